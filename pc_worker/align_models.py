@@ -0,0 +1,154 @@
+"""
+Alignment Model Cache
+Per-language forced-alignment models for word-level timestamps
+
+Features:
+- Alignment models are loaded lazily, the first time a transcript in
+  their language is aligned
+- Up to max_models stay loaded; the least recently used one is evicted
+  when another language needs a model
+- Languages without an alignment model are remembered, so their
+  transcripts keep segment-level timestamps without retrying the load
+- group_by_language() splits a transcript into runs of one language, so
+  mixed-language recordings are aligned run by run with the right model
+- match_source_segments() maps aligned segments (alignment may split a
+  segment into sentences) back to the segments they came from, so a
+  transcript aligned after the fact keeps its speakers
+"""
+
+import asyncio
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from logger import get_logger
+
+logger = get_logger("align_models")
+
+# (model, metadata) as returned by whisperx.load_align_model
+AlignModel = Tuple[Any, Dict]
+
+
+class AlignModelCache:
+    """
+    LRU cache of alignment models keyed by language code
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], AlignModel],
+        max_models: int = 3,
+        release: Optional[Callable[[], None]] = None
+    ):
+        """
+        Args:
+            loader: Loads the model for a language (blocking; raises
+                ValueError if the language has no alignment model)
+            max_models: Models kept loaded at once (at least 1)
+            release: Called after a model is evicted (e.g. to free GPU memory)
+        """
+        self._loader = loader
+        self.max_models = max(1, max_models)
+        self._release = release
+        self._models: "OrderedDict[str, AlignModel]" = OrderedDict()
+        self._unsupported: Set[str] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def languages(self) -> List[str]:
+        """Languages with a loaded model, least recently used first"""
+        return list(self._models)
+
+    async def get(self, language: str) -> Optional[AlignModel]:
+        """
+        Get the alignment model for a language, loading it if needed
+
+        Args:
+            language: Language code
+
+        Returns:
+            (model, metadata), or None if the language has no alignment model
+        """
+        async with self._lock:
+            if language in self._models:
+                self._models.move_to_end(language)
+                return self._models[language]
+            if language in self._unsupported:
+                return None
+
+            while len(self._models) >= self.max_models:
+                evicted, _ = self._models.popitem(last=False)
+                logger.info(f"Evicted alignment model: {evicted}")
+                if self._release is not None:
+                    self._release()
+
+            logger.info(f"Loading alignment model for language: {language}")
+            try:
+                model = await asyncio.to_thread(self._loader, language)
+            except ValueError as e:
+                logger.warning(f"No alignment model for language {language}, keeping segment timestamps: {e}")
+                self._unsupported.add(language)
+                return None
+
+            self._models[language] = model
+            return model
+
+    def clear(self) -> None:
+        """Drop every loaded model"""
+        had_models = bool(self._models)
+        self._models.clear()
+        if had_models and self._release is not None:
+            self._release()
+
+
+def group_by_language(segments: List[Dict], default: str) -> List[Tuple[str, List[Dict]]]:
+    """
+    Split segments into consecutive runs of the same language
+
+    Args:
+        segments: WhisperX-style segments, optionally tagged with "language"
+        default: Language of untagged segments
+
+    Returns:
+        (language, segments) per run, in input order
+    """
+    runs: List[Tuple[str, List[Dict]]] = []
+    for segment in segments:
+        language = segment.get("language") or default
+        if runs and runs[-1][0] == language:
+            runs[-1][1].append(segment)
+        else:
+            runs.append((language, [segment]))
+    return runs
+
+
+def match_source_segments(
+    aligned: List[Tuple[float, float]],
+    sources: List[Tuple[float, float]]
+) -> List[Optional[int]]:
+    """
+    Find the source segment each aligned segment came from
+
+    Args:
+        aligned: (start, end) of the aligned segments
+        sources: (start, end) of the segments that were aligned, sorted by start
+
+    Returns:
+        Index into sources per aligned segment: the source containing its
+        midpoint, else the nearest one (None if there are no sources)
+    """
+    starts = [start for start, _ in sources]
+
+    def distance(index: int, midpoint: float) -> float:
+        start, end = sources[index]
+        if start <= midpoint <= end:
+            return 0.0
+        return min(abs(start - midpoint), abs(end - midpoint))
+
+    matches: List[Optional[int]] = []
+    for start, end in aligned:
+        midpoint = (start + end) / 2
+        i = bisect_right(starts, midpoint) - 1
+        candidates = [j for j in (i, i + 1) if 0 <= j < len(sources)]
+        matches.append(min(candidates, key=lambda j: distance(j, midpoint)) if candidates else None)
+    return matches
@@ -0,0 +1,201 @@
+"""
+Audio Decoder Module
+Decodes compressed audio (m4a, mp3, ...) with ffmpeg straight into numpy
+
+ffmpeg writes raw float32 PCM to stdout (-f f32le pipe:1) after doing
+the resampling and downmix itself, so no temporary WAV file is written
+and no float64 intermediate is allocated. iter_ffmpeg_blocks reads the
+same pipe in fixed-size blocks for bounded-memory streaming.
+"""
+
+import os
+import subprocess
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from exceptions import AudioCorruptedError
+from logger import get_logger
+
+logger = get_logger("audio_decoder")
+
+# Bytes read from the ffmpeg pipe per call
+_READ_SIZE = 1 << 20
+
+# Tail of ffmpeg's stderr kept for error messages
+_STDERR_TAIL_BYTES = 64 * 1024
+
+
+@lru_cache(maxsize=1)
+def get_ffmpeg_path() -> str:
+    """Get the ffmpeg executable (bundled imageio-ffmpeg if available, else PATH)"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return "ffmpeg"
+
+
+def build_ffmpeg_command(
+    file_path: Path,
+    sample_rate: Optional[int] = 16000,
+    channels: Optional[int] = 1,
+    audio_filter: Optional[str] = None
+) -> List[str]:
+    """
+    Build an ffmpeg command that writes float32 PCM to stdout.
+
+    Args:
+        file_path: Input audio file
+        sample_rate: Output sample rate (None keeps the source rate)
+        channels: Output channel count (None keeps the source layout)
+        audio_filter: Optional -af filter graph (e.g. loudnorm)
+
+    Returns:
+        Command argument list
+    """
+    cmd = [get_ffmpeg_path(), '-nostdin', '-v', 'error', '-i', str(file_path), '-vn']
+    if audio_filter:
+        cmd += ['-af', audio_filter]
+    if sample_rate:
+        cmd += ['-ar', str(sample_rate)]
+    if channels:
+        cmd += ['-ac', str(channels)]
+    cmd += ['-f', 'f32le', '-acodec', 'pcm_f32le', 'pipe:1']
+    return cmd
+
+
+def _start_ffmpeg(cmd: List[str]) -> Tuple[subprocess.Popen, IO[bytes]]:
+    """
+    Start ffmpeg with stdout piped and stderr spooled to a temporary file
+
+    stderr is not a pipe: while stdout is read to EOF nobody would drain
+    it, and ffmpeg would block once the pipe buffer filled (deadlock).
+
+    Raises:
+        AudioCorruptedError: If ffmpeg cannot be started
+    """
+    stderr_file = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+    except OSError as e:
+        stderr_file.close()
+        raise AudioCorruptedError(f"Cannot start ffmpeg: {e}")
+    return process, stderr_file
+
+
+def _read_stderr_tail(stderr_file: IO[bytes]) -> str:
+    """Last _STDERR_TAIL_BYTES of ffmpeg's spooled stderr"""
+    size = stderr_file.seek(0, os.SEEK_END)
+    stderr_file.seek(max(0, size - _STDERR_TAIL_BYTES))
+    return stderr_file.read().decode(errors='replace').strip()
+
+
+def decode_with_ffmpeg(
+    file_path: Path,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    audio_filter: Optional[str] = None
+) -> np.ndarray:
+    """
+    Decode an audio file to float32 samples through an ffmpeg pipe.
+
+    Blocking; call via asyncio.to_thread.
+
+    Args:
+        file_path: Input audio file
+        sample_rate: Output sample rate (resampled by ffmpeg)
+        channels: Output channel count (downmixed by ffmpeg)
+        audio_filter: Optional -af filter graph applied before resampling
+
+    Returns:
+        float32 array, shape (samples,) for mono or (samples, channels)
+
+    Raises:
+        AudioCorruptedError: If ffmpeg fails or produces no audio
+    """
+    cmd = build_ffmpeg_command(file_path, sample_rate, channels, audio_filter)
+    process, stderr_file = _start_ffmpeg(cmd)
+
+    # Accumulate into a bytearray so the resulting array is writable without a copy
+    buffer = bytearray()
+    with stderr_file:
+        with process:
+            while True:
+                chunk = process.stdout.read(_READ_SIZE)
+                if not chunk:
+                    break
+                buffer += chunk
+
+        if process.returncode != 0:
+            raise AudioCorruptedError(f"ffmpeg error: {_read_stderr_tail(stderr_file)}")
+
+    frame_bytes = 4 * channels
+    usable = len(buffer) - len(buffer) % frame_bytes
+    if usable == 0:
+        raise AudioCorruptedError(f"ffmpeg produced no audio for {file_path}")
+    del buffer[usable:]
+
+    audio = np.frombuffer(buffer, dtype=np.float32)
+    if channels > 1:
+        audio = audio.reshape(-1, channels)
+
+    logger.debug(
+        f"Decoded {Path(file_path).name} with ffmpeg: "
+        f"{len(audio) / sample_rate:.2f}s @ {sample_rate}Hz"
+    )
+    return audio
+
+
+def iter_ffmpeg_blocks(
+    file_path: Path,
+    block_size: int,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    audio_filter: Optional[str] = None
+) -> Iterator[np.ndarray]:
+    """
+    Decode an audio file through an ffmpeg pipe in fixed-size blocks.
+
+    Only one block is held in memory at a time. Blocking; iterate from a
+    worker thread.
+
+    Args:
+        file_path: Input audio file
+        block_size: Samples (frames) per block; the last block may be shorter
+        sample_rate: Output sample rate (resampled by ffmpeg)
+        channels: Output channel count (downmixed by ffmpeg)
+        audio_filter: Optional -af filter graph
+
+    Yields:
+        float32 arrays, shape (n,) for mono or (n, channels)
+
+    Raises:
+        AudioCorruptedError: If ffmpeg fails
+    """
+    cmd = build_ffmpeg_command(file_path, sample_rate, channels, audio_filter)
+    process, stderr_file = _start_ffmpeg(cmd)
+
+    frame_bytes = 4 * channels
+    try:
+        while True:
+            data = process.stdout.read(block_size * frame_bytes)
+            usable = len(data) - len(data) % frame_bytes
+            if usable == 0:
+                break
+
+            block = np.frombuffer(data[:usable] if usable < len(data) else data, dtype=np.float32)
+            yield block.reshape(-1, channels) if channels > 1 else block
+
+        if process.wait() != 0:
+            raise AudioCorruptedError(f"ffmpeg error: {_read_stderr_tail(stderr_file)}")
+    finally:
+        # Stop ffmpeg if the consumer abandons the stream early
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        process.stdout.close()
+        stderr_file.close()
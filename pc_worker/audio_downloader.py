@@ -0,0 +1,371 @@
+"""
+Audio Downloader Module
+Resumable, parallel HTTP Range downloads over one shared aiohttp session
+
+Features:
+- One ClientSession reused for every download (connection pooling)
+- Large files are split into fixed-size parts fetched concurrently with
+  Range requests and written at their offsets in a preallocated file
+- Progress is kept in <destination>.part plus a small JSON sidecar, so a
+  failed or interrupted download resumes with the missing parts only
+- Servers without Range support fall back to a single streamed GET
+- File writes and hashing run in worker threads, never on the event loop
+- Size is always verified; MD5 is verified when given or when the ETag
+  is a plain MD5 digest (single-part object storage uploads)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Set, Tuple
+
+import aiohttp
+
+from exceptions import AudioDownloadError
+from logger import get_logger
+
+logger = get_logger("audio_downloader")
+
+# Bytes requested per read from the response stream
+_READ_SIZE = 1 << 16
+_MD5_ETAG = re.compile(r"^[0-9a-f]{32}$")
+_CONTENT_RANGE = re.compile(r"bytes\s+\d+-\d+/(\d+)")
+
+
+@dataclass
+class DownloadConfig:
+    """Configuration for ranged audio downloads"""
+    part_size: int = 8 * 1024 * 1024  # bytes per Range request
+    max_connections: int = 4  # parallel Range requests per file
+    parallel_threshold: int = 16 * 1024 * 1024  # smaller files use one stream
+    write_buffer_size: int = 1024 * 1024  # bytes buffered before a disk write
+    max_attempts: int = 3  # attempts per part and per download
+    retry_delay: float = 1.0  # initial backoff in seconds (doubles per attempt)
+    read_timeout: float = 60.0  # seconds without data before a request fails
+
+
+# =============================================================================
+# Blocking file helpers (run via asyncio.to_thread)
+# =============================================================================
+
+def _write_at(path: Path, offset: int, data: bytes) -> None:
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(data)
+
+
+def _append(path: Path, data: bytes) -> None:
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _preallocate(path: Path, size: int) -> None:
+    with open(path, "wb") as f:
+        f.truncate(size)
+
+
+def _file_md5(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_state(path: Path) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(path: Path, state: dict) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _remove(*paths: Path) -> None:
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# =============================================================================
+# Downloader
+# =============================================================================
+
+class AudioDownloader:
+    """
+    Downloads files with parallel Range requests and resume support.
+
+    Usage:
+        downloader = get_audio_downloader()
+        await downloader.download(url, Path("meeting.m4a"))
+        await downloader.close()  # on shutdown
+    """
+
+    def __init__(self, config: Optional[DownloadConfig] = None):
+        self.config = config or DownloadConfig()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session (created lazily inside the running loop)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=self.config.read_timeout),
+                connector=aiohttp.TCPConnector(limit_per_host=self.config.max_connections * 2),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def download(
+        self,
+        url: str,
+        destination: Path,
+        expected_md5: Optional[str] = None
+    ) -> Path:
+        """
+        Download a URL to a local file, resuming earlier partial progress.
+
+        Args:
+            url: HTTP(S) URL (signed URLs may change between attempts)
+            destination: Final file path
+            expected_md5: Optional hex MD5 to verify against
+
+        Returns:
+            destination
+
+        Raises:
+            AudioDownloadError: If the download fails after all attempts or
+                the file does not verify
+        """
+        destination = Path(destination)
+        delay = self.config.retry_delay
+
+        for attempt in range(1, self.config.max_attempts + 1):
+            try:
+                return await self._download_once(url, destination, expected_md5)
+            except (aiohttp.ClientError, asyncio.TimeoutError, AudioDownloadError) as e:
+                if attempt == self.config.max_attempts:
+                    raise AudioDownloadError(f"Download failed after {attempt} attempts: {e}")
+                logger.warning(
+                    f"Download attempt {attempt} for {destination.name} failed ({e}), "
+                    f"resuming in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def _download_once(
+        self,
+        url: str,
+        destination: Path,
+        expected_md5: Optional[str]
+    ) -> Path:
+        part_path = destination.with_name(destination.name + ".part")
+        state_path = destination.with_name(destination.name + ".part.json")
+
+        size, etag, accepts_ranges = await self._probe(url)
+        if expected_md5 is None and etag and _MD5_ETAG.match(etag):
+            expected_md5 = etag
+
+        state = await asyncio.to_thread(_load_state, state_path)
+        if state and (state.get("size") != size or state.get("etag") != etag):
+            logger.info(f"Remote file changed, discarding partial download of {destination.name}")
+            state = None
+        if state is None or not part_path.exists():
+            await asyncio.to_thread(_remove, part_path, state_path)
+            state = None
+
+        if accepts_ranges and size is not None and size >= self.config.parallel_threshold:
+            await self._download_parts(url, part_path, state_path, state, size, etag)
+        else:
+            await self._download_stream(url, part_path, state_path, state, size, etag, accepts_ranges)
+
+        # Verify before the file becomes visible under its final name
+        actual_size = part_path.stat().st_size
+        if size is not None and actual_size != size:
+            await asyncio.to_thread(_remove, part_path, state_path)
+            raise AudioDownloadError(f"Size mismatch: expected {size} bytes, got {actual_size}")
+        if expected_md5:
+            actual_md5 = await asyncio.to_thread(_file_md5, part_path)
+            if actual_md5 != expected_md5.lower():
+                await asyncio.to_thread(_remove, part_path, state_path)
+                raise AudioDownloadError(f"MD5 mismatch: expected {expected_md5}, got {actual_md5}")
+
+        await asyncio.to_thread(os.replace, part_path, destination)
+        await asyncio.to_thread(_remove, state_path)
+        return destination
+
+    async def _probe(self, url: str) -> Tuple[Optional[int], Optional[str], bool]:
+        """
+        Ask for the first byte to learn size, ETag and Range support.
+
+        Returns:
+            Tuple of (size or None, ETag without quotes or None, accepts ranges)
+        """
+        session = self._get_session()
+        async with session.get(url, headers={"Range": "bytes=0-0"}) as response:
+            if response.status not in (200, 206):
+                raise AudioDownloadError(f"HTTP {response.status} when downloading audio")
+
+            etag = response.headers.get("ETag", "").removeprefix("W/").strip('"') or None
+            if response.status == 206:
+                match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                return (int(match.group(1)) if match else None), etag, match is not None
+
+            # Server ignored the Range header; do not read the body
+            return response.content_length, etag, False
+
+    async def _download_parts(
+        self,
+        url: str,
+        part_path: Path,
+        state_path: Path,
+        state: Optional[dict],
+        size: int,
+        etag: Optional[str]
+    ) -> None:
+        """Fetch missing parts concurrently into the preallocated .part file"""
+        part_size = self.config.part_size
+        if state is None or state.get("part_size") != part_size:
+            await asyncio.to_thread(_preallocate, part_path, size)
+            state = {"size": size, "etag": etag, "part_size": part_size, "done": []}
+            await asyncio.to_thread(_save_state, state_path, state)
+
+        num_parts = -(-size // part_size)
+        done: Set[int] = set(state["done"])
+        pending = [i for i in range(num_parts) if i not in done]
+        if done:
+            logger.info(f"Resuming {part_path.name}: {len(done)}/{num_parts} parts present")
+
+        semaphore = asyncio.Semaphore(self.config.max_connections)
+        state_lock = asyncio.Lock()
+
+        async def run(index: int) -> None:
+            start = index * part_size
+            end = min(start + part_size, size) - 1
+            async with semaphore:
+                await self._fetch_part_with_retry(url, part_path, start, end)
+            async with state_lock:
+                done.add(index)
+                state["done"] = sorted(done)
+                await asyncio.to_thread(_save_state, state_path, state)
+
+        tasks = [asyncio.create_task(run(i)) for i in pending]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _fetch_part_with_retry(self, url: str, part_path: Path, start: int, end: int) -> None:
+        delay = self.config.retry_delay
+        for attempt in range(1, self.config.max_attempts + 1):
+            try:
+                await self._fetch_part(url, part_path, start, end)
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError, AudioDownloadError):
+                if attempt == self.config.max_attempts:
+                    raise
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def _fetch_part(self, url: str, part_path: Path, start: int, end: int) -> None:
+        """Fetch bytes [start, end] and write them at their offset"""
+        session = self._get_session()
+        async with session.get(url, headers={"Range": f"bytes={start}-{end}"}) as response:
+            if response.status != 206:
+                raise AudioDownloadError(f"HTTP {response.status} for range {start}-{end}")
+
+            offset = start
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(_READ_SIZE):
+                buffer += chunk
+                if len(buffer) >= self.config.write_buffer_size:
+                    data, buffer = bytes(buffer), bytearray()
+                    await asyncio.to_thread(_write_at, part_path, offset, data)
+                    offset += len(data)
+            if buffer:
+                await asyncio.to_thread(_write_at, part_path, offset, bytes(buffer))
+                offset += len(buffer)
+
+        if offset != end + 1:
+            raise AudioDownloadError(f"Short read for range {start}-{end}: {offset - start} bytes")
+
+    async def _download_stream(
+        self,
+        url: str,
+        part_path: Path,
+        state_path: Path,
+        state: Optional[dict],
+        size: Optional[int],
+        etag: Optional[str],
+        accepts_ranges: bool
+    ) -> None:
+        """Single streamed GET, appending to the .part file from where it stopped"""
+        resume_from = 0
+        if state is not None and state.get("part_size") is None and accepts_ranges:
+            resume_from = part_path.stat().st_size
+        else:
+            await asyncio.to_thread(_remove, part_path)
+        await asyncio.to_thread(
+            _save_state, state_path, {"size": size, "etag": etag, "part_size": None}
+        )
+
+        if size is not None and resume_from == size:
+            return
+
+        headers = {"Range": f"bytes={resume_from}-"} if resume_from else {}
+        session = self._get_session()
+        async with session.get(url, headers=headers) as response:
+            if resume_from and response.status == 200:
+                # Range ignored after all; start over
+                await asyncio.to_thread(_remove, part_path)
+            elif response.status not in (200, 206):
+                raise AudioDownloadError(f"HTTP {response.status} when downloading audio")
+            elif resume_from:
+                logger.info(f"Resuming {part_path.name} at {resume_from / 1024 / 1024:.1f} MB")
+
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(_READ_SIZE):
+                buffer += chunk
+                if len(buffer) >= self.config.write_buffer_size:
+                    data, buffer = bytes(buffer), bytearray()
+                    await asyncio.to_thread(_append, part_path, data)
+            await asyncio.to_thread(_append, part_path, bytes(buffer))
+
+
+# =============================================================================
+# Singleton Instance
+# =============================================================================
+
+_audio_downloader: Optional[AudioDownloader] = None
+
+
+def get_audio_downloader(config: Optional[DownloadConfig] = None) -> AudioDownloader:
+    """Get or create singleton audio downloader"""
+    global _audio_downloader
+
+    if _audio_downloader is None:
+        if config is None:
+            from config import AUDIO_DOWNLOAD_CONNECTIONS
+            config = DownloadConfig(max_connections=AUDIO_DOWNLOAD_CONNECTIONS)
+        _audio_downloader = AudioDownloader(config)
+
+    return _audio_downloader
@@ -5,14 +5,17 @@ Handles audio download, preprocessing, and validation
 
 import asyncio
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Callable, Iterator
 import librosa
 import soundfile as sf
 import numpy as np
-import noisereduce as nr
-from scipy import signal
 
 from models import AudioMetadata
+from audio_decoder import decode_with_ffmpeg, iter_ffmpeg_blocks
+from resampling import StreamingResampler, resample_audio
+from vad import VADConfig, detect_speech_segments
+from enhancement import EnhancementConfig, bandpass_filter, enhance_for_stt, reduce_noise_blockwise
+from loudness import DEFAULT_TARGET_LUFS, LoudnessMeter, loudness_gain, normalize_loudness
 from exceptions import (
     AudioDownloadError,
     AudioCorruptedError,
@@ -34,19 +37,35 @@ class AudioProcessor:
         self,
         target_sample_rate: int = 16000,
         normalize: bool = True,
-        remove_silence: bool = False
+        remove_silence: bool = False,
+        streaming: bool = False,
+        block_seconds: float = 30.0,
+        resample_quality: str = "medium",
+        resample_engine: str = "auto",
+        target_lufs: float = DEFAULT_TARGET_LUFS
     ):
         """
         Initialize audio processor
 
         Args:
             target_sample_rate: Target sample rate for processing (default: 16kHz for WhisperX)
-            normalize: Whether to normalize audio
+            normalize: Whether to loudness-normalize audio (EBU R128)
             remove_silence: Whether to remove silence segments
+            streaming: Preprocess block by block with bounded memory (for very long recordings)
+            block_seconds: Block length in seconds for streaming mode
+            resample_quality: Resampling quality tier ("low", "medium", "high")
+            resample_engine: Resampler ("auto" prefers soxr, "soxr" or "polyphase")
+            target_lufs: Integrated loudness target for normalization
         """
         self.target_sample_rate = target_sample_rate
         self.normalize = normalize
         self.remove_silence = remove_silence
+        self.streaming = streaming
+        self.block_seconds = block_seconds
+        self.resample_quality = resample_quality
+        self.resample_engine = resample_engine
+        self.target_lufs = target_lufs
+        self.enhancement_config = EnhancementConfig()
 
     async def download_audio(
         self,
@@ -152,54 +171,19 @@ class AudioProcessor:
         """
         Load audio using ffmpeg directly (for compressed formats like m4a, mp3)
 
+        ffmpeg resamples to the target rate and downmixes to mono, and the
+        samples are read from its stdout pipe without a temporary WAV file.
+
         Args:
             file_path: Path to audio file
 
         Returns:
             Tuple of (audio_data, sample_rate)
         """
-        import subprocess
-        import tempfile
-
-        # Get ffmpeg path from imageio-ffmpeg
-        try:
-            import imageio_ffmpeg
-            ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
-        except ImportError:
-            ffmpeg_path = "ffmpeg"
-
-        def _convert():
-            # Create temp WAV file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
-                temp_wav = tmp.name
-
-            try:
-                # Use ffmpeg to convert to WAV
-                cmd = [
-                    ffmpeg_path,
-                    '-i', str(file_path),
-                    '-ar', '16000',  # 16kHz sample rate
-                    '-ac', '1',       # mono
-                    '-f', 'wav',
-                    '-y',             # overwrite
-                    temp_wav
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-
-                if result.returncode != 0:
-                    raise Exception(f"ffmpeg error: {result.stderr}")
-
-                # Load the converted WAV file
-                audio_data, sample_rate = sf.read(temp_wav)
-                return audio_data.astype(np.float32), sample_rate
-
-            finally:
-                # Cleanup temp file
-                import os
-                if os.path.exists(temp_wav):
-                    os.remove(temp_wav)
-
-        audio_data, sample_rate = await asyncio.to_thread(_convert)
+        sample_rate = self.target_sample_rate
+        audio_data = await asyncio.to_thread(
+            decode_with_ffmpeg, file_path, sample_rate=sample_rate, channels=1
+        )
 
         logger.debug(
             f"Loaded audio with ffmpeg: duration={len(audio_data)/sample_rate:.2f}s, "
@@ -215,7 +199,14 @@ class AudioProcessor:
         meeting_id: str
     ) -> AudioMetadata:
         """
-        Preprocess audio file: resample, normalize, and convert to WAV
+        Preprocess audio file: resample, loudness-normalize, and convert to WAV
+
+        Integrated loudness is measured once here and stored in the returned
+        metadata (loudness_lufs), so later stages do not normalize again.
+
+        In streaming mode the file is read in blocks (soundfile or the ffmpeg
+        pipe), resampled with a stateful polyphase filter and written
+        incrementally, so peak memory does not grow with recording length.
 
         Args:
             input_path: Path to input audio file
@@ -231,6 +222,9 @@ class AudioProcessor:
         logger.log_operation_start("preprocess_audio", meeting_id=meeting_id)
 
         try:
+            if self.streaming:
+                return await self._preprocess_streaming(input_path, output_path, meeting_id)
+
             # Load audio
             audio_data, original_sr = await self.load_audio(input_path)
 
@@ -240,15 +234,23 @@ class AudioProcessor:
                     f"Resampling from {original_sr}Hz to {self.target_sample_rate}Hz"
                 )
                 audio_data = await asyncio.to_thread(
-                    librosa.resample,
+                    resample_audio,
                     audio_data,
-                    orig_sr=original_sr,
-                    target_sr=self.target_sample_rate
+                    original_sr,
+                    self.target_sample_rate,
+                    self.resample_quality,
+                    self.resample_engine
                 )
 
-            # Normalize audio
+            # Normalize loudness
+            loudness_lufs = None
             if self.normalize:
-                audio_data = self._normalize_audio(audio_data)
+                audio_data, loudness_lufs = await asyncio.to_thread(
+                    normalize_loudness,
+                    audio_data,
+                    self.target_sample_rate,
+                    self.target_lufs
+                )
 
             # Remove silence if requested
             if self.remove_silence:
@@ -274,14 +276,16 @@ class AudioProcessor:
                 sample_rate=self.target_sample_rate,
                 channels=1,  # We convert to mono
                 format='WAV',
-                size_bytes=size_bytes
+                size_bytes=size_bytes,
+                loudness_lufs=loudness_lufs
             )
 
             logger.log_operation_success(
                 "preprocess_audio",
                 meeting_id=meeting_id,
                 duration_s=f"{duration:.2f}",
-                size_mb=f"{size_bytes / 1024 / 1024:.2f}"
+                size_mb=f"{size_bytes / 1024 / 1024:.2f}",
+                loudness_lufs=f"{loudness_lufs:.1f}" if loudness_lufs is not None else "N/A"
             )
 
             return metadata
@@ -293,20 +297,150 @@ class AudioProcessor:
             logger.log_operation_failure("preprocess_audio", e, meeting_id=meeting_id)
             raise AudioPreprocessingError(f"Failed to preprocess audio: {e}")
 
-    def _normalize_audio(self, audio_data: np.ndarray) -> np.ndarray:
+    async def _preprocess_streaming(
+        self,
+        input_path: Path,
+        output_path: Path,
+        meeting_id: str
+    ) -> AudioMetadata:
         """
-        Normalize audio to [-1, 1] range
+        Streaming variant of preprocess_audio
 
         Args:
-            audio_data: Audio samples
+            input_path: Path to input audio file
+            output_path: Path to save processed audio
+            meeting_id: Meeting ID for logging
 
         Returns:
-            Normalized audio data
+            AudioMetadata with processed audio information
         """
-        max_val = np.abs(audio_data).max()
-        if max_val > 0:
-            return audio_data / max_val
-        return audio_data
+        if self.remove_silence:
+            logger.warning("Silence removal is not applied in streaming mode")
+
+        num_samples, loudness_lufs = await asyncio.to_thread(
+            self._write_streaming, Path(input_path), Path(output_path)
+        )
+        if num_samples == 0:
+            raise AudioCorruptedError("Audio data is empty after loading")
+
+        duration = num_samples / self.target_sample_rate
+        size_bytes = output_path.stat().st_size
+
+        metadata = AudioMetadata(
+            file_path=str(output_path),
+            duration_seconds=duration,
+            sample_rate=self.target_sample_rate,
+            channels=1,  # We convert to mono
+            format='WAV',
+            size_bytes=size_bytes,
+            loudness_lufs=loudness_lufs
+        )
+
+        logger.log_operation_success(
+            "preprocess_audio",
+            meeting_id=meeting_id,
+            duration_s=f"{duration:.2f}",
+            size_mb=f"{size_bytes / 1024 / 1024:.2f}",
+            loudness_lufs=f"{loudness_lufs:.1f}" if loudness_lufs is not None else "N/A",
+            mode="streaming"
+        )
+
+        return metadata
+
+    def _open_block_source(
+        self,
+        file_path: Path
+    ) -> Tuple[int, Callable[[], Iterator[np.ndarray]]]:
+        """
+        Get a re-iterable source of mono float32 blocks for a file
+
+        Formats libsndfile can read (WAV, FLAC, OGG) are read with
+        soundfile.blocks at their native rate; everything else is decoded
+        through the ffmpeg pipe, which resamples to the target rate itself.
+
+        Args:
+            file_path: Path to audio file
+
+        Returns:
+            Tuple of (source_sample_rate, block iterator factory)
+        """
+        try:
+            source_sr = sf.info(str(file_path)).samplerate
+        except Exception:
+            source_sr = None
+
+        if source_sr is not None:
+            block_size = int(self.block_seconds * source_sr)
+
+            def soundfile_blocks() -> Iterator[np.ndarray]:
+                for block in sf.blocks(
+                    str(file_path), blocksize=block_size, dtype='float32', always_2d=True
+                ):
+                    yield block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+
+            return source_sr, soundfile_blocks
+
+        block_size = int(self.block_seconds * self.target_sample_rate)
+        return self.target_sample_rate, lambda: iter_ffmpeg_blocks(
+            file_path, block_size, sample_rate=self.target_sample_rate, channels=1
+        )
+
+    def _write_streaming(self, input_path: Path, output_path: Path) -> Tuple[int, Optional[float]]:
+        """
+        Resample, loudness-normalize and write audio block by block (blocking)
+
+        Pass 1 measures the integrated loudness and peak of the resampled
+        signal (matching the in-memory path); pass 2 resamples again and
+        writes with the normalization gain. Only one block is held in
+        memory at a time.
+
+        Args:
+            input_path: Path to input audio file
+            output_path: Path to save processed audio
+
+        Returns:
+            Tuple of (number of samples written, measured loudness in LUFS
+            or None if not normalized / silent)
+        """
+        source_sr, blocks = self._open_block_source(input_path)
+
+        gain = np.float32(1.0)
+        loudness_lufs = None
+        if self.normalize:
+            resampler = StreamingResampler(
+                source_sr, self.target_sample_rate, self.resample_quality
+            )
+            meter = LoudnessMeter(self.target_sample_rate)
+            for block in blocks():
+                meter.process(resampler.process(block))
+            meter.process(resampler.flush())
+
+            measured = meter.integrated()
+            gain = np.float32(loudness_gain(measured, meter.peak, self.target_lufs))
+            if np.isfinite(measured):
+                loudness_lufs = measured
+
+        resampler = StreamingResampler(source_sr, self.target_sample_rate, self.resample_quality)
+        num_samples = 0
+
+        with sf.SoundFile(
+            str(output_path), 'w',
+            samplerate=self.target_sample_rate,
+            channels=1,
+            format='WAV',
+            subtype='PCM_16'
+        ) as out:
+            def write(chunk: np.ndarray) -> int:
+                if len(chunk) == 0:
+                    return 0
+                out.write(chunk * gain)
+                return len(chunk)
+
+            for block in blocks():
+                num_samples += write(resampler.process(block))
+            num_samples += write(resampler.flush())
+
+        return num_samples, loudness_lufs
 
     async def _remove_silence(
         self,
@@ -460,14 +594,23 @@ class AudioProcessor:
         try:
             logger.debug("Applying noise reduction")
 
-            # Use noisereduce library
-            reduced_audio = await asyncio.to_thread(
-                nr.reduce_noise,
-                y=audio_data,
-                sr=sample_rate,
-                stationary=stationary,
-                prop_decrease=0.8  # Aggressive noise reduction
-            )
+            if stationary:
+                # Noise profile from the quietest stretch, gated block by block
+                reduced_audio = await asyncio.to_thread(
+                    reduce_noise_blockwise,
+                    audio_data,
+                    sample_rate,
+                    prop_decrease=0.8  # Aggressive noise reduction
+                )
+            else:
+                import noisereduce as nr
+                reduced_audio = await asyncio.to_thread(
+                    nr.reduce_noise,
+                    y=audio_data,
+                    sr=sample_rate,
+                    stationary=False,
+                    prop_decrease=0.8
+                )
 
             return reduced_audio
 
@@ -480,16 +623,25 @@ class AudioProcessor:
         audio_data: np.ndarray,
         sample_rate: int,
         frame_duration_ms: int = 30,
-        aggressiveness: int = 2
+        aggressiveness: int = 2,
+        hangover_ms: int = 300,
+        min_silence_ms: int = 300,
+        min_speech_ms: int = 250
     ) -> List[Tuple[float, float]]:
         """
         Detect voice activity in audio (Voice Activity Detection - VAD)
 
+        Energy-based and fully vectorized (see vad.detect_speech_segments);
+        runs in a worker thread.
+
         Args:
             audio_data: Audio samples
             sample_rate: Sample rate
             frame_duration_ms: Frame duration in milliseconds (10, 20, or 30)
             aggressiveness: VAD aggressiveness (0-3, higher = more aggressive)
+            hangover_ms: Time speech stays open after energy drops
+            min_silence_ms: Gaps shorter than this are merged
+            min_speech_ms: Segments shorter than this are dropped
 
         Returns:
             List of (start_time, end_time) tuples for voice segments
@@ -497,44 +649,16 @@ class AudioProcessor:
         try:
             logger.debug("Detecting voice activity")
 
-            # Use librosa's energy-based VAD
-            # Calculate frame length in samples
-            hop_length = int(sample_rate * frame_duration_ms / 1000)
-
-            # Compute RMS energy
-            rms = librosa.feature.rms(
-                y=audio_data,
-                frame_length=hop_length * 2,
-                hop_length=hop_length
-            )[0]
-
-            # Threshold based on aggressiveness
-            threshold_multiplier = 0.5 + (aggressiveness * 0.1)
-            threshold = np.median(rms) * threshold_multiplier
-
-            # Find frames above threshold
-            voice_frames = rms > threshold
-
-            # Convert frames to time segments
-            segments = []
-            in_segment = False
-            start_time = 0.0
-
-            for i, is_voice in enumerate(voice_frames):
-                current_time = i * frame_duration_ms / 1000.0
-
-                if is_voice and not in_segment:
-                    # Start of voice segment
-                    start_time = current_time
-                    in_segment = True
-                elif not is_voice and in_segment:
-                    # End of voice segment
-                    segments.append((start_time, current_time))
-                    in_segment = False
-
-            # Close final segment if needed
-            if in_segment:
-                segments.append((start_time, len(voice_frames) * frame_duration_ms / 1000.0))
+            vad_config = VADConfig(
+                frame_duration_ms=frame_duration_ms,
+                aggressiveness=aggressiveness,
+                hangover_ms=hangover_ms,
+                min_silence_ms=min_silence_ms,
+                min_speech_ms=min_speech_ms
+            )
+            segments = await asyncio.to_thread(
+                detect_speech_segments, audio_data, sample_rate, vad_config
+            )
 
             logger.debug(f"Detected {len(segments)} voice segments")
             return segments
@@ -626,28 +750,16 @@ class AudioProcessor:
         try:
             logger.debug(f"Applying bandpass filter: {lowcut}-{highcut} Hz")
 
-            # Calculate normalized frequencies
-            nyquist = 0.5 * sample_rate
-            low = lowcut / nyquist
-            high = highcut / nyquist
-
-            # Design Butterworth bandpass filter
-            b, a = await asyncio.to_thread(
-                signal.butter,
-                order,
-                [low, high],
-                btype='band'
-            )
-
-            # Apply filter
-            filtered_audio = await asyncio.to_thread(
-                signal.filtfilt,
-                b, a,
-                audio_data
+            # Cached SOS design (high cutoff clamped below Nyquist), zero-phase float32
+            return await asyncio.to_thread(
+                bandpass_filter,
+                audio_data,
+                sample_rate,
+                lowcut,
+                highcut,
+                order
             )
 
-            return filtered_audio
-
         except Exception as e:
             logger.warning(f"Bandpass filter failed: {e}. Using original audio.")
             return audio_data
@@ -660,6 +772,10 @@ class AudioProcessor:
         """
         Apply comprehensive audio enhancement for STT
 
+        Noise reduction, bandpass filter and normalization run as one
+        float32 chain in a worker thread (see enhancement.enhance_for_stt);
+        per-step timings are logged.
+
         Args:
             audio_data: Audio samples
             sample_rate: Sample rate
@@ -670,17 +786,19 @@ class AudioProcessor:
         logger.debug("Enhancing audio for STT")
 
         try:
-            # Step 1: Noise reduction
-            audio_data = await self.reduce_noise(audio_data, sample_rate)
-
-            # Step 2: Bandpass filter for speech frequencies
-            audio_data = await self.apply_bandpass_filter(audio_data, sample_rate)
-
-            # Step 3: Normalize
-            audio_data = self._normalize_audio(audio_data)
+            enhanced, timings = await asyncio.to_thread(
+                enhance_for_stt,
+                audio_data,
+                sample_rate,
+                self.enhancement_config
+            )
 
-            logger.debug("Audio enhancement complete")
-            return audio_data
+            logger.info(
+                "Audio enhancement complete",
+                duration_s=f"{len(enhanced) / sample_rate:.1f}",
+                **{f"{step}_s": f"{seconds:.2f}" for step, seconds in timings.items()}
+            )
+            return enhanced
 
         except Exception as e:
             logger.warning(f"Audio enhancement failed: {e}")
@@ -691,7 +809,10 @@ class AudioProcessor:
 def get_audio_processor(
     target_sample_rate: int = 16000,
     normalize: bool = True,
-    remove_silence: bool = False
+    remove_silence: bool = False,
+    streaming: bool = False,
+    resample_quality: str = "medium",
+    resample_engine: str = "auto"
 ) -> AudioProcessor:
     """
     Create audio processor instance
@@ -700,6 +821,9 @@ def get_audio_processor(
         target_sample_rate: Target sample rate
         normalize: Whether to normalize
         remove_silence: Whether to remove silence
+        streaming: Whether to preprocess in bounded-memory blocks
+        resample_quality: Resampling quality tier
+        resample_engine: Resampling engine
 
     Returns:
         AudioProcessor instance
@@ -707,5 +831,8 @@ def get_audio_processor(
     return AudioProcessor(
         target_sample_rate=target_sample_rate,
         normalize=normalize,
-        remove_silence=remove_silence
+        remove_silence=remove_silence,
+        streaming=streaming,
+        resample_quality=resample_quality,
+        resample_engine=resample_engine
     )
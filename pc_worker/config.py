@@ -7,10 +7,22 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # PyTorch 2.6+ compatibility: Patch torch.load to use weights_only=False
-# This is needed because pyannote/whisperx models use pickle serialization
-# Must be done early before any torch imports
-try:
-    import torch
+# This is needed because pyannote/whisperx models use pickle serialization.
+# torch is imported lazily (it takes seconds to import), so modules that load
+# pickled checkpoints call patch_torch_load() right after importing torch
+_torch_load_patched = False
+
+
+def patch_torch_load() -> None:
+    """Patch torch.load with weights_only=False (idempotent, no-op without torch)"""
+    global _torch_load_patched
+    if _torch_load_patched:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+
     _original_torch_load = torch.load
 
     def _patched_torch_load(*args, **kwargs):
@@ -19,8 +31,7 @@ try:
         return _original_torch_load(*args, **kwargs)
 
     torch.load = _patched_torch_load
-except ImportError:
-    pass
+    _torch_load_patched = True
 
 # Supabase Configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -31,7 +42,10 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 DEFAULT_USER_ID = os.getenv("DEFAULT_USER_ID")
 
 # Worker Configuration
-WORKER_ID = os.getenv("WORKER_ID", "default-worker")
+# Must be unique per worker: at startup a worker requeues the meetings still
+# marked processing under its ID (skipped while the default ID is used)
+DEFAULT_WORKER_ID = "default-worker"
+WORKER_ID = os.getenv("WORKER_ID", DEFAULT_WORKER_ID)
 WORKER_NAME = os.getenv("WORKER_NAME", "Default Worker")
 
 # Logging Configuration
@@ -56,6 +70,15 @@ HUGGINGFACE_TOKEN = os.getenv("HUGGINGFACE_TOKEN") or os.getenv("HF_TOKEN")
 _BASE_DIR = Path(__file__).parent.resolve()
 AUDIO_TEMP_DIR = Path(os.getenv("AUDIO_TEMP_DIR", str(_BASE_DIR / "temp_audio"))).resolve()
 MODEL_CACHE_DIR = Path(os.getenv("MODEL_CACHE_DIR", str(_BASE_DIR / "models"))).resolve()
+RAG_INDEX_DIR = Path(os.getenv("RAG_INDEX_DIR", str(_BASE_DIR / "rag_index"))).resolve()
+STT_CHECKPOINT_DIR = Path(os.getenv("STT_CHECKPOINT_DIR", str(_BASE_DIR / "stt_checkpoints"))).resolve()
+# Stage checkpoints (preprocessed audio, transcript, diarization, saved marker) under
+# STT_CHECKPOINT_DIR: a retried meeting resumes after its last finished stage.
+# Checkpoints of meetings never resumed are deleted after STT_CHECKPOINT_MAX_AGE_HOURS
+STT_STAGE_CHECKPOINTS = os.getenv("STT_STAGE_CHECKPOINTS", "true").lower() == "true"
+STT_CHECKPOINT_MAX_AGE_HOURS = float(os.getenv("STT_CHECKPOINT_MAX_AGE_HOURS", "72"))
+# Batch sizes that fit per model and GPU, learned from CUDA out-of-memory retries
+GPU_BATCH_SIZES_FILE = Path(os.getenv("GPU_BATCH_SIZES_FILE", str(MODEL_CACHE_DIR / "batch_sizes.json"))).resolve()
 
 # Create directories if they don't exist
 AUDIO_TEMP_DIR.mkdir(parents=True, exist_ok=True)
@@ -64,6 +87,19 @@ MODEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 # Performance Configuration
 MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "1"))
 POLLING_INTERVAL_SECONDS = int(os.getenv("POLLING_INTERVAL_SECONDS", "60"))
+# Polling mode runs prepare (download/preprocess), STT and finalize (save/summary) as
+# overlapping stages; PREFETCH is the number of meetings queued between stages
+STAGE_PIPELINE_ENABLED = os.getenv("STAGE_PIPELINE_ENABLED", "true").lower() == "true"
+STAGE_PIPELINE_PREFETCH = int(os.getenv("STAGE_PIPELINE_PREFETCH", "1"))
+# Preprocess audio block by block with bounded memory (for multi-hour recordings)
+AUDIO_STREAMING_PREPROCESS = os.getenv("AUDIO_STREAMING_PREPROCESS", "false").lower() == "true"
+# Resampling: quality tier (low/medium/high) and engine (auto/soxr/polyphase)
+AUDIO_RESAMPLE_QUALITY = os.getenv("AUDIO_RESAMPLE_QUALITY", "medium").lower()
+AUDIO_RESAMPLE_ENGINE = os.getenv("AUDIO_RESAMPLE_ENGINE", "auto").lower()
+# Parallel HTTP Range requests per audio download (resumable via .part files)
+AUDIO_DOWNLOAD_CONNECTIONS = int(os.getenv("AUDIO_DOWNLOAD_CONNECTIONS", "4"))
+# Reuse transcript/speakers/summary when an identical recording was already processed
+AUDIO_DEDUP_ENABLED = os.getenv("AUDIO_DEDUP_ENABLED", "true").lower() == "true"
 
 # Folder Monitoring Configuration
 WATCH_FOLDER_PATH = os.getenv("WATCH_FOLDER_PATH", "")
@@ -77,8 +113,57 @@ WORD_OUTPUT_PATH = os.getenv("WORD_OUTPUT_PATH", "./output")
 # Model Configuration
 WHISPERX_MODEL = "large-v2"
 DIARIZATION_MODEL = "pyannote/speaker-diarization-3.0"
+# Drop long silences (energy VAD) before WhisperX; timestamps are remapped afterwards
+WHISPERX_SKIP_SILENCE = os.getenv("WHISPERX_SKIP_SILENCE", "false").lower() == "true"
+# Long-audio mode: recordings longer than this (seconds, 0 = off) are transcribed in
+# silence-aligned windows of about WHISPERX_WINDOW_SECONDS with per-window checkpoints
+WHISPERX_LONG_AUDIO_SECONDS = float(os.getenv("WHISPERX_LONG_AUDIO_SECONDS", "1800"))
+WHISPERX_WINDOW_SECONDS = float(os.getenv("WHISPERX_WINDOW_SECONDS", "600"))
+WHISPERX_PARALLEL_WINDOWS = int(os.getenv("WHISPERX_PARALLEL_WINDOWS", "1"))
+# Batch mode: VAD chunks of recordings up to this length (seconds, 0 = off) share model
+# batches; the STT stage batches up to STT_BATCH_MAX_MEETINGS queued short recordings
+WHISPERX_BATCH_POOL_MAX_SECONDS = float(os.getenv("WHISPERX_BATCH_POOL_MAX_SECONDS", "600"))
+STT_BATCH_MAX_MEETINGS = int(os.getenv("STT_BATCH_MAX_MEETINGS", "8"))
+# Alignment models (one per language) kept loaded, least recently used evicted first
+WHISPERX_ALIGN_CACHE_SIZE = int(os.getenv("WHISPERX_ALIGN_CACHE_SIZE", "3"))
 EMBEDDING_MODEL = "speechbrain/spkrec-ecapa-tdnn"
 
+# STT engine selection ("name" or "name:model"; engines: whisperx, faster-whisper, korean-whisper)
+# Order: per-user setting > CPU-only node (STT_CPU_ENGINE) > recordings up to
+# STT_SHORT_AUDIO_SECONDS (STT_SHORT_AUDIO_ENGINE, 0 = off) > STT_ENGINE
+STT_ENGINE = os.getenv("STT_ENGINE", f"whisperx:{WHISPERX_MODEL}")
+STT_CPU_ENGINE = os.getenv("STT_CPU_ENGINE", "faster-whisper:large-v3-turbo")
+STT_SHORT_AUDIO_ENGINE = os.getenv("STT_SHORT_AUDIO_ENGINE", "whisperx:large-v3-turbo")
+STT_SHORT_AUDIO_SECONDS = float(os.getenv("STT_SHORT_AUDIO_SECONDS", "300"))
+# Fast mode: recordings longer than this (seconds, 0 = off) skip word alignment during STT
+# (segment-level timestamps); a per-user setting (user_stt_settings.word_timestamps,
+# migration 006) wins. Skipped alignment runs later as a background job on request
+STT_FAST_MODE_SECONDS = float(os.getenv("STT_FAST_MODE_SECONDS", "0"))
+# Transcript language ("ko", "en", ...; "auto" = detect from the first 30s of audio,
+# per window in long-audio mode)
+STT_LANGUAGE = os.getenv("STT_LANGUAGE", "ko")
+# faster-whisper (CPU nodes): batched decoding of VAD chunks, optionally on several
+# model replicas each pinned to its own share of the CPU cores
+FASTER_WHISPER_BATCHED = os.getenv("FASTER_WHISPER_BATCHED", "true").lower() == "true"
+FASTER_WHISPER_BATCH_SIZE = int(os.getenv("FASTER_WHISPER_BATCH_SIZE", "8"))
+FASTER_WHISPER_REPLICAS = int(os.getenv("FASTER_WHISPER_REPLICAS", "1"))
+FASTER_WHISPER_CPU_THREADS = int(os.getenv("FASTER_WHISPER_CPU_THREADS", "4"))  # single replica
+# Provisional transcript: segments from streaming engines are saved (and progress pushed
+# over Realtime) in batches of up to STT_STREAM_BATCH_SEGMENTS or every STT_STREAM_BATCH_SECONDS
+STT_STREAM_PARTIAL_TRANSCRIPTS = os.getenv("STT_STREAM_PARTIAL_TRANSCRIPTS", "true").lower() == "true"
+STT_STREAM_BATCH_SEGMENTS = int(os.getenv("STT_STREAM_BATCH_SEGMENTS", "20"))
+STT_STREAM_BATCH_SECONDS = float(os.getenv("STT_STREAM_BATCH_SECONDS", "10"))
+
+# GPU model residency: models load on demand; idle ones are evicted LRU-first to stay
+# under MODEL_VRAM_BUDGET_MB (0 = 90% of the GPU) and unloaded after
+# MODEL_IDLE_UNLOAD_SECONDS without use (0 = never). Models are prewarmed when a job is
+# claimed. Footprints are estimates until measured on load (Ollama runs out of process)
+MODEL_VRAM_BUDGET_MB = float(os.getenv("MODEL_VRAM_BUDGET_MB", "0"))
+MODEL_IDLE_UNLOAD_SECONDS = float(os.getenv("MODEL_IDLE_UNLOAD_SECONDS", "1800"))
+MODEL_PREWARM = os.getenv("MODEL_PREWARM", "true").lower() == "true"
+STT_MODEL_VRAM_MB = float(os.getenv("STT_MODEL_VRAM_MB", "6000"))  # STT + alignment + diarization
+SUMMARIZER_VRAM_MB = float(os.getenv("SUMMARIZER_VRAM_MB", "6000"))  # Ollama summarization model
+
 # Ollama Configuration for Summarization
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "gemma2:7b")
@@ -92,6 +177,19 @@ CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))  # Overlap between chunks
 SUMMARY_LENGTH_MIN = int(os.getenv("SUMMARY_LENGTH_MIN", "100"))  # Minimum summary length
 SUMMARY_LENGTH_MAX = int(os.getenv("SUMMARY_LENGTH_MAX", "1000"))  # Maximum summary length
 
+# RAG Search Configuration
+# Local vector index answers semantic queries without the pgvector RPC (desktop/offline)
+RAG_LOCAL_INDEX_ENABLED = os.getenv("RAG_LOCAL_INDEX_ENABLED", "false").lower() == "true"
+RAG_LOCAL_INDEX_NPROBE = int(os.getenv("RAG_LOCAL_INDEX_NPROBE", "8"))
+# Local BM25 keyword index with Korean n-gram tokenization (replaces the 'simple' tsvector search)
+RAG_LOCAL_KEYWORD_INDEX_ENABLED = os.getenv("RAG_LOCAL_KEYWORD_INDEX_ENABLED", "false").lower() == "true"
+# Hybrid ranking: "rpc" (weighted sum in SQL) or "rrf" (client-side reciprocal rank fusion,
+# needs the local keyword index; falls back to "rpc" until it is backfilled)
+RAG_HYBRID_MODE = os.getenv("RAG_HYBRID_MODE", "rpc").lower()
+# Re-ranker: "cross_encoder" (local model, one batched pass) or "llm" (Ollama prompts)
+RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "cross_encoder").lower()
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "BAAI/bge-reranker-v2-m3")
+
 # Validation
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in .env")
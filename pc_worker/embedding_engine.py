@@ -6,6 +6,9 @@ BGE-M3 Features:
 - 1024-dimensional dense embeddings
 - Excellent multilingual support (Korean included)
 - Optimized for semantic similarity search
+
+On CUDA out-of-memory, encoding is retried with half the batch size and the
+size that fit is remembered for this model and GPU (see gpu_memory).
 """
 
 import asyncio
@@ -15,7 +18,7 @@ import numpy as np
 from pydantic import BaseModel, Field
 
 from logger import get_logger
-from config import get_config
+from gpu_memory import batch_size_key, get_batch_size_store, run_with_oom_backoff
 
 logger = get_logger(__name__)
 
@@ -40,7 +43,7 @@ class EmbeddingConfig(BaseModel):
     )
     batch_size: int = Field(
         default=32,
-        description="Batch size for embedding generation"
+        description="Batch size for embedding generation (lowered per GPU after out-of-memory)"
     )
     use_fp16: bool = Field(
         default=True,
@@ -225,11 +228,31 @@ class EmbeddingEngine:
         Returns:
             Numpy array of embeddings (N x embedding_dim)
         """
+        embeddings = run_with_oom_backoff(
+            lambda batch_size: self._encode(texts, batch_size, show_progress),
+            batch_size_key(f"embedding:{self.config.model_name}", self._device),
+            self.config.batch_size,
+            get_batch_size_store()
+        )
+
+        # Ensure numpy array
+        if not isinstance(embeddings, np.ndarray):
+            embeddings = np.array(embeddings)
+
+        # Normalize if needed (FlagEmbedding already normalizes)
+        if self.config.normalize_embeddings and self._model_type != "flag":
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / (norms + 1e-10)
+
+        return embeddings.astype(np.float32)
+
+    def _encode(self, texts: List[str], batch_size: int, show_progress: bool):
+        """Encode texts with the loaded model (sync)"""
         if self._model_type == "flag":
             # FlagEmbedding API
             output = self._model.encode(
                 texts,
-                batch_size=self.config.batch_size,
+                batch_size=batch_size,
                 max_length=self.config.max_length,
                 return_dense=True,
                 return_sparse=False,
@@ -238,29 +261,16 @@ class EmbeddingEngine:
 
             # BGE-M3 returns dict with 'dense_vecs'
             if isinstance(output, dict):
-                embeddings = output['dense_vecs']
-            else:
-                embeddings = output
-
-        else:
-            # sentence-transformers API
-            embeddings = self._model.encode(
-                texts,
-                batch_size=self.config.batch_size,
-                show_progress_bar=show_progress,
-                normalize_embeddings=self.config.normalize_embeddings
-            )
-
-        # Ensure numpy array
-        if not isinstance(embeddings, np.ndarray):
-            embeddings = np.array(embeddings)
-
-        # Normalize if needed (FlagEmbedding already normalizes)
-        if self.config.normalize_embeddings and self._model_type != "flag":
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            embeddings = embeddings / (norms + 1e-10)
-
-        return embeddings.astype(np.float32)
+                return output['dense_vecs']
+            return output
+
+        # sentence-transformers API
+        return self._model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=show_progress,
+            normalize_embeddings=self.config.normalize_embeddings
+        )
 
     async def embed_query(self, query: str) -> List[float]:
         """
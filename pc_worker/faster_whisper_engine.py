@@ -1,23 +1,41 @@
 """
 Faster-Whisper STT Engine Module
 CPU 최적화된 STT 엔진 (Oracle ARM 호환)
+
+배치 모드: VAD로 찾은 발화 구간을 30초 이하 청크로 묶어
+BatchedInferencePipeline으로 한 번에 여러 청크를 디코딩합니다.
+모델 복제본(replica)을 여러 개 두면 각 복제본이 CPU 코어 일부에
+고정된 전용 스레드에서 실행되어 코어 수에 비례해 처리량이 늘어납니다.
+
+스트리밍: transcribe_stream은 세그먼트가 디코딩되는 대로 시간순으로
+yield하므로, 긴 회의도 전사가 끝나기 전에 앞부분부터 저장/표시할 수 있습니다.
 """
 
 import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Callable, List, Dict, Iterator, Optional, Sequence, Tuple
 import numpy as np
 from dataclasses import dataclass
 
-from faster_whisper import WhisperModel
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
 import soundfile as sf
 
-from models import TranscriptSegment
+from models import AudioMetadata, TranscriptSegment
 from exceptions import TranscriptionError
+from stt_engines import AUTO_LANGUAGE
+from vad import VADConfig, detect_speech_segments
+from stt_windows import balance_chunks, pack_speech_chunks, plan_replica_cores
 from logger import get_logger
 
 logger = get_logger("faster_whisper_engine")
 
+SAMPLE_RATE = 16000
+
 
 @dataclass
 class FasterWhisperConfig:
@@ -37,6 +55,143 @@ class FasterWhisperConfig:
     merge_segments: bool = True
     merge_gap_threshold: float = 0.5  # 0.5초 이내 간격은 병합
     merge_max_duration: float = 30.0  # 최대 30초까지 병합
+    # 배치 추론 설정 (BatchedInferencePipeline)
+    batched: bool = False
+    batch_size: int = 8  # 한 번에 디코딩할 청크 수
+    num_replicas: int = 1  # 모델 복제본 수 (2 이상이면 복제본마다 코어 일부에 고정)
+    max_chunk_seconds: float = 30.0  # Whisper 디코딩 윈도우
+
+
+@dataclass
+class _Replica:
+    """모델 복제본과 전용 (코어 고정) 실행 스레드"""
+    model: WhisperModel
+    pipeline: BatchedInferencePipeline
+    executor: ThreadPoolExecutor
+    cores: Optional[List[int]]
+
+
+def _pin_current_thread(cores: Optional[Sequence[int]]) -> None:
+    """현재 스레드를 지정 코어에 고정 (Linux; 이후 생성되는 스레드도 상속)"""
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+
+class _SegmentMerger:
+    """
+    작은 세그먼트를 문장 단위로 점진 병합
+
+    병합 기준:
+    1. 시간 간격이 threshold 이내
+    2. 병합 후 길이가 max_duration 이내
+    3. 문장 부호로 끝나면 분리
+    """
+
+    def __init__(self, gap_threshold: float, max_duration: float):
+        self.gap_threshold = gap_threshold
+        self.max_duration = max_duration
+        self._current: Optional[Dict] = None
+
+    def push(self, seg: Dict) -> List[Dict]:
+        """세그먼트 추가; 병합이 끝나 확정된 세그먼트 반환"""
+        current = self._current
+        if current is None:
+            self._current = self._start(seg)
+            return []
+
+        gap = seg["start"] - current["end"]
+        merged_duration = seg["end"] - current["start"]
+        ends_with_punct = current["text"].rstrip().endswith((".", "?", "!", "。", "？", "！"))
+
+        # 병합 조건 확인
+        should_merge = (
+            gap <= self.gap_threshold
+            and merged_duration <= self.max_duration
+            and not ends_with_punct
+        )
+
+        if should_merge:
+            # 병합
+            current["end"] = seg["end"]
+            current["text"] = current["text"].rstrip() + " " + seg["text"].lstrip()
+            # confidence 평균
+            if current["confidence"] is not None and seg.get("confidence") is not None:
+                current["confidence"] = (current["confidence"] + seg["confidence"]) / 2
+            return []
+
+        # 새 세그먼트 시작
+        self._current = self._start(seg)
+        return [current]
+
+    def flush(self) -> List[Dict]:
+        """남은 세그먼트 반환"""
+        current, self._current = self._current, None
+        return [current] if current is not None else []
+
+    @staticmethod
+    def _start(seg: Dict) -> Dict:
+        return {
+            "start": seg["start"],
+            "end": seg["end"],
+            "text": seg["text"],
+            "confidence": seg.get("confidence"),
+        }
+
+
+async def _ordered_stream(
+    producers: List[Tuple[Optional[Executor], Callable[[], Iterator[Dict]]]]
+) -> AsyncIterator[Dict]:
+    """
+    생성기들을 각자의 executor에서 소비하며 세그먼트를 시작 시간순으로 yield
+
+    각 생성기는 이미 시간순이므로 k-way 병합: 진행 중인 모든 생성기의 다음
+    세그먼트가 도착했을 때 가장 이른 것을 방출합니다.
+
+    Args:
+        producers: (executor 또는 기본 executor용 None, 세그먼트 생성기 팩토리)
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def drain(index: int, produce: Callable[[], Iterator[Dict]]) -> None:
+        try:
+            for item in produce():
+                if stop.is_set():
+                    return
+                loop.call_soon_threadsafe(queue.put_nowait, (index, item))
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, (index, e))
+            return
+        loop.call_soon_threadsafe(queue.put_nowait, (index, done))
+
+    for index, (executor, produce) in enumerate(producers):
+        loop.run_in_executor(executor, drain, index, produce)
+
+    pending = [deque() for _ in producers]
+    active = set(range(len(producers)))
+    try:
+        while True:
+            while any(pending) and all(pending[i] for i in active):
+                earliest = min(
+                    (i for i in range(len(pending)) if pending[i]),
+                    key=lambda i: pending[i][0]["start"]
+                )
+                yield pending[earliest].popleft()
+            if not active:
+                return
+
+            index, item = await queue.get()
+            if item is done:
+                active.discard(index)
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                pending[index].append(item)
+    finally:
+        # 소비가 중단되면 작업 스레드도 다음 세그먼트에서 멈춤
+        stop.set()
 
 
 class FasterWhisperEngine:
@@ -48,6 +203,7 @@ class FasterWhisperEngine:
     def __init__(self, config: Optional[FasterWhisperConfig] = None):
         self.config = config or FasterWhisperConfig()
         self.model = None
+        self._replicas: List[_Replica] = []
         self._is_initialized = False
 
         logger.info(
@@ -67,13 +223,17 @@ class FasterWhisperEngine:
         try:
             logger.info(f"Loading Faster-Whisper model: {self.config.model_size}")
 
-            self.model = await asyncio.to_thread(
-                WhisperModel,
-                self.config.model_size,
-                device=self.config.device,
-                compute_type=self.config.compute_type,
-                cpu_threads=self.config.cpu_threads,
-            )
+            if self.config.batched:
+                await self._load_replicas()
+                self.model = self._replicas[0].model
+            else:
+                self.model = await asyncio.to_thread(
+                    WhisperModel,
+                    self.config.model_size,
+                    device=self.config.device,
+                    compute_type=self.config.compute_type,
+                    cpu_threads=self.config.cpu_threads,
+                )
 
             self._is_initialized = True
             logger.log_operation_success("initialize_faster_whisper")
@@ -82,13 +242,85 @@ class FasterWhisperEngine:
             logger.log_operation_failure("initialize_faster_whisper", e)
             raise TranscriptionError(f"Failed to initialize Faster-Whisper: {e}")
 
+    async def _load_replicas(self) -> None:
+        """
+        배치 모드용 모델 복제본 로드
+
+        복제본마다 단일 스레드 executor를 만들고, 그 스레드를 코어 집합에 고정한 뒤
+        모델을 생성합니다. CTranslate2 작업 스레드는 생성 스레드의 affinity를
+        상속하므로 복제본끼리 코어를 두고 경쟁하지 않습니다.
+        """
+        loop = asyncio.get_running_loop()
+        core_sets = (
+            plan_replica_cores(self.config.num_replicas)
+            if self.config.num_replicas > 1 else [None]
+        )
+
+        for cores in core_sets:
+            executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="faster-whisper",
+                initializer=_pin_current_thread,
+                initargs=(cores,)
+            )
+            model = await loop.run_in_executor(
+                executor,
+                partial(
+                    WhisperModel,
+                    self.config.model_size,
+                    device=self.config.device,
+                    compute_type=self.config.compute_type,
+                    cpu_threads=len(cores) if cores else self.config.cpu_threads,
+                )
+            )
+            self._replicas.append(_Replica(
+                model=model,
+                pipeline=BatchedInferencePipeline(model=model),
+                executor=executor,
+                cores=cores
+            ))
+
+        logger.info(
+            f"Loaded {len(self._replicas)} Faster-Whisper replica(s): "
+            f"cores={[replica.cores for replica in self._replicas]}, "
+            f"batch_size={self.config.batch_size}"
+        )
+
     async def transcribe(
         self,
         audio_path: Path,
         meeting_id: str,
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        audio_metadata: Optional[AudioMetadata] = None
     ) -> List[TranscriptSegment]:
-        """오디오 파일 전사"""
+        """오디오 파일 전사 (transcribe_stream 결과를 모두 수집)"""
+        return [
+            segment async for segment in
+            self.transcribe_stream(audio_path, meeting_id, language, audio_metadata)
+        ]
+
+    async def transcribe_stream(
+        self,
+        audio_path: Path,
+        meeting_id: str,
+        language: Optional[str] = None,
+        audio_metadata: Optional[AudioMetadata] = None
+    ) -> AsyncIterator[TranscriptSegment]:
+        """
+        오디오 파일 전사 - 세그먼트가 디코딩되는 대로 시간순으로 yield
+
+        faster-whisper의 지연 생성기는 작업 스레드에서 소비되고, 세그먼트 병합은
+        점진적으로 수행되어 다음 세그먼트와 병합되지 않는 것이 확정되는 즉시 방출됩니다.
+
+        Args:
+            audio_path: 오디오 파일 경로
+            meeting_id: 회의 ID
+            language: 언어 코드 (기본: config.language, "auto"는 자동 감지)
+            audio_metadata: STTEngine 인터페이스 호환용 (사용하지 않음)
+
+        Yields:
+            TranscriptSegment (신뢰도 기준 미달 세그먼트 제외)
+        """
         if not self._is_initialized:
             await self.initialize()
 
@@ -96,130 +328,157 @@ class FasterWhisperEngine:
 
         try:
             lang = language or self.config.language
+            if lang == AUTO_LANGUAGE:
+                lang = None  # faster-whisper가 오디오 앞부분으로 언어 감지
 
-            # VAD 파라미터
-            vad_params = None
-            if self.config.vad_filter:
-                vad_params = dict(
-                    min_silence_duration_ms=self.config.vad_min_silence_duration_ms,
-                    speech_pad_ms=self.config.vad_speech_pad_ms,
-                )
+            if self.config.batched:
+                producers = await self._batched_producers(audio_path, lang)
+            else:
+                producers = [(None, partial(self._sequential_segments, audio_path, lang))]
 
-            # 전사 실행
-            segments_iter, info = await asyncio.to_thread(
-                self.model.transcribe,
-                str(audio_path),
-                language=lang,
-                beam_size=self.config.beam_size,
-                vad_filter=self.config.vad_filter,
-                vad_parameters=vad_params,
+            merger = (
+                _SegmentMerger(self.config.merge_gap_threshold, self.config.merge_max_duration)
+                if self.config.merge_segments else None
             )
-
-            # 세그먼트 수집
-            raw_segments = []
-            for segment in segments_iter:
-                raw_segments.append({
-                    "start": segment.start,
-                    "end": segment.end,
-                    "text": segment.text.strip(),
-                    "confidence": getattr(segment, 'avg_logprob', None),
-                })
-
-            logger.info(f"Raw segments: {len(raw_segments)}")
-
-            # 세그먼트 병합
-            if self.config.merge_segments:
-                merged_segments = self._merge_segments(raw_segments)
-                logger.info(f"Merged segments: {len(merged_segments)}")
-            else:
-                merged_segments = raw_segments
-
-            # TranscriptSegment 변환
-            transcript_segments = []
-            for seg in merged_segments:
-                # confidence 변환 (log_prob → 0-1 스케일)
-                confidence = None
-                if seg.get("confidence") is not None:
-                    # avg_logprob는 보통 -1 ~ 0 범위, 0에 가까울수록 높은 신뢰도
-                    confidence = max(0, min(1, 1 + seg["confidence"]))
-
-                if confidence is None or confidence >= self.config.confidence_threshold:
-                    transcript_segments.append(TranscriptSegment(
-                        meeting_id=meeting_id,
-                        start_time=float(seg["start"]),
-                        end_time=float(seg["end"]),
-                        text=seg["text"],
-                        confidence=confidence,
-                        speaker_id=None,
-                        speaker_label=None,
-                    ))
+            raw_count = 0
+            emitted = 0
+
+            async for raw in _ordered_stream(producers):
+                raw_count += 1
+                for seg in (merger.push(raw) if merger else [raw]):
+                    segment = self._to_transcript_segment(seg, meeting_id)
+                    if segment is not None:
+                        emitted += 1
+                        yield segment
+
+            for seg in (merger.flush() if merger else []):
+                segment = self._to_transcript_segment(seg, meeting_id)
+                if segment is not None:
+                    emitted += 1
+                    yield segment
 
             logger.log_operation_success(
                 "transcribe_audio",
                 meeting_id=meeting_id,
-                segment_count=len(transcript_segments),
-                audio_duration=info.duration,
+                raw_segments=raw_count,
+                segment_count=emitted,
             )
 
-            return transcript_segments
-
         except Exception as e:
             logger.log_operation_failure("transcribe_audio", e, meeting_id=meeting_id)
             raise TranscriptionError(f"Failed to transcribe: {e}")
 
-    def _merge_segments(self, segments: List[Dict]) -> List[Dict]:
-        """
-        작은 세그먼트를 문장 단위로 병합
+    def _sequential_segments(self, audio_path: Path, lang: Optional[str]) -> Iterator[Dict]:
+        """파일 전체를 순차 전사 (blocking 생성기, 작업 스레드에서 소비)"""
+        # VAD 파라미터
+        vad_params = None
+        if self.config.vad_filter:
+            vad_params = dict(
+                min_silence_duration_ms=self.config.vad_min_silence_duration_ms,
+                speech_pad_ms=self.config.vad_speech_pad_ms,
+            )
 
-        병합 기준:
-        1. 시간 간격이 threshold 이내
-        2. 병합 후 길이가 max_duration 이내
-        3. 문장 부호로 끝나면 분리
+        segments_iter, _ = self.model.transcribe(
+            str(audio_path),
+            language=lang,
+            beam_size=self.config.beam_size,
+            vad_filter=self.config.vad_filter,
+            vad_parameters=vad_params,
+        )
+        for segment in segments_iter:
+            yield self._segment_to_dict(segment)
+
+    async def _batched_producers(
+        self,
+        audio_path: Path,
+        lang: str
+    ) -> List[Tuple[Optional[Executor], Callable[[], Iterator[Dict]]]]:
         """
-        if not segments:
-            return []
+        VAD 청크를 복제본들에 나눠 배치 디코딩할 생성기 준비
 
-        merged = []
-        current = {
-            "start": segments[0]["start"],
-            "end": segments[0]["end"],
-            "text": segments[0]["text"],
-            "confidence": segments[0].get("confidence"),
-        }
+        Returns:
+            (복제본 executor, 시간순 세그먼트 생성기) 목록
+        """
+        audio = await asyncio.to_thread(decode_audio, str(audio_path), sampling_rate=SAMPLE_RATE)
+        duration = len(audio) / SAMPLE_RATE
 
-        for seg in segments[1:]:
-            gap = seg["start"] - current["end"]
-            merged_duration = seg["end"] - current["start"]
-            ends_with_punct = current["text"].rstrip().endswith((".", "?", "!", "。", "？", "！"))
+        chunks = await asyncio.to_thread(self._plan_chunks, audio)
+        groups = balance_chunks(chunks, len(self._replicas))
 
-            # 병합 조건 확인
-            should_merge = (
-                gap <= self.config.merge_gap_threshold
-                and merged_duration <= self.config.merge_max_duration
-                and not ends_with_punct
-            )
-
-            if should_merge:
-                # 병합
-                current["end"] = seg["end"]
-                current["text"] = current["text"].rstrip() + " " + seg["text"].lstrip()
-                # confidence 평균
-                if current["confidence"] is not None and seg.get("confidence") is not None:
-                    current["confidence"] = (current["confidence"] + seg["confidence"]) / 2
-            else:
-                # 새 세그먼트 시작
-                merged.append(current)
-                current = {
-                    "start": seg["start"],
-                    "end": seg["end"],
-                    "text": seg["text"],
-                    "confidence": seg.get("confidence"),
-                }
+        logger.info(
+            f"Batched decode: {len(chunks)} chunks on {len(groups)} replica(s), "
+            f"speech={sum(end - start for start, end in chunks):.1f}s of {duration:.1f}s"
+        )
+        return [
+            (replica.executor, partial(self._decode_chunks, replica, audio, group, lang))
+            for replica, group in zip(self._replicas, groups)
+        ]
+
+    def _plan_chunks(self, audio: np.ndarray) -> List[Tuple[float, float]]:
+        """발화 구간 검출 후 디코딩 윈도우 크기의 청크로 묶기 (blocking)"""
+        duration = len(audio) / SAMPLE_RATE
+        if not self.config.vad_filter:
+            speech = [(0.0, duration)]
+        else:
+            vad_config = VADConfig(min_silence_ms=self.config.vad_min_silence_duration_ms)
+            pad = self.config.vad_speech_pad_ms / 1000
+            speech = [
+                (max(0.0, start - pad), min(duration, end + pad))
+                for start, end in detect_speech_segments(audio, SAMPLE_RATE, vad_config)
+            ]
+        return pack_speech_chunks(speech, self.config.max_chunk_seconds)
+
+    def _decode_chunks(
+        self,
+        replica: _Replica,
+        audio: np.ndarray,
+        chunks: List[Tuple[float, float]],
+        lang: str
+    ) -> Iterator[Dict]:
+        """복제본 하나로 청크 묶음 디코딩 (복제본 전용 스레드에서 소비)"""
+        clip_timestamps = [
+            {"start": int(start * SAMPLE_RATE), "end": int(end * SAMPLE_RATE)}
+            for start, end in chunks
+        ]
+        segments_iter, _ = replica.pipeline.transcribe(
+            audio,
+            language=lang,
+            beam_size=self.config.beam_size,
+            batch_size=self.config.batch_size,
+            clip_timestamps=clip_timestamps,
+        )
+        for segment in segments_iter:
+            yield self._segment_to_dict(segment)
 
-        # 마지막 세그먼트 추가
-        merged.append(current)
+    @staticmethod
+    def _segment_to_dict(segment) -> Dict:
+        return {
+            "start": segment.start,
+            "end": segment.end,
+            "text": segment.text.strip(),
+            "confidence": getattr(segment, 'avg_logprob', None),
+        }
 
-        return merged
+    def _to_transcript_segment(self, seg: Dict, meeting_id: str) -> Optional[TranscriptSegment]:
+        """병합된 세그먼트를 TranscriptSegment로 변환 (신뢰도 기준 미달이면 None)"""
+        # confidence 변환 (log_prob → 0-1 스케일)
+        confidence = None
+        if seg.get("confidence") is not None:
+            # avg_logprob는 보통 -1 ~ 0 범위, 0에 가까울수록 높은 신뢰도
+            confidence = max(0, min(1, 1 + seg["confidence"]))
+
+        if confidence is not None and confidence < self.config.confidence_threshold:
+            return None
+
+        return TranscriptSegment(
+            meeting_id=meeting_id,
+            start_time=float(seg["start"]),
+            end_time=float(seg["end"]),
+            text=seg["text"],
+            confidence=confidence,
+            speaker_id=None,
+            speaker_label=None,
+        )
 
     def get_model_info(self) -> Dict:
         """모델 정보 반환"""
@@ -233,6 +492,9 @@ class FasterWhisperEngine:
             "cpu_threads": self.config.cpu_threads,
             "vad_filter": self.config.vad_filter,
             "merge_segments": self.config.merge_segments,
+            "batched": self.config.batched,
+            "batch_size": self.config.batch_size,
+            "replicas": len(self._replicas) if self._replicas else self.config.num_replicas,
         }
 
     async def cleanup(self) -> None:
@@ -240,6 +502,9 @@ class FasterWhisperEngine:
         if self.model is not None:
             del self.model
             self.model = None
+        for replica in self._replicas:
+            replica.executor.shutdown(wait=True)
+        self._replicas = []
         self._is_initialized = False
         logger.info("Faster-Whisper cleanup complete")
 
@@ -250,12 +515,18 @@ def get_stt_engine(
     device: str = "cpu",
     language: str = "ko",
     cpu_threads: int = 4,
+    batched: bool = False,
+    batch_size: int = 8,
+    num_replicas: int = 1,
 ) -> FasterWhisperEngine:
     """
     STT 엔진 생성
 
     Oracle ARM CPU 환경에서 사용하려면:
         engine = get_stt_engine(device="cpu", cpu_threads=4)
+
+    배치 모드 (코어 2개씩 고정된 복제본 2개):
+        engine = get_stt_engine(device="cpu", batched=True, num_replicas=2)
     """
     config = FasterWhisperConfig(
         model_size=model_size or "large-v3-turbo",
@@ -263,5 +534,8 @@ def get_stt_engine(
         compute_type="int8" if device == "cpu" else "float16",
         language=language,
         cpu_threads=cpu_threads,
+        batched=batched,
+        batch_size=batch_size,
+        num_replicas=num_replicas,
     )
     return FasterWhisperEngine(config)
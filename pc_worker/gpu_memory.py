@@ -0,0 +1,216 @@
+"""
+GPU Memory Telemetry and OOM-Adaptive Batch Sizing
+Keeps batched GPU calls from failing a job on CUDA out-of-memory
+
+Features:
+- run_with_oom_backoff() runs a batched call and, on CUDA out-of-memory,
+  frees cached memory, halves the batch size and retries
+- The batch size that fit is remembered per model and GPU model
+  (BatchSizeStore, persisted as JSON), so later jobs start from it instead
+  of hitting the same OOM again; delete the file to probe larger sizes
+- track_peak_memory() samples torch.cuda.max_memory_allocated over a
+  pipeline stage, so batch sizes can be tuned from real job metrics
+- Without torch or CUDA, backoff never triggers and peaks are None
+"""
+
+import json
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, TypeVar
+
+from logger import get_logger
+
+logger = get_logger("gpu_memory")
+
+T = TypeVar("T")
+
+# Error text of CUDA allocation failures raised as plain RuntimeErrors
+# (CTranslate2, cuBLAS/cuDNN handles) rather than torch.cuda.OutOfMemoryError
+_OOM_MARKERS = ("CUBLAS_STATUS_ALLOC_FAILED", "CUDNN_STATUS_ALLOC_FAILED")
+
+
+def _cuda_torch():
+    """torch, if it is already imported and CUDA is available (never imports it)"""
+    torch = sys.modules.get("torch")
+    if torch is None or not torch.cuda.is_available():
+        return None
+    return torch
+
+
+def is_cuda_oom(error: BaseException) -> bool:
+    """Check whether an exception is a CUDA out-of-memory error"""
+    torch = sys.modules.get("torch")
+    oom_type = getattr(getattr(torch, "cuda", None), "OutOfMemoryError", None)
+    if isinstance(oom_type, type) and isinstance(error, oom_type):
+        return True
+
+    message = str(error)
+    if any(marker in message for marker in _OOM_MARKERS):
+        return True
+    return "out of memory" in message.lower() and "cuda" in message.lower()
+
+
+def empty_cuda_cache() -> None:
+    """Release cached CUDA memory (no-op without CUDA)"""
+    torch = _cuda_torch()
+    if torch is not None:
+        torch.cuda.empty_cache()
+
+
+def batch_size_key(model: str, device: str) -> str:
+    """
+    Key of a model's safe batch size
+
+    Args:
+        model: Model identifier (e.g. "whisperx:large-v2")
+        device: Device the model runs on ("cuda", "cuda:1", "cpu")
+
+    Returns:
+        "model@device", with the GPU name for CUDA devices so the size
+        learned on one card is not reused on another
+    """
+    torch = _cuda_torch()
+    if device.startswith("cuda") and torch is not None:
+        index = int(device.split(":", 1)[1]) if ":" in device else torch.cuda.current_device()
+        return f"{model}@{torch.cuda.get_device_name(index)}"
+    return f"{model}@{device}"
+
+
+class BatchSizeStore:
+    """
+    Largest batch size known to fit, per model and device
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: JSON file the sizes are persisted to (None = memory only)
+        """
+        self.path = path
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if path is not None and path.exists():
+            try:
+                self._sizes = {
+                    key: int(size)
+                    for key, size in json.loads(path.read_text(encoding="utf-8")).items()
+                }
+            except (OSError, ValueError, AttributeError) as e:
+                logger.warning(f"Ignoring unreadable batch size file {path}: {e}")
+
+    def get(self, key: str, default: int) -> int:
+        """Batch size to start with: the configured one, capped by the safe size"""
+        with self._lock:
+            safe = self._sizes.get(key)
+        return min(default, safe) if safe else default
+
+    def record(self, key: str, size: int) -> None:
+        """Remember a reduced batch size after an out-of-memory error"""
+        with self._lock:
+            if self._sizes.get(key, size + 1) <= size:
+                return
+            self._sizes[key] = size
+            snapshot = dict(self._sizes)
+
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(snapshot, indent=2, sort_keys=True), encoding="utf-8")
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save batch sizes to {self.path}: {e}")
+
+    @property
+    def sizes(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._sizes)
+
+
+def run_with_oom_backoff(
+    run: Callable[[int], T],
+    key: str,
+    batch_size: int,
+    store: Optional[BatchSizeStore] = None,
+    min_batch_size: int = 1
+) -> T:
+    """
+    Run a batched GPU call, halving the batch size on CUDA out-of-memory (blocking)
+
+    Args:
+        run: Called with the batch size; must be safe to call again from
+            scratch after it failed
+        key: Safe batch size key (see batch_size_key)
+        batch_size: Configured batch size
+        store: Where safe sizes are remembered (None = this call only)
+        min_batch_size: Smallest batch size tried before giving up
+
+    Returns:
+        Result of run
+
+    Raises:
+        Whatever run raises; an out-of-memory error only once the batch
+        size is already min_batch_size
+    """
+    size = max(min_batch_size, store.get(key, batch_size) if store else batch_size)
+    while True:
+        try:
+            return run(size)
+        except Exception as e:
+            if size <= min_batch_size or not is_cuda_oom(e):
+                raise
+            empty_cuda_cache()
+            size = max(min_batch_size, size // 2)
+            logger.warning(f"CUDA out of memory in {key}, retrying with batch size {size}")
+            if store is not None:
+                store.record(key, size)
+
+
+@dataclass
+class PeakMemory:
+    """Peak CUDA memory of a stage (None without CUDA)"""
+    peak_mb: Optional[float] = None
+
+
+@contextmanager
+def track_peak_memory() -> Iterator[PeakMemory]:
+    """
+    Sample the peak memory torch allocated on the current CUDA device
+
+    Usage:
+        with track_peak_memory() as stage_memory:
+            ...
+        stage_memory.peak_mb
+
+    The peak is process-wide, so stages should not overlap on the GPU (the
+    STT stage runs one meeting at a time). Memory allocated outside torch
+    (CTranslate2 engines) is not included.
+    """
+    sample = PeakMemory()
+    torch = _cuda_torch()
+    if torch is not None:
+        torch.cuda.reset_peak_memory_stats()
+    try:
+        yield sample
+    finally:
+        # The stage may have imported torch itself (first model load)
+        torch = torch or _cuda_torch()
+        if torch is not None:
+            sample.peak_mb = torch.cuda.max_memory_allocated() / (1024 * 1024)
+
+
+_batch_size_store: Optional[BatchSizeStore] = None
+
+
+def get_batch_size_store() -> BatchSizeStore:
+    """Get or create the global batch size store (GPU_BATCH_SIZES_FILE)"""
+    global _batch_size_store
+    if _batch_size_store is None:
+        from config import GPU_BATCH_SIZES_FILE
+        _batch_size_store = BatchSizeStore(GPU_BATCH_SIZES_FILE)
+    return _batch_size_store
@@ -15,7 +15,7 @@ import subprocess
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 from dataclasses import dataclass, field
 
 from summarizer_utils import (
@@ -72,7 +72,8 @@ class HybridSummarizer:
         model: str = DEFAULT_MODEL,
         ollama_url: str = OLLAMA_URL,
         check_health_on_init: bool = True,
-        strict_validation: bool = True
+        strict_validation: bool = True,
+        keep_alive: Optional[Union[int, str]] = None
     ):
         """
         Args:
@@ -80,10 +81,12 @@ class HybridSummarizer:
             ollama_url: Ollama 서버 URL
             check_health_on_init: 초기화 시 서버 헬스체크 수행 여부
             strict_validation: 엄격한 결과 검증 (빈 결과 시 예외 발생)
+            keep_alive: 호출 후 모델 유지 시간 (None이면 Ollama 기본값)
         """
         self.model = model
         self.ollama_url = ollama_url
         self.strict_validation = strict_validation
+        self.keep_alive = keep_alive
 
         if check_health_on_init:
             ensure_ollama_ready(ollama_url, model)
@@ -92,7 +95,8 @@ class HybridSummarizer:
         """LLM 호출 래퍼"""
         return call_ollama(
             prompt, self.model, self.ollama_url, temperature,
-            raise_on_empty=self.strict_validation
+            raise_on_empty=self.strict_validation,
+            keep_alive=self.keep_alive
         )
 
     def _summarize_chunk(self, time_range: str, chunk: str) -> Dict:
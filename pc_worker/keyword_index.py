@@ -0,0 +1,394 @@
+"""
+Local Keyword Index Module
+Per-user BM25 inverted index over transcript chunk text
+
+Features:
+- Korean-aware tokenization: Hangul runs are split into character
+  bigrams and trigrams, so particles and endings attached to a noun
+  ("회의록을", "회의록에서") still match the bare query term ("회의록")
+- ASCII words and numbers are kept whole (lowercased)
+- BM25 ranking with vectorized scoring over posting lists
+- Incremental updates when transcripts are indexed
+
+On-disk layout (one directory per user, shared with the vector index):
+    keyword_docs.jsonl     chunk metadata and text, one JSON object per row
+    keyword_docs.complete  marker: backfilled with all of the user's stored chunks
+"""
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from logger import get_logger
+from vector_index import IndexedChunk
+
+logger = get_logger("keyword_index")
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+class KeywordIndexConfig(BaseModel):
+    """Configuration for the local keyword index"""
+    base_dir: str = Field(..., description="Directory holding one sub-directory per user")
+    k1: float = Field(default=1.2, ge=0.0, description="BM25 term frequency saturation")
+    b: float = Field(default=0.75, ge=0.0, le=1.0, description="BM25 length normalization")
+    min_ngram: int = Field(default=2, ge=1, description="Smallest Hangul n-gram")
+    max_ngram: int = Field(default=3, ge=1, description="Largest Hangul n-gram")
+
+
+# =============================================================================
+# Tokenization
+# =============================================================================
+
+_HANGUL_RUN = r"[가-힣]+"
+_TOKEN_PATTERN = re.compile(rf"({_HANGUL_RUN})|([a-z0-9]+)")
+
+
+def tokenize(text: str, min_ngram: int = 2, max_ngram: int = 3) -> List[str]:
+    """
+    Split text into index terms.
+
+    Hangul runs produce overlapping character n-grams (runs shorter than
+    min_ngram are kept whole); ASCII words and numbers are kept as-is.
+
+    Args:
+        text: Text to tokenize
+        min_ngram: Smallest Hangul n-gram length
+        max_ngram: Largest Hangul n-gram length
+
+    Returns:
+        List of terms (with repetitions)
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    tokens: List[str] = []
+
+    for match in _TOKEN_PATTERN.finditer(text):
+        hangul, word = match.groups()
+        if word:
+            tokens.append(word)
+            continue
+
+        if len(hangul) < min_ngram:
+            tokens.append(hangul)
+            continue
+
+        for n in range(min_ngram, max_ngram + 1):
+            tokens.extend(hangul[i:i + n] for i in range(len(hangul) - n + 1))
+
+    return tokens
+
+
+# =============================================================================
+# Per-user Index
+# =============================================================================
+
+class UserKeywordIndex:
+    """
+    BM25 inverted index for a single user's transcript chunks.
+
+    Documents are appended to keyword_docs.jsonl and the in-memory
+    postings are rebuilt from it on load. A torn final line (crash
+    mid-append) is dropped. Not thread-safe on its own; LocalKeywordIndex
+    serializes access.
+    """
+
+    DOCS_FILE = "keyword_docs.jsonl"
+    COMPLETE_FILE = "keyword_docs.complete"
+
+    def __init__(self, directory: Path, config: KeywordIndexConfig):
+        self.directory = directory
+        self.config = config
+
+        self._chunks: List[IndexedChunk] = []
+        self._doc_lengths: List[int] = []
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._total_length = 0
+
+        self._load()
+
+    @property
+    def _docs_path(self) -> Path:
+        return self.directory / self.DOCS_FILE
+
+    @property
+    def _complete_path(self) -> Path:
+        return self.directory / self.COMPLETE_FILE
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def _load(self) -> None:
+        """Rebuild postings from the document log"""
+        if not self._docs_path.exists():
+            return
+
+        valid_bytes = 0
+        with open(self._docs_path, "rb") as f:
+            for line in f:
+                try:
+                    chunk = IndexedChunk(**json.loads(line))
+                except (ValueError, TypeError):
+                    logger.warning(f"Dropping torn keyword index entry in {self.directory}")
+                    break
+                valid_bytes += len(line)
+                self._index_chunk(chunk)
+
+        if valid_bytes < self._docs_path.stat().st_size:
+            with open(self._docs_path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+        logger.debug(f"Loaded keyword index {self.directory} ({self.size} docs)")
+
+    def _rewrite(self) -> None:
+        """Atomically rewrite the document log from memory"""
+        tmp_path = self._docs_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for chunk in self._chunks:
+                f.write(json.dumps(asdict(chunk), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._docs_path)
+
+    # -------------------------------------------------------------------------
+    # Updates
+    # -------------------------------------------------------------------------
+
+    def _index_chunk(self, chunk: IndexedChunk) -> None:
+        row = len(self._chunks)
+        counts = Counter(tokenize(chunk.text, self.config.min_ngram, self.config.max_ngram))
+
+        for term, tf in counts.items():
+            rows, tfs = self._postings.setdefault(term, ([], []))
+            rows.append(row)
+            tfs.append(tf)
+
+        length = sum(counts.values())
+        self._chunks.append(chunk)
+        self._doc_lengths.append(length)
+        self._total_length += length
+
+    def add(self, chunks: Sequence[IndexedChunk]) -> int:
+        """
+        Append chunks to the index.
+
+        Args:
+            chunks: Chunk metadata including text
+
+        Returns:
+            Number of chunks added
+        """
+        if not chunks:
+            return 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._docs_path, "a", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(json.dumps(asdict(chunk), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        for chunk in chunks:
+            self._index_chunk(chunk)
+
+        return len(chunks)
+
+    def clear(self) -> None:
+        """Remove every chunk and the backfill marker"""
+        self._complete_path.unlink(missing_ok=True)
+        self._docs_path.unlink(missing_ok=True)
+        self._chunks, self._doc_lengths, self._postings = [], [], {}
+        self._total_length = 0
+
+    def mark_complete(self) -> None:
+        """Record that the index holds all of the user's stored chunks"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._complete_path.touch()
+
+    def remove_meeting(self, meeting_id: str) -> int:
+        """Remove all chunks of a meeting and rebuild the postings"""
+        kept = [c for c in self._chunks if c.meeting_id != meeting_id]
+        removed = len(self._chunks) - len(kept)
+        if removed == 0:
+            return 0
+
+        self._chunks, self._doc_lengths, self._postings = [], [], {}
+        self._total_length = 0
+        for chunk in kept:
+            self._index_chunk(chunk)
+        self._rewrite()
+
+        logger.info(f"Removed {removed} chunks of meeting {meeting_id} from keyword index")
+        return removed
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        meeting_id: Optional[str] = None
+    ) -> List[Tuple[IndexedChunk, float]]:
+        """
+        Rank chunks against a query with BM25.
+
+        Args:
+            query: Query text
+            k: Number of results
+            meeting_id: Restrict results to one meeting
+
+        Returns:
+            List of (chunk, bm25_score) sorted by score, positive scores only
+        """
+        n_docs = len(self._chunks)
+        terms = set(tokenize(query, self.config.min_ngram, self.config.max_ngram))
+        if n_docs == 0 or not terms:
+            return []
+
+        k1, b = self.config.k1, self.config.b
+        avg_length = self._total_length / n_docs or 1.0
+        length_norm = k1 * (1 - b + b * np.asarray(self._doc_lengths, dtype=np.float32) / avg_length)
+        scores = np.zeros(n_docs, dtype=np.float32)
+
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            rows = np.asarray(posting[0], dtype=np.int64)
+            tfs = np.asarray(posting[1], dtype=np.float32)
+            idf = np.log1p((n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * tfs * (k1 + 1) / (tfs + length_norm[rows])
+
+        if meeting_id is not None:
+            mask = np.fromiter(
+                (c.meeting_id == meeting_id for c in self._chunks), dtype=bool, count=n_docs
+            )
+            scores[~mask] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [(self._chunks[i], float(scores[i])) for i in candidates]
+
+    @property
+    def size(self) -> int:
+        """Number of indexed chunks"""
+        return len(self._chunks)
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether the index was backfilled with all stored chunks"""
+        return self._complete_path.exists()
+
+
+# =============================================================================
+# Index Manager
+# =============================================================================
+
+class LocalKeywordIndex:
+    """
+    Manages per-user keyword indexes under a common base directory.
+
+    User indexes are loaded lazily on first access and kept in memory.
+    All methods are blocking; call them via asyncio.to_thread.
+    """
+
+    def __init__(self, config: KeywordIndexConfig):
+        self.config = config
+        self.base_dir = Path(config.base_dir)
+        self._indexes: Dict[str, UserKeywordIndex] = {}
+        self._lock = threading.Lock()
+
+        logger.info(f"LocalKeywordIndex initialized at {self.base_dir}")
+
+    def _user_dir(self, user_id: str) -> Path:
+        return self.base_dir / re.sub(r"[^A-Za-z0-9_-]", "_", user_id)
+
+    def get_user_index(self, user_id: str) -> UserKeywordIndex:
+        """Get (loading if needed) the index for a user"""
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = UserKeywordIndex(self._user_dir(user_id), self.config)
+                self._indexes[user_id] = index
+            return index
+
+    def has_user(self, user_id: str) -> bool:
+        """Check whether a user has any indexed chunks"""
+        if user_id in self._indexes:
+            return self._indexes[user_id].size > 0
+        return (self._user_dir(user_id) / UserKeywordIndex.DOCS_FILE).exists()
+
+    def is_complete(self, user_id: str) -> bool:
+        """Check whether a user's index holds all of their stored chunks"""
+        return (self._user_dir(user_id) / UserKeywordIndex.COMPLETE_FILE).exists()
+
+    def replace_user(self, user_id: str, chunks: Sequence[IndexedChunk]) -> int:
+        """Replace a user's index with a full backfill and mark it complete"""
+        index = self.get_user_index(user_id)
+        with self._lock:
+            index.clear()
+            index.add(chunks)
+            index.mark_complete()
+            return index.size
+
+    def add(self, user_id: str, chunks: Sequence[IndexedChunk]) -> int:
+        """Add chunks to a user's index"""
+        index = self.get_user_index(user_id)
+        with self._lock:
+            return index.add(chunks)
+
+    def remove_meeting(self, user_id: str, meeting_id: str) -> int:
+        """Remove all chunks for a meeting from a user's index"""
+        if not self.has_user(user_id):
+            return 0
+        index = self.get_user_index(user_id)
+        with self._lock:
+            return index.remove_meeting(meeting_id)
+
+    def search(
+        self,
+        user_id: str,
+        query: str,
+        k: int,
+        meeting_id: Optional[str] = None
+    ) -> List[Tuple[IndexedChunk, float]]:
+        """BM25 top-k search within a user's index"""
+        index = self.get_user_index(user_id)
+        with self._lock:
+            return index.search(query, k, meeting_id)
+
+
+# =============================================================================
+# Singleton Instance
+# =============================================================================
+
+_keyword_index: Optional[LocalKeywordIndex] = None
+
+
+def get_local_keyword_index(config: Optional[KeywordIndexConfig] = None) -> LocalKeywordIndex:
+    """Get or create singleton local keyword index"""
+    global _keyword_index
+
+    if _keyword_index is None:
+        if config is None:
+            from config import RAG_INDEX_DIR
+            config = KeywordIndexConfig(base_dir=str(RAG_INDEX_DIR))
+        _keyword_index = LocalKeywordIndex(config)
+
+    return _keyword_index
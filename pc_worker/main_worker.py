@@ -5,33 +5,57 @@ Polls Supabase for pending meetings and processes audio
 """
 
 import asyncio
+import hashlib
 import signal
 import sys
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 import time
+from contextlib import asynccontextmanager
 
 from config import (
     WORKER_ID,
+    DEFAULT_WORKER_ID,
     WORKER_NAME,
     POLLING_INTERVAL_SECONDS,
     AUDIO_TEMP_DIR,
     MAX_CONCURRENT_JOBS,
     SUMMARIZATION_ENABLED,
     WATCH_FOLDER_PATH,
-    WORD_OUTPUT_PATH
+    WORD_OUTPUT_PATH,
+    AUDIO_STREAMING_PREPROCESS,
+    AUDIO_RESAMPLE_QUALITY,
+    AUDIO_RESAMPLE_ENGINE,
+    AUDIO_DEDUP_ENABLED,
+    STAGE_PIPELINE_ENABLED,
+    STAGE_PIPELINE_PREFETCH,
+    STT_STREAM_PARTIAL_TRANSCRIPTS,
+    STT_BATCH_MAX_MEETINGS,
+    STT_LANGUAGE,
+    STT_STAGE_CHECKPOINTS,
+    STT_CHECKPOINT_DIR,
+    STT_CHECKPOINT_MAX_AGE_HOURS,
+    WHISPERX_BATCH_POOL_MAX_SECONDS,
+    MODEL_IDLE_UNLOAD_SECONDS,
+    MODEL_PREWARM,
+    STT_MODEL_VRAM_MB,
+    SUMMARIZER_VRAM_MB
 )
 from logger import get_logger
 from supabase_client import get_supabase_client
+from audio_downloader import get_audio_downloader
 from audio_processor import get_audio_processor
-from stt_pipeline import get_stt_pipeline, STTPipeline
 from hybrid_summarizer import HybridSummarizer
+from summarizer_utils import load_ollama_model, unload_ollama_model
+from model_residency import get_model_residency_manager
 from realtime_worker import get_realtime_worker
 from speaker_matcher import get_speaker_matcher, SpeakerMatcher
 from folder_monitor import get_folder_monitor, FolderMonitor
 from word_generator import get_word_generator, WordGenerator
-from models import MeetingStatus, Meeting, Transcript
+from stt_checkpoint import StageCheckpointStore, get_stage_checkpoint_store, prune_stage_checkpoints
+from models import MeetingStatus, Meeting, Transcript, TranscriptSegment, AudioMetadata
 from exceptions import (
     PCWorkerException,
     AudioDownloadError,
@@ -45,12 +69,37 @@ from utils import (
     get_system_info,
     get_audio_temp_path,
     get_processed_audio_path,
-    cleanup_single_file
+    cleanup_single_file,
+    compute_content_hash
 )
 
+# stt_pipeline pulls in torch, whisperx and pyannote (seconds of imports), so it
+# is imported when the STT pipeline is first loaded rather than at startup
+if TYPE_CHECKING:
+    from stt_pipeline import STTPipeline, PipelineResult, SegmentBatchCallback
+
 # Initialize logger
 logger = get_logger("pc_worker", level="INFO")
 
+# Recordings with the same hash must also decode to the same length (seconds)
+DEDUP_DURATION_TOLERANCE_SECONDS = 0.5
+
+
+@dataclass
+class MeetingJob:
+    """State handed from the prepare stage to the STT and finalize stages"""
+    meeting_id: str
+    user_id: str
+    start_time: float
+    processed_audio_path: Path
+    audio_metadata: AudioMetadata
+    content_hash: str
+    stt_engine_preference: Optional[str] = None
+    word_alignment: Optional[bool] = None  # None = by recording length
+    checkpoint: Optional[StageCheckpointStore] = None
+    resumed_stage: Optional[str] = None  # last stage finished before an interruption
+    pipeline_result: Optional["PipelineResult"] = None
+
 
 class PCWorker:
     """
@@ -67,15 +116,38 @@ class PCWorker:
         self.audio_processor = get_audio_processor(
             target_sample_rate=16000,
             normalize=True,
-            remove_silence=False
+            remove_silence=False,
+            streaming=AUDIO_STREAMING_PREPROCESS,
+            resample_quality=AUDIO_RESAMPLE_QUALITY,
+            resample_engine=AUDIO_RESAMPLE_ENGINE
         )
-        self.stt_pipeline: Optional[STTPipeline] = None  # Lazy initialization
-        self.summarizer = HybridSummarizer() if SUMMARIZATION_ENABLED else None
+        self.stt_pipeline: Optional["STTPipeline"] = None  # Lazy initialization
+        # Ollama keeps the summarization model until the residency manager unloads it
+        # (or the idle timeout passes, in case the worker dies without unloading)
+        self.summarizer = HybridSummarizer(
+            keep_alive=self._ollama_keep_alive()
+        ) if SUMMARIZATION_ENABLED else None
         self.realtime = get_realtime_worker(self.supabase.client)
         self.speaker_matcher = get_speaker_matcher(self.supabase.client)
         self.word_generator = get_word_generator(output_dir=WORD_OUTPUT_PATH)
         self.folder_monitor: Optional[FolderMonitor] = None
 
+        # GPU models: loaded on demand, prewarmed when a job starts, evicted when idle
+        self.models = get_model_residency_manager()
+        self._register_models()
+
+        # Stage pipeline (polling mode): prepare -> STT -> finalize, bounded hand-off queues
+        self._intake_queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._stt_queue: "asyncio.Queue[MeetingJob]" = asyncio.Queue(maxsize=STAGE_PIPELINE_PREFETCH)
+        self._finalize_queue: "asyncio.Queue[MeetingJob]" = asyncio.Queue(maxsize=STAGE_PIPELINE_PREFETCH)
+        self._stage_tasks: List[asyncio.Task] = []
+        self._capacity_available = asyncio.Event()
+
+        # Deferred word alignment requested for meetings transcribed in fast mode
+        self._alignment_tasks: Set[asyncio.Task] = set()
+        # STT and deferred alignment take turns on the GPU (see _stt_gpu)
+        self._stt_gpu_lock = asyncio.Lock()
+
         # Log system info at startup
         system_info = get_system_info(self.worker_id, self.worker_name)
         logger.info(
@@ -102,18 +174,69 @@ class PCWorker:
                 lines.append(f"[{start:.1f}s-{end:.1f}s] {text}")
         return '\n'.join(lines)
 
-    async def _ensure_stt_pipeline(self) -> STTPipeline:
+    def _register_models(self) -> None:
+        """Register the GPU models with the residency manager"""
+        self.models.register(
+            "stt",
+            STT_MODEL_VRAM_MB,
+            load=self._ensure_stt_pipeline,
+            unload=self._unload_stt_pipeline
+        )
+        if self.summarizer:
+            self.models.register(
+                "summarizer",
+                SUMMARIZER_VRAM_MB,
+                load=lambda: asyncio.to_thread(
+                    load_ollama_model,
+                    self.summarizer.model,
+                    self.summarizer.ollama_url,
+                    self._ollama_keep_alive()
+                ),
+                unload=lambda: asyncio.to_thread(
+                    unload_ollama_model,
+                    self.summarizer.model,
+                    self.summarizer.ollama_url
+                ),
+                in_process=False
+            )
+
+    @staticmethod
+    def _ollama_keep_alive() -> str:
+        """Ollama keep_alive matching the residency manager's idle timeout"""
+        return f"{int(MODEL_IDLE_UNLOAD_SECONDS)}s" if MODEL_IDLE_UNLOAD_SECONDS > 0 else "-1"
+
+    def _prewarm_models(self, resumed_stage: Optional[str] = None) -> None:
+        """
+        Start loading the models a claimed job will need
+
+        Args:
+            resumed_stage: Last stage finished before an interruption; STT
+                is not loaded for meetings resuming after diarization
+        """
+        if MODEL_PREWARM:
+            names = [] if resumed_stage in ("diarization", "saved") else ["stt"]
+            if self.summarizer:
+                names.append("summarizer")
+            self.models.prewarm(*names)
+
+    async def _ensure_stt_pipeline(self) -> "STTPipeline":
         """Ensure STT pipeline is initialized (lazy loading)"""
         if self.stt_pipeline is None:
-            logger.info("Initializing STT pipeline (WhisperX + Speaker Diarization)...")
+            from stt_pipeline import get_stt_pipeline
             self.stt_pipeline = get_stt_pipeline(
                 enable_preprocessing=False,  # Audio already preprocessed by audio_processor
                 enable_noise_reduction=False  # Noise reduction already applied
             )
-            await self.stt_pipeline.initialize()
-            logger.info("STT pipeline initialized successfully")
+        # No-op while loaded; reloads the models after the residency manager unloaded them
+        logger.info("Initializing STT pipeline (STT engine + Speaker Diarization)...")
+        await self.stt_pipeline.initialize()
         return self.stt_pipeline
 
+    async def _unload_stt_pipeline(self) -> None:
+        """Release the STT pipeline's models (reloaded by _ensure_stt_pipeline)"""
+        if self.stt_pipeline is not None:
+            await self.stt_pipeline.cleanup()
+
     async def start(self):
         """Start the worker main loop"""
         self.is_running = True
@@ -132,6 +255,11 @@ class PCWorker:
         cleanup_count = cleanup_temp_files(AUDIO_TEMP_DIR, max_age_hours=24)
         if cleanup_count > 0:
             logger.info(f"Cleaned up {cleanup_count} old temp files")
+        pruned = prune_stage_checkpoints(STT_CHECKPOINT_DIR, STT_CHECKPOINT_MAX_AGE_HOURS)
+        if pruned > 0:
+            logger.info(f"Deleted stage checkpoints of {pruned} meetings never resumed")
+
+        self.models.start_idle_sweeper()
 
         try:
             # Check if folder monitoring mode is enabled
@@ -147,9 +275,23 @@ class PCWorker:
     async def _start_polling_mode(self):
         """Start traditional Supabase polling mode"""
         logger.info("Starting in POLLING mode (Supabase)")
+        await self._requeue_interrupted_meetings()
+        if STAGE_PIPELINE_ENABLED:
+            self._start_stage_pipeline()
+
         while self.is_running:
             await self.poll_pending_meetings()
-            await asyncio.sleep(POLLING_INTERVAL_SECONDS)
+            if self._stage_tasks:
+                # Poll again early when a meeting leaves the pipeline (backlog refill)
+                try:
+                    await asyncio.wait_for(
+                        self._capacity_available.wait(), timeout=POLLING_INTERVAL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._capacity_available.clear()
+            else:
+                await asyncio.sleep(POLLING_INTERVAL_SECONDS)
 
     async def _start_folder_monitor_mode(self):
         """Start folder monitoring mode (watchdog)"""
@@ -197,6 +339,7 @@ class PCWorker:
         meeting_id = None
 
         logger.info(f"Processing local audio: {audio_path.name}")
+        self._prewarm_models()
 
         try:
             # Step 1: Create meeting record in Supabase
@@ -220,12 +363,15 @@ class PCWorker:
                 processed_by=self.worker_id
             )
 
-            # Step 3: Preprocess audio
+            # Step 3: Preprocess audio (content hash computed alongside for deduplication)
             processed_audio_path = get_processed_audio_path(meeting_id, AUDIO_TEMP_DIR)
-            audio_metadata = await self.audio_processor.preprocess_audio(
-                input_path=audio_path,
-                output_path=processed_audio_path,
-                meeting_id=meeting_id
+            content_hash, audio_metadata = await asyncio.gather(
+                asyncio.to_thread(compute_content_hash, audio_path),
+                self.audio_processor.preprocess_audio(
+                    input_path=audio_path,
+                    output_path=processed_audio_path,
+                    meeting_id=meeting_id
+                )
             )
 
             logger.log_meeting_event(
@@ -235,23 +381,41 @@ class PCWorker:
                 sample_rate=audio_metadata.sample_rate
             )
 
-            # Step 4: Run STT + Speaker Diarization
-            stt_pipeline = await self._ensure_stt_pipeline()
+            # Re-synced copy of a recording that was already processed: reuse its results
+            duplicate_of = await self._find_duplicate_meeting(
+                user_id, content_hash, audio_metadata.duration_seconds, meeting_id
+            )
+            if duplicate_of and await self._complete_as_duplicate(
+                meeting_id, user_id, duplicate_of, start_time,
+                audio_metadata.duration_seconds, notify=False
+            ):
+                return
 
+            # Step 4: Run STT + Speaker Diarization
             logger.log_meeting_event(meeting_id, "stt_started")
-            pipeline_result = await stt_pipeline.process_audio(
-                audio_path=processed_audio_path,
-                meeting_id=meeting_id,
-                language="ko",
-                num_speakers=None,
-                enhance_audio=False
-            )
+            await self._discard_provisional_transcript(meeting_id)
+            stt_engine_preference, word_alignment = await self._get_stt_settings(user_id)
+            async with self._stt_gpu():
+                pipeline_result = await self.stt_pipeline.process_audio(
+                    audio_path=processed_audio_path,
+                    meeting_id=meeting_id,
+                    language=STT_LANGUAGE,
+                    num_speakers=None,
+                    enhance_audio=False,
+                    audio_metadata=audio_metadata,
+                    stt_engine_preference=stt_engine_preference,
+                    word_alignment=word_alignment,
+                    on_segments=self._provisional_transcript_callback(
+                        meeting_id, user_id, audio_metadata.duration_seconds
+                    )
+                )
 
             logger.log_meeting_event(
                 meeting_id,
                 "stt_completed",
                 segments=len(pipeline_result.transcript.segments),
-                speakers=pipeline_result.num_speakers_detected
+                speakers=pipeline_result.num_speakers_detected,
+                stt_engine=pipeline_result.stt_engine
             )
 
             # Step 5: Match speakers (if embeddings available)
@@ -266,9 +430,11 @@ class PCWorker:
                 except Exception as e:
                     logger.warning(f"Speaker matching failed: {e}")
 
-            # Step 6: Save transcript
+            # Step 6: Save transcript (replacing the provisional segments)
+            await self._discard_provisional_transcript(meeting_id)
             if pipeline_result.transcript.segments:
                 await self.supabase.save_transcript(meeting_id, pipeline_result.transcript)
+            await self._mark_word_alignment_deferred(meeting_id, pipeline_result)
 
             # Step 7: Save speakers
             if pipeline_result.speakers:
@@ -286,12 +452,13 @@ class PCWorker:
                     # segments를 텍스트로 변환
                     transcript_text = self._segments_to_text(pipeline_result.transcript.segments)
 
-                    # sync 함수를 async로 실행
-                    hybrid_summary = await asyncio.to_thread(
-                        self.summarizer.summarize,
-                        transcript_text,
-                        verbose=False
-                    )
+                    # sync 함수를 async로 실행 (요약 모델은 사용 중 GPU에서 내리지 않음)
+                    async with self.models.use("summarizer"):
+                        hybrid_summary = await asyncio.to_thread(
+                            self.summarizer.summarize,
+                            transcript_text,
+                            verbose=False
+                        )
 
                     # MeetingSummary 호환 딕셔너리로 변환 (Supabase 저장용)
                     summary_dict = self.summarizer.to_meeting_summary(
@@ -322,6 +489,11 @@ class PCWorker:
                 except Exception as e:
                     logger.warning(f"Word generation failed: {e}")
 
+            if pipeline_result.transcript.segments:
+                await self._register_processed_audio(
+                    user_id, content_hash, audio_metadata.duration_seconds, meeting_id
+                )
+
             # Step 10: Update status to completed
             processing_time = time.time() - start_time
             await self.supabase.update_meeting_status(
@@ -355,15 +527,18 @@ class PCWorker:
 
     async def poll_pending_meetings(self):
         """Poll Supabase for pending meetings and process them"""
+        await self._poll_word_alignment_requests()
+
         try:
             # Check if we can take more jobs
-            if self.current_jobs >= MAX_CONCURRENT_JOBS:
+            max_jobs = self._max_in_flight()
+            if self.current_jobs >= max_jobs:
                 logger.debug("Max concurrent jobs reached, skipping poll")
                 return
 
-            # Query for pending meetings
+            # Query for pending meetings (queued ones are already claimed)
             pending_meetings = await self.supabase.get_pending_meetings(
-                limit=MAX_CONCURRENT_JOBS - self.current_jobs
+                limit=max_jobs - self.current_jobs
             )
 
             if not pending_meetings:
@@ -374,11 +549,19 @@ class PCWorker:
 
             # Process each meeting
             for meeting in pending_meetings:
-                if not self.is_running:
+                if not self.is_running or self.current_jobs >= max_jobs:
                     break
 
-                # Process meeting (currently synchronous, can be made concurrent)
-                await self.process_meeting(meeting.id)
+                # Another worker may have claimed it since the query
+                if not await self.supabase.claim_meeting(meeting.id, self.worker_id):
+                    logger.debug(f"Meeting {meeting.id} already claimed, skipping")
+                    continue
+
+                if self._stage_tasks:
+                    # Hand off to the stage pipeline; returns immediately
+                    self._enqueue_meeting(meeting.id)
+                else:
+                    await self.process_meeting(meeting.id)
 
         except SupabaseQueryError as e:
             logger.error(f"Database error polling meetings: {e}")
@@ -401,278 +584,623 @@ class PCWorker:
         9. [Phase 3] Generate summary with Ollama + Gemma 2
         10. Update meeting status to 'completed'
 
+        Steps 1-5, 6 and 7-10 are the prepare, STT and finalize stages; the
+        polling loop runs them as an overlapping stage pipeline
+        (_start_stage_pipeline and the _*_stage_loop tasks), this method
+        runs them back to back.
+        Finished stages are checkpointed, so a retried meeting resumes after
+        the last one (a crash during summarization never re-runs STT).
+
         Args:
             meeting_id: Meeting identifier
         """
-        start_time = time.time()
         self.current_jobs += 1
 
+        try:
+            job = await self._prepare_meeting(meeting_id)
+            if job is not None:
+                await self._transcribe_meeting(job)
+                await self._finalize_meeting(job)
+        except Exception as e:
+            await self._handle_stage_error(meeting_id, e)
+        finally:
+            self._cleanup_job_files(meeting_id)
+            self.current_jobs -= 1
+
+    # =========================================================================
+    # Stage pipeline
+    # =========================================================================
+
+    def _max_in_flight(self) -> int:
+        """Meetings that may be in progress at once"""
+        if not self._stage_tasks:
+            return MAX_CONCURRENT_JOBS
+        # One meeting in each stage plus the hand-off queues between them
+        return 3 + 2 * STAGE_PIPELINE_PREFETCH
+
+    def _start_stage_pipeline(self) -> None:
+        """Start the prepare, STT and finalize stage loops"""
+        self._stage_tasks = [
+            asyncio.create_task(self._prepare_stage_loop(), name="stage-prepare"),
+            asyncio.create_task(self._stt_stage_loop(), name="stage-stt"),
+            asyncio.create_task(self._finalize_stage_loop(), name="stage-finalize"),
+        ]
+        logger.info(f"Stage pipeline started (prefetch={STAGE_PIPELINE_PREFETCH})")
+
+    def _enqueue_meeting(self, meeting_id: str) -> None:
+        """Queue a claimed meeting for the prepare stage"""
+        self.current_jobs += 1
+        self._intake_queue.put_nowait(meeting_id)
+
+    def _finish_job(self, meeting_id: str) -> None:
+        """Release a meeting's pipeline slot and temporary files"""
+        self._cleanup_job_files(meeting_id)
+        self.current_jobs -= 1
+        self._capacity_available.set()
+
+    async def _prepare_stage_loop(self) -> None:
+        """Download and preprocess meetings ahead of the GPU"""
+        while True:
+            meeting_id = await self._intake_queue.get()
+            try:
+                job = await self._prepare_meeting(meeting_id)
+            except Exception as e:
+                await self._handle_stage_error(meeting_id, e)
+                job = None
+
+            if job is None:
+                self._finish_job(meeting_id)
+                continue
+
+            # Blocks while STT is busy and the queue is full (caps prepared audio)
+            await self._stt_queue.put(job)
+
+    async def _stt_stage_loop(self) -> None:
+        """
+        Run STT one meeting at a time so the GPU is never shared
+
+        Short recordings already waiting in the queue are transcribed together
+        so they share model batches.
+        """
+        held: Optional[MeetingJob] = None
+        while True:
+            job = held or await self._stt_queue.get()
+            held = None
+
+            batch = [job]
+            if self._can_batch_stt(job):
+                while len(batch) < STT_BATCH_MAX_MEETINGS and not self._stt_queue.empty():
+                    queued = self._stt_queue.get_nowait()
+                    if (
+                        self._can_batch_stt(queued)
+                        and queued.stt_engine_preference == job.stt_engine_preference
+                        and queued.word_alignment == job.word_alignment
+                    ):
+                        batch.append(queued)
+                    else:
+                        held = queued
+                        break
+
+            try:
+                if len(batch) == 1:
+                    await self._transcribe_meeting(job)
+                else:
+                    await self._transcribe_meetings(batch)
+            except Exception as e:
+                for failed in batch:
+                    await self._handle_stage_error(failed.meeting_id, e)
+                    self._finish_job(failed.meeting_id)
+                continue
+
+            for done in batch:
+                if done.pipeline_result is None:
+                    await self._handle_stage_error(
+                        done.meeting_id, TranscriptionError("Batch transcription failed")
+                    )
+                    self._finish_job(done.meeting_id)
+                else:
+                    await self._finalize_queue.put(done)
+
+    @asynccontextmanager
+    async def _stt_gpu(self):
+        """Use the STT models with the GPU to ourselves (STT stage or word alignment)"""
+        async with self._stt_gpu_lock:
+            async with self.models.use("stt"):
+                yield
+
+    @staticmethod
+    def _can_batch_stt(job: MeetingJob) -> bool:
+        """Check whether a meeting is short enough to share STT batches"""
+        return (
+            STT_BATCH_MAX_MEETINGS > 1
+            and job.audio_metadata.duration_seconds <= WHISPERX_BATCH_POOL_MAX_SECONDS
+            # Meetings resuming after STT restore their results in process_audio
+            and job.resumed_stage in (None, "audio")
+        )
+
+    async def _finalize_stage_loop(self) -> None:
+        """Save results and summarize while the GPU moves on to the next meeting"""
+        while True:
+            job = await self._finalize_queue.get()
+            try:
+                await self._finalize_meeting(job)
+            except Exception as e:
+                await self._handle_stage_error(job.meeting_id, e)
+            finally:
+                self._finish_job(job.meeting_id)
+
+    async def _stop_stage_pipeline(self) -> None:
+        """Cancel the stage loops"""
+        for task in self._stage_tasks:
+            task.cancel()
+        await asyncio.gather(*self._stage_tasks, return_exceptions=True)
+        self._stage_tasks = []
+
+    # =========================================================================
+    # Pipeline stages
+    # =========================================================================
+
+    async def _prepare_meeting(self, meeting_id: str) -> Optional[MeetingJob]:
+        """
+        Prepare stage: steps 1-5 (status, tags, download, preprocess, dedup)
+
+        A meeting interrupted after this stage resumes from its stage
+        checkpoint instead of downloading and preprocessing again.
+
+        Args:
+            meeting_id: Meeting identifier
+
+        Returns:
+            MeetingJob ready for STT, or None if results were cloned from a
+            duplicate recording and the meeting is already completed
+        """
+        start_time = time.time()
         logger.log_meeting_event(meeting_id, "processing_started")
 
-        temp_audio_path: Optional[Path] = None
-        processed_audio_path: Optional[Path] = None
+        # Step 1: Update status to processing
+        await self.supabase.update_meeting_status(
+            meeting_id=meeting_id,
+            status=MeetingStatus.PROCESSING,
+            processed_by=self.worker_id
+        )
 
-        try:
-            # Step 1: Update status to processing
-            await self.supabase.update_meeting_status(
-                meeting_id=meeting_id,
-                status=MeetingStatus.PROCESSING,
-                processed_by=self.worker_id
-            )
+        # Step 2: Fetch meeting and apply template tags (auto-tagging)
+        meeting = await self.supabase.get_meeting_by_id(meeting_id)
+        if not meeting:
+            raise Exception("Meeting not found")
 
-            # Step 2: Fetch meeting and apply template tags (auto-tagging)
-            meeting = await self.supabase.get_meeting_by_id(meeting_id)
-            if not meeting:
-                raise Exception("Meeting not found")
+        user_id = meeting.user_id
 
-            user_id = meeting.user_id
+        # Notify mobile: processing started
+        await self.realtime.notify_processing_started(
+            user_id=user_id,
+            meeting_id=meeting_id
+        )
 
-            # Notify mobile: processing started
-            await self.realtime.notify_processing_started(
-                user_id=user_id,
-                meeting_id=meeting_id
+        if meeting:
+            await self._apply_template_tags(meeting_id, meeting.user_id)
+
+        # Resume after an interruption: skip the stages that already finished
+        checkpoint = self._stage_checkpoint(meeting)
+        restored = await self._load_prepared_audio(checkpoint)
+        resumed_stage = await asyncio.to_thread(checkpoint.last_stage) if restored is not None else None
+
+        # Load the models of the remaining stages while the audio downloads
+        self._prewarm_models(resumed_stage)
+
+        if restored is not None:
+            audio_metadata, content_hash = restored
+            processed_audio_path = checkpoint.audio_path
+            logger.log_meeting_event(meeting_id, "resumed_from_checkpoint", stage=resumed_stage)
+        else:
+            processed_audio_path = (
+                checkpoint.audio_path if checkpoint is not None
+                else get_processed_audio_path(meeting_id, AUDIO_TEMP_DIR)
+            )
+            content_hash, audio_metadata = await self._download_and_preprocess(
+                meeting_id, processed_audio_path
             )
 
-            if meeting:
-                await self._apply_template_tags(meeting_id, meeting.user_id)
+            # Duplicate upload: clone the earlier meeting's results instead of recomputing
+            duplicate_of = await self._find_duplicate_meeting(
+                user_id, content_hash, audio_metadata.duration_seconds, meeting_id
+            )
+            if duplicate_of and await self._complete_as_duplicate(
+                meeting_id, user_id, duplicate_of, start_time,
+                audio_metadata.duration_seconds
+            ):
+                await self._clear_stage_checkpoint(checkpoint)
+                return None
+
+            await self._save_stage(checkpoint, "audio", {
+                "audio_metadata": audio_metadata.model_dump(mode="json"),
+                "content_hash": content_hash
+            })
+
+        stt_engine_preference, word_alignment = await self._get_stt_settings(user_id)
+        return MeetingJob(
+            meeting_id=meeting_id,
+            user_id=user_id,
+            start_time=start_time,
+            processed_audio_path=processed_audio_path,
+            audio_metadata=audio_metadata,
+            content_hash=content_hash,
+            stt_engine_preference=stt_engine_preference,
+            word_alignment=word_alignment,
+            checkpoint=checkpoint,
+            resumed_stage=resumed_stage
+        )
 
-            # Step 3: Get audio URL
-            audio_url = await self.supabase.get_meeting_audio_url(meeting_id)
-            if not audio_url:
-                raise AudioDownloadError("No audio URL found for meeting")
+    async def _download_and_preprocess(
+        self,
+        meeting_id: str,
+        processed_audio_path: Path
+    ) -> Tuple[str, AudioMetadata]:
+        """
+        Prepare stage steps 3-5: get the audio URL, download, preprocess
 
-            # Step 4: Download audio
-            temp_audio_path = get_audio_temp_path(meeting_id, AUDIO_TEMP_DIR)
-            await self.audio_processor.download_audio(
-                url=audio_url,
-                destination=temp_audio_path,
-                meeting_id=meeting_id
-            )
+        Args:
+            meeting_id: Meeting identifier
+            processed_audio_path: Where the preprocessed audio is written
 
-            # Step 5: Preprocess audio
-            processed_audio_path = get_processed_audio_path(meeting_id, AUDIO_TEMP_DIR)
-            audio_metadata = await self.audio_processor.preprocess_audio(
+        Returns:
+            (content hash of the download, metadata of the preprocessed audio)
+        """
+        # Step 3: Get audio URL
+        audio_url = await self.supabase.get_meeting_audio_url(meeting_id)
+        if not audio_url:
+            raise AudioDownloadError("No audio URL found for meeting")
+
+        # Step 4: Download audio
+        temp_audio_path = get_audio_temp_path(meeting_id, AUDIO_TEMP_DIR)
+        await self.audio_processor.download_audio(
+            url=audio_url,
+            destination=temp_audio_path,
+            meeting_id=meeting_id
+        )
+
+        # Step 5: Preprocess audio (content hash computed alongside for deduplication)
+        processed_audio_path.parent.mkdir(parents=True, exist_ok=True)
+        content_hash, audio_metadata = await asyncio.gather(
+            asyncio.to_thread(compute_content_hash, temp_audio_path),
+            self.audio_processor.preprocess_audio(
                 input_path=temp_audio_path,
                 output_path=processed_audio_path,
                 meeting_id=meeting_id
             )
+        )
 
-            logger.log_meeting_event(
-                meeting_id,
-                "audio_preprocessed",
-                duration_s=f"{audio_metadata.duration_seconds:.2f}",
-                sample_rate=audio_metadata.sample_rate
-            )
+        # The original download is not needed once preprocessed
+        cleanup_single_file(temp_audio_path)
 
-            # Step 6: Run STT + Speaker Diarization pipeline
-            stt_pipeline = await self._ensure_stt_pipeline()
+        logger.log_meeting_event(
+            meeting_id,
+            "audio_preprocessed",
+            duration_s=f"{audio_metadata.duration_seconds:.2f}",
+            sample_rate=audio_metadata.sample_rate
+        )
+        return content_hash, audio_metadata
 
-            logger.log_meeting_event(meeting_id, "stt_started")
-            pipeline_result = await stt_pipeline.process_audio(
-                audio_path=processed_audio_path,
+    async def _transcribe_meeting(self, job: MeetingJob) -> None:
+        """
+        STT stage: step 6 (WhisperX STT + speaker diarization on the GPU)
+
+        Args:
+            job: Prepared meeting; pipeline_result is filled in
+        """
+        meeting_id = job.meeting_id
+
+        # STT and diarization finished before an interruption: no GPU work left
+        if job.resumed_stage in ("diarization", "saved"):
+            restored = await self._load_stage(job.checkpoint, "diarization")
+            if restored is not None:
+                from stt_pipeline import PipelineResult
+                job.pipeline_result = PipelineResult.from_dict(restored)
+                self._log_stt_completed(meeting_id, job.pipeline_result)
+                return
+
+        # Step 6: Run STT + Speaker Diarization pipeline
+        logger.log_meeting_event(meeting_id, "stt_started")
+        await self._discard_provisional_transcript(meeting_id)
+        async with self._stt_gpu():
+            pipeline_result = await self.stt_pipeline.process_audio(
+                audio_path=job.processed_audio_path,
                 meeting_id=meeting_id,
-                language="ko",  # Korean (can be made configurable)
+                language=STT_LANGUAGE,
                 num_speakers=None,  # Auto-detect
-                enhance_audio=False  # Already preprocessed
+                enhance_audio=False,  # Already preprocessed
+                audio_metadata=job.audio_metadata,  # Loudness already normalized
+                stt_engine_preference=job.stt_engine_preference,
+                word_alignment=job.word_alignment,
+                on_segments=self._provisional_transcript_callback(
+                    meeting_id, job.user_id, job.audio_metadata.duration_seconds
+                ),
+                checkpoint=job.checkpoint
             )
+        job.pipeline_result = pipeline_result
 
-            logger.log_meeting_event(
-                meeting_id,
-                "stt_completed",
-                segments=len(pipeline_result.transcript.segments),
-                speakers=pipeline_result.num_speakers_detected,
-                transcription_time=f"{pipeline_result.transcription_time:.2f}s",
-                diarization_time=f"{pipeline_result.diarization_time:.2f}s",
-                avg_confidence=f"{pipeline_result.average_confidence:.2f}" if pipeline_result.average_confidence else "N/A"
-            )
-
-            # Step 7: Match speakers to registered speakers (auto-matching)
-            speaker_matches = {}
-            if pipeline_result.speaker_embeddings:
-                try:
-                    logger.log_meeting_event(meeting_id, "speaker_matching_started")
-
-                    speaker_matches = await self.speaker_matcher.match_speakers(
-                        speaker_embeddings=pipeline_result.speaker_embeddings,
-                        user_id=user_id,
-                        threshold=0.7  # Configurable similarity threshold
-                    )
-
-                    num_matched = sum(1 for v in speaker_matches.values() if v is not None)
-                    num_new = sum(1 for v in speaker_matches.values() if v is None)
+        # Preprocessed audio is only needed for STT
+        cleanup_single_file(job.processed_audio_path)
 
-                    logger.log_meeting_event(
-                        meeting_id,
-                        "speaker_matching_completed",
-                        total_speakers=len(speaker_matches),
-                        matched_speakers=num_matched,
-                        new_speakers=num_new
-                    )
-                except Exception as e:
-                    # Don't fail processing if speaker matching fails
-                    logger.warning(f"Speaker matching failed for {meeting_id}: {e}")
-                    logger.log_meeting_event(
-                        meeting_id,
-                        "speaker_matching_failed",
-                        error=str(e)
-                    )
+        self._log_stt_completed(meeting_id, pipeline_result)
 
-            # Step 8: Save transcript to Supabase
-            if pipeline_result.transcript.segments:
-                await self.supabase.save_transcript(meeting_id, pipeline_result.transcript)
-                logger.log_meeting_event(
-                    meeting_id,
-                    "transcript_saved",
-                    segment_count=len(pipeline_result.transcript.segments)
-                )
+    async def _transcribe_meetings(self, jobs: List[MeetingJob]) -> None:
+        """
+        STT stage for several short meetings sharing model batches
 
-            # Step 8: Save speakers to Supabase (with matched IDs)
-            if pipeline_result.speakers:
-                # Update speakers with matched speaker_ids before saving
-                for speaker in pipeline_result.speakers:
-                    speaker_label = speaker.speaker_label
-                    if speaker_label in speaker_matches and speaker_matches[speaker_label]:
-                        # Speaker matched to existing profile
-                        speaker.matched_speaker_id = speaker_matches[speaker_label]
-                        logger.debug(
-                            f"Speaker '{speaker_label}' matched to existing ID: "
-                            f"{speaker_matches[speaker_label]}"
-                        )
-                    # If not matched (new speaker), matched_speaker_id remains None
+        Args:
+            jobs: Prepared meetings with the same STT engine and word alignment settings;
+                pipeline_result is filled in for each meeting that succeeded
+        """
+        for job in jobs:
+            logger.log_meeting_event(job.meeting_id, "stt_started", batch_size=len(jobs))
+            await self._discard_provisional_transcript(job.meeting_id)
+
+        async with self._stt_gpu():
+            results = await self.stt_pipeline.process_batch(
+                audio_paths=[job.processed_audio_path for job in jobs],
+                meeting_ids=[job.meeting_id for job in jobs],
+                language=STT_LANGUAGE,
+                enhance_audio=False,  # Already preprocessed
+                audio_metadata=[job.audio_metadata for job in jobs],
+                stt_engine_preference=jobs[0].stt_engine_preference,
+                word_alignment=jobs[0].word_alignment,
+                checkpoints={job.meeting_id: job.checkpoint for job in jobs if job.checkpoint}
+            )
+        results_by_meeting = {result.meeting_id: result for result in results}
 
-                await self.supabase.save_speakers(meeting_id, pipeline_result.speakers)
-                logger.log_meeting_event(
-                    meeting_id,
-                    "speakers_saved",
-                    speaker_count=len(pipeline_result.speakers)
-                )
+        for job in jobs:
+            cleanup_single_file(job.processed_audio_path)
+            job.pipeline_result = results_by_meeting.get(job.meeting_id)
+            if job.pipeline_result is not None:
+                self._log_stt_completed(job.meeting_id, job.pipeline_result)
 
-                # Save embeddings for new speakers (those without matches)
-                if pipeline_result.speaker_embeddings:
-                    try:
-                        # Query back the newly created speakers to get their IDs
-                        # Use asyncio.to_thread to make synchronous Supabase call async
-                        response = await asyncio.to_thread(
-                            lambda: self.supabase.client.table("speakers")
-                            .select("id, speaker_label, meeting_id")
-                            .eq("meeting_id", meeting_id)
-                            .execute()
-                        )
+    def _log_stt_completed(self, meeting_id: str, pipeline_result: "PipelineResult") -> None:
+        """Log the stt_completed meeting event"""
+        logger.log_meeting_event(
+            meeting_id,
+            "stt_completed",
+            segments=len(pipeline_result.transcript.segments),
+            speakers=pipeline_result.num_speakers_detected,
+            stt_engine=pipeline_result.stt_engine,
+            transcription_time=f"{pipeline_result.transcription_time:.2f}s",
+            diarization_time=f"{pipeline_result.diarization_time:.2f}s",
+            avg_confidence=f"{pipeline_result.average_confidence:.2f}" if pipeline_result.average_confidence else "N/A",
+            gpu_peak_memory=", ".join(
+                f"{stage}={peak_mb:.0f}MB" for stage, peak_mb in pipeline_result.gpu_peak_memory_mb.items()
+            ) or "N/A"
+        )
 
-                        saved_speakers = response.data if response.data else []
-                        speaker_id_map = {s["speaker_label"]: s["id"] for s in saved_speakers}
+    async def _finalize_meeting(self, job: MeetingJob) -> None:
+        """
+        Finalize stage: steps 7-10 (speaker matching, saving, summary, completion)
 
-                        for speaker_label, embedding_obj in pipeline_result.speaker_embeddings.items():
-                            # Only save embeddings for new speakers (not matched to existing)
-                            is_new_speaker = (
-                                speaker_label not in speaker_matches or
-                                speaker_matches[speaker_label] is None
-                            )
+        Args:
+            job: Meeting with pipeline_result from the STT stage
+        """
+        meeting_id = job.meeting_id
+        user_id = job.user_id
+        pipeline_result = job.pipeline_result
+        audio_metadata = job.audio_metadata
+
+        # Steps 7-8 finished before an interruption: resume at the summary
+        if job.resumed_stage == "saved":
+            logger.info(f"Transcript and speakers of {meeting_id} already saved, resuming at summary")
+        else:
+            await self._save_meeting_results(job)
+            await self._save_stage(job.checkpoint, "saved", {})
+
+        # Step 9: Generate summary with HybridSummarizer
+        summary = None
+        if SUMMARIZATION_ENABLED and self.summarizer:
+            if pipeline_result.transcript.segments:
+                try:
+                    # segments를 텍스트로 변환
+                    transcript_text = self._segments_to_text(pipeline_result.transcript.segments)
 
-                            if is_new_speaker and speaker_label in speaker_id_map:
-                                speaker_id = speaker_id_map[speaker_label]
-
-                                await self.speaker_matcher.save_speaker_embedding(
-                                    speaker_id=speaker_id,
-                                    embedding=embedding_obj.embedding,
-                                    confidence=embedding_obj.confidence,
-                                    model_name=embedding_obj.model_name
-                                )
-
-                                logger.debug(
-                                    f"Saved embedding for new speaker '{speaker_label}' "
-                                    f"(ID: {speaker_id}) in meeting {meeting_id}"
-                                )
-                    except Exception as e:
-                        # Don't fail processing if embedding save fails
-                        logger.warning(f"Failed to save speaker embeddings for {meeting_id}: {e}")
-
-            # Step 9: Generate summary with HybridSummarizer
-            summary = None
-            if SUMMARIZATION_ENABLED and self.summarizer:
-                if pipeline_result.transcript.segments:
-                    try:
-                        # segments를 텍스트로 변환
-                        transcript_text = self._segments_to_text(pipeline_result.transcript.segments)
-
-                        # sync 함수를 async로 실행
+                    # sync 함수를 async로 실행 (요약 모델은 사용 중 GPU에서 내리지 않음)
+                    async with self.models.use("summarizer"):
                         hybrid_summary = await asyncio.to_thread(
                             self.summarizer.summarize,
                             transcript_text,
                             verbose=False
                         )
 
-                        # MeetingSummary 호환 딕셔너리로 변환
-                        summary = self.summarizer.to_meeting_summary(
-                            hybrid_summary,
-                            meeting_id=meeting_id
+                    # MeetingSummary 호환 딕셔너리로 변환
+                    summary = self.summarizer.to_meeting_summary(
+                        hybrid_summary,
+                        meeting_id=meeting_id
+                    )
+
+                    if summary:
+                        await self.supabase.save_summary(meeting_id, summary)
+                        logger.log_meeting_event(
+                            meeting_id,
+                            "summary_generated",
+                            summary_length=len(summary.get('summary', '')),
+                            key_points=len(summary.get('key_points', [])),
+                            action_items=len(summary.get('action_items', []))
                         )
+                    else:
+                        logger.warning(f"Summarization failed for {meeting_id} after retries")
 
-                        if summary:
-                            await self.supabase.save_summary(meeting_id, summary)
-                            logger.log_meeting_event(
-                                meeting_id,
-                                "summary_generated",
-                                summary_length=len(summary.get('summary', '')),
-                                key_points=len(summary.get('key_points', [])),
-                                action_items=len(summary.get('action_items', []))
-                            )
-                        else:
-                            logger.warning(f"Summarization failed for {meeting_id} after retries")
+                except Exception as e:
+                    # Log but don't fail the entire meeting if summary fails
+                    logger.warning(f"Summary generation error for {meeting_id}: {e}")
 
-                    except Exception as e:
-                        # Log but don't fail the entire meeting if summary fails
-                        logger.warning(f"Summary generation error for {meeting_id}: {e}")
+        if pipeline_result.transcript.segments:
+            await self._register_processed_audio(
+                user_id, job.content_hash, audio_metadata.duration_seconds, meeting_id
+            )
 
-            processing_time = time.time() - start_time
+        processing_time = time.time() - job.start_time
 
-            # Step 10: Update status to completed
-            await self.supabase.update_meeting_status(
-                meeting_id=meeting_id,
-                status=MeetingStatus.COMPLETED,
-                processed_by=self.worker_id
-            )
+        # Step 10: Update status to completed
+        await self.supabase.update_meeting_status(
+            meeting_id=meeting_id,
+            status=MeetingStatus.COMPLETED,
+            processed_by=self.worker_id
+        )
 
-            # Notify mobile: processing completed
-            await self.realtime.notify_processing_completed(
-                user_id=user_id,
-                meeting_id=meeting_id,
-                result_data={
-                    'processing_time': processing_time,
-                    'duration': audio_metadata.duration_seconds,
-                    'transcript_segments': len(pipeline_result.transcript.segments),
-                    'speakers_detected': pipeline_result.num_speakers_detected,
-                    'summary_generated': summary is not None
-                }
+        # Notify mobile: processing completed
+        await self.realtime.notify_processing_completed(
+            user_id=user_id,
+            meeting_id=meeting_id,
+            result_data={
+                'processing_time': processing_time,
+                'duration': audio_metadata.duration_seconds,
+                'transcript_segments': len(pipeline_result.transcript.segments),
+                'speakers_detected': pipeline_result.num_speakers_detected,
+                'summary_generated': summary is not None
+            }
+        )
+
+        logger.log_meeting_event(
+            meeting_id,
+            "processing_completed",
+            duration_s=f"{processing_time:.2f}",
+            summary_generated=summary is not None
+        )
+        await self._clear_stage_checkpoint(job.checkpoint)
+
+    async def _save_meeting_results(self, job: MeetingJob) -> None:
+        """
+        Finalize stage steps 7-8: match speakers, save transcript and speakers
+
+        Args:
+            job: Meeting with pipeline_result from the STT stage
+        """
+        meeting_id = job.meeting_id
+        user_id = job.user_id
+        pipeline_result = job.pipeline_result
+
+        # Step 7: Match speakers to registered speakers (auto-matching)
+        speaker_matches = {}
+        if pipeline_result.speaker_embeddings:
+            try:
+                logger.log_meeting_event(meeting_id, "speaker_matching_started")
+
+                speaker_matches = await self.speaker_matcher.match_speakers(
+                    speaker_embeddings=pipeline_result.speaker_embeddings,
+                    user_id=user_id,
+                    threshold=0.7  # Configurable similarity threshold
+                )
+
+                num_matched = sum(1 for v in speaker_matches.values() if v is not None)
+                num_new = sum(1 for v in speaker_matches.values() if v is None)
+
+                logger.log_meeting_event(
+                    meeting_id,
+                    "speaker_matching_completed",
+                    total_speakers=len(speaker_matches),
+                    matched_speakers=num_matched,
+                    new_speakers=num_new
+                )
+            except Exception as e:
+                # Don't fail processing if speaker matching fails
+                logger.warning(f"Speaker matching failed for {meeting_id}: {e}")
+                logger.log_meeting_event(
+                    meeting_id,
+                    "speaker_matching_failed",
+                    error=str(e)
+                )
+
+        # Step 8: Save transcript to Supabase (replacing the provisional segments)
+        await self._discard_provisional_transcript(meeting_id)
+        if pipeline_result.transcript.segments:
+            if job.resumed_stage == "diarization":
+                # May have been saved before the interruption
+                await self.supabase.replace_transcript(meeting_id, pipeline_result.transcript)
+            else:
+                await self.supabase.save_transcript(meeting_id, pipeline_result.transcript)
+            logger.log_meeting_event(
+                meeting_id,
+                "transcript_saved",
+                segment_count=len(pipeline_result.transcript.segments)
             )
+        await self._mark_word_alignment_deferred(meeting_id, pipeline_result)
+
+        # Step 8: Save speakers to Supabase (with matched IDs)
+        if pipeline_result.speakers:
+            # Update speakers with matched speaker_ids before saving
+            for speaker in pipeline_result.speakers:
+                speaker_label = speaker.speaker_label
+                if speaker_label in speaker_matches and speaker_matches[speaker_label]:
+                    # Speaker matched to existing profile
+                    speaker.matched_speaker_id = speaker_matches[speaker_label]
+                    logger.debug(
+                        f"Speaker '{speaker_label}' matched to existing ID: "
+                        f"{speaker_matches[speaker_label]}"
+                    )
+                # If not matched (new speaker), matched_speaker_id remains None
 
+            await self.supabase.save_speakers(meeting_id, pipeline_result.speakers)
             logger.log_meeting_event(
                 meeting_id,
-                "processing_completed",
-                duration_s=f"{processing_time:.2f}",
-                summary_generated=summary is not None
-            )
-
-        except AudioDownloadError as e:
-            await self._handle_processing_error(meeting_id, "Audio download failed", e)
-        except AudioPreprocessingError as e:
-            await self._handle_processing_error(meeting_id, "Audio preprocessing failed", e)
-        except TranscriptionError as e:
-            await self._handle_processing_error(meeting_id, "Transcription failed", e)
-        except DiarizationError as e:
-            await self._handle_processing_error(meeting_id, "Speaker diarization failed", e)
-        except PCWorkerException as e:
-            await self._handle_processing_error(meeting_id, "Processing failed", e)
-        except Exception as e:
-            await self._handle_processing_error(meeting_id, "Unexpected error", e)
-        finally:
-            # Cleanup temporary files
-            if temp_audio_path:
-                cleanup_single_file(temp_audio_path)
-            if processed_audio_path:
-                cleanup_single_file(processed_audio_path)
+                "speakers_saved",
+                speaker_count=len(pipeline_result.speakers)
+            )
 
-            self.current_jobs -= 1
+            # Save embeddings for new speakers (those without matches)
+            if pipeline_result.speaker_embeddings:
+                try:
+                    # Query back the newly created speakers to get their IDs
+                    # Use asyncio.to_thread to make synchronous Supabase call async
+                    response = await asyncio.to_thread(
+                        lambda: self.supabase.client.table("speakers")
+                        .select("id, speaker_label, meeting_id")
+                        .eq("meeting_id", meeting_id)
+                        .execute()
+                    )
+
+                    saved_speakers = response.data if response.data else []
+                    speaker_id_map = {s["speaker_label"]: s["id"] for s in saved_speakers}
+
+                    for speaker_label, embedding_obj in pipeline_result.speaker_embeddings.items():
+                        # Only save embeddings for new speakers (not matched to existing)
+                        is_new_speaker = (
+                            speaker_label not in speaker_matches or
+                            speaker_matches[speaker_label] is None
+                        )
+
+                        if is_new_speaker and speaker_label in speaker_id_map:
+                            speaker_id = speaker_id_map[speaker_label]
+
+                            await self.speaker_matcher.save_speaker_embedding(
+                                speaker_id=speaker_id,
+                                embedding=embedding_obj.embedding,
+                                confidence=embedding_obj.confidence,
+                                model_name=embedding_obj.model_name
+                            )
+
+                            logger.debug(
+                                f"Saved embedding for new speaker '{speaker_label}' "
+                                f"(ID: {speaker_id}) in meeting {meeting_id}"
+                            )
+                except Exception as e:
+                    # Don't fail processing if embedding save fails
+                    logger.warning(f"Failed to save speaker embeddings for {meeting_id}: {e}")
+
+    async def _handle_stage_error(self, meeting_id: str, error: Exception) -> None:
+        """Mark a meeting failed with an error type matching the exception"""
+        if isinstance(error, AudioDownloadError):
+            error_type = "Audio download failed"
+        elif isinstance(error, AudioPreprocessingError):
+            error_type = "Audio preprocessing failed"
+        elif isinstance(error, TranscriptionError):
+            error_type = "Transcription failed"
+        elif isinstance(error, DiarizationError):
+            error_type = "Speaker diarization failed"
+        elif isinstance(error, PCWorkerException):
+            error_type = "Processing failed"
+        else:
+            error_type = "Unexpected error"
+        await self._handle_processing_error(meeting_id, error_type, error)
+
+    def _cleanup_job_files(self, meeting_id: str) -> None:
+        """Remove a meeting's temporary audio files"""
+        cleanup_single_file(get_audio_temp_path(meeting_id, AUDIO_TEMP_DIR))
+        cleanup_single_file(get_processed_audio_path(meeting_id, AUDIO_TEMP_DIR))
 
     async def _apply_template_tags(self, meeting_id: str, user_id: str) -> None:
         """
@@ -745,6 +1273,407 @@ class PCWorker:
             # Log but don't fail processing on tagging errors
             logger.warning(f"Failed to apply template tags to meeting {meeting_id}: {e}")
 
+    async def _get_stt_settings(self, user_id: Optional[str]) -> Tuple[Optional[str], Optional[bool]]:
+        """
+        Get the user's STT settings
+
+        Args:
+            user_id: Owner of the recording
+
+        Returns:
+            (engine spec or None = choose by hardware and length,
+             word timestamps or None = decide by recording length)
+        """
+        if not user_id:
+            return None, None
+
+        try:
+            settings = await self.supabase.get_user_stt_settings(user_id)
+        except Exception as e:
+            logger.warning(f"STT setting lookup failed for user {user_id}: {e}")
+            return None, None
+
+        if not settings:
+            return None, None
+        return settings.get("stt_engine"), settings.get("word_timestamps")
+
+    # =========================================================================
+    # Stage checkpoints
+    # =========================================================================
+
+    async def _requeue_interrupted_meetings(self) -> None:
+        """Return meetings this worker was processing when it stopped to the queue"""
+        if self.worker_id == DEFAULT_WORKER_ID:
+            # Other workers may share the default ID and still be processing their meetings
+            logger.warning(
+                "WORKER_ID is not set; interrupted meetings are not requeued. "
+                "Set a unique WORKER_ID per worker to resume them after a restart"
+            )
+            return
+
+        try:
+            meeting_ids = await self.supabase.requeue_interrupted_meetings(self.worker_id)
+        except Exception as e:
+            logger.warning(f"Failed to requeue interrupted meetings: {e}")
+            return
+
+        if meeting_ids:
+            logger.info(
+                f"Requeued {len(meeting_ids)} meeting(s) interrupted in processing: "
+                f"{', '.join(meeting_ids)}"
+            )
+
+    def _stage_checkpoint(self, meeting: Meeting) -> Optional[StageCheckpointStore]:
+        """Stage checkpoints of a meeting, keyed by its recording (None if disabled)"""
+        if not STT_STAGE_CHECKPOINTS:
+            return None
+        source = meeting.audio_url or meeting.audio_storage_path or ""
+        return get_stage_checkpoint_store(meeting.id, hashlib.sha1(source.encode()).hexdigest())
+
+    async def _load_prepared_audio(
+        self,
+        checkpoint: Optional[StageCheckpointStore]
+    ) -> Optional[Tuple[AudioMetadata, str]]:
+        """
+        Restore the prepare stage from a checkpoint
+
+        Args:
+            checkpoint: Stage checkpoints of the meeting
+
+        Returns:
+            (audio metadata, content hash), or None if the meeting has to be
+            prepared again (no checkpoint, or the preprocessed audio was
+            already deleted but STT results are not checkpointed)
+        """
+        data = await self._load_stage(checkpoint, "audio")
+        if data is None:
+            return None
+        if not checkpoint.audio_path.exists() and await self._load_stage(checkpoint, "diarization") is None:
+            return None
+        return AudioMetadata.model_validate(data["audio_metadata"]), data["content_hash"]
+
+    async def _load_stage(
+        self,
+        checkpoint: Optional[StageCheckpointStore],
+        stage: str
+    ) -> Optional[Dict[str, Any]]:
+        """Data of a finished stage (None without a checkpoint)"""
+        if checkpoint is None:
+            return None
+        return await asyncio.to_thread(checkpoint.load, stage)
+
+    async def _save_stage(
+        self,
+        checkpoint: Optional[StageCheckpointStore],
+        stage: str,
+        data: Dict[str, Any]
+    ) -> None:
+        """Checkpoint a finished stage (best effort)"""
+        if checkpoint is None:
+            return
+        try:
+            await asyncio.to_thread(checkpoint.save, stage, data)
+        except OSError as e:
+            logger.warning(f"Failed to checkpoint {stage} of {checkpoint.meeting_id}: {e}")
+
+    async def _clear_stage_checkpoint(self, checkpoint: Optional[StageCheckpointStore]) -> None:
+        """Delete a meeting's stage checkpoints once it is complete"""
+        if checkpoint is not None:
+            await asyncio.to_thread(checkpoint.clear)
+
+    # =========================================================================
+    # Deferred word alignment
+    # =========================================================================
+
+    async def _mark_word_alignment_deferred(
+        self,
+        meeting_id: str,
+        pipeline_result: "PipelineResult"
+    ) -> None:
+        """Record that a meeting was transcribed without word alignment (best effort)"""
+        if not pipeline_result.word_alignment_deferred or not pipeline_result.transcript.segments:
+            return
+
+        try:
+            await self.supabase.update_word_alignment_state(meeting_id, "deferred")
+            logger.log_meeting_event(meeting_id, "word_alignment_deferred")
+        except Exception as e:
+            logger.warning(f"Failed to mark word alignment deferred for {meeting_id}: {e}")
+
+    async def _poll_word_alignment_requests(self) -> None:
+        """Start the next requested word alignment (one at a time, best effort)"""
+        if self._alignment_tasks or not self.is_running:
+            return
+
+        try:
+            meeting_ids = await self.supabase.get_word_alignment_requests(limit=1)
+            if not meeting_ids:
+                return
+
+            meeting_id = meeting_ids[0]
+            # Claim the request so no other worker runs it
+            if not await self.supabase.update_word_alignment_state(
+                meeting_id, "running", expected_state="requested"
+            ):
+                return
+        except Exception as e:
+            logger.warning(f"Failed to poll word alignment requests: {e}")
+            return
+
+        task = asyncio.create_task(self._align_meeting_words(meeting_id), name=f"align-{meeting_id}")
+        self._alignment_tasks.add(task)
+        task.add_done_callback(self._alignment_tasks.discard)
+
+    async def _align_meeting_words(self, meeting_id: str) -> None:
+        """
+        Run deferred word alignment on a meeting's saved transcript
+
+        Steps:
+        1. Load the saved transcript (segment-level timestamps, speakers)
+        2. Download and preprocess the recording again
+        3. Align the transcript on the GPU (waits for the STT stage to
+           finish its current meeting, and vice versa)
+        4. Replace the saved transcript with the word-aligned one
+
+        Args:
+            meeting_id: Meeting identifier (word_alignment already 'running')
+        """
+        start_time = time.time()
+        logger.log_meeting_event(meeting_id, "word_alignment_started")
+        temp_audio_path = get_audio_temp_path(f"{meeting_id}_align", AUDIO_TEMP_DIR)
+        processed_audio_path = get_processed_audio_path(f"{meeting_id}_align", AUDIO_TEMP_DIR)
+
+        try:
+            segments = await self.supabase.get_transcript_segments(meeting_id)
+            if not segments:
+                raise TranscriptionError("Meeting has no saved transcript to align")
+
+            meeting = await self.supabase.get_meeting_by_id(meeting_id)
+            audio_url = await self.supabase.get_meeting_audio_url(meeting_id)
+            if not meeting or not audio_url:
+                raise AudioDownloadError("No audio URL found for meeting")
+
+            await self.audio_processor.download_audio(
+                url=audio_url,
+                destination=temp_audio_path,
+                meeting_id=meeting_id
+            )
+            audio_metadata = await self.audio_processor.preprocess_audio(
+                input_path=temp_audio_path,
+                output_path=processed_audio_path,
+                meeting_id=meeting_id
+            )
+            cleanup_single_file(temp_audio_path)
+
+            stt_engine_preference, _ = await self._get_stt_settings(meeting.user_id)
+            async with self._stt_gpu():
+                aligned = await self.stt_pipeline.align_transcript(
+                    audio_path=processed_audio_path,
+                    segments=segments,
+                    language=STT_LANGUAGE,
+                    audio_metadata=audio_metadata,
+                    stt_engine_preference=stt_engine_preference
+                )
+
+            await self.supabase.replace_transcript(
+                meeting_id,
+                Transcript(meeting_id=meeting_id, segments=aligned)
+            )
+            await self.supabase.update_word_alignment_state(meeting_id, "completed")
+
+            logger.log_meeting_event(
+                meeting_id,
+                "word_alignment_completed",
+                segments=len(aligned),
+                time=f"{time.time() - start_time:.2f}s"
+            )
+
+        except asyncio.CancelledError:
+            # Shutdown: hand the request back to the next worker
+            await self._reset_word_alignment_state(meeting_id, "requested")
+            raise
+        except Exception as e:
+            logger.error(f"Word alignment failed for {meeting_id}: {e}", exc_info=True)
+            await self._reset_word_alignment_state(meeting_id, "failed")
+        finally:
+            cleanup_single_file(temp_audio_path)
+            cleanup_single_file(processed_audio_path)
+
+    async def _reset_word_alignment_state(self, meeting_id: str, state: str) -> None:
+        """Set the word alignment state after an interrupted run (best effort)"""
+        try:
+            await self.supabase.update_word_alignment_state(meeting_id, state)
+        except Exception as e:
+            logger.error(f"Failed to set word alignment state for {meeting_id}: {e}")
+
+    def _provisional_transcript_callback(
+        self,
+        meeting_id: str,
+        user_id: Optional[str],
+        duration_seconds: float
+    ) -> Optional["SegmentBatchCallback"]:
+        """
+        Build the callback that saves segments while STT is still running
+
+        Each batch is stored as provisional transcript rows and STT progress
+        (audio position reached) is pushed to the user over Realtime.
+
+        Args:
+            meeting_id: Meeting identifier
+            user_id: Owner of the recording (no progress push if None)
+            duration_seconds: Audio length, for the progress percentage
+
+        Returns:
+            Callback for STTPipeline.process_audio, or None if disabled
+        """
+        if not STT_STREAM_PARTIAL_TRANSCRIPTS:
+            return None
+
+        async def on_segments(segments: List[TranscriptSegment]) -> None:
+            await self.supabase.save_provisional_transcript_segments(meeting_id, segments)
+
+            if user_id and duration_seconds > 0:
+                position = segments[-1].end_time
+                await self.realtime.notify_processing_progress(
+                    user_id=user_id,
+                    meeting_id=meeting_id,
+                    progress_percentage=min(100.0, position / duration_seconds * 100),
+                    message=f"Transcribed {position / 60:.1f} of {duration_seconds / 60:.1f} min"
+                )
+
+        return on_segments
+
+    async def _discard_provisional_transcript(self, meeting_id: str) -> None:
+        """Delete provisional transcript rows (best effort)"""
+        if not STT_STREAM_PARTIAL_TRANSCRIPTS:
+            return
+
+        try:
+            await self.supabase.delete_provisional_transcript(meeting_id)
+        except Exception as e:
+            logger.warning(f"Failed to delete provisional transcript for {meeting_id}: {e}")
+
+    async def _find_duplicate_meeting(
+        self,
+        user_id: Optional[str],
+        content_hash: str,
+        duration_seconds: float,
+        meeting_id: str
+    ) -> Optional[str]:
+        """
+        Find a meeting already processed from identical audio
+
+        Args:
+            user_id: Owner of the recording
+            content_hash: SHA-256 of the original audio file
+            duration_seconds: Decoded duration of this recording
+            meeting_id: Meeting being processed (never matched against itself)
+
+        Returns:
+            Source meeting ID, or None if there is no usable duplicate
+        """
+        if not AUDIO_DEDUP_ENABLED or not user_id:
+            return None
+
+        try:
+            record = await self.supabase.find_processed_audio(user_id, content_hash)
+        except Exception as e:
+            logger.warning(f"Processed-audio lookup failed for {meeting_id}: {e}")
+            return None
+
+        if not record or record["meeting_id"] == meeting_id:
+            return None
+
+        if abs(float(record["duration_seconds"]) - duration_seconds) > DEDUP_DURATION_TOLERANCE_SECONDS:
+            logger.warning(
+                f"Hash match for {meeting_id} with different duration "
+                f"({record['duration_seconds']:.2f}s vs {duration_seconds:.2f}s), reprocessing"
+            )
+            return None
+
+        return record["meeting_id"]
+
+    async def _complete_as_duplicate(
+        self,
+        meeting_id: str,
+        user_id: str,
+        source_meeting_id: str,
+        start_time: float,
+        duration_seconds: float,
+        notify: bool = True
+    ) -> bool:
+        """
+        Clone results from an identical earlier recording and mark the meeting completed
+
+        Args:
+            meeting_id: Meeting being processed
+            user_id: Owner of the meeting
+            source_meeting_id: Meeting processed from the same audio
+            start_time: Processing start (time.time())
+            duration_seconds: Audio duration
+            notify: Send the realtime completion notification
+
+        Returns:
+            False if the results could not be cloned (partial copies are
+            removed; the caller processes the audio normally)
+        """
+        try:
+            copied = await self.supabase.clone_meeting_results(source_meeting_id, meeting_id)
+        except Exception as e:
+            logger.warning(
+                f"Cloning results of {source_meeting_id} into {meeting_id} failed, "
+                f"running STT instead: {e}"
+            )
+            return False
+
+        processing_time = time.time() - start_time
+        await self.supabase.update_meeting_status(
+            meeting_id=meeting_id,
+            status=MeetingStatus.COMPLETED,
+            processed_by=self.worker_id
+        )
+
+        if notify:
+            await self.realtime.notify_processing_completed(
+                user_id=user_id,
+                meeting_id=meeting_id,
+                result_data={
+                    'processing_time': processing_time,
+                    'duration': duration_seconds,
+                    'transcript_segments': copied.get("transcripts", 0),
+                    'speakers_detected': copied.get("speakers", 0),
+                    'summary_generated': copied.get("meeting_summaries", 0) > 0,
+                    'duplicate_of': source_meeting_id
+                }
+            )
+
+        logger.log_meeting_event(
+            meeting_id,
+            "duplicate_audio_cloned",
+            source_meeting=source_meeting_id,
+            duration_s=f"{processing_time:.2f}",
+            **copied
+        )
+        return True
+
+    async def _register_processed_audio(
+        self,
+        user_id: Optional[str],
+        content_hash: str,
+        duration_seconds: float,
+        meeting_id: str
+    ) -> None:
+        """Record the audio hash of a finished meeting (failures are only logged)"""
+        if not AUDIO_DEDUP_ENABLED or not user_id:
+            return
+
+        try:
+            await self.supabase.register_processed_audio(
+                user_id, content_hash, duration_seconds, meeting_id
+            )
+        except Exception as e:
+            logger.warning(f"Failed to register audio hash for {meeting_id}: {e}")
+
     async def _handle_processing_error(
         self,
         meeting_id: str,
@@ -805,20 +1734,32 @@ class PCWorker:
         if self.current_jobs > 0:
             logger.warning(f"Forced shutdown with {self.current_jobs} job(s) still running")
 
+        # Stop stage pipeline loops (in-flight meetings were given time above)
+        if self._stage_tasks:
+            await self._stop_stage_pipeline()
+
+        # Interrupted word alignments go back to 'requested'
+        for task in list(self._alignment_tasks):
+            task.cancel()
+        await asyncio.gather(*self._alignment_tasks, return_exceptions=True)
+
         # Stop folder monitor if running
         if self.folder_monitor:
             logger.info("Stopping folder monitor...")
             await self.folder_monitor.stop()
             self.folder_monitor = None
 
-        # Cleanup STT pipeline resources (GPU memory, models)
-        if self.stt_pipeline:
-            logger.info("Cleaning up STT pipeline...")
-            await self.stt_pipeline.cleanup()
-            self.stt_pipeline = None
+        # Unload all GPU models (STT pipeline, summarization model)
+        logger.info("Unloading models...")
+        await self.models.close()
+        self.stt_pipeline = None
+
+        # Close the shared download session
+        await get_audio_downloader().close()
 
-        # Final cleanup
-        cleanup_count = cleanup_temp_files(AUDIO_TEMP_DIR, max_age_hours=0)
+        # Final cleanup (keeps partial downloads so the next run resumes them;
+        # the 24h startup sweep removes abandoned ones)
+        cleanup_count = cleanup_temp_files(AUDIO_TEMP_DIR, max_age_hours=0, exclude=("*.part*",))
         if cleanup_count > 0:
             logger.info(f"Final cleanup removed {cleanup_count} temp files")
 
@@ -0,0 +1,37 @@
+-- Migration: Create processed_audio table for content-hash deduplication
+-- Description: Maps a user's audio content hash to the meeting that was processed from it,
+--              so duplicate uploads / re-synced copies reuse existing results
+-- Date: 2026-10-18
+
+-- ============================================================================
+-- 1. Create processed_audio table
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS public.processed_audio (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    content_hash CHAR(64) NOT NULL,          -- SHA-256 of the original audio file
+    duration_seconds FLOAT NOT NULL,         -- Decoded duration (guards against hash misuse)
+    meeting_id UUID NOT NULL REFERENCES public.meetings(id) ON DELETE CASCADE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    CONSTRAINT processed_audio_user_hash_unique UNIQUE (user_id, content_hash)
+);
+
+-- ============================================================================
+-- 2. Indexes
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_processed_audio_meeting_id ON public.processed_audio(meeting_id);
+
+-- ============================================================================
+-- 3. Row Level Security
+-- ============================================================================
+ALTER TABLE public.processed_audio ENABLE ROW LEVEL SECURITY;
+
+-- RLS Policy: Users can see which of their recordings were processed
+CREATE POLICY IF NOT EXISTS "Users can select their own processed audio"
+    ON public.processed_audio
+    FOR SELECT
+    USING (auth.uid() = user_id);
+
+-- Grant service_role access (PC Worker registers and looks up hashes)
+GRANT ALL ON public.processed_audio TO service_role;
@@ -0,0 +1,31 @@
+-- Migration: Create user_stt_settings table for per-user STT engine selection
+-- Description: Optional per-user override of the STT engine the PC Worker picks
+--              (otherwise chosen from hardware and recording length)
+-- Date: 2026-10-18
+
+-- ============================================================================
+-- 1. Create user_stt_settings table
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS public.user_stt_settings (
+    user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    stt_engine TEXT NOT NULL,                -- "name" or "name:model", e.g. "faster-whisper:large-v3-turbo"
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    CONSTRAINT user_stt_settings_engine_check
+        CHECK (split_part(stt_engine, ':', 1) IN ('whisperx', 'faster-whisper', 'korean-whisper'))
+);
+
+-- ============================================================================
+-- 2. Row Level Security
+-- ============================================================================
+ALTER TABLE public.user_stt_settings ENABLE ROW LEVEL SECURITY;
+
+-- RLS Policy: Users manage their own STT setting
+CREATE POLICY IF NOT EXISTS "Users can manage their own STT settings"
+    ON public.user_stt_settings
+    FOR ALL
+    USING (auth.uid() = user_id)
+    WITH CHECK (auth.uid() = user_id);
+
+-- Grant service_role access (PC Worker reads the setting per job)
+GRANT ALL ON public.user_stt_settings TO service_role;
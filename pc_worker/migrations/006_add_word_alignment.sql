@@ -0,0 +1,35 @@
+-- Migration: Word alignment settings and deferred alignment requests
+-- Description: Per-user fast mode (skip word alignment during STT, keep segment-level
+--              timestamps) and per-meeting state of the deferred word alignment job
+-- Date: 2026-10-18
+
+-- ============================================================================
+-- 1. Per-user setting
+-- ============================================================================
+-- NULL = decided by recording length (STT_FAST_MODE_SECONDS on the PC Worker)
+ALTER TABLE public.user_stt_settings
+    ADD COLUMN IF NOT EXISTS word_timestamps BOOLEAN;
+
+-- A user may set word_timestamps without choosing an engine
+ALTER TABLE public.user_stt_settings
+    ALTER COLUMN stt_engine DROP NOT NULL;
+
+-- ============================================================================
+-- 2. Deferred word alignment per meeting
+-- ============================================================================
+-- deferred:  transcribed in fast mode, word alignment not run yet
+-- requested: set by the app when a word-level feature is opened
+-- running / completed / failed: set by the PC Worker
+ALTER TABLE public.meetings
+    ADD COLUMN IF NOT EXISTS word_alignment TEXT;
+
+ALTER TABLE public.meetings
+    DROP CONSTRAINT IF EXISTS meetings_word_alignment_check;
+ALTER TABLE public.meetings
+    ADD CONSTRAINT meetings_word_alignment_check
+    CHECK (word_alignment IN ('deferred', 'requested', 'running', 'completed', 'failed'));
+
+-- The worker polls for requested alignments
+CREATE INDEX IF NOT EXISTS idx_meetings_word_alignment_requested
+    ON public.meetings(updated_at)
+    WHERE word_alignment = 'requested';
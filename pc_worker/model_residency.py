@@ -0,0 +1,344 @@
+"""
+Model Residency Manager
+Keeps GPU models resident under a VRAM budget
+
+Features:
+- Models are registered with a VRAM footprint and async load/unload
+  callables; in-process models have their footprint re-measured from
+  CUDA allocations when they load
+- Models load on demand; before loading, idle models are evicted
+  least-recently-used first until the new model fits the budget
+- Models in use are never evicted; if a model still does not fit, it is
+  loaded over budget (a job is never refused) and a warning is logged
+- Models idle longer than idle_unload_seconds are unloaded by a sweeper
+- prewarm() loads models in the background when a job is claimed, so the
+  first job after an idle period does not pay the cold start; prewarming
+  never goes over budget
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from logger import get_logger
+
+logger = get_logger("model_residency")
+
+
+def cuda_allocated_mb() -> Optional[float]:
+    """Memory allocated by torch on the current CUDA device (None without CUDA)"""
+    try:
+        import torch
+    except ImportError:
+        return None
+    if not torch.cuda.is_available():
+        return None
+    return torch.cuda.memory_allocated() / (1024 * 1024)
+
+
+def cuda_total_mb() -> Optional[float]:
+    """Total memory of the current CUDA device (None without CUDA)"""
+    try:
+        import torch
+    except ImportError:
+        return None
+    if not torch.cuda.is_available():
+        return None
+    return torch.cuda.get_device_properties(torch.cuda.current_device()).total_memory / (1024 * 1024)
+
+
+def gpu_budget_mb() -> Optional[float]:
+    """Default budget: 90% of the current CUDA device's memory (None without CUDA)"""
+    total = cuda_total_mb()
+    return total * 0.9 if total else None
+
+
+@dataclass
+class ResidentModel:
+    """A model managed by the residency manager"""
+    name: str
+    vram_mb: float
+    load: Callable[[], Awaitable[None]]
+    unload: Callable[[], Awaitable[None]]
+    in_process: bool = True  # False for models served by another process (e.g. Ollama)
+    loaded: bool = False
+    in_use: int = 0
+    last_used: float = 0.0
+    load_seconds: Optional[float] = None
+
+
+class ModelResidencyManager:
+    """
+    Loads models on demand and keeps hot ones resident under a VRAM budget
+    """
+
+    def __init__(
+        self,
+        budget_mb: Optional[float] = None,
+        idle_unload_seconds: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+        measure_vram: Callable[[], Optional[float]] = cuda_allocated_mb,
+        budget_resolver: Optional[Callable[[], Optional[float]]] = None
+    ):
+        """
+        Args:
+            budget_mb: VRAM available to managed models (None = unlimited)
+            idle_unload_seconds: Unload models unused for this long (0 = never)
+            clock: Time source (seconds)
+            measure_vram: Current CUDA allocation in MB, or None if unavailable
+            budget_resolver: Computes budget_mb before the first load instead
+                (e.g. from the GPU's memory, so startup does not import torch)
+        """
+        self.budget_mb = budget_mb
+        self._budget_resolver = budget_resolver
+        self.idle_unload_seconds = idle_unload_seconds
+        self._clock = clock
+        self._measure_vram = measure_vram
+        self._models: Dict[str, ResidentModel] = {}
+        self._lock = asyncio.Lock()
+        self._prewarm_tasks: Set[asyncio.Task] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        vram_mb: float,
+        load: Callable[[], Awaitable[None]],
+        unload: Callable[[], Awaitable[None]],
+        in_process: bool = True
+    ) -> None:
+        """
+        Register a model
+
+        Args:
+            name: Model name used by use()/prewarm()
+            vram_mb: Estimated VRAM footprint
+            load: Loads the model (awaited at most once until unloaded)
+            unload: Releases the model's memory
+            in_process: Whether the model's memory is allocated by this
+                process's torch (footprint is then measured on load)
+        """
+        self._models[name] = ResidentModel(name, vram_mb, load, unload, in_process)
+
+    @property
+    def resident_mb(self) -> float:
+        """VRAM footprint of all loaded models"""
+        return sum(m.vram_mb for m in self._models.values() if m.loaded)
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a model is currently resident"""
+        return self._models[name].loaded
+
+    async def ensure_loaded(self, name: str) -> None:
+        """
+        Load a model if it is not resident (evicting idle models to fit)
+
+        Args:
+            name: Registered model name
+
+        Raises:
+            KeyError: If the model is not registered
+        """
+        async with self._lock:
+            await self._ensure_loaded_locked(self._models[name], allow_over_budget=True)
+
+    @asynccontextmanager
+    async def use(self, name: str) -> AsyncIterator[None]:
+        """
+        Keep a model loaded (and not evictable) for the duration of the block
+
+        Args:
+            name: Registered model name
+        """
+        model = self._models[name]
+        async with self._lock:
+            await self._ensure_loaded_locked(model, allow_over_budget=True)
+            model.in_use += 1
+        try:
+            yield
+        finally:
+            model.in_use -= 1
+            model.last_used = self._clock()
+
+    def prewarm(self, *names: str) -> None:
+        """
+        Load models in the background (skipped if they do not fit the budget)
+
+        Args:
+            names: Registered model names, loaded in order
+        """
+        pending = [n for n in names if not self._models[n].loaded]
+        if not pending:
+            return
+
+        task = asyncio.create_task(self._prewarm(pending), name=f"prewarm-{'+'.join(pending)}")
+        self._prewarm_tasks.add(task)
+        task.add_done_callback(self._prewarm_tasks.discard)
+
+    async def _prewarm(self, names: List[str]) -> None:
+        for name in names:
+            try:
+                async with self._lock:
+                    loaded = await self._ensure_loaded_locked(
+                        self._models[name], allow_over_budget=False
+                    )
+                if not loaded:
+                    logger.info(f"Skipped prewarming {name}: does not fit the VRAM budget")
+            except Exception as e:
+                logger.warning(f"Prewarming {name} failed: {e}")
+
+    async def _ensure_loaded_locked(self, model: ResidentModel, allow_over_budget: bool) -> bool:
+        """Load a model (caller holds the lock); returns False if it was not loaded"""
+        model.last_used = self._clock()
+        if model.loaded:
+            return True
+
+        if not await self._make_room(model.vram_mb):
+            if not allow_over_budget:
+                return False
+            logger.warning(
+                f"Loading {model.name} over the VRAM budget",
+                needed_mb=f"{model.vram_mb:.0f}",
+                resident_mb=f"{self.resident_mb:.0f}",
+                budget_mb=f"{self.budget_mb:.0f}"
+            )
+
+        before = self._measure_vram() if model.in_process else None
+        start = self._clock()
+        await model.load()
+        model.load_seconds = self._clock() - start
+        model.loaded = True
+        model.last_used = self._clock()
+
+        if before is not None:
+            after = self._measure_vram()
+            if after is not None and after > before:
+                model.vram_mb = after - before
+
+        logger.info(
+            f"Loaded model {model.name}",
+            vram_mb=f"{model.vram_mb:.0f}",
+            load_s=f"{model.load_seconds:.1f}",
+            resident_mb=f"{self.resident_mb:.0f}"
+        )
+        return True
+
+    async def _make_room(self, needed_mb: float) -> bool:
+        """Evict idle models LRU-first until needed_mb fits; False if it cannot"""
+        if self._budget_resolver is not None:
+            self.budget_mb = self._budget_resolver()
+            self._budget_resolver = None
+        if self.budget_mb is None:
+            return True
+
+        idle = sorted(
+            (m for m in self._models.values() if m.loaded and m.in_use == 0),
+            key=lambda m: m.last_used
+        )
+        for model in idle:
+            if self.resident_mb + needed_mb <= self.budget_mb:
+                break
+            await self._unload(model, reason="evicted")
+
+        return self.resident_mb + needed_mb <= self.budget_mb
+
+    async def _unload(self, model: ResidentModel, reason: str) -> None:
+        try:
+            await model.unload()
+        except Exception as e:
+            logger.warning(f"Unloading {model.name} failed: {e}")
+        model.loaded = False
+        logger.info(f"Unloaded model {model.name} ({reason})", vram_mb=f"{model.vram_mb:.0f}")
+
+    async def unload_idle(self) -> List[str]:
+        """
+        Unload models idle longer than idle_unload_seconds
+
+        Returns:
+            Names of the unloaded models
+        """
+        if self.idle_unload_seconds <= 0:
+            return []
+
+        unloaded = []
+        async with self._lock:
+            now = self._clock()
+            for model in self._models.values():
+                if (
+                    model.loaded
+                    and model.in_use == 0
+                    and now - model.last_used >= self.idle_unload_seconds
+                ):
+                    await self._unload(model, reason="idle")
+                    unloaded.append(model.name)
+        return unloaded
+
+    def start_idle_sweeper(self, interval_seconds: Optional[float] = None) -> None:
+        """Periodically unload idle models (no-op if idle unloading is disabled)"""
+        if self.idle_unload_seconds <= 0 or self._sweeper is not None:
+            return
+        interval = interval_seconds or min(60.0, self.idle_unload_seconds / 4)
+        self._sweeper = asyncio.create_task(self._sweep(interval), name="model-idle-sweeper")
+
+    async def _sweep(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.unload_idle()
+            except Exception as e:
+                logger.warning(f"Idle model sweep failed: {e}")
+
+    async def close(self) -> None:
+        """Stop background tasks and unload every model"""
+        tasks = list(self._prewarm_tasks)
+        if self._sweeper is not None:
+            tasks.append(self._sweeper)
+            self._sweeper = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        async with self._lock:
+            for model in self._models.values():
+                if model.loaded:
+                    await self._unload(model, reason="shutdown")
+
+    def get_info(self) -> Dict[str, Dict]:
+        """Residency state of every registered model"""
+        now = self._clock()
+        return {
+            name: {
+                "loaded": m.loaded,
+                "in_use": m.in_use,
+                "vram_mb": round(m.vram_mb),
+                "idle_seconds": round(now - m.last_used) if m.last_used else None,
+                "load_seconds": m.load_seconds,
+            }
+            for name, m in self._models.items()
+        }
+
+
+# Global manager instance
+_model_residency_manager: Optional[ModelResidencyManager] = None
+
+
+def get_model_residency_manager() -> ModelResidencyManager:
+    """
+    Get or create the global manager
+
+    Budget from MODEL_VRAM_BUDGET_MB (0 = 90% of the GPU's memory, unlimited
+    without a GPU, resolved before the first load); idle timeout from
+    MODEL_IDLE_UNLOAD_SECONDS.
+    """
+    global _model_residency_manager
+    if _model_residency_manager is None:
+        from config import MODEL_VRAM_BUDGET_MB, MODEL_IDLE_UNLOAD_SECONDS
+        auto_budget = MODEL_VRAM_BUDGET_MB <= 0
+        _model_residency_manager = ModelResidencyManager(
+            budget_mb=None if auto_budget else MODEL_VRAM_BUDGET_MB,
+            idle_unload_seconds=MODEL_IDLE_UNLOAD_SECONDS,
+            budget_resolver=gpu_budget_mb if auto_budget else None
+        )
+    return _model_residency_manager
@@ -182,6 +182,7 @@ class AudioMetadata(BaseModel):
     channels: int
     format: str
     size_bytes: int
+    loudness_lufs: Optional[float] = None  # Source loudness; set once the audio is loudness-normalized
 
     @validator('sample_rate')
     def validate_sample_rate(cls, v):
@@ -0,0 +1,198 @@
+"""
+Worker Startup Import Profiler
+Measures how long importing the worker takes, using python -X importtime
+
+Features:
+- Imports the module in a fresh interpreter (cold import) and parses the
+  -X importtime report
+- Groups self time by top-level package, so a slow startup can be traced
+  to the dependency that caused it
+- Checks that heavy ML packages (torch, whisperx, pyannote, ...) are not
+  imported at startup; they are loaded with the models on first use
+- JSON output and a time budget for tracking startup time across changes
+
+Usage:
+    python profile_startup.py                      # report for main_worker
+    python profile_startup.py --repeat 5 --json startup.json
+    python profile_startup.py --budget-seconds 3   # exit 1 if slower
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# Packages that must only be imported when their models are first loaded
+DEFERRED_PACKAGES = (
+    "torch", "torchaudio", "whisperx", "pyannote", "speechbrain", "transformers",
+    "FlagEmbedding", "sentence_transformers", "langchain", "langchain_community",
+)
+
+
+@dataclass
+class ImportTiming:
+    """One line of the -X importtime report"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split(".", 1)[0]
+
+
+@dataclass
+class StartupProfile:
+    """Import profile of one module"""
+    module: str
+    total_seconds: float
+    import_count: int
+    packages: Dict[str, float]  # top-level package -> self time (seconds)
+    deferred_imported: List[str]  # DEFERRED_PACKAGES imported at startup
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def parse_importtime(report: str) -> List[ImportTiming]:
+    """
+    Parse the stderr of python -X importtime
+
+    Args:
+        report: Interpreter stderr (other lines are ignored)
+
+    Returns:
+        Timings in report order (children before their parent)
+    """
+    timings = []
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip(" ")
+        timings.append(ImportTiming(
+            module=stripped,
+            self_us=int(parts[0]),
+            cumulative_us=int(parts[1]),
+            depth=(len(name) - len(stripped) - 1) // 2
+        ))
+    return timings
+
+
+def summarize_imports(
+    module: str,
+    timings: Sequence[ImportTiming],
+    deferred: Sequence[str] = DEFERRED_PACKAGES
+) -> StartupProfile:
+    """
+    Build a startup profile from parsed timings
+
+    Args:
+        module: Profiled module
+        timings: Parsed -X importtime report
+        deferred: Packages that should not be imported at startup
+
+    Returns:
+        Startup profile
+    """
+    packages: Dict[str, float] = defaultdict(float)
+    for timing in timings:
+        packages[timing.package] += timing.self_us / 1e6
+
+    total_us = sum(t.cumulative_us for t in timings if t.depth == 0)
+    imported = {t.package for t in timings}
+
+    return StartupProfile(
+        module=module,
+        total_seconds=total_us / 1e6,
+        import_count=len(timings),
+        packages={p: round(s, 4) for p, s in sorted(packages.items(), key=lambda item: item[1], reverse=True)},
+        deferred_imported=sorted(p for p in deferred if p in imported)
+    )
+
+
+def profile_module(module: str = "main_worker", python: str = sys.executable) -> StartupProfile:
+    """
+    Import a module in a fresh interpreter and profile the import
+
+    Args:
+        module: Module to import (from this directory)
+        python: Interpreter to use
+
+    Returns:
+        Startup profile
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).parent,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"Importing {module} failed: {error[0]}")
+    return summarize_imports(module, parse_importtime(result.stderr))
+
+
+def format_report(profile: StartupProfile, top: int = 15) -> str:
+    """Human-readable report: total time, slowest packages, deferred-import check"""
+    lines = [
+        f"Startup imports for {profile.module}: "
+        f"{profile.total_seconds:.2f}s ({profile.import_count} modules)",
+        "",
+        f"{'package':<32}{'self time':>12}{'share':>8}",
+    ]
+    for package, seconds in list(profile.packages.items())[:top]:
+        share = seconds / profile.total_seconds if profile.total_seconds else 0.0
+        lines.append(f"{package:<32}{seconds:>11.3f}s{share:>8.1%}")
+
+    lines.append("")
+    if profile.deferred_imported:
+        lines.append(f"Imported at startup but should be deferred: {', '.join(profile.deferred_imported)}")
+    else:
+        lines.append("No heavy ML packages imported at startup")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile worker startup imports (-X importtime)")
+    parser.add_argument("--module", default="main_worker", help="Module to profile (default: main_worker)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs; the fastest one is reported")
+    parser.add_argument("--top", type=int, default=15, help="Packages listed in the report")
+    parser.add_argument("--json", type=Path, help="Also write the profile to this JSON file")
+    parser.add_argument("--budget-seconds", type=float, help="Exit with 1 if startup is slower")
+    args = parser.parse_args(argv)
+
+    try:
+        runs = [profile_module(args.module) for _ in range(max(1, args.repeat))]
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+    profile = min(runs, key=lambda p: p.total_seconds)
+
+    print(format_report(profile, args.top))
+    if args.json:
+        report = profile.to_dict()
+        report["runs_seconds"] = [round(p.total_seconds, 4) for p in runs]
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    failed = bool(profile.deferred_imported)
+    if args.budget_seconds is not None and profile.total_seconds > args.budget_seconds:
+        print(f"Startup {profile.total_seconds:.2f}s exceeds budget {args.budget_seconds:.2f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
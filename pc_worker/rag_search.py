@@ -6,20 +6,36 @@ Features:
 - Save transcript chunks with embeddings
 - Hybrid search combining keyword and vector similarity
 - Batch embedding generation and storage
+- Optional local vector index for offline semantic search
+- Reciprocal rank fusion (RRF) hybrid mode with client-side merging
+- Optional local BM25 keyword index with Korean n-gram tokenization
+- Local indexes are backfilled from transcript_chunks on a user's first
+  search and only serve searches once they hold all of the user's chunks
 """
 
 import asyncio
-from typing import List, Optional, Dict, Any
+import json
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pydantic import BaseModel, Field
 
 from postgrest.exceptions import APIError
 
-from config import logger
+from config import (
+    logger,
+    RAG_LOCAL_INDEX_ENABLED,
+    RAG_LOCAL_INDEX_NPROBE,
+    RAG_LOCAL_KEYWORD_INDEX_ENABLED,
+    RAG_HYBRID_MODE,
+)
 from supabase_client import get_supabase_client
 from text_chunker import TextChunker, TranscriptChunk, ChunkingConfig
 from embedding_engine import get_embedding_engine, EmbeddingConfig
+from vector_index import IndexedChunk, get_local_vector_index
+from keyword_index import get_local_keyword_index
 from models import Transcript
 from exceptions import SupabaseQueryError
 from utils import retry_with_backoff
@@ -70,6 +86,81 @@ class SearchConfig(BaseModel):
     semantic_weight: float = Field(default=0.7, ge=0.0, le=1.0)
     default_limit: int = Field(default=20, ge=1, le=100)
     min_score_threshold: float = Field(default=0.1, ge=0.0, le=1.0)
+    use_local_index: bool = Field(
+        default=RAG_LOCAL_INDEX_ENABLED,
+        description="Serve semantic search from the local vector index instead of the RPC"
+    )
+    local_index_nprobe: int = Field(default=RAG_LOCAL_INDEX_NPROBE, ge=1)
+    use_local_keyword_index: bool = Field(
+        default=RAG_LOCAL_KEYWORD_INDEX_ENABLED,
+        description="Rank keyword queries with the local BM25 index once it is backfilled"
+    )
+    hybrid_mode: str = Field(
+        default=RAG_HYBRID_MODE,
+        description="'rpc' (weighted sum in SQL) or 'rrf' (client-side reciprocal rank fusion)"
+    )
+    rrf_k: int = Field(default=60, ge=1, description="RRF rank smoothing constant")
+    rrf_candidate_multiplier: int = Field(
+        default=3, ge=1,
+        description="Candidates fetched per list, as a multiple of the result limit"
+    )
+    keyword_cache_size: int = Field(default=256, ge=0)
+    keyword_cache_ttl_seconds: float = Field(default=300.0, ge=0.0)
+
+
+# =============================================================================
+# Result Fusion
+# =============================================================================
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[List[SearchResult]],
+    weights: Sequence[float],
+    k: int = 60,
+    limit: Optional[int] = None
+) -> List[SearchResult]:
+    """
+    Fuse ranked result lists with weighted reciprocal rank fusion.
+
+    score(d) = sum_i w_i / (k + rank_i(d)), normalized by the best
+    achievable score so that a document ranked first in every list
+    scores 1.0. Per-list keyword/semantic scores are carried over.
+
+    Args:
+        ranked_lists: Result lists, each sorted best-first
+        weights: Weight per list
+        k: Rank smoothing constant
+        limit: Maximum results to return
+
+    Returns:
+        Fused results sorted by combined_score
+    """
+    max_score = sum(w / (k + 1) for w in weights)
+    if max_score <= 0:
+        return []
+
+    fused: Dict[str, SearchResult] = {}
+    scores: Dict[str, float] = {}
+
+    for results, weight in zip(ranked_lists, weights):
+        for rank, result in enumerate(results, start=1):
+            scores[result.chunk_id] = scores.get(result.chunk_id, 0.0) + weight / (k + rank)
+            existing = fused.get(result.chunk_id)
+            if existing is None:
+                fused[result.chunk_id] = result
+            else:
+                fused[result.chunk_id] = replace(
+                    existing,
+                    keyword_score=max(existing.keyword_score, result.keyword_score),
+                    semantic_score=max(existing.semantic_score, result.semantic_score)
+                )
+
+    ranked = sorted(
+        (replace(result, combined_score=scores[chunk_id] / max_score)
+         for chunk_id, result in fused.items()),
+        key=lambda r: r.combined_score,
+        reverse=True
+    )
+    return ranked[:limit] if limit else ranked
 
 
 # =============================================================================
@@ -107,8 +198,27 @@ class RAGSearchEngine:
         self._chunker = TextChunker(self.chunking_config)
         self._embedding_engine = get_embedding_engine(self.embedding_config)
         self._supabase = get_supabase_client()
+        self._local_index = (
+            get_local_vector_index() if self.search_config.use_local_index else None
+        )
+        self._keyword_index = (
+            get_local_keyword_index() if self.search_config.use_local_keyword_index else None
+        )
+        # Serializes backfills with index updates for the same user
+        self._index_locks: Dict[str, asyncio.Lock] = {}
+        # (user_id, meeting_id, query, limit) -> (cached_at, results)
+        self._keyword_cache: "OrderedDict[Tuple, Tuple[float, List[SearchResult]]]" = OrderedDict()
+
+        if self.search_config.hybrid_mode == "rrf" and self._keyword_index is None:
+            logger.warning(
+                "RAG_HYBRID_MODE=rrf needs the local keyword index "
+                "(RAG_LOCAL_KEYWORD_INDEX_ENABLED); using rpc hybrid search"
+            )
 
-        logger.info("RAGSearchEngine initialized")
+        logger.info(
+            f"RAGSearchEngine initialized (local_index={self._local_index is not None}, "
+            f"keyword_index={self._keyword_index is not None})"
+        )
 
     # =========================================================================
     # Indexing Operations
@@ -127,6 +237,8 @@ class RAGSearchEngine:
         1. Chunks the transcript into searchable segments
         2. Generates embeddings for each chunk
         3. Stores chunks with embeddings in the database
+        4. Appends them to the local vector/keyword indexes (if enabled and
+           already backfilled; otherwise the backfill picks them up)
 
         Args:
             transcript: Complete transcript to index
@@ -155,8 +267,21 @@ class RAGSearchEngine:
 
         logger.info(f"Generated {len(embeddings)} embeddings")
 
-        # Step 3: Save chunks with embeddings
-        await self._save_chunks_with_embeddings(chunks, embeddings)
+        async with self._user_index_lock(user_id):
+            # Step 3: Save chunks with embeddings
+            chunk_ids = await self._save_chunks_with_embeddings(chunks, embeddings)
+
+            # Step 4: Update local indexes incrementally
+            vector = self._local_index is not None and self._local_index.is_complete(user_id)
+            keyword = self._keyword_index is not None and self._keyword_index.is_complete(user_id)
+            if vector or keyword:
+                indexed = self._to_indexed_chunks(chunks, chunk_ids)
+                if vector:
+                    await self._add_to_local_index(user_id, indexed, embeddings)
+                if keyword:
+                    await self._add_to_keyword_index(user_id, indexed)
+
+        self._invalidate_keyword_cache(user_id)
 
         logger.info(f"Indexed {len(chunks)} chunks for meeting {transcript.meeting_id}")
         return len(chunks)
@@ -183,8 +308,8 @@ class RAGSearchEngine:
         self,
         chunks: List[TranscriptChunk],
         embeddings: List[List[float]]
-    ) -> None:
-        """Save chunks with their embeddings to database"""
+    ) -> List[str]:
+        """Save chunks with their embeddings to database, returning chunk IDs"""
         if len(chunks) != len(embeddings):
             raise ValueError("Chunks and embeddings count mismatch")
 
@@ -196,17 +321,21 @@ class RAGSearchEngine:
             record['embedding'] = f"[{','.join(str(x) for x in embedding)}]"
             records.append(record)
 
+        chunk_ids = []
         try:
             # Insert in batches of 100 (Supabase limit)
             for i in range(0, len(records), 100):
                 batch = records[i:i + 100]
-                await asyncio.to_thread(
+                response = await asyncio.to_thread(
                     lambda b=batch: self._supabase.client.table('transcript_chunks')
                     .insert(b)
                     .execute()
                 )
+                chunk_ids.extend(row['id'] for row in response.data or [])
                 logger.debug(f"Saved batch {i // 100 + 1}")
 
+            return chunk_ids
+
         except APIError as e:
             logger.error(f"Database error saving chunks: {e}")
             raise SupabaseQueryError(f"Failed to save chunks: {e}")
@@ -214,6 +343,51 @@ class RAGSearchEngine:
             logger.error(f"Unexpected error saving chunks: {e}")
             raise SupabaseQueryError(f"Unexpected error: {e}")
 
+    def _to_indexed_chunks(
+        self,
+        chunks: List[TranscriptChunk],
+        chunk_ids: List[str]
+    ) -> List[IndexedChunk]:
+        """Build local index entries for saved chunks"""
+        if len(chunk_ids) != len(chunks):
+            # Fall back to a stable synthetic ID if the insert did not return rows
+            chunk_ids = [f"{c.meeting_id}:{c.chunk_index}" for c in chunks]
+
+        return [
+            IndexedChunk(
+                chunk_id=chunk_id,
+                meeting_id=chunk.meeting_id,
+                chunk_index=chunk.chunk_index,
+                start_time=chunk.start_time,
+                end_time=chunk.end_time,
+                speaker_id=chunk.speaker_id,
+                text=chunk.text
+            )
+            for chunk, chunk_id in zip(chunks, chunk_ids)
+        ]
+
+    async def _add_to_local_index(
+        self,
+        user_id: str,
+        indexed: List[IndexedChunk],
+        embeddings: List[List[float]]
+    ) -> None:
+        """Append indexed chunks to the local vector index (best effort)"""
+        try:
+            await asyncio.to_thread(self._local_index.add, user_id, indexed, embeddings)
+            logger.debug(f"Added {len(indexed)} chunks to local vector index")
+        except Exception as e:
+            # The database remains the source of truth; don't fail indexing
+            logger.warning(f"Failed to update local vector index: {e}")
+
+    async def _add_to_keyword_index(self, user_id: str, indexed: List[IndexedChunk]) -> None:
+        """Append indexed chunks to the local keyword index (best effort)"""
+        try:
+            await asyncio.to_thread(self._keyword_index.add, user_id, indexed)
+            logger.debug(f"Added {len(indexed)} chunks to local keyword index")
+        except Exception as e:
+            logger.warning(f"Failed to update local keyword index: {e}")
+
     async def delete_meeting_chunks(self, meeting_id: str, user_id: str) -> int:
         """
         Delete all chunks for a meeting.
@@ -228,22 +402,126 @@ class RAGSearchEngine:
             Number of chunks deleted
         """
         try:
-            response = await asyncio.to_thread(
-                lambda: self._supabase.client.table('transcript_chunks')
-                .delete()
-                .eq('meeting_id', meeting_id)
-                .eq('user_id', user_id)
-                .execute()
-            )
+            async with self._user_index_lock(user_id):
+                response = await asyncio.to_thread(
+                    lambda: self._supabase.client.table('transcript_chunks')
+                    .delete()
+                    .eq('meeting_id', meeting_id)
+                    .eq('user_id', user_id)
+                    .execute()
+                )
+
+                count = len(response.data) if response.data else 0
+                logger.info(f"Deleted {count} chunks for meeting {meeting_id}")
 
-            count = len(response.data) if response.data else 0
-            logger.info(f"Deleted {count} chunks for meeting {meeting_id}")
+                if self._local_index is not None:
+                    await asyncio.to_thread(self._local_index.remove_meeting, user_id, meeting_id)
+                if self._keyword_index is not None:
+                    await asyncio.to_thread(self._keyword_index.remove_meeting, user_id, meeting_id)
+
+            self._invalidate_keyword_cache(user_id)
             return count
 
         except Exception as e:
             logger.error(f"Error deleting chunks: {e}")
             raise SupabaseQueryError(f"Failed to delete chunks: {e}")
 
+    # =========================================================================
+    # Local Index Backfill
+    # =========================================================================
+
+    def _user_index_lock(self, user_id: str) -> asyncio.Lock:
+        """Lock guarding a user's local indexes against concurrent backfills"""
+        return self._index_locks.setdefault(user_id, asyncio.Lock())
+
+    async def sync_local_indexes(self, user_id: str, page_size: int = 200) -> None:
+        """
+        Backfill a user's local indexes from transcript_chunks (once per user)
+
+        Chunks saved before the local indexes were enabled exist only in the
+        database, so an index is rebuilt from it and marked complete before
+        searches are served from it. Until then searches use the database.
+        Failures are only logged.
+
+        Args:
+            user_id: User whose indexes to backfill
+            page_size: Rows fetched per request
+        """
+        async with self._user_index_lock(user_id):
+            vector = self._local_index is not None and not self._local_index.is_complete(user_id)
+            keyword = self._keyword_index is not None and not self._keyword_index.is_complete(user_id)
+            if not (vector or keyword):
+                return
+
+            try:
+                rows = await self._fetch_user_chunks(user_id, vector, page_size)
+                indexed = [
+                    IndexedChunk(
+                        chunk_id=row['id'],
+                        meeting_id=row['meeting_id'],
+                        chunk_index=row['chunk_index'],
+                        start_time=row['start_time'],
+                        end_time=row['end_time'],
+                        speaker_id=row.get('speaker_id'),
+                        text=row['text']
+                    )
+                    for row in rows
+                ]
+
+                if vector:
+                    # pgvector columns come back as '[x,y,...]' strings
+                    embedded = [
+                        (chunk, json.loads(row['embedding']) if isinstance(row['embedding'], str)
+                         else row['embedding'])
+                        for chunk, row in zip(indexed, rows)
+                        if row.get('embedding') is not None
+                    ]
+                    await asyncio.to_thread(
+                        self._local_index.replace_user,
+                        user_id,
+                        [chunk for chunk, _ in embedded],
+                        [embedding for _, embedding in embedded]
+                    )
+                if keyword:
+                    await asyncio.to_thread(self._keyword_index.replace_user, user_id, indexed)
+
+            except Exception as e:
+                logger.warning(f"Local index backfill failed for user {user_id}: {e}")
+                return
+
+        self._invalidate_keyword_cache(user_id)
+        logger.info(
+            f"Backfilled local indexes for user {user_id} with {len(indexed)} chunks "
+            f"(vector={vector}, keyword={keyword})"
+        )
+
+    async def _fetch_user_chunks(
+        self,
+        user_id: str,
+        with_embeddings: bool,
+        page_size: int
+    ) -> List[Dict[str, Any]]:
+        """Fetch all of a user's stored chunks, page by page"""
+        columns = 'id, meeting_id, chunk_index, start_time, end_time, speaker_id, text'
+        if with_embeddings:
+            columns += ', embedding'
+
+        rows: List[Dict[str, Any]] = []
+        while True:
+            start = len(rows)
+            response = await asyncio.to_thread(
+                lambda: self._supabase.client.table('transcript_chunks')
+                .select(columns)
+                .eq('user_id', user_id)
+                .order('id')
+                .range(start, start + page_size - 1)
+                .execute()
+            )
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+
     # =========================================================================
     # Search Operations
     # =========================================================================
@@ -260,6 +538,12 @@ class RAGSearchEngine:
         """
         Perform hybrid search combining keyword and semantic similarity.
 
+        In 'rpc' mode the hybrid_search_chunks SQL function computes a weighted
+        sum of ts_rank_cd and cosine similarity. In 'rrf' mode keyword and
+        vector top-k queries run concurrently and are fused client-side;
+        fusion needs ranked keyword results, so rrf falls back to 'rpc'
+        unless the local BM25 index is enabled and backfilled for the user.
+
         Args:
             query: Search query text
             user_id: User ID for RLS
@@ -281,6 +565,13 @@ class RAGSearchEngine:
         keyword_weight = keyword_weight if keyword_weight is not None else self.search_config.keyword_weight
         semantic_weight = semantic_weight if semantic_weight is not None else self.search_config.semantic_weight
 
+        if self.search_config.hybrid_mode == "rrf":
+            if await self._has_ranked_keyword_index(user_id):
+                return await self._rrf_hybrid_search(
+                    query, user_id, meeting_id, limit, keyword_weight, semantic_weight
+                )
+            logger.debug(f"No ranked keyword index for user {user_id}, using rpc hybrid search")
+
         # Generate query embedding
         query_embedding = await self._embedding_engine.embed_query(query)
 
@@ -330,6 +621,84 @@ class RAGSearchEngine:
             logger.error(f"Unexpected search error: {e}")
             raise SupabaseQueryError(f"Unexpected error: {e}")
 
+    async def _rrf_hybrid_search(
+        self,
+        query: str,
+        user_id: str,
+        meeting_id: Optional[str],
+        limit: int,
+        keyword_weight: float,
+        semantic_weight: float
+    ) -> List[SearchResult]:
+        """Hybrid search via concurrent top-k queries and reciprocal rank fusion"""
+        candidates = limit * self.search_config.rrf_candidate_multiplier
+
+        keyword_results, semantic_results = await asyncio.gather(
+            self._cached_keyword_search(query, user_id, meeting_id, candidates),
+            self.semantic_search(query, user_id, meeting_id, candidates)
+        )
+
+        fused = reciprocal_rank_fusion(
+            [keyword_results, semantic_results],
+            [keyword_weight, semantic_weight],
+            k=self.search_config.rrf_k,
+            limit=limit
+        )
+        results = [
+            r for r in fused
+            if r.combined_score >= self.search_config.min_score_threshold
+        ]
+
+        logger.info(
+            f"Found {len(results)} results (rrf: "
+            f"{len(keyword_results)} keyword, {len(semantic_results)} semantic)"
+        )
+        return results
+
+    async def _has_ranked_keyword_index(self, user_id: str) -> bool:
+        """
+        Check whether keyword results for a user come ranked from the local BM25 index
+
+        The database fallback (text_search) returns matches unordered, and
+        fusing ranks of an unordered list would promote arbitrary chunks.
+        """
+        if self._keyword_index is None:
+            return False
+        await self.sync_local_indexes(user_id)
+        return self._keyword_index.is_complete(user_id)
+
+    async def _cached_keyword_search(
+        self,
+        query: str,
+        user_id: str,
+        meeting_id: Optional[str],
+        limit: int
+    ) -> List[SearchResult]:
+        """Keyword search with a per-query TTL cache"""
+        key = (user_id, meeting_id, query.strip(), limit)
+        cached = self._keyword_cache.get(key)
+        if cached is not None:
+            cached_at, results = cached
+            if time.monotonic() - cached_at <= self.search_config.keyword_cache_ttl_seconds:
+                self._keyword_cache.move_to_end(key)
+                logger.debug(f"Keyword cache hit: '{query}'")
+                return results
+            del self._keyword_cache[key]
+
+        results = await self.keyword_search(query, user_id, meeting_id, limit)
+
+        if self.search_config.keyword_cache_size > 0:
+            self._keyword_cache[key] = (time.monotonic(), results)
+            while len(self._keyword_cache) > self.search_config.keyword_cache_size:
+                self._keyword_cache.popitem(last=False)
+
+        return results
+
+    def _invalidate_keyword_cache(self, user_id: str) -> None:
+        """Drop cached keyword results for a user after their chunks change"""
+        for key in [k for k in self._keyword_cache if k[0] == user_id]:
+            del self._keyword_cache[key]
+
     async def semantic_search(
         self,
         query: str,
@@ -340,6 +709,9 @@ class RAGSearchEngine:
         """
         Perform pure semantic (vector) search.
 
+        Uses the local vector index when enabled and backfilled for the user
+        (see sync_local_indexes), otherwise the semantic_search_chunks RPC.
+
         Args:
             query: Search query text
             user_id: User ID for RLS
@@ -356,6 +728,13 @@ class RAGSearchEngine:
         # Generate query embedding
         query_embedding = await self._embedding_engine.embed_query(query)
 
+        if self._local_index is not None:
+            await self.sync_local_indexes(user_id)
+            if self._local_index.is_complete(user_id):
+                return await self._local_semantic_search(
+                    query_embedding, user_id, meeting_id, limit
+                )
+
         try:
             response = await asyncio.to_thread(
                 lambda: self._supabase.client.rpc(
@@ -394,6 +773,42 @@ class RAGSearchEngine:
             logger.error(f"Unexpected search error: {e}")
             raise SupabaseQueryError(f"Unexpected error: {e}")
 
+    async def _local_semantic_search(
+        self,
+        query_embedding: List[float],
+        user_id: str,
+        meeting_id: Optional[str],
+        limit: int
+    ) -> List[SearchResult]:
+        """Semantic search against the local vector index"""
+        hits = await asyncio.to_thread(
+            self._local_index.search,
+            user_id,
+            query_embedding,
+            limit,
+            meeting_id,
+            self.search_config.local_index_nprobe
+        )
+
+        results = [
+            SearchResult(
+                chunk_id=chunk.chunk_id,
+                meeting_id=chunk.meeting_id,
+                chunk_index=chunk.chunk_index,
+                start_time=chunk.start_time,
+                end_time=chunk.end_time,
+                speaker_id=chunk.speaker_id,
+                text=chunk.text,
+                keyword_score=0.0,
+                semantic_score=similarity,
+                combined_score=similarity
+            )
+            for chunk, similarity in hits
+        ]
+
+        logger.info(f"Found {len(results)} results (local index)")
+        return results
+
     async def keyword_search(
         self,
         query: str,
@@ -404,6 +819,10 @@ class RAGSearchEngine:
         """
         Perform pure keyword (full-text) search.
 
+        Uses the local BM25 index when enabled and backfilled for the user
+        (see sync_local_indexes); otherwise falls back to the 'simple'
+        tsvector column in Supabase.
+
         Args:
             query: Search query text
             user_id: User ID for RLS
@@ -417,6 +836,11 @@ class RAGSearchEngine:
 
         limit = limit or self.search_config.default_limit
 
+        if self._keyword_index is not None:
+            await self.sync_local_indexes(user_id)
+            if self._keyword_index.is_complete(user_id):
+                return await self._local_keyword_search(query, user_id, meeting_id, limit)
+
         try:
             # Build query
             query_builder = self._supabase.client.table('transcript_chunks') \
@@ -455,6 +879,39 @@ class RAGSearchEngine:
             logger.error(f"Unexpected search error: {e}")
             raise SupabaseQueryError(f"Unexpected error: {e}")
 
+    async def _local_keyword_search(
+        self,
+        query: str,
+        user_id: str,
+        meeting_id: Optional[str],
+        limit: int
+    ) -> List[SearchResult]:
+        """BM25 keyword search against the local keyword index"""
+        hits = await asyncio.to_thread(
+            self._keyword_index.search, user_id, query, limit, meeting_id
+        )
+
+        # combined_score is BM25 relative to the best hit, so it stays in [0, 1]
+        top_score = hits[0][1] if hits else 1.0
+        results = [
+            SearchResult(
+                chunk_id=chunk.chunk_id,
+                meeting_id=chunk.meeting_id,
+                chunk_index=chunk.chunk_index,
+                start_time=chunk.start_time,
+                end_time=chunk.end_time,
+                speaker_id=chunk.speaker_id,
+                text=chunk.text,
+                keyword_score=score,
+                semantic_score=0.0,
+                combined_score=score / top_score
+            )
+            for chunk, score in hits
+        ]
+
+        logger.info(f"Found {len(results)} results (local keyword index)")
+        return results
+
     # =========================================================================
     # Utility Methods
     # =========================================================================
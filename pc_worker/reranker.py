@@ -1,37 +1,56 @@
 """
-LangChain Re-ranker Module
-Re-ranks search results using Ollama + Gemma 2 for improved accuracy
+Re-ranker Module
+Re-ranks search results for improved accuracy
+
+Backends:
+- cross_encoder: local cross-encoder (BGE reranker v2 m3) scoring all
+  query-document pairs in one batched forward pass (default)
+- llm: Ollama + Gemma 2 relevance prompts (slow path, gives explanations)
 
 Features:
-- Cross-encoder style relevance scoring
 - Batch re-ranking for efficiency
-- Korean language optimized prompts
+- Korean language optimized models and prompts
 """
 
 import asyncio
-from typing import List, Optional, Tuple
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
 import re
+import threading
 
+import numpy as np
 from pydantic import BaseModel, Field
 
 from config import (
     OLLAMA_BASE_URL,
     OLLAMA_MODEL,
+    RERANKER_BACKEND,
+    RERANKER_MODEL,
     logger
 )
 from rag_search import SearchResult
 from exceptions import SummaryGenerationError
 
-try:
-    from langchain_community.llms import Ollama
-except ImportError:
+
+def _load_ollama_llm():
+    """
+    Import the LangChain Ollama LLM class (deferred: langchain is slow to
+    import and only the llm backend needs it)
+
+    Returns:
+        Ollama class, or None if LangChain is not installed
+    """
     try:
-        from langchain.llms import Ollama
+        from langchain_community.llms import Ollama
     except ImportError:
-        logger.warning("LangChain Ollama not available")
-        Ollama = None
+        try:
+            from langchain.llms import Ollama
+        except ImportError:
+            logger.warning("LangChain Ollama not available")
+            return None
+    return Ollama
 
 
 # =============================================================================
@@ -40,6 +59,10 @@ except ImportError:
 
 class RerankerConfig(BaseModel):
     """Configuration for re-ranker"""
+    backend: str = Field(
+        default=RERANKER_BACKEND,
+        description="'cross_encoder' (local model) or 'llm' (Ollama prompts)"
+    )
     ollama_url: str = Field(default=OLLAMA_BASE_URL)
     model_name: str = Field(default=OLLAMA_MODEL)
     timeout: int = Field(default=60, description="Timeout per re-rank call in seconds")
@@ -48,6 +71,36 @@ class RerankerConfig(BaseModel):
     min_score: float = Field(default=0.3, description="Minimum relevance score threshold")
     rerank_weight: float = Field(default=0.4, description="Weight for LLM re-rank score")
     original_weight: float = Field(default=0.6, description="Weight for original search score")
+    max_concurrent_batches: int = Field(
+        default=2, ge=1,
+        description="LLM batches prompted concurrently"
+    )
+    score_cache_size: int = Field(
+        default=1024, ge=0,
+        description="Cached (query, chunk_id) LLM scores"
+    )
+
+    # Cross-encoder backend
+    cross_encoder_model: str = Field(
+        default=RERANKER_MODEL,
+        description="HuggingFace model name for the cross-encoder"
+    )
+    cross_encoder_batch_size: int = Field(
+        default=32,
+        description="Query-document pairs per forward pass"
+    )
+    max_length: int = Field(
+        default=512,
+        description="Maximum token length of a query-document pair"
+    )
+    use_fp16: bool = Field(
+        default=True,
+        description="Use FP16 for faster inference (GPU only)"
+    )
+    device: Optional[str] = Field(
+        default=None,
+        description="Device to use (cuda/cpu). Auto-detect if None"
+    )
 
 
 # =============================================================================
@@ -86,8 +139,195 @@ class RerankedResult:
         }
 
 
+def _build_reranked(
+    result: SearchResult,
+    rerank_score: float,
+    config: RerankerConfig,
+    explanation: Optional[str] = None
+) -> RerankedResult:
+    """Combine the original search score with a re-rank score"""
+    final_score = (
+        result.combined_score * config.original_weight +
+        rerank_score * config.rerank_weight
+    )
+
+    return RerankedResult(
+        chunk_id=result.chunk_id,
+        meeting_id=result.meeting_id,
+        chunk_index=result.chunk_index,
+        start_time=result.start_time,
+        end_time=result.end_time,
+        speaker_id=result.speaker_id,
+        text=result.text,
+        original_score=result.combined_score,
+        rerank_score=rerank_score,
+        final_score=final_score,
+        relevance_explanation=explanation
+    )
+
+
+def _select_top_k(
+    reranked: List[RerankedResult],
+    min_score: float,
+    top_k: int
+) -> List[RerankedResult]:
+    """Sort by final score, then filter by minimum score and limit to top_k"""
+    reranked.sort(key=lambda x: x.final_score, reverse=True)
+    return [r for r in reranked if r.final_score >= min_score][:top_k]
+
+
 # =============================================================================
-# Re-ranker
+# Cross-encoder Re-ranker
+# =============================================================================
+
+class CrossEncoderReranker:
+    """
+    Re-ranks search results with a local cross-encoder model.
+
+    All query-document pairs are scored in a single batched forward
+    pass; logits are mapped to [0, 1] with a sigmoid so they combine
+    with the original search score the same way as LLM scores.
+    """
+
+    def __init__(self, config: Optional[RerankerConfig] = None):
+        """
+        Initialize the re-ranker.
+
+        Args:
+            config: Optional configuration
+        """
+        self.config = config or RerankerConfig()
+        self._model = None
+        self._model_type = None
+        self._device = None
+        self._initialized = False
+        self._init_lock = asyncio.Lock()
+
+        logger.info(f"CrossEncoderReranker created with model: {self.config.cross_encoder_model}")
+
+    async def initialize(self) -> None:
+        """Lazily load the model (called automatically on first use)"""
+        async with self._init_lock:
+            if self._initialized:
+                return
+
+            logger.info(f"Initializing cross-encoder: {self.config.cross_encoder_model}")
+            await asyncio.to_thread(self._load_model)
+
+            self._initialized = True
+            logger.info(f"Cross-encoder initialized on device: {self._device}")
+
+    def _load_model(self) -> None:
+        """Load the cross-encoder (sync, runs in thread pool)"""
+        import torch
+
+        if self.config.device:
+            self._device = self.config.device
+        else:
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+
+        try:
+            # Try FlagEmbedding first (official BGE reranker implementation)
+            from FlagEmbedding import FlagReranker
+
+            self._model = FlagReranker(
+                self.config.cross_encoder_model,
+                use_fp16=self.config.use_fp16 and self._device == "cuda",
+                device=self._device
+            )
+            self._model_type = "flag"
+            logger.info("Loaded cross-encoder using FlagEmbedding")
+
+        except ImportError:
+            # Fallback to sentence-transformers
+            logger.warning("FlagEmbedding not available, using sentence-transformers")
+            from sentence_transformers import CrossEncoder
+
+            self._model = CrossEncoder(
+                self.config.cross_encoder_model,
+                max_length=self.config.max_length,
+                device=self._device
+            )
+            self._model_type = "sentence_transformers"
+            logger.info("Loaded cross-encoder using sentence-transformers")
+
+    def _score_pairs(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """Score query-document pairs (sync, runs in thread pool)"""
+        if self._model_type == "flag":
+            logits = self._model.compute_score(
+                pairs,
+                batch_size=self.config.cross_encoder_batch_size,
+                max_length=self.config.max_length
+            )
+        else:
+            # CrossEncoder.predict already applies a sigmoid for single-label models
+            return np.asarray(
+                self._model.predict(
+                    pairs,
+                    batch_size=self.config.cross_encoder_batch_size,
+                    show_progress_bar=False
+                ),
+                dtype=np.float32
+            ).reshape(-1)
+
+        logits = np.atleast_1d(np.asarray(logits, dtype=np.float32))
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    async def rerank(
+        self,
+        query: str,
+        results: List[SearchResult],
+        top_k: Optional[int] = None
+    ) -> List[RerankedResult]:
+        """
+        Re-rank search results and return top-k.
+
+        Args:
+            query: Search query
+            results: Initial search results
+            top_k: Number of results to return (default: config.top_k)
+
+        Returns:
+            Re-ranked and sorted results
+        """
+        if not results:
+            return []
+
+        top_k = top_k or self.config.top_k
+        logger.info(f"Re-ranking {len(results)} results for query: '{query}'")
+
+        pairs = [(query, result.text) for result in results]
+        try:
+            # A model that fails to load degrades to the original ranking too
+            await self.initialize()
+            scores = await asyncio.to_thread(self._score_pairs, pairs)
+        except Exception as e:
+            logger.warning(f"Cross-encoder re-ranking failed: {e}")
+            # Fallback to original scores
+            scores = [r.combined_score for r in results]
+
+        reranked = [
+            _build_reranked(result, float(score), self.config)
+            for result, score in zip(results, scores)
+        ]
+
+        filtered = _select_top_k(reranked, self.config.min_score, top_k)
+
+        logger.info(f"Returning {len(filtered)} re-ranked results")
+        return filtered
+
+    async def health_check(self) -> bool:
+        """Check if the cross-encoder can be loaded"""
+        try:
+            await self.initialize()
+            return True
+        except Exception as e:
+            logger.error(f"Re-ranker health check failed: {e}")
+            return False
+
+
+# =============================================================================
+# LLM Re-ranker
 # =============================================================================
 
 class LangChainReranker:
@@ -139,15 +379,24 @@ class LangChainReranker:
             config: Optional configuration
         """
         self.config = config or RerankerConfig()
-        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_batches)
         self._ollama_client = None
+        # Batches run in executor threads; only one of them may create the client
+        self._client_lock = threading.Lock()
+        # (query, chunk_id) -> (score, explanation)
+        self._score_cache: "OrderedDict[Tuple[str, str], Tuple[float, Optional[str]]]" = OrderedDict()
 
         logger.info(f"LangChainReranker initialized with model: {self.config.model_name}")
 
     @property
     def ollama_client(self):
-        """Lazy initialization of Ollama client"""
-        if self._ollama_client is None:
+        """Lazy initialization of Ollama client (thread-safe)"""
+        if self._ollama_client is not None:
+            return self._ollama_client
+        with self._client_lock:
+            if self._ollama_client is not None:
+                return self._ollama_client
+            Ollama = _load_ollama_llm()
             if Ollama is None:
                 raise SummaryGenerationError(
                     "LangChain Ollama not available. Install langchain-community"
@@ -321,7 +570,8 @@ class LangChainReranker:
         """
         Re-rank a batch of search results.
 
-        More efficient than re-ranking one by one.
+        More efficient than re-ranking one by one. Scores already cached
+        for (query, chunk_id) are reused; only the rest are prompted.
 
         Args:
             query: Search query
@@ -333,49 +583,137 @@ class LangChainReranker:
         if not results:
             return []
 
-        # Format documents for batch prompt
-        documents = "\n".join([
-            f"[문서 {i+1}]\n{result.text}\n"
-            for i, result in enumerate(results)
-        ])
-
-        prompt = self.BATCH_RELEVANCE_PROMPT.format(
-            query=query,
-            documents=documents
-        )
+        scores: Dict[str, Tuple[float, Optional[str]]] = {}
+        uncached = []
+        for result in results:
+            cached = self._get_cached_score(query, result.chunk_id)
+            if cached is not None:
+                scores[result.chunk_id] = cached
+            else:
+                uncached.append(result)
+
+        if uncached:
+            # Format documents for batch prompt
+            documents = "\n".join([
+                f"[문서 {i+1}]\n{result.text}\n"
+                for i, result in enumerate(uncached)
+            ])
+
+            prompt = self.BATCH_RELEVANCE_PROMPT.format(
+                query=query,
+                documents=documents
+            )
 
-        try:
-            response = await self._call_ollama(prompt)
-            scores = self._parse_batch_scores(response, len(results))
-        except Exception as e:
-            logger.warning(f"Batch re-ranking failed: {e}")
-            # Fallback to original scores
-            scores = [(r.combined_score, None) for r in results]
+            try:
+                response = await self._call_ollama(prompt)
+                parsed = self._parse_batch_scores(response, len(uncached))
+                for result, score in zip(uncached, parsed):
+                    scores[result.chunk_id] = score
+                    self._cache_score(query, result.chunk_id, score)
+            except Exception as e:
+                logger.warning(f"Batch re-ranking failed: {e}")
+                # Fallback to original scores (not cached)
+                for result in uncached:
+                    scores[result.chunk_id] = (result.combined_score, None)
+        else:
+            logger.debug(f"All {len(results)} scores served from cache")
 
         # Create re-ranked results
         reranked = []
-        for result, (rerank_score, explanation) in zip(results, scores):
-            final_score = (
-                result.combined_score * self.config.original_weight +
-                rerank_score * self.config.rerank_weight
-            )
-
-            reranked.append(RerankedResult(
-                chunk_id=result.chunk_id,
-                meeting_id=result.meeting_id,
-                chunk_index=result.chunk_index,
-                start_time=result.start_time,
-                end_time=result.end_time,
-                speaker_id=result.speaker_id,
-                text=result.text,
-                original_score=result.combined_score,
-                rerank_score=rerank_score,
-                final_score=final_score,
-                relevance_explanation=explanation
-            ))
+        for result in results:
+            rerank_score, explanation = scores[result.chunk_id]
+            reranked.append(_build_reranked(result, rerank_score, self.config, explanation))
 
         return reranked
 
+    def _get_cached_score(self, query: str, chunk_id: str) -> Optional[Tuple[float, Optional[str]]]:
+        key = (query.strip(), chunk_id)
+        cached = self._score_cache.get(key)
+        if cached is not None:
+            self._score_cache.move_to_end(key)
+        return cached
+
+    def _cache_score(self, query: str, chunk_id: str, score: Tuple[float, Optional[str]]) -> None:
+        if self.config.score_cache_size <= 0:
+            return
+        self._score_cache[(query.strip(), chunk_id)] = score
+        while len(self._score_cache) > self.config.score_cache_size:
+            self._score_cache.popitem(last=False)
+
+    async def rerank_stream(
+        self,
+        query: str,
+        results: List[SearchResult],
+        top_k: Optional[int] = None
+    ) -> AsyncIterator[RerankedResult]:
+        """
+        Re-rank search results, yielding each result as its batch finishes.
+
+        Results are prompted in order of original score, with up to
+        config.max_concurrent_batches batches in flight. Since a re-rank
+        score is at most 1.0, an unscored result can reach at most
+        original * original_weight + rerank_weight. Once the current
+        top_k already beats that bound for every remaining result (or the
+        bound falls below min_score), the remaining batches are skipped.
+
+        Args:
+            query: Search query
+            results: Initial search results
+            top_k: Number of results the caller will keep (default: config.top_k)
+
+        Yields:
+            RerankedResult in completion order (not sorted)
+        """
+        if not results:
+            return
+
+        top_k = top_k or self.config.top_k
+        ordered = sorted(results, key=lambda r: r.combined_score, reverse=True)
+        batches = [
+            ordered[i:i + self.config.batch_size]
+            for i in range(0, len(ordered), self.config.batch_size)
+        ]
+
+        def upper_bound(batch_index: int) -> float:
+            best_original = batches[batch_index][0].combined_score
+            return best_original * self.config.original_weight + self.config.rerank_weight
+
+        final_scores: List[float] = []
+        next_batch = 0
+        pending = set()
+
+        try:
+            while next_batch < len(batches) or pending:
+                while next_batch < len(batches) and len(pending) < self.config.max_concurrent_batches:
+                    pending.add(asyncio.ensure_future(
+                        self.rerank_batch(query, batches[next_batch])
+                    ))
+                    next_batch += 1
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for reranked in task.result():
+                        final_scores.append(reranked.final_score)
+                        yield reranked
+
+                if next_batch < len(batches):
+                    bound = upper_bound(next_batch)
+                    kept = sorted(
+                        (s for s in final_scores if s >= self.config.min_score), reverse=True
+                    )
+                    if bound < self.config.min_score or (
+                        len(kept) >= top_k and kept[top_k - 1] >= bound
+                    ):
+                        logger.debug(
+                            f"Early cutoff: skipping {len(batches) - next_batch} batches "
+                            f"(bound {bound:.3f})"
+                        )
+                        next_batch = len(batches)
+        finally:
+            for task in pending:
+                task.cancel()
+
+
     async def rerank(
         self,
         query: str,
@@ -399,22 +737,10 @@ class LangChainReranker:
         top_k = top_k or self.config.top_k
         logger.info(f"Re-ranking {len(results)} results for query: '{query}'")
 
-        # Process in batches
-        all_reranked = []
-        for i in range(0, len(results), self.config.batch_size):
-            batch = results[i:i + self.config.batch_size]
-            reranked_batch = await self.rerank_batch(query, batch)
-            all_reranked.extend(reranked_batch)
-            logger.debug(f"Re-ranked batch {i // self.config.batch_size + 1}")
-
-        # Sort by final score (descending)
-        all_reranked.sort(key=lambda x: x.final_score, reverse=True)
+        # Process batches concurrently, stopping once top_k is settled
+        all_reranked = [r async for r in self.rerank_stream(query, results, top_k)]
 
-        # Filter by minimum score and limit to top_k
-        filtered = [
-            r for r in all_reranked
-            if r.final_score >= self.config.min_score
-        ][:top_k]
+        filtered = _select_top_k(all_reranked, self.config.min_score, top_k)
 
         logger.info(f"Returning {len(filtered)} re-ranked results")
         return filtered
@@ -438,15 +764,21 @@ class LangChainReranker:
 # Singleton Instance
 # =============================================================================
 
-_reranker_instance: Optional[LangChainReranker] = None
+Reranker = Union[CrossEncoderReranker, LangChainReranker]
+
+_reranker_instance: Optional[Reranker] = None
 
 
-def get_reranker(config: Optional[RerankerConfig] = None) -> LangChainReranker:
-    """Get or create singleton re-ranker instance"""
+def get_reranker(config: Optional[RerankerConfig] = None) -> Reranker:
+    """Get or create singleton re-ranker instance for the configured backend"""
     global _reranker_instance
 
     if _reranker_instance is None:
-        _reranker_instance = LangChainReranker(config)
+        config = config or RerankerConfig()
+        if config.backend == "llm":
+            _reranker_instance = LangChainReranker(config)
+        else:
+            _reranker_instance = CrossEncoderReranker(config)
 
     return _reranker_instance
 
@@ -461,7 +793,7 @@ async def rerank_search_results(
     top_k: int = 10
 ) -> List[RerankedResult]:
     """
-    Re-rank search results using LLM.
+    Re-rank search results with the configured backend.
 
     Args:
         query: Search query
@@ -482,7 +814,7 @@ async def rerank_search_results(
 if __name__ == "__main__":
     async def main():
         """Test re-ranker"""
-        print("=== LangChain Re-ranker Test ===\n")
+        print("=== Re-ranker Test ===\n")
 
         # Create mock search results
         mock_results = [
@@ -525,12 +857,12 @@ if __name__ == "__main__":
         ]
 
         # Test re-ranking
-        reranker = LangChainReranker()
+        reranker = get_reranker()
 
         # Check health first
-        print("Checking Ollama availability...")
+        print(f"Checking {type(reranker).__name__} availability...")
         if not await reranker.health_check():
-            print("Ollama not available. Skipping re-rank test.")
+            print("Re-ranker not available. Skipping re-rank test.")
             return
 
         query = "프로젝트 일정이 어떻게 되나요?"
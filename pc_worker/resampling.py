@@ -0,0 +1,250 @@
+"""
+Resampling Module
+Sample-rate conversion for audio preprocessing and STT input
+
+Features:
+- resample_audio: one-shot float32 resampling with mono downmix, using
+  soxr when installed or scipy polyphase filtering at a quality tier
+- StreamingResampler: block-wise polyphase resampling that produces the
+  same output as a one-shot scipy.signal.resample_poly call while only
+  keeping a filter-length worth of input history between blocks
+"""
+
+from functools import lru_cache
+from math import gcd
+from typing import Tuple, Union
+
+import numpy as np
+from scipy import signal
+
+from logger import get_logger
+
+logger = get_logger("resampling")
+
+try:
+    import soxr
+except ImportError:
+    soxr = None
+
+# Quality tier -> (filter zero crossings per side, kaiser beta) for the polyphase path.
+# "medium" is scipy.signal.resample_poly's default design.
+POLYPHASE_QUALITY = {
+    "low": (4, 5.0),
+    "medium": (10, 5.0),
+    "high": (16, 8.6),
+}
+
+# Quality tier -> soxr recipe
+SOXR_QUALITY = {
+    "low": "LQ",
+    "medium": "MQ",
+    "high": "HQ",
+}
+
+
+def design_resample_filter(
+    up: int,
+    down: int,
+    window: Union[str, Tuple] = ('kaiser', 5.0),
+    zero_crossings: int = 10
+) -> np.ndarray:
+    """
+    Design the anti-aliasing FIR filter used by resample_poly.
+
+    Args:
+        up: Upsampling factor
+        down: Downsampling factor
+        window: FIR window (same default as scipy.signal.resample_poly)
+        zero_crossings: Filter half-length in units of the larger rate factor
+
+    Returns:
+        Filter taps scaled by the upsampling factor
+    """
+    max_rate = max(up, down)
+    half_len = zero_crossings * max_rate
+    h = signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=window)
+    return (h * up).astype(np.float64)
+
+
+@lru_cache(maxsize=32)
+def _polyphase_filter(up: int, down: int, quality: str) -> np.ndarray:
+    """Unscaled float32 taps (resample_poly copies them and applies the gain)"""
+    zero_crossings, beta = POLYPHASE_QUALITY[quality]
+    h = design_resample_filter(up, down, ('kaiser', beta), zero_crossings) / up
+    return h.astype(np.float32)
+
+
+def downmix_to_mono(audio: np.ndarray) -> np.ndarray:
+    """
+    Average channels into a float32 mono signal.
+
+    Args:
+        audio: Samples, shape (samples,) or (samples, channels)
+
+    Returns:
+        float32 array of shape (samples,)
+    """
+    audio = np.asarray(audio)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1, dtype=np.float32) if audio.shape[1] > 1 else audio[:, 0]
+    return audio.astype(np.float32, copy=False)
+
+
+def resample_audio(
+    audio: np.ndarray,
+    orig_sr: int,
+    target_sr: int,
+    quality: str = "medium",
+    engine: str = "auto"
+) -> np.ndarray:
+    """
+    Resample audio to a target rate as float32 mono.
+
+    Multi-channel input is downmixed before filtering, so only one channel
+    is resampled. The polyphase path reduces the rate ratio to lowest terms
+    (44.1k -> 16k is 160/441) and filters in float32.
+
+    Args:
+        audio: Samples, shape (samples,) or (samples, channels)
+        orig_sr: Source sample rate
+        target_sr: Target sample rate
+        quality: "low", "medium" or "high"
+        engine: "auto" (soxr if installed), "soxr" or "polyphase"
+
+    Returns:
+        float32 mono array at target_sr
+    """
+    if quality not in POLYPHASE_QUALITY:
+        raise ValueError(f"Unknown resampling quality: {quality}")
+
+    audio = downmix_to_mono(audio)
+    if orig_sr == target_sr or len(audio) == 0:
+        return audio
+
+    if engine == "soxr" or (engine == "auto" and soxr is not None):
+        if soxr is None:
+            raise ImportError("soxr is not installed")
+        return soxr.resample(audio, orig_sr, target_sr, quality=SOXR_QUALITY[quality])
+
+    divisor = gcd(int(orig_sr), int(target_sr))
+    up, down = int(target_sr) // divisor, int(orig_sr) // divisor
+    h = _polyphase_filter(up, down, quality)
+
+    return signal.resample_poly(audio, up, down, window=h).astype(np.float32, copy=False)
+
+
+class StreamingResampler:
+    """
+    Stateful polyphase resampler for mono float32 blocks.
+
+    The filter is front-padded so that its group delay is a whole number
+    of output samples, and the retained input history always starts at a
+    multiple of the downsampling factor. Each upfirdn call on the history
+    plus the new block is then phase-aligned with the full-stream result,
+    and only outputs whose filter support is fully available are emitted.
+
+    Usage:
+        resampler = StreamingResampler(44100, 16000, quality="medium")
+        for block in blocks:
+            out = resampler.process(block)
+        tail = resampler.flush()
+    """
+
+    def __init__(
+        self,
+        orig_sr: int,
+        target_sr: int,
+        quality: str = "medium"
+    ):
+        divisor = gcd(int(orig_sr), int(target_sr))
+        self.up = int(target_sr) // divisor
+        self.down = int(orig_sr) // divisor
+
+        self._h = np.ones(1)
+        self._delay = 0
+        if not self.passthrough:
+            zero_crossings, beta = POLYPHASE_QUALITY[quality]
+            h = design_resample_filter(self.up, self.down, ('kaiser', beta), zero_crossings)
+            half_len = (len(h) - 1) // 2
+            # Front-pad so the filter delay is a multiple of `down` (as resample_poly does)
+            pre_pad = self.down - half_len % self.down
+            self._h = np.concatenate([np.zeros(pre_pad), h])
+            self._delay = (half_len + pre_pad) // self.down
+
+        self._history = np.zeros(0, dtype=np.float32)
+        self._base = 0          # global input index of _history[0] (multiple of down)
+        self._next_out = self._delay  # next index into the full upfirdn output
+        self._total_in = 0
+        self._flushed = False
+
+    @property
+    def passthrough(self) -> bool:
+        """True when input and output rates are equal"""
+        return self.up == self.down
+
+    def _emit(self, last_out: int) -> np.ndarray:
+        """Emit full-stream outputs [_next_out, last_out] from the current history"""
+        if last_out < self._next_out or len(self._history) == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        y = signal.upfirdn(self._h, self._history, self.up, self.down)
+        offset = self._base * self.up // self.down
+        out = y[self._next_out - offset:last_out - offset + 1].astype(np.float32)
+        self._next_out = last_out + 1
+
+        # Drop input no longer reachable by the filter, keeping _base a multiple of down
+        first_needed = (self._next_out * self.down - len(self._h) + 1) // self.up
+        new_base = max(self._base, (max(first_needed, 0) // self.down) * self.down)
+        if new_base > self._base:
+            self._history = self._history[new_base - self._base:]
+            self._base = new_base
+
+        return out
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Resample the next block of input.
+
+        Args:
+            block: Mono samples
+
+        Returns:
+            Resampled samples that are final given the input seen so far
+        """
+        if self._flushed:
+            raise RuntimeError("StreamingResampler already flushed")
+
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        if self.passthrough:
+            self._total_in += len(block)
+            return block
+
+        self._history = np.concatenate([self._history, block])
+        self._total_in += len(block)
+
+        # Output f depends on upsampled inputs up to f * down
+        last_out = ((self._total_in - 1) * self.up) // self.down
+        return self._emit(last_out)
+
+    def flush(self) -> np.ndarray:
+        """
+        Emit the remaining output, treating the input as zero beyond its end.
+
+        Returns:
+            Final resampled samples
+        """
+        if self._flushed or self.passthrough:
+            self._flushed = True
+            return np.zeros(0, dtype=np.float32)
+        self._flushed = True
+
+        total_out = -(-self._total_in * self.up // self.down)
+        last_out = self._delay + total_out - 1
+
+        # Zero-pad the history far enough to cover the last output's filter support
+        needed_in = (last_out * self.down) // self.up + 1
+        pad = needed_in - (self._base + len(self._history))
+        if pad > 0:
+            self._history = np.concatenate([self._history, np.zeros(pad, dtype=np.float32)])
+
+        return self._emit(last_out)
@@ -3,8 +3,12 @@ Speaker Diarization Module
 Handles speaker identification and segmentation using pyannote.audio
 """
 
-# Import config first to apply PyTorch 2.6+ compatibility patch
-from config import DIARIZATION_MODEL, ENABLE_GPU, CUDA_DEVICE, MODEL_CACHE_DIR, HUGGINGFACE_TOKEN
+# Apply the PyTorch 2.6+ compatibility patch before pyannote loads any models
+from config import (
+    DIARIZATION_MODEL, ENABLE_GPU, CUDA_DEVICE, MODEL_CACHE_DIR, HUGGINGFACE_TOKEN,
+    patch_torch_load
+)
+patch_torch_load()
 
 import asyncio
 from pathlib import Path
@@ -0,0 +1,270 @@
+"""
+STT Checkpoint Module
+Persists intermediate results so an interrupted meeting resumes where it
+stopped instead of starting over
+
+- Window checkpoints: per-window transcription results, so an interrupted
+  long-audio transcription resumes from the last finished window
+- Stage checkpoints: artifacts of each finished processing stage, so a
+  retried meeting resumes from the last finished stage (a crash during
+  summarization never forces a new transcription)
+
+Layout (per meeting under STT_CHECKPOINT_DIR):
+    <meeting_id>.windows.jsonl  one JSON object per finished window
+    <meeting_id>.stages/        audio.wav (preprocessed audio) and one
+                                <stage>.json per finished stage
+
+Every record carries a fingerprint of the audio and settings; records from
+a different fingerprint are discarded on load.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from logger import get_logger
+
+logger = get_logger("stt_checkpoint")
+
+
+def audio_fingerprint(audio: np.ndarray, sample_rate: int, *settings) -> str:
+    """
+    Cheap fingerprint of decoded audio plus transcription settings.
+
+    Hashes the length and one sample per second rather than the full
+    buffer, which is enough to tell recordings apart.
+
+    Args:
+        audio: Decoded samples
+        sample_rate: Sample rate
+        *settings: Values that change the transcription result (model, language, ...)
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha1()
+    digest.update(f"{len(audio)}:{sample_rate}:{settings!r}".encode())
+    digest.update(np.ascontiguousarray(audio[::sample_rate], dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class WindowCheckpointStore:
+    """
+    Append-only log of finished transcription windows for one meeting.
+
+    Blocking file I/O; call via asyncio.to_thread from async code.
+    """
+
+    def __init__(self, directory: Path, meeting_id: str, fingerprint: str):
+        self.directory = Path(directory)
+        self.meeting_id = meeting_id
+        self.fingerprint = fingerprint
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", meeting_id)
+        self.path = self.directory / f"{safe_id}.windows.jsonl"
+
+    def load(self) -> Dict[int, List[Dict]]:
+        """
+        Load finished windows for the current fingerprint.
+
+        A torn final line is dropped; a log written for different audio or
+        settings is deleted.
+
+        Returns:
+            Mapping of window index to window-relative segments
+        """
+        if not self.path.exists():
+            return {}
+
+        finished: Dict[int, List[Dict]] = {}
+        valid_bytes = 0
+        stale = False
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Dropping torn checkpoint entry in {self.path.name}")
+                    break
+                if record.get("fingerprint") != self.fingerprint:
+                    stale = True
+                    break
+                valid_bytes += len(line)
+                finished[int(record["index"])] = record["segments"]
+
+        if stale:
+            logger.info(f"Discarding stale STT checkpoint for meeting {self.meeting_id}")
+            self.clear()
+            return {}
+
+        if valid_bytes < self.path.stat().st_size:
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+        if finished:
+            logger.info(
+                f"Resuming meeting {self.meeting_id} from checkpoint "
+                f"({len(finished)} windows done)"
+            )
+        return finished
+
+    def save(self, index: int, segments: List[Dict]) -> None:
+        """Append a finished window (fsynced before returning)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        record = {"fingerprint": self.fingerprint, "index": index, "segments": segments}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=float) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        """Delete the checkpoint (after the transcript is complete)"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# Processing stages in order; saving a stage invalidates the stages after it
+#   audio:         preprocessed audio (audio.wav), its metadata and content hash
+#   transcription: STT output (word-aligned segments, engine used)
+#   diarization:   assembled pipeline result (speaker-labelled transcript,
+#                  speakers, speaker embeddings)
+#   saved:         transcript and speakers stored in Supabase
+STAGES = ("audio", "transcription", "diarization", "saved")
+
+
+class StageCheckpointStore:
+    """
+    Artifacts of the finished processing stages of one meeting.
+
+    Blocking file I/O; call via asyncio.to_thread from async code.
+    """
+
+    def __init__(self, directory: Path, meeting_id: str, fingerprint: str):
+        self.directory = Path(directory)
+        self.meeting_id = meeting_id
+        self.fingerprint = fingerprint
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", meeting_id)
+        self.path = self.directory / f"{safe_id}.stages"
+
+    @property
+    def audio_path(self) -> Path:
+        """Where the prepare stage writes the preprocessed audio"""
+        return self.path / "audio.wav"
+
+    def load(self, stage: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a finished stage.
+
+        Checkpoints written for a different fingerprint are all deleted.
+
+        Args:
+            stage: One of STAGES
+
+        Returns:
+            Data saved for the stage, or None if the stage has not finished
+        """
+        stage_path = self._stage_path(stage)
+        if not stage_path.exists():
+            return None
+
+        try:
+            record = json.loads(stage_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {stage} checkpoint of meeting {self.meeting_id}: {e}")
+            return None
+
+        if record.get("fingerprint") != self.fingerprint:
+            logger.info(f"Discarding stale stage checkpoints for meeting {self.meeting_id}")
+            self.clear()
+            return None
+        return record["data"]
+
+    def last_stage(self) -> Optional[str]:
+        """Last finished stage (None if nothing is checkpointed)"""
+        for stage in reversed(STAGES):
+            if self.load(stage) is not None:
+                return stage
+        return None
+
+    def save(self, stage: str, data: Dict[str, Any]) -> None:
+        """Record a finished stage (fsynced before returning)"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        for later in STAGES[STAGES.index(stage) + 1:]:
+            self._stage_path(later).unlink(missing_ok=True)
+
+        stage_path = self._stage_path(stage)
+        tmp_path = stage_path.with_suffix(".tmp")
+        record = {"fingerprint": self.fingerprint, "stage": stage, "data": data}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str))
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(stage_path)
+
+    def clear(self) -> None:
+        """Delete all stage checkpoints (after the meeting is complete)"""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def _stage_path(self, stage: str) -> Path:
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        return self.path / f"{stage}.json"
+
+
+def prune_stage_checkpoints(directory: Path, max_age_hours: float) -> int:
+    """
+    Delete stage checkpoints of meetings that were never resumed
+
+    Args:
+        directory: Checkpoint directory
+        max_age_hours: Checkpoints untouched for longer are deleted
+
+    Returns:
+        Number of meetings whose checkpoints were deleted
+    """
+    if not Path(directory).exists():
+        return 0
+
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for path in Path(directory).glob("*.stages"):
+        try:
+            latest = max([p.stat().st_mtime for p in path.iterdir()] or [path.stat().st_mtime])
+        except OSError:
+            continue
+        if latest < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def get_stage_checkpoint_store(
+    meeting_id: str,
+    fingerprint: str,
+    directory: Optional[Path] = None
+) -> StageCheckpointStore:
+    """Create a stage checkpoint store under STT_CHECKPOINT_DIR (or the given directory)"""
+    if directory is None:
+        from config import STT_CHECKPOINT_DIR
+        directory = STT_CHECKPOINT_DIR
+    return StageCheckpointStore(directory, meeting_id, fingerprint)
+
+
+def get_window_checkpoint_store(
+    meeting_id: str,
+    fingerprint: str,
+    directory: Optional[Path] = None
+) -> WindowCheckpointStore:
+    """Create a checkpoint store under STT_CHECKPOINT_DIR (or the given directory)"""
+    if directory is None:
+        from config import STT_CHECKPOINT_DIR
+        directory = STT_CHECKPOINT_DIR
+    return WindowCheckpointStore(directory, meeting_id, fingerprint)
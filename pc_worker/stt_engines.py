@@ -0,0 +1,370 @@
+"""
+STT Engine Registry
+Common protocol for the STT engines and per-job engine selection
+
+Features:
+- STTEngine protocol implemented by WhisperXEngine, FasterWhisperEngine
+  and KoreanWhisperEngine; engines that can yield segments while decoding
+  also implement StreamingSTTEngine, engines that can decode several
+  recordings in shared batches implement BatchSTTEngine, engines whose
+  word alignment can be skipped and run later implement AligningSTTEngine
+- Registry of engine factories by name; engines are specified as
+  "name" or "name:model" (e.g. "faster-whisper:large-v3-turbo")
+- Selection per job: explicit (per-user) preference, then hardware
+  (CPU-only nodes use faster-whisper int8), then audio length (short
+  memos use a turbo model), then the default engine
+- Fast mode: long recordings (or jobs that ask for it) skip word
+  alignment and keep segment-level timestamps
+- language="auto" asks an engine to detect the language from the audio
+- Engines are imported lazily and loaded once per spec, so a node only
+  pays for the engines it actually selects
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional, Protocol, runtime_checkable
+
+from models import AudioMetadata, TranscriptSegment
+from exceptions import TranscriptionError
+from logger import get_logger
+
+logger = get_logger("stt_engines")
+
+# Language value that asks the engine to detect the language from the audio
+AUTO_LANGUAGE = "auto"
+
+
+@runtime_checkable
+class STTEngine(Protocol):
+    """Interface shared by all STT engines"""
+
+    async def initialize(self) -> None:
+        ...
+
+    async def transcribe(
+        self,
+        audio_path: Path,
+        meeting_id: str,
+        language: Optional[str] = None,
+        audio_metadata: Optional[AudioMetadata] = None
+    ) -> List[TranscriptSegment]:
+        ...
+
+    def get_model_info(self) -> Dict:
+        ...
+
+    async def cleanup(self) -> None:
+        ...
+
+
+@runtime_checkable
+class StreamingSTTEngine(STTEngine, Protocol):
+    """Engine that yields segments in time order as they are decoded"""
+
+    def transcribe_stream(
+        self,
+        audio_path: Path,
+        meeting_id: str,
+        language: Optional[str] = None,
+        audio_metadata: Optional[AudioMetadata] = None
+    ) -> AsyncIterator[TranscriptSegment]:
+        ...
+
+
+@runtime_checkable
+class BatchSTTEngine(STTEngine, Protocol):
+    """
+    Engine that decodes several recordings in shared model batches
+
+    transcribe_batch() leaves files that failed out of its result.
+    """
+
+    async def transcribe_batch(
+        self,
+        audio_paths: List[Path],
+        meeting_ids: List[str],
+        language: Optional[str] = None,
+        audio_metadata: Optional[List[Optional[AudioMetadata]]] = None
+    ) -> Dict[str, List[TranscriptSegment]]:
+        ...
+
+
+@runtime_checkable
+class AligningSTTEngine(STTEngine, Protocol):
+    """
+    Engine with a separate word-alignment pass
+
+    transcribe() and transcribe_batch() accept word_alignment=False to skip
+    it (fast mode); align_segments() runs it later on a saved transcript.
+    """
+
+    async def align_segments(
+        self,
+        audio_path: Path,
+        segments: List[TranscriptSegment],
+        language: Optional[str] = None,
+        audio_metadata: Optional[AudioMetadata] = None
+    ) -> List[TranscriptSegment]:
+        ...
+
+
+@dataclass(frozen=True)
+class EngineSpec:
+    """Engine name plus optional model override"""
+    name: str
+    model: Optional[str] = None
+
+    @classmethod
+    def parse(cls, value: str) -> "EngineSpec":
+        """Parse "name" or "name:model" """
+        name, _, model = value.strip().partition(":")
+        return cls(name=name.strip().lower(), model=model.strip() or None)
+
+    def __str__(self) -> str:
+        return f"{self.name}:{self.model}" if self.model else self.name
+
+
+# (model, device) -> engine; model/device None means the engine's default
+EngineFactory = Callable[[Optional[str], Optional[str]], STTEngine]
+
+_ENGINE_FACTORIES: Dict[str, EngineFactory] = {}
+
+
+def register_stt_engine(name: str, factory: EngineFactory) -> None:
+    """
+    Register an engine factory under a name
+
+    Args:
+        name: Engine name used in specs and settings
+        factory: Callable (model, device) -> STTEngine
+    """
+    _ENGINE_FACTORIES[name.lower()] = factory
+
+
+def available_stt_engines() -> List[str]:
+    """Names of all registered engines"""
+    return sorted(_ENGINE_FACTORIES)
+
+
+def create_stt_engine(spec: EngineSpec, device: Optional[str] = None) -> STTEngine:
+    """
+    Instantiate (but do not load) an engine
+
+    Args:
+        spec: Engine to create
+        device: Device override
+
+    Returns:
+        Engine instance
+
+    Raises:
+        TranscriptionError: If the engine name is not registered
+    """
+    factory = _ENGINE_FACTORIES.get(spec.name)
+    if factory is None:
+        raise TranscriptionError(
+            f"Unknown STT engine '{spec.name}' (available: {', '.join(available_stt_engines())})"
+        )
+    return factory(spec.model, device)
+
+
+def _create_whisperx(model: Optional[str], device: Optional[str]) -> STTEngine:
+    from whisperx_engine import get_whisperx_engine
+    return get_whisperx_engine(model_size=model, device=device)
+
+
+def _create_faster_whisper(model: Optional[str], device: Optional[str]) -> STTEngine:
+    from config import (
+        FASTER_WHISPER_BATCHED, FASTER_WHISPER_BATCH_SIZE, FASTER_WHISPER_REPLICAS,
+        FASTER_WHISPER_CPU_THREADS
+    )
+    from faster_whisper_engine import get_stt_engine
+    return get_stt_engine(
+        model_size=model,
+        device=device or ("cuda" if cuda_available() else "cpu"),
+        cpu_threads=FASTER_WHISPER_CPU_THREADS,
+        batched=FASTER_WHISPER_BATCHED,
+        batch_size=FASTER_WHISPER_BATCH_SIZE,
+        num_replicas=FASTER_WHISPER_REPLICAS
+    )
+
+
+def _create_korean_whisper(model: Optional[str], device: Optional[str]) -> STTEngine:
+    from whisper_korean_engine import get_korean_whisper_engine
+    return get_korean_whisper_engine(model_id=model, device=device)
+
+
+register_stt_engine("whisperx", _create_whisperx)
+register_stt_engine("faster-whisper", _create_faster_whisper)
+register_stt_engine("korean-whisper", _create_korean_whisper)
+
+
+# ============================================================================
+# Selection
+# ============================================================================
+
+def cuda_available() -> bool:
+    """Whether a CUDA device is usable (False if torch is not installed)"""
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+@dataclass
+class EngineSelectionPolicy:
+    """Which engine to use for which job"""
+    default: EngineSpec = field(default_factory=lambda: EngineSpec("whisperx"))
+    cpu: EngineSpec = field(default_factory=lambda: EngineSpec("faster-whisper", "large-v3-turbo"))
+    short_audio: EngineSpec = field(default_factory=lambda: EngineSpec("whisperx", "large-v3-turbo"))
+    short_audio_seconds: float = 300.0  # 0 disables the short-audio rule
+
+
+def select_stt_engine(
+    duration_seconds: Optional[float] = None,
+    preference: Optional[str] = None,
+    has_cuda: Optional[bool] = None,
+    policy: Optional[EngineSelectionPolicy] = None
+) -> EngineSpec:
+    """
+    Choose the engine for one job
+
+    Args:
+        duration_seconds: Audio length (None if unknown)
+        preference: Per-user engine setting ("name" or "name:model")
+        has_cuda: GPU availability (detected if None)
+        policy: Selection policy (defaults if None)
+
+    Returns:
+        Selected engine spec
+    """
+    policy = policy or EngineSelectionPolicy()
+
+    if preference:
+        spec = EngineSpec.parse(preference)
+        if spec.name in _ENGINE_FACTORIES:
+            return spec
+        logger.warning(f"Ignoring unknown STT engine preference: {preference}")
+
+    if has_cuda is None:
+        has_cuda = cuda_available()
+    if not has_cuda:
+        return policy.cpu
+
+    if (
+        duration_seconds is not None
+        and policy.short_audio_seconds > 0
+        and duration_seconds <= policy.short_audio_seconds
+    ):
+        return policy.short_audio
+
+    return policy.default
+
+
+def use_word_alignment(
+    duration_seconds: Optional[float] = None,
+    requested: Optional[bool] = None,
+    fast_mode_seconds: float = 0.0
+) -> bool:
+    """
+    Whether a job runs word alignment during STT (False = fast mode)
+
+    Args:
+        duration_seconds: Audio length (None if unknown)
+        requested: Per-job setting (wins if not None)
+        fast_mode_seconds: Recordings longer than this skip alignment (0 = never)
+
+    Returns:
+        True to align during STT
+    """
+    if requested is not None:
+        return requested
+    if fast_mode_seconds > 0 and duration_seconds is not None:
+        return duration_seconds <= fast_mode_seconds
+    return True
+
+
+def get_selection_policy() -> EngineSelectionPolicy:
+    """Selection policy from config (STT_ENGINE, STT_CPU_ENGINE, STT_SHORT_AUDIO_*)"""
+    from config import STT_ENGINE, STT_CPU_ENGINE, STT_SHORT_AUDIO_ENGINE, STT_SHORT_AUDIO_SECONDS
+    return EngineSelectionPolicy(
+        default=EngineSpec.parse(STT_ENGINE),
+        cpu=EngineSpec.parse(STT_CPU_ENGINE),
+        short_audio=EngineSpec.parse(STT_SHORT_AUDIO_ENGINE),
+        short_audio_seconds=STT_SHORT_AUDIO_SECONDS
+    )
+
+
+# ============================================================================
+# Loaded engines
+# ============================================================================
+
+class STTEngineRegistry:
+    """
+    Loads engines on first use and keeps them for later jobs
+    """
+
+    def __init__(
+        self,
+        policy: Optional[EngineSelectionPolicy] = None,
+        device: Optional[str] = None
+    ):
+        self.policy = policy or EngineSelectionPolicy()
+        self.device = device
+        self._engines: Dict[EngineSpec, STTEngine] = {}
+        self._lock = asyncio.Lock()
+
+    def select(
+        self,
+        duration_seconds: Optional[float] = None,
+        preference: Optional[str] = None
+    ) -> EngineSpec:
+        """Choose the engine for a job using this registry's policy"""
+        return select_stt_engine(duration_seconds, preference, policy=self.policy)
+
+    async def get(self, spec: EngineSpec) -> STTEngine:
+        """
+        Get a loaded engine, creating and initializing it on first use
+
+        Args:
+            spec: Engine to get
+
+        Returns:
+            Initialized engine
+        """
+        engine = self._engines.get(spec)
+        if engine is not None:
+            return engine
+
+        async with self._lock:
+            engine = self._engines.get(spec)
+            if engine is None:
+                logger.info(f"Loading STT engine: {spec}")
+                engine = create_stt_engine(spec, self.device)
+                await engine.initialize()
+                self._engines[spec] = engine
+        return engine
+
+    def get_info(self) -> Dict[str, Dict]:
+        """Model info of every loaded engine, keyed by spec"""
+        return {str(spec): engine.get_model_info() for spec, engine in self._engines.items()}
+
+    async def cleanup(self) -> None:
+        """Release all loaded engines"""
+        for engine in self._engines.values():
+            await engine.cleanup()
+        self._engines.clear()
+
+
+# Global registry instance
+_stt_engine_registry: Optional[STTEngineRegistry] = None
+
+
+def get_stt_engine_registry() -> STTEngineRegistry:
+    """Get or create the global engine registry (policy from config)"""
+    global _stt_engine_registry
+    if _stt_engine_registry is None:
+        _stt_engine_registry = STTEngineRegistry(get_selection_policy())
+    return _stt_engine_registry
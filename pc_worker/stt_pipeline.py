@@ -1,17 +1,29 @@
 """
 Integrated STT + Speaker Diarization Pipeline
-Combines audio processing, WhisperX transcription, and speaker diarization
+Combines audio processing, transcription (engine selected per job), and speaker diarization
 """
 
 import asyncio
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from audio_processor import AudioProcessor, get_audio_processor
-from whisperx_engine import WhisperXEngine, get_whisperx_engine
+from whisperx_engine import WhisperXEngine
+from stt_engines import (
+    AligningSTTEngine,
+    BatchSTTEngine,
+    EngineSpec,
+    STTEngine,
+    StreamingSTTEngine,
+    STTEngineRegistry,
+    get_stt_engine_registry,
+    use_word_alignment
+)
 from speaker_diarization import SpeakerDiarizationEngine, get_diarization_engine
+from gpu_memory import track_peak_memory
+from stt_checkpoint import StageCheckpointStore
 from models import (
     TranscriptSegment,
     Transcript,
@@ -26,10 +38,18 @@ from exceptions import (
     PCWorkerException
 )
 from logger import get_logger
-from config import AUDIO_TEMP_DIR
+from config import (
+    AUDIO_TEMP_DIR,
+    STT_STREAM_BATCH_SEGMENTS,
+    STT_STREAM_BATCH_SECONDS,
+    STT_FAST_MODE_SECONDS
+)
 
 logger = get_logger("stt_pipeline")
 
+# Receives each batch of provisional segments while transcription is running
+SegmentBatchCallback = Callable[[List[TranscriptSegment]], Awaitable[None]]
+
 
 @dataclass
 class PipelineResult:
@@ -51,6 +71,54 @@ class PipelineResult:
     num_speakers_detected: int = 0
     alignment_rate: float = 0.0
 
+    # STT engine used ("name" or "name:model")
+    stt_engine: Optional[str] = None
+
+    # Fast mode: word alignment was skipped (see STTPipeline.align_transcript)
+    word_alignment_deferred: bool = False
+
+    # Peak CUDA memory (MB) per stage ("transcription", "diarization"); empty without CUDA
+    gpu_peak_memory_mb: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form (stage checkpoints)"""
+        return {
+            "meeting_id": self.meeting_id,
+            "audio_metadata": self.audio_metadata.model_dump(mode="json"),
+            "transcript": self.transcript.model_dump(mode="json"),
+            "speakers": [speaker.model_dump(mode="json") for speaker in self.speakers],
+            "speaker_embeddings": {
+                label: embedding.model_dump(mode="json")
+                for label, embedding in self.speaker_embeddings.items()
+            },
+            "processing_time_seconds": self.processing_time_seconds,
+            "transcription_time": self.transcription_time,
+            "diarization_time": self.diarization_time,
+            "alignment_time": self.alignment_time,
+            "average_confidence": self.average_confidence,
+            "num_speakers_detected": self.num_speakers_detected,
+            "alignment_rate": self.alignment_rate,
+            "stt_engine": self.stt_engine,
+            "word_alignment_deferred": self.word_alignment_deferred,
+            "gpu_peak_memory_mb": self.gpu_peak_memory_mb
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PipelineResult":
+        """Rebuild a result saved with to_dict"""
+        return cls(
+            **{
+                **data,
+                "audio_metadata": AudioMetadata.model_validate(data["audio_metadata"]),
+                "transcript": Transcript.model_validate(data["transcript"]),
+                "speakers": [Speaker.model_validate(speaker) for speaker in data["speakers"]],
+                "speaker_embeddings": {
+                    label: SpeakerEmbedding.model_validate(embedding)
+                    for label, embedding in data["speaker_embeddings"].items()
+                }
+            }
+        )
+
 
 class STTPipeline:
     """
@@ -58,10 +126,14 @@ class STTPipeline:
 
     Pipeline stages:
     1. Audio preprocessing (noise reduction, normalization)
-    2. Speech-to-text transcription (WhisperX)
+    2. Speech-to-text transcription (engine chosen per job from the STT engine registry)
     3. Speaker diarization (Pyannote)
     4. Alignment of transcript with speaker labels
     5. Speaker embedding extraction
+
+    With a stage checkpoint store, the results of stage 2 and of stages 3-5
+    are saved as they finish, and a retried meeting resumes after the last
+    saved stage.
     """
 
     def __init__(
@@ -70,20 +142,23 @@ class STTPipeline:
         whisperx_engine: Optional[WhisperXEngine] = None,
         diarization_engine: Optional[SpeakerDiarizationEngine] = None,
         enable_preprocessing: bool = True,
-        enable_noise_reduction: bool = True
+        enable_noise_reduction: bool = True,
+        stt_engine_registry: Optional[STTEngineRegistry] = None
     ):
         """
         Initialize STT pipeline
 
         Args:
             audio_processor: Audio processor instance (creates default if None)
-            whisperx_engine: WhisperX engine instance (creates default if None)
+            whisperx_engine: Fixed WhisperX engine for every job (selected per job if None)
             diarization_engine: Diarization engine instance (creates default if None)
             enable_preprocessing: Whether to apply audio preprocessing
             enable_noise_reduction: Whether to apply noise reduction
+            stt_engine_registry: Engine registry for per-job selection (global if None)
         """
         self.audio_processor = audio_processor or get_audio_processor()
-        self.whisperx_engine = whisperx_engine or get_whisperx_engine()
+        self.whisperx_engine = whisperx_engine
+        self.stt_engine_registry = stt_engine_registry or get_stt_engine_registry()
         self.diarization_engine = diarization_engine or get_diarization_engine()
 
         self.enable_preprocessing = enable_preprocessing
@@ -107,8 +182,12 @@ class STTPipeline:
         logger.log_operation_start("initialize_stt_pipeline")
 
         try:
-            # Initialize WhisperX (heavy operation)
-            await self.whisperx_engine.initialize()
+            # Load the STT engine this node uses by default (heavy operation);
+            # engines picked for specific jobs are loaded on first use
+            if self.whisperx_engine:
+                await self.whisperx_engine.initialize()
+            else:
+                await self.stt_engine_registry.get(self.stt_engine_registry.select())
 
             # Initialize Diarization pipeline (heavy operation)
             await self.diarization_engine.initialize()
@@ -127,7 +206,12 @@ class STTPipeline:
         meeting_id: str,
         language: str = "ko",
         num_speakers: Optional[int] = None,
-        enhance_audio: bool = True
+        enhance_audio: bool = True,
+        audio_metadata: Optional[AudioMetadata] = None,
+        stt_engine_preference: Optional[str] = None,
+        on_segments: Optional[SegmentBatchCallback] = None,
+        word_alignment: Optional[bool] = None,
+        checkpoint: Optional[StageCheckpointStore] = None
     ) -> PipelineResult:
         """
         Process audio file through complete STT + Diarization pipeline
@@ -138,6 +222,16 @@ class STTPipeline:
             language: Language code for transcription
             num_speakers: Known number of speakers (improves accuracy if provided)
             enhance_audio: Whether to apply audio enhancement
+            audio_metadata: Metadata from AudioProcessor.preprocess_audio when
+                audio_path is already preprocessed (carries the measured loudness)
+            stt_engine_preference: Per-user STT engine setting ("name" or "name:model")
+            on_segments: Called with batches of segments as they are decoded
+                (only for engines that support streaming); these are provisional,
+                without speaker labels
+            word_alignment: Per-job word alignment setting (None = by duration,
+                STT_FAST_MODE_SECONDS); False keeps segment-level timestamps
+            checkpoint: Stage checkpoints of this meeting; finished stages are
+                restored instead of run, newly finished ones are saved
 
         Returns:
             PipelineResult with transcript, speakers, and embeddings
@@ -159,35 +253,147 @@ class STTPipeline:
         pipeline_start_time = time.time()
 
         try:
+            # Interrupted after diarization: nothing left to run
+            restored = await self._load_checkpoint(checkpoint, "diarization")
+            if restored is not None:
+                logger.info(f"Restored STT and diarization results of {meeting_id} from checkpoint")
+                return PipelineResult.from_dict(restored)
+
             # Stage 1: Audio Preprocessing
             preprocessed_path = audio_path
 
             if self.enable_preprocessing or enhance_audio:
-                preprocessed_path = await self._preprocess_audio(
+                preprocessed_path, audio_metadata = await self._preprocess_audio(
                     audio_path,
                     meeting_id,
                     enhance_audio
                 )
 
-            # Load audio metadata
-            audio_metadata = await self._get_audio_metadata(preprocessed_path)
+            # Load audio metadata (enhanced audio has none from the preprocessor)
+            if audio_metadata is None:
+                audio_metadata = await self._get_audio_metadata(preprocessed_path)
+
+            # Stage 2: Speech-to-Text Transcription (restored if checkpointed)
+            restored = await self._load_checkpoint(checkpoint, "transcription")
+            if restored is not None:
+                transcript_segments = [
+                    TranscriptSegment.model_validate(segment) for segment in restored["segments"]
+                ]
+                stt_engine_name = restored["stt_engine"]
+                transcription_time = restored["transcription_time"]
+                word_alignment_deferred = restored["word_alignment_deferred"]
+                transcription_peak_mb = restored["gpu_peak_mb"]
+                logger.info(
+                    f"Restored transcription from checkpoint: {len(transcript_segments)} segments"
+                )
+            else:
+                stt_engine, stt_engine_name = await self._select_stt_engine(
+                    audio_metadata.duration_seconds,
+                    stt_engine_preference
+                )
+                align = use_word_alignment(
+                    audio_metadata.duration_seconds, word_alignment, STT_FAST_MODE_SECONDS
+                )
+                logger.info(
+                    f"Transcribing with {stt_engine_name}"
+                    + ("" if align else " (fast mode, no word alignment)")
+                )
 
-            # Stage 2: Speech-to-Text Transcription
-            transcription_start = time.time()
-            transcript_segments = await self.whisperx_engine.transcribe(
+                transcription_start = time.time()
+                with track_peak_memory() as transcription_memory:
+                    transcript_segments = await self._transcribe(
+                        stt_engine,
+                        preprocessed_path,
+                        meeting_id,
+                        language,
+                        audio_metadata,
+                        on_segments,
+                        align
+                    )
+                transcription_time = time.time() - transcription_start
+                word_alignment_deferred = not align and isinstance(stt_engine, AligningSTTEngine)
+                transcription_peak_mb = transcription_memory.peak_mb
+
+                logger.info(
+                    f"Transcription complete: {len(transcript_segments)} segments "
+                    f"in {transcription_time:.2f}s"
+                )
+                await self._save_checkpoint(checkpoint, "transcription", self._transcription_record(
+                    transcript_segments, stt_engine_name, transcription_time,
+                    word_alignment_deferred, transcription_peak_mb
+                ))
+
+            result = await self._diarize_and_assemble(
                 preprocessed_path,
                 meeting_id,
-                language=language
+                language,
+                num_speakers,
+                audio_metadata,
+                transcript_segments,
+                transcription_time,
+                stt_engine_name,
+                pipeline_start_time,
+                word_alignment_deferred=word_alignment_deferred,
+                transcription_peak_mb=transcription_peak_mb
             )
-            transcription_time = time.time() - transcription_start
+            await self._save_checkpoint(checkpoint, "diarization", result.to_dict())
+
+            logger.log_operation_success(
+                "process_audio_pipeline",
+                meeting_id=meeting_id,
+                total_time=f"{result.processing_time_seconds:.2f}s",
+                segments=len(result.transcript.segments),
+                speakers=result.num_speakers_detected,
+                avg_confidence=f"{result.average_confidence:.2f}" if result.average_confidence else "N/A"
+            )
+
+            return result
 
-            logger.info(
-                f"Transcription complete: {len(transcript_segments)} segments "
-                f"in {transcription_time:.2f}s"
+        except Exception as e:
+            logger.log_operation_failure(
+                "process_audio_pipeline",
+                e,
+                meeting_id=meeting_id
             )
+            raise
+
+    async def _diarize_and_assemble(
+        self,
+        preprocessed_path: Path,
+        meeting_id: str,
+        language: str,
+        num_speakers: Optional[int],
+        audio_metadata: AudioMetadata,
+        transcript_segments: List[TranscriptSegment],
+        transcription_time: float,
+        stt_engine_name: str,
+        pipeline_start_time: float,
+        word_alignment_deferred: bool = False,
+        transcription_peak_mb: Optional[float] = None
+    ) -> PipelineResult:
+        """
+        Stages 3-6: diarize, label the transcript, extract embeddings and
+        build the pipeline result
 
-            # Stage 3: Speaker Diarization
-            diarization_start = time.time()
+        Args:
+            preprocessed_path: Audio the transcript was decoded from
+            meeting_id: Meeting ID
+            language: Transcript language
+            num_speakers: Known number of speakers
+            audio_metadata: Metadata of the preprocessed audio
+            transcript_segments: STT output
+            transcription_time: Seconds spent in STT
+            stt_engine_name: Engine spec used for STT
+            pipeline_start_time: time.time() when processing started
+            word_alignment_deferred: Whether STT skipped word alignment
+            transcription_peak_mb: Peak CUDA memory of the STT stage
+
+        Returns:
+            PipelineResult
+        """
+        # Stage 3: Speaker Diarization
+        diarization_start = time.time()
+        with track_peak_memory() as diarization_memory:
             diarization = await self.diarization_engine.diarize(
                 preprocessed_path,
                 meeting_id,
@@ -195,100 +401,217 @@ class STTPipeline:
                 min_speakers=1,
                 max_speakers=10
             )
-            diarization_time = time.time() - diarization_start
+        diarization_time = time.time() - diarization_start
 
-            num_speakers_detected = len(list(diarization.labels()))
-            logger.info(
-                f"Diarization complete: {num_speakers_detected} speakers "
-                f"in {diarization_time:.2f}s"
-            )
+        num_speakers_detected = len(list(diarization.labels()))
+        logger.info(
+            f"Diarization complete: {num_speakers_detected} speakers "
+            f"in {diarization_time:.2f}s"
+        )
+
+        # Stage 4: Align transcript with speaker labels
+        alignment_start = time.time()
+        aligned_segments = await self.diarization_engine.align_with_transcript(
+            diarization,
+            transcript_segments,
+            meeting_id
+        )
+        alignment_time = time.time() - alignment_start
 
-            # Stage 4: Align transcript with speaker labels
-            alignment_start = time.time()
-            aligned_segments = await self.diarization_engine.align_with_transcript(
+        # Stage 5: Extract speaker embeddings (optional - may fail if model not available)
+        speaker_embeddings = {}
+        try:
+            speaker_embeddings = await self.diarization_engine.extract_speaker_embeddings(
+                preprocessed_path,
                 diarization,
-                transcript_segments,
                 meeting_id
             )
-            alignment_time = time.time() - alignment_start
+        except Exception as e:
+            logger.warning(
+                f"Speaker embedding extraction failed (optional feature): {e}. "
+                f"Continuing without embeddings."
+            )
 
-            # Stage 5: Extract speaker embeddings (optional - may fail if model not available)
-            speaker_embeddings = {}
-            try:
-                speaker_embeddings = await self.diarization_engine.extract_speaker_embeddings(
-                    preprocessed_path,
-                    diarization,
-                    meeting_id
-                )
-            except Exception as e:
-                logger.warning(
-                    f"Speaker embedding extraction failed (optional feature): {e}. "
-                    f"Continuing without embeddings."
-                )
+        # Stage 6: Create speaker objects
+        speakers = self._create_speaker_objects(
+            diarization,
+            speaker_embeddings,
+            meeting_id
+        )
 
-            # Stage 6: Create speaker objects
-            speakers = self._create_speaker_objects(
-                diarization,
-                speaker_embeddings,
-                meeting_id
-            )
+        # Create transcript object
+        transcript = Transcript(
+            meeting_id=meeting_id,
+            segments=aligned_segments,
+            language=language,
+            duration=audio_metadata.duration_seconds
+        )
 
-            # Create transcript object
-            transcript = Transcript(
-                meeting_id=meeting_id,
-                segments=aligned_segments,
-                language=language,
-                duration=audio_metadata.duration_seconds
+        # Calculate metrics
+        average_confidence = self._calculate_average_confidence(aligned_segments)
+        alignment_rate = self._calculate_alignment_rate(aligned_segments)
+
+        # Total processing time
+        total_time = time.time() - pipeline_start_time
+
+        gpu_peak_memory_mb = {
+            stage: round(peak_mb, 1)
+            for stage, peak_mb in (
+                ("transcription", transcription_peak_mb),
+                ("diarization", diarization_memory.peak_mb)
             )
+            if peak_mb is not None
+        }
+
+        # Create result
+        result = PipelineResult(
+            meeting_id=meeting_id,
+            audio_metadata=audio_metadata,
+            transcript=transcript,
+            speakers=speakers,
+            speaker_embeddings=speaker_embeddings,
+            processing_time_seconds=total_time,
+            transcription_time=transcription_time,
+            diarization_time=diarization_time,
+            alignment_time=alignment_time,
+            average_confidence=average_confidence,
+            num_speakers_detected=num_speakers_detected,
+            alignment_rate=alignment_rate,
+            stt_engine=stt_engine_name,
+            word_alignment_deferred=word_alignment_deferred,
+            gpu_peak_memory_mb=gpu_peak_memory_mb
+        )
 
-            # Calculate metrics
-            average_confidence = self._calculate_average_confidence(aligned_segments)
-            alignment_rate = self._calculate_alignment_rate(aligned_segments)
+        return result
+
+    @staticmethod
+    async def _load_checkpoint(
+        checkpoint: Optional[StageCheckpointStore],
+        stage: str
+    ) -> Optional[Dict]:
+        """Data of a finished stage (None without a checkpoint store)"""
+        if checkpoint is None:
+            return None
+        return await asyncio.to_thread(checkpoint.load, stage)
+
+    @staticmethod
+    def _transcription_record(
+        segments: List[TranscriptSegment],
+        stt_engine_name: str,
+        transcription_time: float,
+        word_alignment_deferred: bool,
+        peak_mb: Optional[float]
+    ) -> Dict:
+        """Checkpoint data of the transcription stage (restored in process_audio)"""
+        return {
+            "segments": [segment.model_dump(mode="json") for segment in segments],
+            "stt_engine": stt_engine_name,
+            "transcription_time": transcription_time,
+            "word_alignment_deferred": word_alignment_deferred,
+            "gpu_peak_mb": peak_mb
+        }
 
-            # Total processing time
-            total_time = time.time() - pipeline_start_time
+    @staticmethod
+    async def _save_checkpoint(
+        checkpoint: Optional[StageCheckpointStore],
+        stage: str,
+        data: Dict
+    ) -> None:
+        """Save a finished stage (best effort: a failed write never fails the job)"""
+        if checkpoint is None:
+            return
+        try:
+            await asyncio.to_thread(checkpoint.save, stage, data)
+        except OSError as e:
+            logger.warning(f"Failed to checkpoint {stage} of {checkpoint.meeting_id}: {e}")
 
-            # Create result
-            result = PipelineResult(
-                meeting_id=meeting_id,
-                audio_metadata=audio_metadata,
-                transcript=transcript,
-                speakers=speakers,
-                speaker_embeddings=speaker_embeddings,
-                processing_time_seconds=total_time,
-                transcription_time=transcription_time,
-                diarization_time=diarization_time,
-                alignment_time=alignment_time,
-                average_confidence=average_confidence,
-                num_speakers_detected=num_speakers_detected,
-                alignment_rate=alignment_rate
-            )
+    async def _select_stt_engine(
+        self,
+        duration_seconds: float,
+        preference: Optional[str]
+    ) -> Tuple[STTEngine, str]:
+        """
+        Get the STT engine for a job
 
-            logger.log_operation_success(
-                "process_audio_pipeline",
-                meeting_id=meeting_id,
-                total_time=f"{total_time:.2f}s",
-                segments=len(aligned_segments),
-                speakers=num_speakers_detected,
-                avg_confidence=f"{average_confidence:.2f}" if average_confidence else "N/A"
-            )
+        Args:
+            duration_seconds: Audio length
+            preference: Per-user engine setting
 
-            return result
+        Returns:
+            Tuple of (initialized engine, engine spec string)
+        """
+        if self.whisperx_engine:
+            return self.whisperx_engine, f"whisperx:{self.whisperx_engine.config.model_size}"
 
-        except Exception as e:
-            logger.log_operation_failure(
-                "process_audio_pipeline",
-                e,
-                meeting_id=meeting_id
+        spec = self.stt_engine_registry.select(duration_seconds, preference)
+        return await self.stt_engine_registry.get(spec), str(spec)
+
+    async def _transcribe(
+        self,
+        stt_engine: STTEngine,
+        audio_path: Path,
+        meeting_id: str,
+        language: str,
+        audio_metadata: AudioMetadata,
+        on_segments: Optional[SegmentBatchCallback],
+        word_alignment: bool = True
+    ) -> List[TranscriptSegment]:
+        """
+        Transcribe, passing segments to on_segments in batches as they are decoded
+
+        A batch is flushed every STT_STREAM_BATCH_SEGMENTS segments or
+        STT_STREAM_BATCH_SECONDS seconds, whichever comes first. Callback
+        failures are logged and do not stop transcription.
+        """
+        if on_segments is None or not isinstance(stt_engine, StreamingSTTEngine):
+            kwargs = {}
+            if isinstance(stt_engine, AligningSTTEngine):
+                kwargs["word_alignment"] = word_alignment
+            return await stt_engine.transcribe(
+                audio_path,
+                meeting_id,
+                language=language,
+                audio_metadata=audio_metadata,
+                **kwargs
             )
-            raise
+
+        segments: List[TranscriptSegment] = []
+        batch: List[TranscriptSegment] = []
+        last_flush = time.monotonic()
+
+        async def flush() -> None:
+            nonlocal batch, last_flush
+            if batch:
+                try:
+                    await on_segments(batch)
+                except Exception as e:
+                    logger.warning(f"Segment callback failed for meeting {meeting_id}: {e}")
+            batch = []
+            last_flush = time.monotonic()
+
+        async for segment in stt_engine.transcribe_stream(
+            audio_path,
+            meeting_id,
+            language=language,
+            audio_metadata=audio_metadata
+        ):
+            segments.append(segment)
+            batch.append(segment)
+            if (
+                len(batch) >= STT_STREAM_BATCH_SEGMENTS
+                or time.monotonic() - last_flush >= STT_STREAM_BATCH_SECONDS
+            ):
+                await flush()
+
+        await flush()
+        return segments
 
     async def _preprocess_audio(
         self,
         audio_path: Path,
         meeting_id: str,
         enhance: bool
-    ) -> Path:
+    ) -> Tuple[Path, Optional[AudioMetadata]]:
         """
         Preprocess audio file
 
@@ -298,11 +621,13 @@ class STTPipeline:
             enhance: Whether to apply enhancement
 
         Returns:
-            Path to preprocessed audio
+            Tuple of (path to preprocessed audio, preprocessing metadata or
+            None for the enhancement path)
         """
         # Create output path
         output_path = AUDIO_TEMP_DIR / f"{meeting_id}_preprocessed.wav"
 
+        metadata = None
         if not enhance:
             # Just resample and normalize
             metadata = await self.audio_processor.preprocess_audio(
@@ -327,7 +652,7 @@ class STTPipeline:
                 output_path
             )
 
-        return output_path
+        return output_path, metadata
 
     async def _get_audio_metadata(self, audio_path: Path) -> AudioMetadata:
         """Get audio metadata"""
@@ -399,30 +724,141 @@ class STTPipeline:
         self,
         audio_paths: List[Path],
         meeting_ids: List[str],
-        language: str = "ko"
+        language: str = "ko",
+        enhance_audio: bool = True,
+        audio_metadata: Optional[List[Optional[AudioMetadata]]] = None,
+        stt_engine_preference: Optional[str] = None,
+        word_alignment: Optional[bool] = None,
+        checkpoints: Optional[Dict[str, StageCheckpointStore]] = None
     ) -> List[PipelineResult]:
         """
         Process multiple audio files in batch
 
+        With an engine that supports it (BatchSTTEngine), STT for all files
+        runs as one call so short recordings share model batches; diarization
+        then runs per file. Otherwise files are transcribed one at a time.
+
         Args:
             audio_paths: List of audio file paths
             meeting_ids: List of meeting IDs (must match audio_paths length)
             language: Language code
+            enhance_audio: Whether to apply audio enhancement
+            audio_metadata: Preprocessing metadata per file when audio_paths
+                are already preprocessed
+            stt_engine_preference: STT engine setting shared by the batch
+            word_alignment: Word alignment setting shared by the batch (None =
+                by duration, per file)
+            checkpoints: Stage checkpoints per meeting ID; finished stages are
+                saved (resuming goes through process_audio)
 
         Returns:
-            List of PipelineResult objects
+            List of PipelineResult objects (files that failed are left out)
         """
         if len(audio_paths) != len(meeting_ids):
             raise ValueError("audio_paths and meeting_ids must have same length")
 
+        if not self._is_initialized:
+            await self.initialize()
+
         logger.info(f"Starting batch processing for {len(audio_paths)} files")
+        batch_start_time = time.time()
 
-        results = []
+        # Stage 1: Audio Preprocessing (per file)
+        prepared: List[Tuple[str, Path, AudioMetadata]] = []
+        for audio_path, meeting_id, metadata in zip(
+            audio_paths, meeting_ids, audio_metadata or [None] * len(audio_paths)
+        ):
+            try:
+                preprocessed_path = audio_path
+                if self.enable_preprocessing or enhance_audio:
+                    preprocessed_path, metadata = await self._preprocess_audio(
+                        audio_path,
+                        meeting_id,
+                        enhance_audio
+                    )
+                if metadata is None:
+                    metadata = await self._get_audio_metadata(preprocessed_path)
+                prepared.append((meeting_id, preprocessed_path, metadata))
+            except Exception as e:
+                logger.error(f"Failed to preprocess {meeting_id}: {e}")
 
-        # Process each file (can be parallelized with asyncio.gather)
-        for audio_path, meeting_id in zip(audio_paths, meeting_ids):
+        if not prepared:
+            return []
+
+        # Stage 2: Speech-to-Text Transcription (one engine for the whole batch)
+        stt_engine, stt_engine_name = await self._select_stt_engine(
+            max(metadata.duration_seconds for _, _, metadata in prepared),
+            stt_engine_preference
+        )
+
+        aligning = isinstance(stt_engine, AligningSTTEngine)
+        align = {
+            meeting_id: use_word_alignment(metadata.duration_seconds, word_alignment, STT_FAST_MODE_SECONDS)
+            for meeting_id, _, metadata in prepared
+        }
+
+        transcripts: Dict[str, List[TranscriptSegment]] = {}
+        transcription_times: Dict[str, float] = {}
+        transcription_peaks: Dict[str, Optional[float]] = {}
+        # transcribe_batch takes one alignment setting; mixed batches go file by file
+        batch_align = set(align.values())
+        if len(prepared) > 1 and isinstance(stt_engine, BatchSTTEngine) and len(batch_align) == 1:
+            kwargs = {"word_alignment": batch_align.pop()} if aligning else {}
+            logger.info(f"Transcribing {len(prepared)} files together with {stt_engine_name}")
+            transcription_start = time.time()
+            with track_peak_memory() as batch_memory:
+                transcripts = await stt_engine.transcribe_batch(
+                    [path for _, path, _ in prepared],
+                    [meeting_id for meeting_id, _, _ in prepared],
+                    language=language,
+                    audio_metadata=[metadata for _, _, metadata in prepared],
+                    **kwargs
+                )
+            # Attribute the shared STT time by audio length
+            elapsed = time.time() - transcription_start
+            total_duration = sum(metadata.duration_seconds for _, _, metadata in prepared) or 1.0
+            transcription_times = {
+                meeting_id: elapsed * metadata.duration_seconds / total_duration
+                for meeting_id, _, metadata in prepared
+            }
+            # The batch shares one peak
+            transcription_peaks = {meeting_id: batch_memory.peak_mb for meeting_id in transcripts}
+
+        results = []
+        for meeting_id, preprocessed_path, metadata in prepared:
             try:
-                result = await self.process_audio(audio_path, meeting_id, language)
+                # Not batched, or failed in the batch: transcribe on its own
+                if meeting_id not in transcripts:
+                    transcription_start = time.time()
+                    with track_peak_memory() as transcription_memory:
+                        transcripts[meeting_id] = await self._transcribe(
+                            stt_engine, preprocessed_path, meeting_id, language, metadata, None,
+                            align[meeting_id]
+                        )
+                    transcription_times[meeting_id] = time.time() - transcription_start
+                    transcription_peaks[meeting_id] = transcription_memory.peak_mb
+
+                checkpoint = (checkpoints or {}).get(meeting_id)
+                await self._save_checkpoint(checkpoint, "transcription", self._transcription_record(
+                    transcripts[meeting_id], stt_engine_name, transcription_times[meeting_id],
+                    aligning and not align[meeting_id], transcription_peaks.get(meeting_id)
+                ))
+
+                # Stages 3-6: Diarization and result assembly (per file)
+                result = await self._diarize_and_assemble(
+                    preprocessed_path,
+                    meeting_id,
+                    language,
+                    None,
+                    metadata,
+                    transcripts[meeting_id],
+                    transcription_times[meeting_id],
+                    stt_engine_name,
+                    batch_start_time,
+                    word_alignment_deferred=aligning and not align[meeting_id],
+                    transcription_peak_mb=transcription_peaks.get(meeting_id)
+                )
+                await self._save_checkpoint(checkpoint, "diarization", result.to_dict())
                 results.append(result)
             except Exception as e:
                 logger.error(f"Failed to process {meeting_id}: {e}")
@@ -432,13 +868,51 @@ class STTPipeline:
 
         return results
 
+    async def align_transcript(
+        self,
+        audio_path: Path,
+        segments: List[TranscriptSegment],
+        language: str = "ko",
+        audio_metadata: Optional[AudioMetadata] = None,
+        stt_engine_preference: Optional[str] = None
+    ) -> List[TranscriptSegment]:
+        """
+        Run the word alignment that fast mode skipped
+
+        Args:
+            audio_path: Preprocessed audio of the meeting
+            segments: Saved transcript segments (with speakers)
+            language: Transcript language
+            audio_metadata: Preprocessing metadata of audio_path
+            stt_engine_preference: Per-user STT engine setting
+
+        Returns:
+            Word-aligned segments (speakers kept)
+
+        Raises:
+            TranscriptionError: If alignment fails
+        """
+        if audio_metadata is None:
+            audio_metadata = await self._get_audio_metadata(audio_path)
+
+        engine, _ = await self._select_stt_engine(audio_metadata.duration_seconds, stt_engine_preference)
+        if not isinstance(engine, AligningSTTEngine):
+            # Only WhisperX skips alignment, so a fast-mode transcript came from it
+            engine = await self.stt_engine_registry.get(EngineSpec("whisperx"))
+
+        return await engine.align_segments(audio_path, segments, language, audio_metadata)
+
     def get_pipeline_info(self) -> Dict[str, any]:
         """Get information about pipeline components"""
         return {
             "initialized": self._is_initialized,
             "preprocessing_enabled": self.enable_preprocessing,
             "noise_reduction_enabled": self.enable_noise_reduction,
-            "whisperx": self.whisperx_engine.get_model_info() if self._is_initialized else {},
+            "whisperx": (
+                self.whisperx_engine.get_model_info()
+                if self._is_initialized and self.whisperx_engine else {}
+            ),
+            "stt_engines": self.stt_engine_registry.get_info(),
             "diarization": self.diarization_engine.get_pipeline_info() if self._is_initialized else {}
         }
 
@@ -448,6 +922,8 @@ class STTPipeline:
 
         if self.whisperx_engine:
             await self.whisperx_engine.cleanup()
+        else:
+            await self.stt_engine_registry.cleanup()
 
         if self.diarization_engine:
             await self.diarization_engine.cleanup()
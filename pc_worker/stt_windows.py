@@ -0,0 +1,262 @@
+"""
+STT Window Planning Module
+Splits long recordings into transcription windows at detected silences
+and stitches the per-window results back into one timeline
+
+Features:
+- Cut points are placed in the widest silence gap near the target window
+  length, so windows rarely split a word
+- Each window carries a small overlap on both sides for decoder context;
+  ownership of the overlap is decided by the cut point
+- Stitching offsets window-relative timestamps and drops duplicated
+  segments decoded in the overlap
+- Batched decoding helpers: speech packed into decoder-sized chunks,
+  chunks balanced across model replicas, and CPU cores partitioned
+  between replicas
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from logger import get_logger
+
+logger = get_logger("stt_windows")
+
+
+@dataclass
+class AudioWindow:
+    """A transcription window on the recording timeline (seconds)"""
+    index: int
+    start: float       # audio start including leading overlap
+    end: float         # audio end including trailing overlap
+    keep_start: float  # cut point owned by this window
+    keep_end: float    # cut point owned by the next window
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def plan_windows(
+    speech_segments: Sequence[Tuple[float, float]],
+    duration: float,
+    target_seconds: float = 600.0,
+    search_seconds: float = 60.0,
+    overlap_seconds: float = 1.0
+) -> List[AudioWindow]:
+    """
+    Plan transcription windows cut at silences.
+
+    For each window the cut is the middle of the widest silence gap whose
+    midpoint lies within target_seconds +/- search_seconds of the window
+    start. Without a gap in that range the window is cut at exactly
+    target_seconds.
+
+    Args:
+        speech_segments: Sorted (start, end) speech regions in seconds
+        duration: Total audio duration in seconds
+        target_seconds: Preferred window length
+        search_seconds: How far from the target a cut may move
+        overlap_seconds: Extra audio decoded on each side of a window
+
+    Returns:
+        Windows covering [0, duration]
+    """
+    if duration <= 0:
+        return []
+
+    # Silence gaps as (midpoint, width)
+    gaps = [
+        ((prev_end + next_start) / 2, next_start - prev_end)
+        for (_, prev_end), (next_start, _) in zip(speech_segments, speech_segments[1:])
+        if next_start > prev_end
+    ]
+
+    cuts = [0.0]
+    while duration - cuts[-1] > target_seconds + search_seconds:
+        cursor = cuts[-1]
+        target = cursor + target_seconds
+        candidates = [
+            (width, -abs(mid - target), mid) for mid, width in gaps
+            if target - search_seconds <= mid <= target + search_seconds
+        ]
+        cuts.append(max(candidates)[2] if candidates else target)
+    cuts.append(duration)
+
+    return [
+        AudioWindow(
+            index=i,
+            start=max(0.0, keep_start - overlap_seconds),
+            end=min(duration, keep_end + overlap_seconds),
+            keep_start=keep_start,
+            keep_end=keep_end
+        )
+        for i, (keep_start, keep_end) in enumerate(zip(cuts, cuts[1:]))
+    ]
+
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _normalize_text(text: str) -> str:
+    return _NON_WORD.sub("", text).lower()
+
+
+def _offset_segment(segment: Dict, offset: float) -> Dict:
+    shifted = dict(segment)
+    for key in ("start", "end"):
+        if key in shifted:
+            shifted[key] = shifted[key] + offset
+    if shifted.get("words"):
+        shifted["words"] = [
+            {k: (v + offset if k in ("start", "end") else v) for k, v in word.items()}
+            for word in shifted["words"]
+        ]
+    return shifted
+
+
+def stitch_windows(
+    window_results: Sequence[Tuple[AudioWindow, List[Dict]]],
+    overlap_seconds: float = 1.0
+) -> List[Dict]:
+    """
+    Merge per-window WhisperX segments into one timeline.
+
+    Segment times are shifted by the window start. A segment belongs to
+    the window whose [keep_start, keep_end) range contains its midpoint;
+    a kept segment whose text repeats the previous one within the
+    overlap is dropped as a duplicate.
+
+    Args:
+        window_results: (window, segments with window-relative times)
+        overlap_seconds: Overlap used when planning the windows
+
+    Returns:
+        Segments with recording-relative times, sorted by start
+    """
+    ordered = sorted(window_results, key=lambda item: item[0].index)
+    stitched: List[Dict] = []
+    duplicates = 0
+
+    for position, (window, segments) in enumerate(ordered):
+        is_last = position == len(ordered) - 1
+        for segment in segments:
+            shifted = _offset_segment(segment, window.start)
+            midpoint = (shifted["start"] + shifted["end"]) / 2
+            if midpoint < window.keep_start:
+                continue
+            if midpoint >= window.keep_end and not is_last:
+                continue
+
+            if stitched:
+                previous = stitched[-1]
+                text = _normalize_text(shifted.get("text", ""))
+                if (
+                    text
+                    and text == _normalize_text(previous.get("text", ""))
+                    and shifted["start"] < previous["end"] + overlap_seconds
+                ):
+                    duplicates += 1
+                    continue
+
+            stitched.append(shifted)
+
+    stitched.sort(key=lambda seg: seg["start"])
+    if duplicates:
+        logger.debug(f"Dropped {duplicates} duplicated overlap segments")
+    return stitched
+
+
+# ============================================================================
+# Batched decoding
+# ============================================================================
+
+def pack_speech_chunks(
+    speech_segments: Sequence[Tuple[float, float]],
+    max_chunk_seconds: float = 30.0
+) -> List[Tuple[float, float]]:
+    """
+    Pack speech regions into chunks that fit one decoder window.
+
+    Consecutive regions are merged while the merged span stays within
+    max_chunk_seconds; a single longer region is split into equal parts.
+
+    Args:
+        speech_segments: Sorted (start, end) speech regions in seconds
+        max_chunk_seconds: Longest chunk (Whisper decodes 30s windows)
+
+    Returns:
+        Sorted (start, end) chunks in seconds
+    """
+    pieces: List[Tuple[float, float]] = []
+    for start, end in speech_segments:
+        parts = max(1, int(-(-(end - start) // max_chunk_seconds)))
+        step = (end - start) / parts
+        pieces.extend((start + i * step, start + (i + 1) * step) for i in range(parts))
+
+    chunks: List[Tuple[float, float]] = []
+    for start, end in pieces:
+        if chunks and end - chunks[-1][0] <= max_chunk_seconds:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
+
+
+def balance_chunks(
+    chunks: Sequence[Tuple[float, float]],
+    num_groups: int
+) -> List[List[Tuple[float, float]]]:
+    """
+    Split chunks into groups of similar total duration.
+
+    Longest chunks are assigned first, each to the least-loaded group;
+    every group is then put back in time order.
+
+    Args:
+        chunks: (start, end) chunks in seconds
+        num_groups: Number of groups (model replicas)
+
+    Returns:
+        Non-empty groups of time-ordered chunks
+    """
+    groups: List[List[Tuple[float, float]]] = [[] for _ in range(max(1, num_groups))]
+    loads = [0.0] * len(groups)
+    for chunk in sorted(chunks, key=lambda c: c[1] - c[0], reverse=True):
+        target = loads.index(min(loads))
+        groups[target].append(chunk)
+        loads[target] += chunk[1] - chunk[0]
+    return [sorted(group) for group in groups if group]
+
+
+def plan_replica_cores(
+    num_replicas: int,
+    cores: Optional[Sequence[int]] = None
+) -> List[List[int]]:
+    """
+    Partition CPU cores into contiguous sets, one per model replica.
+
+    Args:
+        num_replicas: Requested replicas (capped at the number of cores)
+        cores: Usable core IDs (the process CPU affinity if None)
+
+    Returns:
+        One non-empty core list per replica
+    """
+    if cores is None:
+        if hasattr(os, "sched_getaffinity"):
+            cores = sorted(os.sched_getaffinity(0))
+        else:
+            cores = list(range(os.cpu_count() or 1))
+
+    num_replicas = max(1, min(num_replicas, len(cores)))
+    base, extra = divmod(len(cores), num_replicas)
+    partitions = []
+    position = 0
+    for index in range(num_replicas):
+        size = base + (1 if index < extra else 0)
+        partitions.append(list(cores[position:position + size]))
+        position += size
+    return partitions
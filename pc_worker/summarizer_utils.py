@@ -9,7 +9,7 @@ import re
 import time
 import logging
 import requests
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -90,6 +90,43 @@ def ensure_ollama_ready(
         raise OllamaConnectionError(f"Ollama 서버 통신 오류: {e}")
 
 
+def load_ollama_model(
+    model: str = DEFAULT_MODEL,
+    ollama_url: str = OLLAMA_URL,
+    keep_alive: Union[int, str] = -1,
+    timeout: int = 300
+) -> None:
+    """
+    모델을 GPU 메모리에 미리 로드 (프롬프트 없는 generate 요청)
+
+    Args:
+        model: 모델명
+        ollama_url: Ollama 서버 URL
+        keep_alive: 유지 시간 (-1이면 unload_ollama_model 호출 전까지 유지)
+        timeout: 요청 타임아웃 (초, 모델 로드 시간 포함)
+    """
+    response = requests.post(
+        f"{ollama_url}/api/generate",
+        json={"model": model, "keep_alive": keep_alive},
+        timeout=timeout
+    )
+    response.raise_for_status()
+
+
+def unload_ollama_model(
+    model: str = DEFAULT_MODEL,
+    ollama_url: str = OLLAMA_URL,
+    timeout: int = 30
+) -> None:
+    """모델을 GPU 메모리에서 즉시 내림 (keep_alive=0)"""
+    response = requests.post(
+        f"{ollama_url}/api/generate",
+        json={"model": model, "keep_alive": 0},
+        timeout=timeout
+    )
+    response.raise_for_status()
+
+
 def format_time(seconds: Optional[float]) -> str:
     """초를 MM:SS 형식으로 변환"""
     if seconds is None:
@@ -112,7 +149,8 @@ def call_ollama(
     timeout: int = 120,
     max_retries: int = MAX_RETRIES,
     retry_delay: float = RETRY_DELAY,
-    raise_on_empty: bool = True
+    raise_on_empty: bool = True,
+    keep_alive: Optional[Union[int, str]] = None
 ) -> str:
     """
     Ollama API 호출 (재시도 및 검증 로직 포함)
@@ -126,6 +164,8 @@ def call_ollama(
         max_retries: 최대 재시도 횟수
         retry_delay: 재시도 간 대기 시간 (초)
         raise_on_empty: 빈 응답 시 예외 발생 여부
+        keep_alive: 응답 후 모델을 메모리에 유지할 시간 (None이면 서버 기본값,
+            -1이면 unload_ollama_model 호출 전까지 유지)
 
     Returns:
         LLM 응답 텍스트
@@ -136,16 +176,20 @@ def call_ollama(
     """
     last_error = None
 
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        "options": {"temperature": temperature, "num_predict": 2000}
+    }
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+
     for attempt in range(max_retries):
         try:
             response = requests.post(
                 f"{ollama_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {"temperature": temperature, "num_predict": 2000}
-                },
+                json=payload,
                 timeout=timeout
             )
 
@@ -7,7 +7,6 @@ import asyncio
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from pathlib import Path
-import aiohttp
 
 from supabase import create_client, Client
 from postgrest.exceptions import APIError
@@ -31,6 +30,7 @@ from exceptions import (
     RetryExhaustedError,
 )
 from utils import retry_with_backoff
+from audio_downloader import get_audio_downloader
 
 
 class SupabaseClient:
@@ -194,6 +194,83 @@ class SupabaseClient:
             logger.error(f"Unexpected error updating meeting status: {e}")
             raise SupabaseQueryError(f"Unexpected error: {e}")
 
+    @retry_with_backoff(max_attempts=3, initial_delay=1.0)
+    async def claim_meeting(self, meeting_id: str, worker_id: str) -> bool:
+        """
+        Claim a pending meeting for this worker ('pending' -> 'processing')
+
+        The update only matches while the meeting is still pending, so when
+        several workers poll the same meeting only one of them claims it.
+
+        Args:
+            meeting_id: Meeting identifier
+            worker_id: Worker claiming the meeting (stored in processed_by)
+
+        Returns:
+            True if this worker claimed the meeting
+
+        Raises:
+            SupabaseQueryError: If update fails
+        """
+        try:
+            response = await asyncio.to_thread(
+                lambda: self.client.table("meetings")
+                .update({
+                    "status": MeetingStatus.PROCESSING.value,
+                    "processed_by": worker_id,
+                    "updated_at": datetime.now().isoformat(),
+                })
+                .eq("id", meeting_id)
+                .eq("status", MeetingStatus.PENDING.value)
+                .execute()
+            )
+            return bool(response.data)
+
+        except APIError as e:
+            logger.error(f"Supabase API error claiming meeting: {e}")
+            raise SupabaseQueryError(f"Failed to claim meeting: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error claiming meeting: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
+    @retry_with_backoff(max_attempts=3, initial_delay=1.0)
+    async def requeue_interrupted_meetings(self, worker_id: str) -> List[str]:
+        """
+        Set meetings a worker left in 'processing' back to 'pending'
+
+        Only safe when that worker has no jobs running (at its startup) and
+        its ID is unique: meetings of other workers sharing the ID would be
+        processed twice.
+
+        Args:
+            worker_id: Worker that claimed the meetings (processed_by)
+
+        Returns:
+            IDs of the requeued meetings
+
+        Raises:
+            SupabaseQueryError: If update fails
+        """
+        try:
+            response = await asyncio.to_thread(
+                lambda: self.client.table("meetings")
+                .update({
+                    "status": MeetingStatus.PENDING.value,
+                    "updated_at": datetime.now().isoformat()
+                })
+                .eq("status", MeetingStatus.PROCESSING.value)
+                .eq("processed_by", worker_id)
+                .execute()
+            )
+            return [row["id"] for row in response.data]
+
+        except APIError as e:
+            logger.error(f"Supabase API error requeuing interrupted meetings: {e}")
+            raise SupabaseQueryError(f"Failed to requeue interrupted meetings: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error requeuing interrupted meetings: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
     async def update_meeting_tags(self, meeting_id: str, tags: List[str]) -> bool:
         """
         Update meeting tags
@@ -361,6 +438,11 @@ class SupabaseClient:
         """
         Download audio file from URL to local path
 
+        Uses the shared ranged downloader: large files are fetched with
+        parallel Range requests, partial downloads resume from
+        <destination>.part, and size (plus MD5 when the ETag carries one)
+        is verified before the file is moved into place.
+
         Args:
             meeting_id: Meeting identifier (for logging)
             url: Audio file URL or Storage path
@@ -396,17 +478,7 @@ class SupabaseClient:
                     logger.error(f"Failed to generate signed URL: {e}")
                     raise AudioDownloadError(f"Storage signed URL error: {e}")
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(download_url) as response:
-                    if response.status != 200:
-                        raise AudioDownloadError(
-                            f"HTTP {response.status} when downloading audio"
-                        )
-
-                    # Download in chunks to handle large files
-                    with open(destination, "wb") as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
+            await get_audio_downloader().download(download_url, destination)
 
             if not destination.exists() or destination.stat().st_size == 0:
                 raise AudioDownloadError("Downloaded file is empty or missing")
@@ -417,9 +489,8 @@ class SupabaseClient:
             )
             return destination
 
-        except aiohttp.ClientError as e:
-            logger.error(f"Network error downloading audio: {e}")
-            raise AudioDownloadError(f"Network error: {e}")
+        except AudioDownloadError:
+            raise
         except IOError as e:
             logger.error(f"File I/O error downloading audio: {e}")
             raise AudioDownloadError(f"File I/O error: {e}")
@@ -471,6 +542,86 @@ class SupabaseClient:
             logger.error(f"Unexpected error saving transcript: {e}")
             raise SupabaseQueryError(f"Unexpected error: {e}")
 
+    @retry_with_backoff(max_attempts=3, initial_delay=1.0)
+    async def save_provisional_transcript_segments(
+        self, meeting_id: str, segments: List[TranscriptSegment]
+    ) -> bool:
+        """
+        Save segments decoded so far, before diarization
+
+        Rows are marked with metadata.provisional = true and replaced by the
+        final transcript (see delete_provisional_transcript).
+
+        Args:
+            meeting_id: Meeting identifier
+            segments: Newly decoded segments (no speaker labels yet)
+
+        Returns:
+            True if successful
+
+        Raises:
+            SupabaseQueryError: If save fails
+        """
+        try:
+            created_at = datetime.now().isoformat()
+            rows = [
+                {
+                    "meeting_id": meeting_id,
+                    "text": segment.text,
+                    "start_time": segment.start_time,
+                    "end_time": segment.end_time,
+                    "confidence": segment.confidence,
+                    "metadata": {"provisional": True},
+                    "created_at": created_at,
+                }
+                for segment in segments
+            ]
+            if rows:
+                await asyncio.to_thread(
+                    lambda: self.client.table("transcripts")
+                    .insert(rows)
+                    .execute()
+                )
+            return True
+
+        except APIError as e:
+            logger.error(f"Supabase API error saving provisional transcript: {e}")
+            raise SupabaseQueryError(f"Failed to save provisional transcript: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error saving provisional transcript: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
+    @retry_with_backoff(max_attempts=3, initial_delay=1.0)
+    async def delete_provisional_transcript(self, meeting_id: str) -> bool:
+        """
+        Delete provisional transcript rows of a meeting
+
+        Args:
+            meeting_id: Meeting identifier
+
+        Returns:
+            True if successful
+
+        Raises:
+            SupabaseQueryError: If delete fails
+        """
+        try:
+            await asyncio.to_thread(
+                lambda: self.client.table("transcripts")
+                .delete()
+                .eq("meeting_id", meeting_id)
+                .eq("metadata->>provisional", "true")
+                .execute()
+            )
+            return True
+
+        except APIError as e:
+            logger.error(f"Supabase API error deleting provisional transcript: {e}")
+            raise SupabaseQueryError(f"Failed to delete provisional transcript: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error deleting provisional transcript: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
     @retry_with_backoff(max_attempts=3, initial_delay=1.0)
     async def save_speakers(self, meeting_id: str, speakers: List[Speaker]) -> bool:
         """
@@ -557,6 +708,382 @@ class SupabaseClient:
             logger.error(f"Unexpected error saving summary: {e}")
             raise SupabaseQueryError(f"Unexpected error: {e}")
 
+    @retry_with_backoff(max_attempts=3, initial_delay=1.0)
+    async def get_user_stt_settings(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a user's STT settings
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Row with stt_engine ("name" or "name:model") and word_timestamps
+            (either may be None), or None if the user has no settings
+
+        Raises:
+            SupabaseQueryError: If query fails
+        """
+        try:
+            response = await asyncio.to_thread(
+                lambda: self.client.table("user_stt_settings")
+                .select("stt_engine, word_timestamps")
+                .eq("user_id", user_id)
+                .limit(1)
+                .execute()
+            )
+            return response.data[0] if response.data else None
+
+        except APIError as e:
+            logger.error(f"Supabase API error fetching STT settings: {e}")
+            raise SupabaseQueryError(f"Failed to fetch STT settings: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error fetching STT settings: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
+    @retry_with_backoff(max_attempts=3, initial_delay=1.0)
+    async def get_word_alignment_requests(self, limit: int = 1) -> List[str]:
+        """
+        Query meetings whose deferred word alignment was requested
+
+        Args:
+            limit: Maximum number of meetings to return
+
+        Returns:
+            Meeting IDs, oldest request first
+
+        Raises:
+            SupabaseQueryError: If query fails
+        """
+        try:
+            response = await asyncio.to_thread(
+                lambda: self.client.table("meetings")
+                .select("id")
+                .eq("word_alignment", "requested")
+                .order("updated_at", desc=False)
+                .limit(limit)
+                .execute()
+            )
+            return [row["id"] for row in response.data]
+
+        except APIError as e:
+            logger.error(f"Supabase API error getting word alignment requests: {e}")
+            raise SupabaseQueryError(f"Failed to query word alignment requests: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error getting word alignment requests: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
+    @retry_with_backoff(max_attempts=3, initial_delay=1.0)
+    async def update_word_alignment_state(
+        self,
+        meeting_id: str,
+        state: str,
+        expected_state: Optional[str] = None
+    ) -> bool:
+        """
+        Set a meeting's word alignment state (see migration 006)
+
+        Args:
+            meeting_id: Meeting identifier
+            state: deferred, requested, running, completed or failed
+            expected_state: Only update if the meeting is in this state
+                (claims a request so only one worker runs it)
+
+        Returns:
+            True if the meeting was updated
+
+        Raises:
+            SupabaseQueryError: If update fails
+        """
+        try:
+            def update():
+                query = (
+                    self.client.table("meetings")
+                    .update({"word_alignment": state, "updated_at": datetime.now().isoformat()})
+                    .eq("id", meeting_id)
+                )
+                if expected_state is not None:
+                    query = query.eq("word_alignment", expected_state)
+                return query.execute()
+
+            response = await asyncio.to_thread(update)
+            return bool(response.data)
+
+        except APIError as e:
+            logger.error(f"Supabase API error updating word alignment state: {e}")
+            raise SupabaseQueryError(f"Failed to update word alignment state: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error updating word alignment state: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
+    @retry_with_backoff(max_attempts=3, initial_delay=1.0)
+    async def get_transcript_segments(self, meeting_id: str) -> List[TranscriptSegment]:
+        """
+        Get the saved (non-provisional) transcript of a meeting
+
+        Args:
+            meeting_id: Meeting identifier
+
+        Returns:
+            Segments ordered by start time
+
+        Raises:
+            SupabaseQueryError: If query fails
+        """
+        try:
+            response = await asyncio.to_thread(
+                lambda: self.client.table("transcripts")
+                .select("start_time, end_time, text, speaker_id, speaker_label, confidence, metadata")
+                .eq("meeting_id", meeting_id)
+                .order("start_time", desc=False)
+                .execute()
+            )
+            return [
+                TranscriptSegment(
+                    meeting_id=meeting_id,
+                    start_time=row["start_time"],
+                    end_time=row["end_time"],
+                    text=row["text"],
+                    speaker_id=row.get("speaker_id"),
+                    speaker_label=row.get("speaker_label"),
+                    confidence=row.get("confidence")
+                )
+                for row in response.data
+                if not (row.get("metadata") or {}).get("provisional")
+            ]
+
+        except APIError as e:
+            logger.error(f"Supabase API error getting transcript: {e}")
+            raise SupabaseQueryError(f"Failed to get transcript: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error getting transcript: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
+    async def replace_transcript(self, meeting_id: str, transcript: Transcript) -> bool:
+        """
+        Replace a meeting's saved transcript
+
+        The new segments are inserted before the old rows are deleted, so
+        a failure never leaves the meeting without a transcript. Old rows
+        are looked up and deleted in pages, since long meetings have more
+        rows than fit in one request (row limit, URL length).
+
+        Args:
+            meeting_id: Meeting identifier
+            transcript: New transcript
+
+        Returns:
+            True if successful
+
+        Raises:
+            SupabaseQueryError: If the replacement fails
+        """
+        page_size = 100
+
+        try:
+            old_ids: List[str] = []
+            while True:
+                start = len(old_ids)
+                response = await asyncio.to_thread(
+                    lambda: self.client.table("transcripts")
+                    .select("id")
+                    .eq("meeting_id", meeting_id)
+                    .order("id")
+                    .range(start, start + page_size - 1)
+                    .execute()
+                )
+                old_ids.extend(row["id"] for row in response.data or [])
+                if len(response.data or []) < page_size:
+                    break
+
+            await self.save_transcript(meeting_id, transcript)
+
+            for i in range(0, len(old_ids), page_size):
+                batch = old_ids[i:i + page_size]
+                await asyncio.to_thread(
+                    lambda: self.client.table("transcripts")
+                    .delete()
+                    .in_("id", batch)
+                    .execute()
+                )
+            return True
+
+        except SupabaseQueryError:
+            raise
+        except APIError as e:
+            logger.error(f"Supabase API error replacing transcript: {e}")
+            raise SupabaseQueryError(f"Failed to replace transcript: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error replacing transcript: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
+    @retry_with_backoff(max_attempts=3, initial_delay=1.0)
+    async def find_processed_audio(
+        self, user_id: str, content_hash: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previously processed recording by content hash
+
+        Args:
+            user_id: Owner of the recording
+            content_hash: SHA-256 of the original audio file
+
+        Returns:
+            processed_audio row (meeting_id, duration_seconds, ...) or None
+
+        Raises:
+            SupabaseQueryError: If query fails
+        """
+        try:
+            response = await asyncio.to_thread(
+                lambda: self.client.table("processed_audio")
+                .select("*")
+                .eq("user_id", user_id)
+                .eq("content_hash", content_hash)
+                .limit(1)
+                .execute()
+            )
+            return response.data[0] if response.data else None
+
+        except APIError as e:
+            logger.error(f"Supabase API error looking up processed audio: {e}")
+            raise SupabaseQueryError(f"Failed to look up processed audio: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error looking up processed audio: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
+    @retry_with_backoff(max_attempts=3, initial_delay=1.0)
+    async def register_processed_audio(
+        self,
+        user_id: str,
+        content_hash: str,
+        duration_seconds: float,
+        meeting_id: str
+    ) -> bool:
+        """
+        Record that a recording has been fully processed into a meeting
+
+        Args:
+            user_id: Owner of the recording
+            content_hash: SHA-256 of the original audio file
+            duration_seconds: Decoded audio duration
+            meeting_id: Meeting holding the results
+
+        Returns:
+            True if successful
+
+        Raises:
+            SupabaseQueryError: If save fails
+        """
+        try:
+            await asyncio.to_thread(
+                lambda: self.client.table("processed_audio")
+                .upsert(
+                    {
+                        "user_id": user_id,
+                        "content_hash": content_hash,
+                        "duration_seconds": duration_seconds,
+                        "meeting_id": meeting_id,
+                    },
+                    on_conflict="user_id,content_hash",
+                )
+                .execute()
+            )
+            logger.debug(f"Registered audio hash {content_hash[:12]} for meeting {meeting_id}")
+            return True
+
+        except APIError as e:
+            logger.error(f"Supabase API error registering processed audio: {e}")
+            raise SupabaseQueryError(f"Failed to register processed audio: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error registering processed audio: {e}")
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
+    async def clone_meeting_results(
+        self, source_meeting_id: str, target_meeting_id: str
+    ) -> Dict[str, int]:
+        """
+        Copy transcript, speakers and summary of one meeting to another
+
+        Used when an uploaded recording is byte-identical to one that was
+        already processed. Speakers are copied first so the copied transcript
+        rows point at the target meeting's speakers. The copy is not atomic:
+        if any insert fails, the rows already copied to the target meeting
+        are deleted again before the error is raised.
+
+        Args:
+            source_meeting_id: Meeting whose results are copied
+            target_meeting_id: Meeting receiving the copies
+
+        Returns:
+            Number of rows copied per table
+
+        Raises:
+            SupabaseQueryError: If a copy fails
+        """
+        copied = {}
+        speaker_ids: Dict[str, str] = {}
+        now = datetime.now().isoformat()
+
+        try:
+            for table in ("speakers", "transcripts", "meeting_summaries"):
+                response = await asyncio.to_thread(
+                    lambda: self.client.table(table)
+                    .select("*")
+                    .eq("meeting_id", source_meeting_id)
+                    .execute()
+                )
+                source_rows = response.data or []
+
+                rows = []
+                for row in source_rows:
+                    row = {k: v for k, v in row.items() if k not in ("id", "updated_at")}
+                    row["meeting_id"] = target_meeting_id
+                    row["created_at"] = now
+                    if row.get("speaker_id") is not None:
+                        row["speaker_id"] = speaker_ids.get(row["speaker_id"])
+                    rows.append(row)
+
+                if rows:
+                    inserted = await asyncio.to_thread(
+                        lambda: self.client.table(table).insert(rows).execute()
+                    )
+                    if table == "speakers":
+                        # Inserted rows come back in insertion order
+                        speaker_ids = {
+                            old["id"]: new["id"]
+                            for old, new in zip(source_rows, inserted.data or [])
+                        }
+                copied[table] = len(rows)
+
+            logger.info(
+                f"Cloned results of meeting {source_meeting_id} into {target_meeting_id}: "
+                f"{copied}"
+            )
+            return copied
+
+        except APIError as e:
+            logger.error(f"Supabase API error cloning meeting results: {e}")
+            await self._delete_meeting_results(target_meeting_id, list(copied))
+            raise SupabaseQueryError(f"Failed to clone meeting results: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error cloning meeting results: {e}")
+            await self._delete_meeting_results(target_meeting_id, list(copied))
+            raise SupabaseQueryError(f"Unexpected error: {e}")
+
+    async def _delete_meeting_results(self, meeting_id: str, tables: List[str]) -> None:
+        """Delete a meeting's rows from the given tables (failures are only logged)"""
+        # Transcripts reference speakers, so delete in reverse copy order
+        for table in reversed(tables):
+            try:
+                await asyncio.to_thread(
+                    lambda: self.client.table(table)
+                    .delete()
+                    .eq("meeting_id", meeting_id)
+                    .execute()
+                )
+            except Exception as e:
+                logger.error(f"Failed to delete partial {table} copy of meeting {meeting_id}: {e}")
+
     @retry_with_backoff(max_attempts=3, initial_delay=1.0)
     async def list_templates(self, user_id: str) -> List[Template]:
         """
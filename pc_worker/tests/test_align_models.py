@@ -0,0 +1,84 @@
+"""
+Tests for Alignment Model Cache
+Lazy per-language loading, LRU eviction, unsupported languages, language runs,
+matching aligned segments back to their source segments
+"""
+
+import sys
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from align_models import AlignModelCache, group_by_language, match_source_segments
+
+
+def make_cache(max_models=2):
+    """Cache with a fake loader; returns (cache, loaded languages, release count)"""
+    loads: List[str] = []
+    releases: List[int] = []
+
+    def loader(language):
+        if language == "xx":
+            raise ValueError("No default align-model for language: xx")
+        loads.append(language)
+        return f"model-{language}", {"language": language}
+
+    cache = AlignModelCache(loader, max_models=max_models, release=lambda: releases.append(1))
+    return cache, loads, releases
+
+
+async def test_models_load_lazily_and_evict_least_recently_used():
+    """Each language loads once; the least recently used model is evicted"""
+    cache, loads, releases = make_cache(max_models=2)
+
+    assert await cache.get("ko") == ("model-ko", {"language": "ko"})
+    await cache.get("en")
+    await cache.get("ko")  # cached, now most recently used
+    assert loads == ["ko", "en"]
+
+    await cache.get("ja")  # evicts en
+    assert cache.languages == ["ko", "ja"]
+    assert len(releases) == 1
+
+    await cache.get("en")  # reloaded, evicts ko
+    assert loads == ["ko", "en", "ja", "en"]
+    assert cache.languages == ["ja", "en"]
+
+
+async def test_unsupported_language_is_remembered():
+    """A language without an alignment model returns None and is not retried"""
+    cache, loads, _ = make_cache()
+
+    assert await cache.get("xx") is None
+    assert await cache.get("xx") is None
+    assert cache.languages == []
+
+    cache.clear()
+    assert await cache.get("ko") is not None
+
+
+def test_group_by_language():
+    """Consecutive segments of one language form a run; untagged ones use the default"""
+    segments = [
+        {"text": "안녕하세요", "language": "ko"},
+        {"text": "네"},
+        {"text": "Let's start", "language": "en"},
+        {"text": "OK", "language": "en"},
+        {"text": "좋습니다", "language": "ko"},
+    ]
+
+    runs = group_by_language(segments, default="ko")
+
+    assert [(lang, len(run)) for lang, run in runs] == [("ko", 2), ("en", 2), ("ko", 1)]
+    assert runs[1][1][0]["text"] == "Let's start"
+
+
+def test_match_source_segments():
+    """Split segments map to the source containing their midpoint, else the nearest"""
+    sources = [(0.0, 4.0), (4.5, 10.0), (12.0, 15.0)]
+    aligned = [(0.1, 1.9), (2.0, 3.8), (4.6, 9.0), (10.2, 10.6), (11.5, 14.0)]
+
+    assert match_source_segments(aligned, sources) == [0, 0, 1, 1, 2]
+    assert match_source_segments([(0.0, 1.0)], []) == [None]
@@ -0,0 +1,189 @@
+"""
+Tests for duplicate-audio detection
+Content hashing, processed-audio lookup, result cloning and its rollback
+"""
+
+import itertools
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("supabase")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+
+from postgrest.exceptions import APIError
+
+import main_worker
+from exceptions import SupabaseQueryError
+from main_worker import PCWorker
+from supabase_client import SupabaseClient
+from utils import compute_content_hash
+
+
+class FakeQuery:
+    """Just enough of the postgrest query builder for the dedup queries"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.filters = []
+        self.action = "select"
+        self.rows = None
+        self.max_rows = None
+
+    def select(self, *columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def limit(self, count):
+        self.max_rows = count
+        return self
+
+    def insert(self, rows):
+        self.action, self.rows = "insert", rows
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def _matches(self, row):
+        return all(row.get(column) == value for column, value in self.filters)
+
+    def execute(self):
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.action == "insert":
+            if self.table in self.client.fail_inserts:
+                raise APIError({"message": f"insert into {self.table} failed"})
+            inserted = [{**row, "id": f"new-{next(self.client.ids)}"} for row in self.rows]
+            rows.extend(inserted)
+            data = inserted
+        elif self.action == "delete":
+            data = [row for row in rows if self._matches(row)]
+            rows[:] = [row for row in rows if not self._matches(row)]
+        else:
+            data = [dict(row) for row in rows if self._matches(row)][:self.max_rows]
+        return type("Response", (), {"data": data})()
+
+
+class FakeClient:
+    def __init__(self, tables, fail_inserts=()):
+        self.tables = tables
+        self.fail_inserts = set(fail_inserts)
+        self.ids = itertools.count(1)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def source_meeting_tables():
+    return {
+        "speakers": [
+            {"id": "spk-a", "meeting_id": "src", "speaker_label": "SPEAKER_00"},
+            {"id": "spk-b", "meeting_id": "src", "speaker_label": "SPEAKER_01"},
+        ],
+        "transcripts": [
+            {"id": "t1", "meeting_id": "src", "speaker_id": "spk-b", "text": "안녕하세요"},
+            {"id": "t2", "meeting_id": "src", "speaker_id": "spk-a", "text": "네"},
+            {"id": "t3", "meeting_id": "src", "speaker_id": None, "text": "음"},
+        ],
+        "meeting_summaries": [{"id": "s1", "meeting_id": "src", "summary": "요약"}],
+        "processed_audio": [
+            {"user_id": "u1", "content_hash": "abc", "duration_seconds": 60.0, "meeting_id": "src"},
+        ],
+    }
+
+
+def make_supabase(tables, fail_inserts=()):
+    supabase = object.__new__(SupabaseClient)
+    supabase._client = FakeClient(tables, fail_inserts)
+    return supabase
+
+
+def make_worker(supabase):
+    worker = object.__new__(PCWorker)
+    worker.supabase = supabase
+    worker.worker_id = "worker-1"
+    return worker
+
+
+def rows_of(tables, table, meeting_id):
+    return [row for row in tables[table] if row["meeting_id"] == meeting_id]
+
+
+def test_content_hash_is_chunk_size_independent(tmp_path):
+    """Same bytes, same hash, whatever the read size"""
+    audio = tmp_path / "a.m4a"
+    audio.write_bytes(os.urandom(100_000))
+    copy = tmp_path / "b.m4a"
+    copy.write_bytes(audio.read_bytes())
+
+    assert compute_content_hash(audio) == compute_content_hash(copy, chunk_size=4096)
+    copy.write_bytes(audio.read_bytes() + b"\0")
+    assert compute_content_hash(audio) != compute_content_hash(copy)
+
+
+async def test_find_duplicate_meeting(monkeypatch):
+    """Matches on user and hash; a different duration or the meeting itself is not a duplicate"""
+    monkeypatch.setattr(main_worker, "AUDIO_DEDUP_ENABLED", True)
+    supabase = make_supabase(source_meeting_tables())
+    worker = make_worker(supabase)
+
+    assert (await supabase.find_processed_audio("u1", "abc"))["meeting_id"] == "src"
+    assert await supabase.find_processed_audio("u2", "abc") is None
+
+    assert await worker._find_duplicate_meeting("u1", "abc", 60.2, "new") == "src"
+    assert await worker._find_duplicate_meeting("u1", "abc", 75.0, "new") is None
+    assert await worker._find_duplicate_meeting("u1", "abc", 60.0, "src") is None
+    assert await worker._find_duplicate_meeting(None, "abc", 60.0, "new") is None
+
+
+async def test_clone_remaps_speaker_ids():
+    """Copied transcript rows point at the copied speakers, not the source meeting's"""
+    tables = source_meeting_tables()
+    supabase = make_supabase(tables)
+
+    copied = await supabase.clone_meeting_results("src", "dst")
+
+    assert copied == {"speakers": 2, "transcripts": 3, "meeting_summaries": 1}
+    speaker_ids = {row["speaker_label"]: row["id"] for row in rows_of(tables, "speakers", "dst")}
+    assert not {"spk-a", "spk-b"} & set(speaker_ids.values())
+    assert [(row["text"], row["speaker_id"]) for row in rows_of(tables, "transcripts", "dst")] == [
+        ("안녕하세요", speaker_ids["SPEAKER_01"]),
+        ("네", speaker_ids["SPEAKER_00"]),
+        ("음", None),
+    ]
+    # The source meeting is untouched
+    assert len(rows_of(tables, "transcripts", "src")) == 3
+
+
+async def test_failed_clone_is_rolled_back_and_falls_back_to_stt():
+    """A failed copy leaves no rows on the target and the meeting is not completed"""
+    tables = source_meeting_tables()
+    supabase = make_supabase(tables, fail_inserts={"meeting_summaries"})
+
+    with pytest.raises(SupabaseQueryError):
+        await supabase.clone_meeting_results("src", "dst")
+    for table in ("speakers", "transcripts", "meeting_summaries"):
+        assert rows_of(tables, table, "dst") == []
+
+    status_updates = []
+
+    async def update_meeting_status(**kwargs):
+        status_updates.append(kwargs)
+
+    supabase.update_meeting_status = update_meeting_status
+    worker = make_worker(supabase)
+
+    assert await worker._complete_as_duplicate("dst", "u1", "src", 0.0, 60.0, notify=False) is False
+    assert status_updates == []
+    assert rows_of(tables, "speakers", "dst") == []
@@ -0,0 +1,148 @@
+"""
+Tests for Resumable Ranged Audio Download
+Runs the downloader against a local aiohttp server with Range support
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from audio_downloader import AudioDownloader, DownloadConfig
+from exceptions import AudioDownloadError
+from utils import cleanup_temp_files
+
+
+PART_SIZE = 64 * 1024
+
+
+@pytest.fixture
+def payload() -> bytes:
+    return bytes(range(256)) * 4100  # ~1 MB, not a multiple of PART_SIZE
+
+
+@pytest.fixture
+async def server(tmp_path, payload):
+    """Serve the payload with Range support; records requested ranges"""
+    source = tmp_path / "remote.m4a"
+    source.write_bytes(payload)
+    requests = []
+    failures = {"remaining": 0}
+
+    async def handler(request):
+        requests.append(request.headers.get("Range"))
+        if failures["remaining"] > 0 and request.headers.get("Range") != "bytes=0-0":
+            failures["remaining"] -= 1
+            return web.Response(status=503)
+        return web.FileResponse(source)
+
+    app = web.Application()
+    app.router.add_get("/audio.m4a", handler)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    test_server.requests = requests
+    test_server.failures = failures
+    yield test_server
+    await test_server.close()
+
+
+def make_downloader(**overrides) -> AudioDownloader:
+    settings = dict(
+        part_size=PART_SIZE,
+        parallel_threshold=PART_SIZE,
+        write_buffer_size=16 * 1024,
+        retry_delay=0.01
+    )
+    settings.update(overrides)
+    return AudioDownloader(DownloadConfig(**settings))
+
+
+async def test_parallel_ranged_download(server, payload, tmp_path):
+    """Parts are fetched with Range requests and assembled in order"""
+    downloader = make_downloader(max_connections=4)
+    destination = tmp_path / "meeting.m4a"
+
+    await downloader.download(str(server.make_url("/audio.m4a")), destination)
+    await downloader.close()
+
+    assert destination.read_bytes() == payload
+    assert not destination.with_name("meeting.m4a.part").exists()
+    assert not destination.with_name("meeting.m4a.part.json").exists()
+    num_parts = -(-len(payload) // PART_SIZE)
+    assert len([r for r in server.requests if r != "bytes=0-0"]) == num_parts
+
+
+async def test_resume_fetches_only_missing_parts(server, payload, tmp_path):
+    """A .part file with a sidecar resumes without refetching finished parts"""
+    destination = tmp_path / "meeting.m4a"
+    part_path = tmp_path / "meeting.m4a.part"
+    state_path = tmp_path / "meeting.m4a.part.json"
+
+    # Simulate a crash after parts 0-4 were written
+    num_parts = -(-len(payload) // PART_SIZE)
+    done = list(range(5))
+    partial = bytearray(len(payload))
+    partial[:5 * PART_SIZE] = payload[:5 * PART_SIZE]
+    part_path.write_bytes(bytes(partial))
+
+    downloader = make_downloader()
+    async with downloader._get_session().get(str(server.make_url("/audio.m4a"))) as response:
+        etag = response.headers["ETag"].removeprefix("W/").strip('"')
+    server.requests.clear()
+    state_path.write_text(json.dumps(
+        {"size": len(payload), "etag": etag, "part_size": PART_SIZE, "done": done}
+    ))
+
+    await downloader.download(str(server.make_url("/audio.m4a")), destination)
+    await downloader.close()
+
+    assert destination.read_bytes() == payload
+    fetched = [r for r in server.requests if r != "bytes=0-0"]
+    assert len(fetched) == num_parts - len(done)
+    assert f"bytes=0-{PART_SIZE - 1}" not in fetched
+
+
+async def test_transient_errors_are_retried(server, payload, tmp_path):
+    """Failed part requests are retried with backoff"""
+    server.failures["remaining"] = 2
+    downloader = make_downloader(max_connections=2)
+    destination = tmp_path / "meeting.m4a"
+
+    await downloader.download(str(server.make_url("/audio.m4a")), destination)
+    await downloader.close()
+
+    assert destination.read_bytes() == payload
+
+
+async def test_small_file_streams_and_md5_is_verified(server, payload, tmp_path):
+    """Below the threshold one GET is used; a wrong checksum fails the download"""
+    downloader = make_downloader(parallel_threshold=len(payload) + 1, max_attempts=1)
+    url = str(server.make_url("/audio.m4a"))
+
+    good = tmp_path / "good.m4a"
+    await downloader.download(url, good, expected_md5=hashlib.md5(payload).hexdigest())
+    assert good.read_bytes() == payload
+
+    bad = tmp_path / "bad.m4a"
+    with pytest.raises(AudioDownloadError, match="MD5 mismatch"):
+        await downloader.download(url, bad, expected_md5="0" * 32)
+    await downloader.close()
+
+    assert not bad.exists()
+    assert not (tmp_path / "bad.m4a.part").exists()
+
+
+def test_shutdown_cleanup_keeps_partial_downloads(tmp_path):
+    """The worker's final cleanup leaves .part files and sidecars for the next run"""
+    for name in ("meeting.m4a", "meeting.m4a.part", "meeting.m4a.part.json", "meeting_processed.wav"):
+        (tmp_path / name).write_bytes(b"x")
+
+    assert cleanup_temp_files(tmp_path, max_age_hours=0, exclude=("*.part*",)) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["meeting.m4a.part", "meeting.m4a.part.json"]
@@ -0,0 +1,411 @@
+"""
+Tests for Audio DSP Helpers
+Resampling, voice activity detection, ffmpeg decoding and other signal-processing building blocks
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy import signal
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from resampling import StreamingResampler, resample_audio, soxr
+from vad import VADConfig, compact_silences, detect_speech_segments, frame_rms
+from enhancement import bandpass_filter, enhance_for_stt, speech_filter_sos
+from loudness import LoudnessMeter, integrated_loudness, k_weighting_sos, normalize_loudness
+import audio_decoder
+from audio_decoder import decode_with_ffmpeg, iter_ffmpeg_blocks
+from exceptions import AudioCorruptedError
+
+
+# Test Constants
+TEST_SAMPLE_RATE = 16000
+
+
+def generate_noise(duration: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """Generate white noise (exercises the full band of the resampling filter)"""
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(int(duration * sample_rate)).astype(np.float32)
+
+
+def resample_in_blocks(resampler: StreamingResampler, audio: np.ndarray, seed: int = 0) -> np.ndarray:
+    """Feed audio through a streaming resampler in random-sized blocks"""
+    rng = np.random.default_rng(seed)
+    outputs = []
+    position = 0
+    while position < len(audio):
+        size = int(rng.integers(1, 20000))
+        outputs.append(resampler.process(audio[position:position + size]))
+        position += size
+    outputs.append(resampler.flush())
+    return np.concatenate(outputs)
+
+
+# Streaming Resampler Tests
+
+@pytest.mark.parametrize("orig_sr", [8000, 22050, 44100, 48000])
+def test_streaming_resampler_matches_resample_poly(orig_sr):
+    """Block-wise output should equal a one-shot resample_poly call"""
+    audio = generate_noise(3.0, orig_sr)[:orig_sr * 3 - 7]
+    resampler = StreamingResampler(orig_sr, TEST_SAMPLE_RATE)
+
+    streamed = resample_in_blocks(resampler, audio)
+    expected = signal.resample_poly(audio.astype(np.float64), resampler.up, resampler.down)
+
+    assert streamed.dtype == np.float32
+    assert len(streamed) == len(expected)
+    np.testing.assert_allclose(streamed, expected, atol=1e-5)
+
+
+def test_streaming_resampler_passthrough():
+    """Equal rates should pass blocks through unchanged"""
+    audio = generate_noise(1.0, TEST_SAMPLE_RATE)
+    resampler = StreamingResampler(TEST_SAMPLE_RATE, TEST_SAMPLE_RATE)
+
+    assert resampler.passthrough
+    np.testing.assert_array_equal(resample_in_blocks(resampler, audio), audio)
+
+
+def test_streaming_resampler_bounded_history():
+    """Retained history should not grow with the amount of input"""
+    resampler = StreamingResampler(44100, TEST_SAMPLE_RATE)
+    block = generate_noise(1.0, 44100)
+
+    for _ in range(20):
+        resampler.process(block)
+
+    assert len(resampler._history) < 2 * len(block)
+
+
+# One-shot Resampling Tests
+
+def tone(frequency: float, duration: float, sample_rate: int) -> np.ndarray:
+    """Generate a sine tone"""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    return np.sin(2 * np.pi * frequency * t).astype(np.float32)
+
+
+def test_resample_audio_downmixes_stereo_to_float32_mono():
+    """Stereo input should be averaged and returned as float32 mono"""
+    left = tone(440, 1.0, 44100)
+    stereo = np.stack([left, np.zeros_like(left)], axis=1).astype(np.float64)
+
+    resampled = resample_audio(stereo, 44100, TEST_SAMPLE_RATE, engine="polyphase")
+
+    assert resampled.dtype == np.float32
+    assert resampled.ndim == 1
+    assert len(resampled) == TEST_SAMPLE_RATE
+    assert np.abs(resampled[1000:-1000]).max() == pytest.approx(0.5, abs=0.01)
+
+
+def test_resample_audio_medium_matches_resample_poly():
+    """Medium polyphase quality should equal scipy's default resample_poly design"""
+    audio = generate_noise(2.0, 48000)
+
+    resampled = resample_audio(audio, 48000, TEST_SAMPLE_RATE, quality="medium", engine="polyphase")
+
+    np.testing.assert_allclose(
+        resampled, signal.resample_poly(audio.astype(np.float64), 1, 3), atol=1e-5
+    )
+
+
+def test_resample_audio_same_rate_is_noop():
+    """Equal rates should skip filtering"""
+    audio = generate_noise(1.0, TEST_SAMPLE_RATE)
+    assert resample_audio(audio, TEST_SAMPLE_RATE, TEST_SAMPLE_RATE) is audio
+
+
+@pytest.mark.benchmark
+def test_resampling_quality_speed_tradeoff():
+    """Benchmark resampling speed and quality across common input rates"""
+    engines = [("polyphase", q) for q in ("low", "medium", "high")]
+    if soxr is not None:
+        engines += [("soxr", q) for q in ("low", "medium", "high")]
+
+    duration = 60.0
+    print(f"\n=== Resampling Benchmark ({duration:.0f}s mono -> {TEST_SAMPLE_RATE}Hz) ===")
+    print(f"{'rate':>6} {'engine':>9} {'quality':>7} {'x realtime':>11} {'SNR dB':>7} {'alias dB':>9}")
+
+    for orig_sr in (22050, 44100, 48000):
+        # In-band tone for SNR, out-of-band tone (above 8 kHz) for alias rejection
+        in_band = tone(1000, duration, orig_sr)
+        out_of_band = tone(10000, duration, orig_sr)
+        reference = tone(1000, duration, TEST_SAMPLE_RATE)
+        trim = slice(TEST_SAMPLE_RATE, -TEST_SAMPLE_RATE)
+
+        for engine, quality in engines:
+            start = time.perf_counter()
+            resampled = resample_audio(in_band, orig_sr, TEST_SAMPLE_RATE, quality, engine)
+            elapsed = time.perf_counter() - start
+
+            error = resampled[:len(reference)][trim] - reference[:len(resampled)][trim]
+            snr_db = 10 * np.log10(np.mean(reference[trim] ** 2) / max(np.mean(error ** 2), 1e-20))
+
+            aliased = resample_audio(out_of_band, orig_sr, TEST_SAMPLE_RATE, quality, engine)
+            alias_db = 10 * np.log10(max(np.mean(aliased[trim] ** 2), 1e-20) / 0.5)
+
+            print(
+                f"{orig_sr:>6} {engine:>9} {quality:>7} {duration / elapsed:>10.0f}x "
+                f"{snr_db:>7.1f} {alias_db:>9.1f}"
+            )
+
+            if quality != "low":
+                assert snr_db > 40
+                assert alias_db < -40
+
+
+# Voice Activity Detection Tests
+
+def speech_with_pauses(pattern, sample_rate: int = TEST_SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """Build audio from (is_speech, seconds) pairs: modulated tone vs low noise"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for is_speech, seconds in pattern:
+        n = int(seconds * sample_rate)
+        if is_speech:
+            t = np.arange(n) / sample_rate
+            parts.append(0.3 * np.sin(2 * np.pi * 220 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)))
+        else:
+            parts.append(0.001 * rng.standard_normal(n))
+    return np.concatenate(parts).astype(np.float32)
+
+
+def test_frame_rms_matches_librosa():
+    """Vectorized RMS should match librosa's centered RMS"""
+    librosa = pytest.importorskip("librosa")
+    audio = generate_noise(3.0, TEST_SAMPLE_RATE)[:-123]
+
+    expected = librosa.feature.rms(y=audio, frame_length=960, hop_length=480)[0]
+
+    np.testing.assert_allclose(frame_rms(audio, 480), expected, rtol=1e-4, atol=1e-6)
+
+
+def test_vad_finds_speech_regions():
+    """Speech/silence alternation should produce matching segments"""
+    audio = speech_with_pauses([(False, 2), (True, 3), (False, 4), (True, 2), (False, 2)])
+
+    segments = detect_speech_segments(audio, TEST_SAMPLE_RATE, VADConfig(hangover_ms=0))
+
+    assert len(segments) == 2
+    assert segments[0] == pytest.approx((2.0, 5.0), abs=0.1)
+    assert segments[1] == pytest.approx((9.0, 11.0), abs=0.1)
+
+
+def test_vad_merges_short_gaps_and_drops_blips():
+    """Short pauses are merged; very short bursts are dropped"""
+    audio = speech_with_pauses([
+        (False, 2), (True, 2), (False, 0.2), (True, 2), (False, 3), (True, 0.1), (False, 3)
+    ])
+
+    segments = detect_speech_segments(
+        audio, TEST_SAMPLE_RATE, VADConfig(min_silence_ms=500, min_speech_ms=250)
+    )
+
+    assert len(segments) == 1
+    assert segments[0][0] == pytest.approx(2.0, abs=0.1)
+    assert segments[0][1] == pytest.approx(6.2 + 0.3, abs=0.1)  # includes hangover
+
+
+def test_compact_silences_remaps_timestamps():
+    """Compacted timestamps should map back onto the original timeline"""
+    audio = speech_with_pauses([(False, 10), (True, 2), (False, 20), (True, 3), (False, 5)])
+    segments = detect_speech_segments(audio, TEST_SAMPLE_RATE)
+
+    compacted, timestamp_map = compact_silences(audio, TEST_SAMPLE_RATE, segments, padding_seconds=0.2)
+
+    assert len(compacted) / TEST_SAMPLE_RATE < 7.0
+    # Second speech region starts after the first padded span in compacted time
+    first_span = timestamp_map.compact_starts[1]
+    assert timestamp_map.to_original(first_span + 0.2) == pytest.approx(32.0, abs=0.1)
+    assert timestamp_map.to_original(first_span, is_end=True) == pytest.approx(
+        segments[0][1] + 0.2, abs=0.05
+    )
+    np.testing.assert_allclose(
+        timestamp_map.to_original(np.array([0.2, 1.0])), [10.0, 10.8], atol=0.05
+    )
+
+
+def test_speech_filter_is_cached_and_valid_at_16k():
+    """SOS designs are reused; an 8kHz band edge at 16kHz degrades to a highpass"""
+    assert speech_filter_sos(16000, 80.0, 8000.0, 5) is speech_filter_sos(16000, 80.0, 8000.0, 5)
+
+    audio = generate_noise(5.0, TEST_SAMPLE_RATE)
+    filtered = bandpass_filter(audio, TEST_SAMPLE_RATE)
+    assert filtered.dtype == np.float32
+    assert np.all(np.isfinite(filtered))
+
+    # Below Nyquist the SOS result matches the previous b/a filtfilt design
+    sr = 44100
+    audio = generate_noise(2.0, sr)
+    b, a = signal.butter(5, [80 / (sr / 2), 8000 / (sr / 2)], btype='band')
+    expected = signal.filtfilt(b, a, audio.astype(np.float64))
+    assert np.max(np.abs(bandpass_filter(audio, sr) - expected)) < 1e-3
+
+
+def test_enhance_for_stt_reduces_noise():
+    """Enhancement improves SNR of a gated tone in noise and reports step timings"""
+    t = np.arange(60 * TEST_SAMPLE_RATE) / TEST_SAMPLE_RATE
+    clean = (0.5 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.2 * t) > 0)).astype(np.float32)
+    noisy = clean + 0.05 * generate_noise(60.0, TEST_SAMPLE_RATE)
+
+    def snr_db(audio):
+        gain = np.dot(audio, clean) / np.dot(clean, clean)
+        return 10 * np.log10(np.sum(clean ** 2) / np.sum((audio - gain * clean) ** 2))
+
+    enhanced, timings = enhance_for_stt(noisy, TEST_SAMPLE_RATE)
+
+    assert enhanced.dtype == np.float32
+    assert np.max(np.abs(enhanced)) == pytest.approx(1.0)
+    assert snr_db(enhanced) > snr_db(noisy) + 1.0
+    assert set(timings) == {"noise_reduction", "bandpass", "normalize"}
+
+
+
+def test_k_weighting_matches_bs1770_at_48k():
+    """The derived K-weighting reproduces the standard's 48kHz coefficients"""
+    sos = k_weighting_sos(48000)
+    np.testing.assert_allclose(
+        sos[0], [1.53512485958697, -2.69169618940638, 1.19839281085285, 1.0,
+                 -1.69065929318241, 0.73248077421585], atol=1e-10
+    )
+    np.testing.assert_allclose(sos[1, 3:], [1.0, -1.99004745483398, 0.99007225036621], atol=1e-10)
+
+
+@pytest.mark.parametrize("sample_rate", [16000, 48000])
+def test_integrated_loudness_of_reference_tone(sample_rate):
+    """A 1kHz sine at -3dBFS measures about -6 LUFS (mono, BS.1770)"""
+    audio = 10 ** (-3 / 20) * tone(1000, 5.0, sample_rate)
+    assert integrated_loudness(audio, sample_rate) == pytest.approx(-6.0, abs=0.1)
+
+
+def test_loudness_gating_and_streaming_meter():
+    """Silent stretches are gated out; block-fed measurement equals one-shot"""
+    speech = 0.1 * tone(440, 10.0, TEST_SAMPLE_RATE)
+    with_silence = np.concatenate([speech, np.zeros(20 * TEST_SAMPLE_RATE, dtype=np.float32)])
+    assert integrated_loudness(with_silence, TEST_SAMPLE_RATE) == pytest.approx(
+        integrated_loudness(speech, TEST_SAMPLE_RATE), abs=0.1
+    )
+    assert integrated_loudness(np.zeros(TEST_SAMPLE_RATE), TEST_SAMPLE_RATE) == float("-inf")
+
+    meter = LoudnessMeter(TEST_SAMPLE_RATE)
+    rng = np.random.default_rng(0)
+    position = 0
+    while position < len(with_silence):
+        size = int(rng.integers(1, 5000))
+        meter.process(with_silence[position:position + size])
+        position += size
+    assert meter.integrated() == pytest.approx(integrated_loudness(with_silence, TEST_SAMPLE_RATE), abs=1e-6)
+
+
+def test_normalize_loudness_hits_target_under_peak_ceiling():
+    """Quiet audio is raised to -16 LUFS; peaky audio is limited by the ceiling"""
+    quiet = 0.01 * generate_noise(10.0, TEST_SAMPLE_RATE)
+    normalized, measured = normalize_loudness(quiet, TEST_SAMPLE_RATE)
+    assert normalized.dtype == np.float32
+    assert measured < -30
+    assert integrated_loudness(normalized, TEST_SAMPLE_RATE) == pytest.approx(-16.0, abs=0.05)
+
+    # Mostly quiet with one loud click: the gain stops at the -1.5dBFS peak ceiling
+    clicky = quiet.copy()
+    clicky[1000] = 0.5
+    normalized, _ = normalize_loudness(clicky, TEST_SAMPLE_RATE)
+    assert np.max(np.abs(normalized)) == pytest.approx(10 ** (-1.5 / 20), rel=1e-4)
+
+    silent, measured = normalize_loudness(np.zeros(TEST_SAMPLE_RATE), TEST_SAMPLE_RATE)
+    assert measured is None
+    assert not np.any(silent)
+
+
+# ffmpeg Decoder Tests
+
+def fake_ffmpeg(monkeypatch, samples: int, stderr_bytes: int, exit_code: int = 0):
+    """Replace ffmpeg with a script that floods stderr before writing PCM to stdout"""
+    script = (
+        "import sys, numpy as np\n"
+        f"sys.stderr.write('w' * {stderr_bytes} + 'decoder gave up')\n"
+        "sys.stderr.flush()\n"
+        f"sys.stdout.buffer.write(np.arange({samples}, dtype=np.float32).tobytes())\n"
+        f"sys.exit({exit_code})\n"
+    )
+    monkeypatch.setattr(
+        audio_decoder, "build_ffmpeg_command",
+        lambda *args, **kwargs: [sys.executable, "-c", script]
+    )
+
+
+def test_ffmpeg_decode_survives_chatty_stderr(monkeypatch):
+    """More stderr than a pipe buffer holds does not stall reading stdout"""
+    fake_ffmpeg(monkeypatch, samples=50_000, stderr_bytes=1 << 20)
+
+    audio = decode_with_ffmpeg(Path("in.m4a"))
+    np.testing.assert_array_equal(audio, np.arange(50_000, dtype=np.float32))
+
+    blocks = list(iter_ffmpeg_blocks(Path("in.m4a"), block_size=16_000))
+    assert [len(b) for b in blocks] == [16_000, 16_000, 16_000, 2_000]
+
+
+def test_ffmpeg_failure_reports_stderr_tail(monkeypatch):
+    """The error message ends with ffmpeg's last words, bounded in size"""
+    fake_ffmpeg(monkeypatch, samples=0, stderr_bytes=1 << 20, exit_code=1)
+
+    with pytest.raises(AudioCorruptedError, match="decoder gave up$") as error:
+        decode_with_ffmpeg(Path("in.m4a"))
+    assert len(str(error.value)) < 100_000
+
+    with pytest.raises(AudioCorruptedError, match="decoder gave up$"):
+        list(iter_ffmpeg_blocks(Path("in.m4a"), block_size=16_000))
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+def test_vad_benchmark_3_hours():
+    """Benchmark vectorized VAD against the per-frame loop on a 3-hour input"""
+    # 3 hours: 40s speech / 20s pause pattern
+    minute = speech_with_pauses([(True, 40), (False, 20)])
+    audio = np.tile(minute, 180)
+    hop_length = int(TEST_SAMPLE_RATE * 0.03)
+
+    start = time.perf_counter()
+    segments = detect_speech_segments(audio, TEST_SAMPLE_RATE)
+    vectorized_s = time.perf_counter() - start
+
+    # Previous implementation: librosa RMS, median threshold, per-frame loop
+    try:
+        import librosa
+        compute_rms = lambda: librosa.feature.rms(
+            y=audio, frame_length=hop_length * 2, hop_length=hop_length
+        )[0]
+    except ImportError:
+        compute_rms = lambda: frame_rms(audio, hop_length)
+
+    start = time.perf_counter()
+    rms = compute_rms()
+    voice_frames = rms > np.median(rms) * 0.7
+    loop_segments = []
+    in_segment = False
+    segment_start = 0.0
+    for i, is_voice in enumerate(voice_frames):
+        current_time = i * 0.03
+        if is_voice and not in_segment:
+            segment_start = current_time
+            in_segment = True
+        elif not is_voice and in_segment:
+            loop_segments.append((segment_start, current_time))
+            in_segment = False
+    loop_s = time.perf_counter() - start
+
+    print(f"\n=== VAD Benchmark (3h @ {TEST_SAMPLE_RATE}Hz) ===")
+    print(f"Vectorized: {vectorized_s:.2f}s, per-frame loop: {loop_s:.2f}s "
+          f"({loop_s / vectorized_s:.1f}x)")
+
+    assert len(segments) == 180
+    assert vectorized_s < loop_s
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,123 @@
+"""
+Tests for GPU memory telemetry and OOM-adaptive batch sizing
+Out-of-memory detection, batch halving, persisted safe sizes, peak sampling
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gpu_memory import BatchSizeStore, is_cuda_oom, run_with_oom_backoff, track_peak_memory
+
+
+class FakeOutOfMemoryError(RuntimeError):
+    pass
+
+
+@pytest.fixture
+def fake_torch(monkeypatch):
+    """torch with CUDA available and a scripted peak memory"""
+    stats = {"peak": 0, "resets": 0, "empty_cache": 0}
+
+    def reset_peak_memory_stats():
+        stats["resets"] += 1
+        stats["peak"] = 0
+
+    cuda = SimpleNamespace(
+        OutOfMemoryError=FakeOutOfMemoryError,
+        is_available=lambda: True,
+        reset_peak_memory_stats=reset_peak_memory_stats,
+        max_memory_allocated=lambda: stats["peak"],
+        empty_cache=lambda: stats.update(empty_cache=stats["empty_cache"] + 1),
+    )
+    monkeypatch.setitem(sys.modules, "torch", SimpleNamespace(cuda=cuda))
+    return stats
+
+
+def oom_above(limit, calls):
+    """Batched call that runs out of memory for batch sizes above limit"""
+    def run(batch_size):
+        calls.append(batch_size)
+        if batch_size > limit:
+            raise RuntimeError("CUDA failed with error out of memory")
+        return f"ok@{batch_size}"
+    return run
+
+
+def test_is_cuda_oom(fake_torch):
+    """torch's OOM type and CUDA allocation failures from other libraries count"""
+    assert is_cuda_oom(FakeOutOfMemoryError("Tried to allocate 2.00 GiB"))
+    assert is_cuda_oom(RuntimeError("CUDA out of memory. Tried to allocate 20.00 MiB"))
+    assert is_cuda_oom(RuntimeError("CUDA failed with error out of memory"))
+    assert is_cuda_oom(RuntimeError("CUBLAS_STATUS_ALLOC_FAILED when calling cublasCreate(handle)"))
+    assert not is_cuda_oom(RuntimeError("Expected all tensors to be on the same device"))
+    assert not is_cuda_oom(MemoryError())
+
+
+def test_backoff_halves_and_persists_safe_size(tmp_path):
+    """Batch size halves until it fits; the next run (new store) starts there"""
+    path = tmp_path / "batch_sizes.json"
+    store = BatchSizeStore(path)
+    calls = []
+
+    assert run_with_oom_backoff(oom_above(5, calls), "whisperx@RTX", 16, store) == "ok@4"
+    assert calls == [16, 8, 4]
+
+    reloaded = BatchSizeStore(path)
+    assert reloaded.sizes == {"whisperx@RTX": 4}
+    calls.clear()
+    assert run_with_oom_backoff(oom_above(5, calls), "whisperx@RTX", 16, reloaded) == "ok@4"
+    assert calls == [4]
+
+    # A smaller configured size wins; other models and GPUs are unaffected
+    assert reloaded.get("whisperx@RTX", 2) == 2
+    assert reloaded.get("embedding@RTX", 32) == 32
+
+
+def test_backoff_gives_up_at_min_batch_size_and_ignores_other_errors():
+    """OOM at the smallest batch and non-OOM errors are raised unchanged"""
+    calls = []
+    with pytest.raises(RuntimeError, match="out of memory"):
+        run_with_oom_backoff(oom_above(0, calls), "model@cuda", 4)
+    assert calls == [4, 2, 1]
+
+    def broken(batch_size):
+        calls.append(batch_size)
+        raise ValueError("bad input")
+
+    calls.clear()
+    with pytest.raises(ValueError):
+        run_with_oom_backoff(broken, "model@cuda", 4)
+    assert calls == [4]
+
+
+def test_unreadable_store_file_is_ignored(tmp_path):
+    """A corrupt file starts from the configured sizes"""
+    path = tmp_path / "batch_sizes.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert BatchSizeStore(path).get("model@cuda", 16) == 16
+
+
+def test_track_peak_memory(fake_torch):
+    """The peak is reset on entry and read on exit, in MB"""
+    fake_torch["peak"] = 123
+    with track_peak_memory() as stage:
+        fake_torch["peak"] += 512 * 1024 * 1024
+
+    assert fake_torch["resets"] == 1
+    assert stage.peak_mb == pytest.approx(512, abs=0.01)
+
+
+def test_track_peak_memory_without_cuda(monkeypatch):
+    """No torch loaded: nothing is sampled"""
+    monkeypatch.delitem(sys.modules, "torch", raising=False)
+    with track_peak_memory() as stage:
+        pass
+
+    assert stage.peak_mb is None
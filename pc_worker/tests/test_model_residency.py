@@ -0,0 +1,110 @@
+"""
+Tests for Model Residency Manager
+On-demand loading, LRU eviction under a VRAM budget, idle unload, prewarm
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from model_residency import ModelResidencyManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_manager(budget_mb, clock=None, idle_unload_seconds=0.0):
+    """Manager with fake models; returns (manager, event log)"""
+    events: List[str] = []
+    manager = ModelResidencyManager(
+        budget_mb=budget_mb,
+        idle_unload_seconds=idle_unload_seconds,
+        clock=clock or FakeClock(),
+        measure_vram=lambda: None
+    )
+
+    for name, vram_mb in [("stt", 6000), ("summarizer", 5000), ("embeddings", 2000)]:
+        async def load(name=name):
+            events.append(f"load:{name}")
+
+        async def unload(name=name):
+            events.append(f"unload:{name}")
+
+        manager.register(name, vram_mb, load, unload)
+    return manager, events
+
+
+async def test_loads_on_demand_and_evicts_least_recently_used():
+    """Idle models are evicted LRU-first, only as many as needed"""
+    clock = FakeClock()
+    manager, events = make_manager(budget_mb=11000, clock=clock)
+
+    async with manager.use("embeddings"):
+        pass
+    clock.now = 1
+    async with manager.use("stt"):
+        pass
+    clock.now = 2
+    async with manager.use("stt"):  # already resident
+        pass
+    assert events == ["load:embeddings", "load:stt"]
+
+    # 8000 resident + 5000 > 11000: evicting embeddings (LRU) is enough
+    clock.now = 3
+    await manager.ensure_loaded("summarizer")
+    assert events[2:] == ["unload:embeddings", "load:summarizer"]
+    assert manager.resident_mb == 11000
+    assert manager.is_loaded("stt") and not manager.is_loaded("embeddings")
+
+
+async def test_models_in_use_are_never_evicted():
+    """A model that does not fit next to in-use models is loaded over budget"""
+    manager, events = make_manager(budget_mb=8000)
+
+    async with manager.use("stt"):
+        async with manager.use("summarizer"):
+            assert manager.is_loaded("stt") and manager.is_loaded("summarizer")
+
+    assert "unload:stt" not in events
+    assert manager.resident_mb == 11000
+
+
+async def test_idle_models_are_unloaded():
+    """unload_idle releases models unused for idle_unload_seconds"""
+    clock = FakeClock()
+    manager, events = make_manager(budget_mb=None, clock=clock, idle_unload_seconds=600)
+
+    async with manager.use("stt"):
+        clock.now = 1000
+        assert await manager.unload_idle() == []  # in use
+
+    async with manager.use("summarizer"):
+        pass
+    clock.now = 1500
+    assert await manager.unload_idle() == []
+    clock.now = 1601
+    assert await manager.unload_idle() == ["stt", "summarizer"]
+    assert manager.resident_mb == 0
+
+
+async def test_prewarm_stays_within_budget():
+    """Prewarming loads models in the background but never exceeds the budget"""
+    manager, events = make_manager(budget_mb=9000)
+
+    async with manager.use("stt"):
+        manager.prewarm("summarizer", "embeddings")
+        await asyncio.sleep(0)
+        await asyncio.gather(*manager._prewarm_tasks)
+
+    assert events == ["load:stt", "load:embeddings"]
+    await manager.close()
+    assert manager.resident_mb == 0
@@ -0,0 +1,255 @@
+"""
+Tests for the RAG Search Engine
+Reciprocal rank fusion, local index backfill from transcript_chunks and search routing
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("supabase")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+
+from keyword_index import KeywordIndexConfig, LocalKeywordIndex
+from rag_search import RAGSearchEngine, SearchConfig, SearchResult, reciprocal_rank_fusion
+from vector_index import IndexedChunk, LocalVectorIndex, VectorIndexConfig
+
+
+TEST_DIM = 8
+TEST_USER_ID = "test-user-001"
+
+
+def ranked(*chunk_ids, keyword=False):
+    """Search results in rank order, scored as one list of the hybrid search"""
+    return [
+        SearchResult(
+            chunk_id=chunk_id,
+            meeting_id="meeting-1",
+            chunk_index=i,
+            start_time=0.0,
+            end_time=7.0,
+            speaker_id=None,
+            text=chunk_id,
+            keyword_score=1.0 / (i + 1) if keyword else 0.0,
+            semantic_score=0.0 if keyword else 1.0 / (i + 1),
+            combined_score=1.0 / (i + 1)
+        )
+        for i, chunk_id in enumerate(chunk_ids)
+    ]
+
+
+# Reciprocal Rank Fusion Tests
+
+def test_rrf_merges_overlapping_results():
+    """A chunk found by both lists is fused once, with both per-list scores"""
+    keyword = ranked("a", "b", "c", keyword=True)
+    semantic = ranked("b", "d")
+
+    fused = reciprocal_rank_fusion([keyword, semantic], [1.0, 1.0], k=60)
+
+    assert [r.chunk_id for r in fused] == ["b", "a", "d", "c"]
+    b = fused[0]
+    assert b.keyword_score == pytest.approx(0.5)
+    assert b.semantic_score == pytest.approx(1.0)
+    assert b.combined_score == pytest.approx((1 / 62 + 1 / 61) / (2 / 61))
+
+
+def test_rrf_normalization_and_ties():
+    """First in every list scores 1.0; equal scores keep first-list order"""
+    fused = reciprocal_rank_fusion([ranked("a", "x"), ranked("a", "y")], [1.0, 1.0], k=60)
+    assert fused[0].chunk_id == "a"
+    assert fused[0].combined_score == pytest.approx(1.0)
+    assert [r.chunk_id for r in fused[1:]] == ["x", "y"]
+
+    assert reciprocal_rank_fusion([ranked("a")], [0.0]) == []
+    assert len(reciprocal_rank_fusion([ranked("a", "b", "c")], [1.0], limit=2)) == 2
+
+
+def test_rrf_k_trades_top_ranks_against_agreement():
+    """Small k rewards a single first place; large k rewards consistent mid ranks"""
+    keyword = ranked("a", "k0", "b", keyword=True)  # a 1st, b 3rd
+    semantic = ranked("s0", "s1", "b", *[f"s{i}" for i in range(2, 8)], "a")  # b 3rd, a 10th
+
+    top = lambda k: reciprocal_rank_fusion([keyword, semantic], [1.0, 1.0], k=k)[0].chunk_id
+    assert top(1) == "a"   # 1/2 + 1/11 > 2/4
+    assert top(60) == "b"  # 2/63 > 1/61 + 1/70
+
+
+class FakeChunkQuery:
+    """Just enough of the postgrest query builder for transcript_chunks"""
+
+    def __init__(self, store):
+        self.store = store
+        self.filters = []
+        self.action = "select"
+        self.bounds = None
+
+    def select(self, columns, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def _matches(self, row):
+        return all(row.get(column) == value for column, value in self.filters)
+
+    def execute(self):
+        self.store.requests += 1
+        rows = sorted((r for r in self.store.rows if self._matches(r)), key=lambda r: r["id"])
+        if self.action == "delete":
+            self.store.rows = [r for r in self.store.rows if not self._matches(r)]
+        elif self.bounds:
+            rows = rows[self.bounds[0]:self.bounds[1] + 1]
+        return type("Response", (), {"data": rows})()
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = 0
+        self.rpc_calls = []
+        self.client = self
+
+    def table(self, name):
+        assert name == "transcript_chunks"
+        return FakeChunkQuery(self)
+
+    def rpc(self, name, params):
+        self.rpc_calls.append(name)
+        return self
+
+    def execute(self):
+        return type("Response", (), {"data": []})()
+
+
+class FakeEmbeddingEngine:
+    async def embed_query(self, query):
+        return unit_vector(0).tolist()
+
+
+def unit_vector(axis: int) -> np.ndarray:
+    vector = np.zeros(TEST_DIM, dtype=np.float32)
+    vector[axis] = 1.0
+    return vector
+
+
+def archived_row(i: int, text: str):
+    """A chunk saved before the local indexes were enabled"""
+    return {
+        "id": f"chunk-{i:03d}",
+        "user_id": TEST_USER_ID,
+        "meeting_id": f"meeting-{i % 3}",
+        "chunk_index": i,
+        "start_time": float(i),
+        "end_time": float(i + 1),
+        "speaker_id": None,
+        "text": text,
+        "embedding": json.dumps(unit_vector(i % TEST_DIM).tolist()),
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine with both local indexes and an archive of 25 chunks in the database"""
+    engine = object.__new__(RAGSearchEngine)
+    engine.search_config = SearchConfig(use_local_index=True, use_local_keyword_index=True)
+    engine._supabase = FakeSupabase([
+        archived_row(i, "예산 회의록" if i == 17 else f"기타 안건 {i}") for i in range(25)
+    ])
+    engine._embedding_engine = FakeEmbeddingEngine()
+    engine._local_index = LocalVectorIndex(
+        VectorIndexConfig(base_dir=str(tmp_path / "rag"), embedding_dim=TEST_DIM)
+    )
+    engine._keyword_index = LocalKeywordIndex(KeywordIndexConfig(base_dir=str(tmp_path / "rag")))
+    engine._index_locks = {}
+    engine._keyword_cache = {}
+    return engine
+
+
+async def test_backfill_serves_archived_chunks_locally(engine):
+    """An incrementally filled index is rebuilt from the archive before it serves searches"""
+    # Only the newest chunk reached the indexes before the backfill
+    newest = engine._supabase.rows[24]
+    recent = [IndexedChunk(**{k: newest[k] for k in (
+        "meeting_id", "chunk_index", "start_time", "end_time", "speaker_id", "text"
+    )}, chunk_id=newest["id"])]
+    engine._keyword_index.add(TEST_USER_ID, recent)
+    engine._local_index.add(TEST_USER_ID, recent, [json.loads(newest["embedding"])])
+    assert not engine._keyword_index.is_complete(TEST_USER_ID)
+    assert not engine._local_index.is_complete(TEST_USER_ID)
+
+    await engine.sync_local_indexes(TEST_USER_ID, page_size=10)
+
+    assert engine._local_index.is_complete(TEST_USER_ID)
+    assert engine._keyword_index.is_complete(TEST_USER_ID)
+    assert engine._local_index.get_user_index(TEST_USER_ID).size == 25
+    assert engine._keyword_index.get_user_index(TEST_USER_ID).size == 25
+    assert engine._supabase.requests == 3  # pages of 10, 10 and 5
+
+    keyword_hits = await engine.keyword_search("회의록", TEST_USER_ID, limit=3)
+    assert [r.chunk_id for r in keyword_hits] == ["chunk-017"]
+
+    # The query embedding points at axis 0: chunks 0, 8, 16 and 24
+    semantic_hits = await engine.semantic_search("예산", TEST_USER_ID, limit=4)
+    assert {r.chunk_id for r in semantic_hits} == {"chunk-000", "chunk-008", "chunk-016", newest["id"]}
+
+    # Complete indexes are not backfilled again
+    requests = engine._supabase.requests
+    await engine.sync_local_indexes(TEST_USER_ID)
+    assert engine._supabase.requests == requests
+
+
+async def test_user_without_chunks_is_backfilled_once(engine):
+    """An empty archive leaves complete, empty indexes that are not backfilled again"""
+    engine._supabase.rows = []
+
+    await engine.sync_local_indexes(TEST_USER_ID)
+    await engine.sync_local_indexes(TEST_USER_ID)
+
+    assert engine._supabase.requests == 1
+    assert engine._local_index.is_complete(TEST_USER_ID)
+    assert engine._keyword_index.is_complete(TEST_USER_ID)
+    assert await engine.keyword_search("회의록", TEST_USER_ID) == []
+    assert engine._supabase.rpc_calls == []
+
+
+async def test_failed_backfill_keeps_database_search(engine):
+    """Until a backfill succeeds the local indexes are not used"""
+    def broken_table(name):
+        raise ConnectionError("database unavailable")
+
+    engine._supabase.table = broken_table
+    await engine.sync_local_indexes(TEST_USER_ID)
+
+    assert not engine._local_index.is_complete(TEST_USER_ID)
+    assert not engine._keyword_index.is_complete(TEST_USER_ID)
+
+
+async def test_rrf_falls_back_to_rpc_without_ranked_keyword_index(engine):
+    """Unranked database keyword matches are never fused"""
+    engine.search_config = SearchConfig(hybrid_mode="rrf", use_local_keyword_index=False)
+    engine._keyword_index = None
+
+    await engine.hybrid_search("예산", TEST_USER_ID)
+
+    assert engine._supabase.rpc_calls == ["hybrid_search_chunks"]
@@ -0,0 +1,346 @@
+"""
+Tests for RAG Search Components
+Local vector index, keyword ranking and result fusion
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from vector_index import (
+    IndexedChunk,
+    LocalVectorIndex,
+    UserVectorIndex,
+    VectorIndexConfig,
+)
+from keyword_index import (
+    KeywordIndexConfig,
+    LocalKeywordIndex,
+    UserKeywordIndex,
+    tokenize,
+)
+
+
+# Test Constants
+TEST_DIM = 64
+TEST_USER_ID = "test-user-001"
+
+
+# Fixtures
+
+@pytest.fixture
+def index_config(tmp_path):
+    """Vector index config with a small dimension and training threshold"""
+    return VectorIndexConfig(
+        base_dir=str(tmp_path / "rag_index"),
+        embedding_dim=TEST_DIM,
+        min_train_size=256,
+        nprobe=4
+    )
+
+
+def generate_embeddings(count: int, dim: int = TEST_DIM, seed: int = 0) -> np.ndarray:
+    """Generate clustered, L2-normalized embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((16, dim))
+    vectors = centers[rng.integers(0, 16, count)] + 0.3 * rng.standard_normal((count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def make_chunks(count: int, meeting_id: str = "meeting-1", offset: int = 0):
+    """Create chunk metadata for the index"""
+    return [
+        IndexedChunk(
+            chunk_id=f"{meeting_id}-chunk-{offset + i}",
+            meeting_id=meeting_id,
+            chunk_index=offset + i,
+            start_time=float(i * 7),
+            end_time=float(i * 7 + 7),
+            speaker_id=None,
+            text=f"청크 {offset + i}"
+        )
+        for i in range(count)
+    ]
+
+
+# Local Vector Index Tests
+
+def test_vector_index_search_returns_nearest(index_config):
+    """Each stored vector should be its own nearest neighbour"""
+    index = LocalVectorIndex(index_config)
+    embeddings = generate_embeddings(100)
+    index.add(TEST_USER_ID, make_chunks(100), embeddings)
+
+    hits = index.search(TEST_USER_ID, embeddings[42], k=5)
+
+    assert len(hits) == 5
+    assert hits[0][0].chunk_id == "meeting-1-chunk-42"
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert [s for _, s in hits] == sorted([s for _, s in hits], reverse=True)
+
+
+def test_vector_index_persists_and_updates_incrementally(index_config):
+    """Index should reload from disk and accept appends after training"""
+    index = LocalVectorIndex(index_config)
+    first = generate_embeddings(300, seed=1)
+    index.add(TEST_USER_ID, make_chunks(300, "meeting-1"), first)
+    assert index.get_user_index(TEST_USER_ID).is_trained
+
+    # Reload from disk with a fresh manager
+    reloaded = LocalVectorIndex(index_config)
+    user_index = reloaded.get_user_index(TEST_USER_ID)
+    assert user_index.size == 300
+    assert user_index.is_trained
+
+    second = generate_embeddings(20, seed=2)
+    reloaded.add(TEST_USER_ID, make_chunks(20, "meeting-2"), second)
+    hits = reloaded.search(TEST_USER_ID, second[3], k=1, meeting_id="meeting-2")
+    assert hits[0][0].chunk_id == "meeting-2-chunk-3"
+
+
+def test_vector_index_remove_meeting(index_config):
+    """Removed meetings should no longer appear in results"""
+    index = LocalVectorIndex(index_config)
+    embeddings = generate_embeddings(40)
+    index.add(TEST_USER_ID, make_chunks(20, "meeting-1"), embeddings[:20])
+    index.add(TEST_USER_ID, make_chunks(20, "meeting-2"), embeddings[20:])
+
+    removed = index.remove_meeting(TEST_USER_ID, "meeting-1")
+
+    assert removed == 20
+    hits = index.search(TEST_USER_ID, embeddings[0], k=40)
+    assert all(chunk.meeting_id == "meeting-2" for chunk, _ in hits)
+
+
+def test_vector_index_ignores_uncommitted_rows(index_config):
+    """Rows appended without a state.json commit should be discarded on load"""
+    directory = Path(index_config.base_dir) / TEST_USER_ID
+    index = UserVectorIndex(directory, index_config)
+    index.add(make_chunks(10), generate_embeddings(10))
+
+    # Simulate a crash after the vector append but before the state commit
+    with open(directory / "vectors.f32", "ab") as f:
+        f.write(generate_embeddings(3).tobytes())
+
+    reloaded = UserVectorIndex(directory, index_config)
+    assert reloaded.size == 10
+    assert (directory / "vectors.f32").stat().st_size == 10 * TEST_DIM * 4
+
+
+def test_vector_index_empty_backfill_is_complete(index_config):
+    """A backfilled user without chunks stays complete across reloads"""
+    index = LocalVectorIndex(index_config)
+    assert not index.is_complete(TEST_USER_ID)
+
+    index.replace_user(TEST_USER_ID, [], [])
+    assert index.is_complete(TEST_USER_ID)
+
+    reloaded = LocalVectorIndex(index_config)
+    assert reloaded.is_complete(TEST_USER_ID)
+    assert reloaded.search(TEST_USER_ID, generate_embeddings(1)[0], k=5) == []
+
+
+def test_vector_index_interrupted_compaction(index_config, monkeypatch):
+    """A crash before the swap keeps the old files; one after it forces a rebuild"""
+    directory = Path(index_config.base_dir) / TEST_USER_ID
+    index = UserVectorIndex(directory, index_config)
+    index.add(make_chunks(10, "meeting-1") + make_chunks(10, "meeting-2"), generate_embeddings(20))
+    index.mark_complete()
+    index._deleted.update(range(10))
+    index._write_state()
+
+    def crash(*args):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr("vector_index.os.replace", crash)
+        with pytest.raises(OSError):
+            index.compact()
+    reloaded = UserVectorIndex(directory, index_config)
+    assert (reloaded.size, reloaded.is_complete) == (10, True)
+
+    # Files swapped, state.json not yet committed
+    monkeypatch.setattr(UserVectorIndex, "_write_state", crash)
+    with pytest.raises(OSError):
+        reloaded.compact()
+    monkeypatch.undo()
+    rebuilt = UserVectorIndex(directory, index_config)
+    assert (rebuilt.size, rebuilt.is_complete) == (0, False)
+
+
+@pytest.mark.benchmark
+def test_vector_index_recall_and_latency(tmp_path):
+    """Benchmark ANN recall@10 against exact search on 20k vectors"""
+    config = VectorIndexConfig(
+        base_dir=str(tmp_path / "rag_index"),
+        embedding_dim=256,
+        nprobe=16
+    )
+    index = LocalVectorIndex(config)
+    embeddings = generate_embeddings(20000, dim=256)
+    index.add(TEST_USER_ID, make_chunks(20000), embeddings)
+
+    queries = generate_embeddings(50, dim=256, seed=99)
+    recall = index.recall_at_k(TEST_USER_ID, queries, k=10)
+
+    user_index = index.get_user_index(TEST_USER_ID)
+    start = time.perf_counter()
+    for query in queries:
+        user_index.search(query, 10)
+    ann_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    for query in queries:
+        user_index.exact_search(query, 10)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    print(f"\n=== Local Vector Index Benchmark (20k x 256) ===")
+    print(f"Recall@10: {recall:.3f}")
+    print(f"ANN: {ann_ms:.2f}ms/query, exact: {exact_ms:.2f}ms/query")
+
+    assert recall >= 0.9
+
+
+# Local Keyword Index Tests
+
+KOREAN_NOUNS = [
+    "예산", "일정", "회의록", "마케팅", "디자인", "서버", "배포", "고객", "계약", "채용",
+    "보고서", "분기", "매출", "프로젝트", "테스트", "품질", "교육", "출장", "인사", "재무",
+]
+KOREAN_PARTICLES = ["", "은", "는", "이", "가", "을", "를", "에서", "으로", "에 대해", "까지", "도"]
+KOREAN_FILLERS = ["그래서", "다음 주에", "확인해 주세요", "논의했습니다", "정리하면", "일단"]
+
+
+@pytest.fixture
+def keyword_config(tmp_path):
+    """Keyword index config rooted in a temp directory"""
+    return KeywordIndexConfig(base_dir=str(tmp_path / "rag_index"))
+
+
+def make_text_chunks(texts, meeting_id: str = "meeting-1"):
+    """Create chunk metadata for the given texts"""
+    return [
+        IndexedChunk(
+            chunk_id=f"{meeting_id}-chunk-{i}",
+            meeting_id=meeting_id,
+            chunk_index=i,
+            start_time=float(i * 7),
+            end_time=float(i * 7 + 7),
+            speaker_id=None,
+            text=text
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
+def generate_korean_corpus(count: int, seed: int = 0):
+    """Generate transcript-like Korean chunks with particles attached to nouns"""
+    rng = np.random.default_rng(seed)
+    texts, topics = [], []
+    for _ in range(count):
+        nouns = list(rng.choice(KOREAN_NOUNS, size=3, replace=False))
+        words = []
+        for noun in nouns:
+            words.append(noun + rng.choice(KOREAN_PARTICLES))
+            words.append(rng.choice(KOREAN_FILLERS))
+        texts.append(" ".join(words))
+        topics.append(nouns)
+    return texts, topics
+
+
+def test_tokenize_korean_ngrams():
+    """Hangul runs become bigrams/trigrams; ASCII words stay whole"""
+    tokens = tokenize("회의록을 API로")
+
+    assert "회의" in tokens and "의록" in tokens and "회의록" in tokens
+    assert "api" in tokens
+    assert tokenize("a") == ["a"]
+    assert tokenize("") == []
+
+
+def test_keyword_index_matches_inflected_forms(keyword_config):
+    """Bare query terms should match nouns with attached particles"""
+    index = LocalKeywordIndex(keyword_config)
+    index.add(TEST_USER_ID, make_text_chunks([
+        "다음 분기 예산안을 검토했습니다",
+        "서버 배포 일정은 금요일입니다",
+        "고객 계약서에서 문제가 발견되었습니다",
+    ]))
+
+    hits = index.search(TEST_USER_ID, "계약서 문제", k=3)
+
+    assert hits[0][0].chunk_id == "meeting-1-chunk-2"
+    assert [s for _, s in hits] == sorted([s for _, s in hits], reverse=True)
+    assert index.search(TEST_USER_ID, "채용", k=3) == []
+
+
+def test_keyword_index_persists_and_removes_meeting(keyword_config):
+    """Index should reload from disk and drop removed meetings"""
+    index = LocalKeywordIndex(keyword_config)
+    index.add(TEST_USER_ID, make_text_chunks(["예산 논의"], "meeting-1"))
+    index.add(TEST_USER_ID, make_text_chunks(["예산 확정"], "meeting-2"))
+
+    assert index.remove_meeting(TEST_USER_ID, "meeting-1") == 1
+
+    reloaded = LocalKeywordIndex(keyword_config)
+    hits = reloaded.search(TEST_USER_ID, "예산", k=5)
+    assert [chunk.meeting_id for chunk, _ in hits] == ["meeting-2"]
+
+
+def test_keyword_index_drops_torn_entry(keyword_config):
+    """A partially written last line should be discarded on load"""
+    directory = Path(keyword_config.base_dir) / TEST_USER_ID
+    index = UserKeywordIndex(directory, keyword_config)
+    index.add(make_text_chunks(["예산 논의", "일정 공유"]))
+
+    with open(directory / UserKeywordIndex.DOCS_FILE, "a", encoding="utf-8") as f:
+        f.write('{"chunk_id": "torn')
+
+    reloaded = UserKeywordIndex(directory, keyword_config)
+    assert reloaded.size == 2
+    assert reloaded.search("일정", k=1)[0][0].text == "일정 공유"
+
+
+@pytest.mark.benchmark
+def test_keyword_index_relevance_and_latency(keyword_config):
+    """Benchmark MRR and latency of BM25 n-gram search on Korean queries"""
+    texts, topics = generate_korean_corpus(20000)
+    index = LocalKeywordIndex(keyword_config)
+    index.add(TEST_USER_ID, make_text_chunks(texts))
+
+    # Each query is two bare nouns; relevant chunks mention both
+    rng = np.random.default_rng(7)
+    reciprocal_ranks = []
+    latencies = []
+    for _ in range(100):
+        pair = list(rng.choice(KOREAN_NOUNS, size=2, replace=False))
+        relevant = {
+            f"meeting-1-chunk-{i}" for i, nouns in enumerate(topics)
+            if pair[0] in nouns and pair[1] in nouns
+        }
+        start = time.perf_counter()
+        hits = index.search(TEST_USER_ID, " ".join(pair), k=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        rank = next(
+            (r for r, (chunk, _) in enumerate(hits, start=1) if chunk.chunk_id in relevant), None
+        )
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+
+    mrr = float(np.mean(reciprocal_ranks))
+
+    print(f"\n=== Local Keyword Index Benchmark (20k Korean chunks) ===")
+    print(f"MRR@10: {mrr:.3f}")
+    print(f"Latency: {np.mean(latencies):.2f}ms mean, {np.percentile(latencies, 95):.2f}ms p95")
+
+    assert mrr >= 0.9
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,201 @@
+"""
+Tests for the Re-ranker
+Cross-encoder ordering, thresholds and fallback to the search ranking;
+LLM early cutoff, score cache and client creation
+"""
+
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("supabase")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+
+from rag_search import SearchResult
+import reranker as reranker_module
+from reranker import CrossEncoderReranker, LangChainReranker, RerankerConfig
+
+
+QUERY = "예산 승인"
+
+
+def make_result(chunk_id: str, combined_score: float, text: str = "") -> SearchResult:
+    return SearchResult(
+        chunk_id=chunk_id,
+        meeting_id="meeting-1",
+        chunk_index=0,
+        start_time=0.0,
+        end_time=7.0,
+        speaker_id=None,
+        text=text or chunk_id,
+        keyword_score=0.0,
+        semantic_score=combined_score,
+        combined_score=combined_score
+    )
+
+
+def cross_encoder(relevance, **config) -> CrossEncoderReranker:
+    """Cross-encoder whose model scores each document by text"""
+    reranker = CrossEncoderReranker(RerankerConfig(backend="cross_encoder", **config))
+    reranker._initialized = True
+    reranker._score_pairs = lambda pairs: np.array(
+        [relevance[document] for _, document in pairs], dtype=np.float32
+    )
+    return reranker
+
+
+def llm(relevance, **config) -> LangChainReranker:
+    """LLM re-ranker whose model scores each document by text, recording the prompts"""
+    reranker = LangChainReranker(RerankerConfig(backend="llm", **config))
+    reranker.prompts = []
+
+    async def call_ollama(prompt):
+        reranker.prompts.append(prompt)
+        return "\n".join(
+            f"{number}: {relevance[text]:.4f} - 관련" for number, text in prompted(prompt)
+        )
+
+    reranker._call_ollama = call_ollama
+    return reranker
+
+
+def prompted(prompt: str):
+    """(document number, text) of each document in a batch prompt"""
+    return re.findall(r"\[문서 (\d+)\]\n(.+)", prompt)
+
+
+async def test_cross_encoder_reorders_by_relevance():
+    """A relevant chunk overtakes better-scored search hits"""
+    results = [make_result("a", 0.9), make_result("b", 0.5), make_result("c", 0.4)]
+    reranker = cross_encoder(
+        {"a": 0.0, "b": 1.0, "c": 0.5},
+        original_weight=0.5, rerank_weight=0.5, min_score=0.0
+    )
+
+    reranked = await reranker.rerank(QUERY, results)
+
+    assert [r.chunk_id for r in reranked] == ["b", "a", "c"]
+    assert reranked[0].final_score == pytest.approx(0.75)
+    assert reranked[0].original_score == pytest.approx(0.5)
+
+
+async def test_cross_encoder_applies_min_score_and_top_k():
+    """Results below min_score are dropped before top_k is applied"""
+    results = [make_result(chunk_id, 0.5) for chunk_id in "abcd"]
+    reranker = cross_encoder(
+        {"a": 0.9, "b": 0.1, "c": 0.7, "d": 0.8},
+        original_weight=0.5, rerank_weight=0.5, min_score=0.5, top_k=10
+    )
+
+    assert [r.chunk_id for r in await reranker.rerank(QUERY, results)] == ["a", "d", "c"]
+    assert [r.chunk_id for r in await reranker.rerank(QUERY, results, top_k=2)] == ["a", "d"]
+
+
+async def test_cross_encoder_falls_back_when_model_fails_to_load():
+    """A model load failure keeps the search ranking instead of failing the query"""
+    reranker = CrossEncoderReranker(RerankerConfig(backend="cross_encoder", min_score=0.0))
+
+    def load_model():
+        raise ImportError("No module named 'FlagEmbedding'")
+
+    reranker._load_model = load_model
+    results = [make_result("a", 0.2), make_result("b", 0.8)]
+
+    reranked = await reranker.rerank(QUERY, results)
+
+    assert [r.chunk_id for r in reranked] == ["b", "a"]
+    assert [r.rerank_score for r in reranked] == pytest.approx([0.8, 0.2])
+    assert reranked[0].final_score == pytest.approx(0.8)
+
+
+# LLM Re-ranker Tests
+
+@pytest.mark.parametrize("seed", range(20))
+async def test_llm_early_cutoff_keeps_the_true_top_k(seed):
+    """Skipping batches never drops a result that scoring everything would keep"""
+    rng = random.Random(seed)
+    results = [make_result(f"c{i}", round(rng.random(), 4)) for i in range(23)]
+    relevance = {r.text: round(rng.random(), 4) for r in results}
+    reranker = llm(
+        relevance, batch_size=3, max_concurrent_batches=2, top_k=4,
+        original_weight=0.6, rerank_weight=0.4, min_score=0.3
+    )
+
+    reranked = await reranker.rerank(QUERY, results)
+
+    final = {r.chunk_id: r.combined_score * 0.6 + relevance[r.text] * 0.4 for r in results}
+    expected = sorted((c for c in final if final[c] >= 0.3), key=final.get, reverse=True)[:4]
+    assert [r.chunk_id for r in reranked] == expected
+
+
+async def test_llm_early_cutoff_skips_settled_batches():
+    """Once top_k beats the best possible remaining score, no more batches are prompted"""
+    results = [make_result(f"c{i}", 0.9 - i / 10) for i in range(8)]
+    relevance = {r.text: 1.0 if r.chunk_id in ("c0", "c1") else 0.0 for r in results}
+    reranker = llm(
+        relevance, batch_size=2, max_concurrent_batches=1, top_k=2,
+        original_weight=0.5, rerank_weight=0.5, min_score=0.0
+    )
+
+    reranked = await reranker.rerank(QUERY, results)
+
+    # c2 can reach at most 0.7 * 0.5 + 0.5 = 0.85 < 0.9
+    assert [r.chunk_id for r in reranked] == ["c0", "c1"]
+    assert len(reranker.prompts) == 1
+
+
+async def test_llm_score_cache_skips_the_llm():
+    """(query, chunk_id) cache hits are not prompted again"""
+    results = [make_result(chunk_id, 0.5) for chunk_id in "abc"]
+    relevance = {"a": 0.9, "b": 0.6, "c": 0.3, "d": 0.8}
+    reranker = llm(relevance, batch_size=4, min_score=0.0, score_cache_size=3)
+
+    first = await reranker.rerank(QUERY, results)
+    again = await reranker.rerank(f" {QUERY} ", results)
+    assert len(reranker.prompts) == 1
+    assert [(r.chunk_id, r.final_score) for r in again] == [(r.chunk_id, r.final_score) for r in first]
+
+    # Only the uncached chunk is prompted; it evicts the least recently used score
+    await reranker.rerank(QUERY, [results[0], make_result("d", 0.5)])
+    assert prompted(reranker.prompts[-1]) == [("1", "d")]
+    await reranker.rerank(QUERY, results[1:])
+    assert prompted(reranker.prompts[-1]) == [("1", "b")]
+
+    await reranker.rerank("다른 질문", results)
+    assert len(prompted(reranker.prompts[-1])) == 3
+
+
+def test_llm_client_is_created_once(monkeypatch):
+    """Concurrent batches share one Ollama client"""
+    created = []
+
+    class SlowOllama:
+        def __init__(self, **kwargs):
+            time.sleep(0.05)
+            created.append(self)
+
+    monkeypatch.setattr(reranker_module, "_load_ollama_llm", lambda: SlowOllama)
+    reranker = LangChainReranker(RerankerConfig(backend="llm"))
+    start = threading.Barrier(4)
+
+    def get_client(_):
+        start.wait()
+        return reranker.ollama_client
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        clients = list(pool.map(get_client, range(4)))
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
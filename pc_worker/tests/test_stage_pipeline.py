@@ -0,0 +1,354 @@
+"""
+Tests for the worker stage pipeline
+Prepare, STT and finalize overlap; failures free their slot; STT batching keeps queue order;
+meetings claimed by another worker are skipped; interrupted meetings need a unique worker ID
+and prewarm only the models of the stages they still run
+
+The stages themselves are stubbed: each records when it runs and can be held at a gate.
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("supabase")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+
+import main_worker
+from exceptions import AudioDownloadError, SupabaseQueryError, TranscriptionError
+from main_worker import MeetingJob, PCWorker
+from models import AudioMetadata
+from stt_checkpoint import StageCheckpointStore
+
+
+SHORT_SECONDS = 60.0
+LONG_SECONDS = 7200.0
+
+STAGE_ERRORS = {
+    "prepare": AudioDownloadError("download failed"),
+    "stt": TranscriptionError("decode failed"),
+    "finalize": SupabaseQueryError("save failed"),
+}
+
+
+def make_job(meeting_id: str, seconds: float = SHORT_SECONDS, preference=None) -> MeetingJob:
+    return MeetingJob(
+        meeting_id=meeting_id,
+        user_id="user-1",
+        start_time=0.0,
+        processed_audio_path=Path(f"{meeting_id}.wav"),
+        audio_metadata=AudioMetadata(
+            file_path=f"{meeting_id}.wav", duration_seconds=seconds, sample_rate=16000,
+            channels=1, format="wav", size_bytes=int(seconds * 32000)
+        ),
+        content_hash=f"hash-{meeting_id}",
+        stt_engine_preference=preference
+    )
+
+
+class Stages:
+    """Stubbed stages of one worker, recording (stage, meeting_id) as each starts"""
+
+    def __init__(self, worker: PCWorker, fail=None):
+        self.fail = fail  # (stage, meeting_id) that raises
+        self.gates = {}
+        self.events = []
+        self.batches = []
+        self.completed = []
+        worker._prepare_meeting = self.prepare
+        worker._transcribe_meeting = self.transcribe
+        worker._transcribe_meetings = self.transcribe_batch
+        worker._finalize_meeting = self.finalize
+
+    def hold(self, stage: str, meeting_id: str) -> asyncio.Event:
+        """Gate that keeps the stage of a meeting running until set"""
+        gate = self.gates[(stage, meeting_id)] = asyncio.Event()
+        return gate
+
+    def started(self, stage: str):
+        return [meeting_id for name, meeting_id in self.events if name == stage]
+
+    async def _run(self, stage: str, meeting_id: str) -> None:
+        self.events.append((stage, meeting_id))
+        gate = self.gates.get((stage, meeting_id))
+        if gate is not None:
+            await gate.wait()
+        if self.fail == (stage, meeting_id):
+            raise STAGE_ERRORS[stage]
+
+    async def prepare(self, meeting_id):
+        await self._run("prepare", meeting_id)
+        return make_job(meeting_id)
+
+    async def transcribe(self, job):
+        await self._run("stt", job.meeting_id)
+        job.pipeline_result = f"result-{job.meeting_id}"
+
+    async def transcribe_batch(self, jobs):
+        self.batches.append([job.meeting_id for job in jobs])
+        for job in jobs:
+            self.events.append(("stt", job.meeting_id))
+            # A meeting that fails inside a batch gets no result
+            if self.fail != ("stt", job.meeting_id):
+                job.pipeline_result = f"result-{job.meeting_id}"
+
+    async def finalize(self, job):
+        await self._run("finalize", job.meeting_id)
+        self.completed.append(job.meeting_id)
+
+
+def make_worker(prefetch: int = 1) -> PCWorker:
+    """Worker with the stage queues and no models, database or files"""
+    worker = object.__new__(PCWorker)
+    worker.worker_id = "worker-1"
+    worker.is_running = True
+    worker.current_jobs = 0
+    worker.summarizer = None
+    worker.models = SimpleNamespace(prewarm=lambda *names: None)
+    worker._intake_queue = asyncio.Queue()
+    worker._stt_queue = asyncio.Queue(maxsize=prefetch)
+    worker._finalize_queue = asyncio.Queue(maxsize=prefetch)
+    worker._stage_tasks = []
+    worker._capacity_available = asyncio.Event()
+    worker._cleanup_job_files = lambda meeting_id: None
+    worker.failed = []
+
+    async def handle_processing_error(meeting_id, error_type, error):
+        worker.failed.append((meeting_id, error_type))
+
+    worker._handle_processing_error = handle_processing_error
+    return worker
+
+
+async def settle(condition, timeout: float = 2.0) -> None:
+    """Let the stage loops run until condition() holds"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "stage pipeline did not settle"
+        await asyncio.sleep(0.001)
+
+
+@pytest.fixture(autouse=True)
+def no_stt_batching(monkeypatch):
+    monkeypatch.setattr(main_worker, "STT_BATCH_MAX_MEETINGS", 1)
+
+
+@pytest.fixture
+async def worker():
+    worker = make_worker()
+    yield worker
+    await worker._stop_stage_pipeline()
+
+
+async def test_stages_overlap_with_bounded_queues(worker):
+    """The next meetings prepare during STT and transcribe during finalize; queues cap prepared audio"""
+    stages = Stages(worker)
+    stt_m1 = stages.hold("stt", "m1")
+    finalize_m1 = stages.hold("finalize", "m1")
+    worker._start_stage_pipeline()
+    for meeting_id in ("m1", "m2", "m3", "m4"):
+        worker._enqueue_meeting(meeting_id)
+
+    # m2 waits in the STT queue, m3 is prepared but blocked on it, m4 is not started
+    await settle(lambda: stages.started("prepare") == ["m1", "m2", "m3"])
+    await asyncio.sleep(0.01)
+    assert stages.started("prepare") == ["m1", "m2", "m3"]
+    assert stages.started("stt") == ["m1"]
+
+    stt_m1.set()
+    await settle(lambda: "m2" in stages.started("stt"))
+    assert stages.started("finalize") == ["m1"] and stages.completed == []
+
+    finalize_m1.set()
+    await settle(lambda: stages.completed == ["m1", "m2", "m3", "m4"])
+    assert worker.current_jobs == 0
+    assert worker.failed == []
+    assert worker._capacity_available.is_set()
+
+
+@pytest.mark.parametrize("stage, error_type", [
+    ("prepare", "Audio download failed"),
+    ("stt", "Transcription failed"),
+    ("finalize", "Processing failed"),
+])
+async def test_stage_failure_frees_its_slot(worker, stage, error_type):
+    """A meeting failing in any stage is marked failed and the next one still completes"""
+    stages = Stages(worker, fail=(stage, "m1"))
+    worker._start_stage_pipeline()
+    worker._enqueue_meeting("m1")
+    worker._enqueue_meeting("m2")
+
+    await settle(lambda: stages.completed == ["m2"] and worker.current_jobs == 0)
+    assert worker.failed == [("m1", error_type)]
+
+
+async def test_skipped_meeting_frees_its_slot(worker):
+    """A meeting the prepare stage completes itself (e.g. as a duplicate) leaves the pipeline"""
+    stages = Stages(worker)
+
+    async def prepare(meeting_id):
+        stages.events.append(("prepare", meeting_id))
+        return None if meeting_id == "m1" else make_job(meeting_id)
+
+    worker._prepare_meeting = prepare
+    worker._start_stage_pipeline()
+    worker._enqueue_meeting("m1")
+    worker._enqueue_meeting("m2")
+
+    await settle(lambda: stages.completed == ["m2"] and worker.current_jobs == 0)
+    assert stages.started("stt") == ["m2"]
+    assert worker.failed == []
+
+
+async def test_stt_batches_keep_queue_order(monkeypatch):
+    """Held and mismatched jobs are neither lost nor reordered; a batch miss fails only that meeting"""
+    monkeypatch.setattr(main_worker, "STT_BATCH_MAX_MEETINGS", 3)
+    worker = make_worker(prefetch=10)
+    stages = Stages(worker, fail=("stt", "m5"))
+    jobs = [
+        make_job("m1"),
+        make_job("m2"),
+        make_job("m3", preference="faster_whisper"),  # other engine: ends the first batch
+        make_job("m4", LONG_SECONDS),                 # too long to batch
+        make_job("m5"),
+        make_job("m6"),
+        make_job("m7"),
+        make_job("m8"),                               # batch is full at m7
+    ]
+    for job in jobs:
+        worker.current_jobs += 1
+        worker._stt_queue.put_nowait(job)
+
+    worker._stage_tasks = [
+        asyncio.create_task(worker._stt_stage_loop()),
+        asyncio.create_task(worker._finalize_stage_loop()),
+    ]
+    try:
+        await settle(lambda: worker.current_jobs == 0)
+    finally:
+        await worker._stop_stage_pipeline()
+
+    assert stages.batches == [["m1", "m2"], ["m5", "m6", "m7"]]
+    assert stages.started("stt") == [job.meeting_id for job in jobs]
+    assert stages.completed == ["m1", "m2", "m3", "m4", "m6", "m7", "m8"]
+    assert worker.failed == [("m5", "Transcription failed")]
+
+
+class FakeSupabase:
+    """Pending meetings, of which this worker wins the claims in won"""
+
+    def __init__(self, pending, won):
+        self.pending = pending
+        self.won = set(won)
+        self.claims = []
+        self.limits = []
+
+    async def get_pending_meetings(self, limit):
+        self.limits.append(limit)
+        return [SimpleNamespace(id=meeting_id) for meeting_id in self.pending[:limit]]
+
+    async def claim_meeting(self, meeting_id, worker_id):
+        self.claims.append((meeting_id, worker_id))
+        return meeting_id in self.won
+
+
+async def test_poll_skips_meetings_claimed_elsewhere(monkeypatch):
+    """Only meetings whose claim this worker won enter the pipeline or take a slot"""
+    monkeypatch.setattr(main_worker, "MAX_CONCURRENT_JOBS", 3)
+    worker = make_worker()
+    worker.supabase = FakeSupabase(["m1", "m2", "m3"], won={"m1", "m3"})
+    worker._stage_tasks = [SimpleNamespace()]  # stage pipeline running
+
+    async def no_alignment_requests():
+        pass
+
+    worker._poll_word_alignment_requests = no_alignment_requests
+
+    await worker.poll_pending_meetings()
+
+    assert [meeting_id for meeting_id, _ in worker.supabase.claims] == ["m1", "m2", "m3"]
+    assert worker.supabase.limits == [worker._max_in_flight()]
+    assert [worker._intake_queue.get_nowait() for _ in range(worker._intake_queue.qsize())] == ["m1", "m3"]
+    assert worker.current_jobs == 2
+
+    # Without the stage pipeline, unclaimed meetings are not processed either
+    worker._stage_tasks = []
+    worker.current_jobs = 0
+    processed = []
+
+    async def process_meeting(meeting_id):
+        processed.append(meeting_id)
+
+    worker.process_meeting = process_meeting
+    await worker.poll_pending_meetings()
+    assert processed == ["m1", "m3"]
+
+
+async def test_requeue_needs_a_unique_worker_id():
+    """Meetings left in processing are requeued only under an explicit worker ID"""
+    requeued_for = []
+
+    async def requeue_interrupted_meetings(worker_id):
+        requeued_for.append(worker_id)
+        return ["m1"]
+
+    worker = make_worker()
+    worker.supabase = SimpleNamespace(requeue_interrupted_meetings=requeue_interrupted_meetings)
+
+    worker.worker_id = main_worker.DEFAULT_WORKER_ID
+    await worker._requeue_interrupted_meetings()
+    assert requeued_for == []
+
+    worker.worker_id = "office-pc-1"
+    await worker._requeue_interrupted_meetings()
+    assert requeued_for == ["office-pc-1"]
+
+
+@pytest.mark.parametrize("finished, prewarmed", [
+    (["audio"], ("stt",)),
+    (["audio", "transcription", "diarization"], ()),
+    (["audio", "transcription", "diarization", "saved"], ()),
+])
+async def test_resumed_meeting_prewarms_remaining_stages(tmp_path, monkeypatch, finished, prewarmed):
+    """STT is not loaded for a meeting resuming after diarization"""
+    monkeypatch.setattr(main_worker, "MODEL_PREWARM", True)
+    checkpoint = StageCheckpointStore(tmp_path, "m1", "fp")
+    checkpoint.save("audio", {
+        "audio_metadata": make_job("m1").audio_metadata.model_dump(mode="json"),
+        "content_hash": "hash-m1"
+    })
+    checkpoint.audio_path.write_bytes(b"RIFF")
+    for stage in finished[1:]:
+        checkpoint.save(stage, {})
+
+    async def nothing(*args, **kwargs):
+        pass
+
+    async def get_meeting_by_id(meeting_id):
+        return SimpleNamespace(id=meeting_id, user_id="user-1")
+
+    async def get_stt_settings(user_id):
+        return None, None
+
+    prewarms = []
+    worker = make_worker()
+    worker.models = SimpleNamespace(prewarm=lambda *names: prewarms.append(names))
+    worker.supabase = SimpleNamespace(update_meeting_status=nothing, get_meeting_by_id=get_meeting_by_id)
+    worker.realtime = SimpleNamespace(notify_processing_started=nothing)
+    worker._apply_template_tags = nothing
+    worker._stage_checkpoint = lambda meeting: checkpoint
+    worker._get_stt_settings = get_stt_settings
+
+    job = await worker._prepare_meeting("m1")
+
+    assert job.resumed_stage == finished[-1]
+    assert prewarms == [prewarmed]
@@ -0,0 +1,58 @@
+"""
+Tests for worker startup imports
+Heavy ML packages are deferred until their models load; import-time report parsing
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from profile_startup import parse_importtime, profile_module, summarize_imports
+
+
+IMPORTTIME_REPORT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _abc
+import time:       300 |        420 | abc
+import time:      1500 |       1500 |       torch._C
+import time:      2500 |       4000 |     torch
+import time:       800 |       4800 |   stt_pipeline
+import time:      1000 |       5800 | main_worker
+Traceback lines and other stderr output are ignored
+"""
+
+
+def test_parse_importtime_report():
+    """Report lines are parsed with their nesting depth; other lines are skipped"""
+    timings = parse_importtime(IMPORTTIME_REPORT)
+
+    assert [t.module for t in timings] == ["_abc", "abc", "torch._C", "torch", "stt_pipeline", "main_worker"]
+    assert [t.depth for t in timings] == [1, 0, 3, 2, 1, 0]
+    assert timings[3].self_us == 2500 and timings[3].cumulative_us == 4000
+
+
+def test_summarize_imports():
+    """Total is the sum of top-level imports; self time is grouped by package"""
+    profile = summarize_imports("main_worker", parse_importtime(IMPORTTIME_REPORT))
+
+    assert profile.total_seconds == pytest.approx(0.00622)  # abc + main_worker
+    assert list(profile.packages)[0] == "torch"
+    assert profile.packages["torch"] == pytest.approx(0.004)
+    assert profile.deferred_imported == ["torch"]
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(
+    any(importlib.util.find_spec(name) is None for name in ("supabase", "watchdog", "docx")),
+    reason="worker dependencies not installed"
+)
+def test_main_worker_startup_defers_heavy_imports():
+    """Importing the worker does not import torch, whisperx, pyannote, ..."""
+    profile = profile_module("main_worker")
+
+    assert profile.deferred_imported == [], f"imported at startup: {profile.deferred_imported}"
@@ -0,0 +1,64 @@
+"""
+Tests for stage checkpoints
+Resume from the last finished stage, invalidation, stale fingerprints, pruning
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stt_checkpoint import StageCheckpointStore, prune_stage_checkpoints
+
+
+def test_stages_resume_in_order(tmp_path):
+    """Finished stages survive a new store; saving a stage drops the later ones"""
+    store = StageCheckpointStore(tmp_path, "meeting/1", "fp")
+    assert store.last_stage() is None
+
+    store.save("audio", {"content_hash": "abc"})
+    store.save("transcription", {"segments": [{"text": "안녕하세요"}]})
+    store.save("diarization", {"speakers": []})
+
+    resumed = StageCheckpointStore(tmp_path, "meeting/1", "fp")
+    assert resumed.last_stage() == "diarization"
+    assert resumed.load("transcription") == {"segments": [{"text": "안녕하세요"}]}
+
+    # Re-running an earlier stage invalidates what was built on it
+    resumed.save("audio", {"content_hash": "def"})
+    assert resumed.last_stage() == "audio"
+    assert resumed.load("diarization") is None
+
+
+def test_stale_fingerprint_discards_all_stages(tmp_path):
+    """Checkpoints of a different recording are deleted, audio included"""
+    store = StageCheckpointStore(tmp_path, "m1", "old-recording")
+    store.save("audio", {"content_hash": "abc"})
+    store.audio_path.write_bytes(b"RIFF")
+
+    replaced = StageCheckpointStore(tmp_path, "m1", "new-recording")
+    assert replaced.load("audio") is None
+    assert not store.path.exists()
+
+
+def test_clear_and_prune(tmp_path):
+    """Completed meetings are cleared; old unfinished ones are pruned"""
+    done = StageCheckpointStore(tmp_path, "done", "fp")
+    done.save("saved", {})
+    done.clear()
+    assert not done.path.exists()
+
+    old = StageCheckpointStore(tmp_path, "old", "fp")
+    old.save("audio", {})
+    week_ago = time.time() - 7 * 24 * 3600
+    for path in [*old.path.iterdir(), old.path]:
+        os.utime(path, (week_ago, week_ago))
+    recent = StageCheckpointStore(tmp_path, "recent", "fp")
+    recent.save("audio", {})
+
+    assert prune_stage_checkpoints(tmp_path, max_age_hours=72) == 1
+    assert not old.path.exists()
+    assert recent.load("audio") == {}
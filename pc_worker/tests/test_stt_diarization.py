@@ -138,17 +138,79 @@ async def test_audio_load_and_save(audio_processor, test_audio_dir):
 
 
 @pytest.mark.asyncio
-async def test_audio_normalization(audio_processor):
-    """Test audio normalization"""
-    # Create audio with varying amplitude
-    audio_data = np.random.randn(16000) * 0.5
+async def test_audio_load_compressed_via_ffmpeg_pipe(audio_processor, test_audio_dir):
+    """Test decoding a compressed file through the ffmpeg pipe (no temp WAV)"""
+    import subprocess
+    from audio_decoder import get_ffmpeg_path
+
+    # 44.1kHz stereo source, encoded to m4a
+    source = test_audio_dir / "source.wav"
+    stereo = np.stack([generate_test_audio(3.0, 44100)] * 2, axis=1)
+    sf.write(source, stereo, 44100)
+
+    test_file = test_audio_dir / "test_audio.m4a"
+    try:
+        subprocess.run(
+            [get_ffmpeg_path(), '-y', '-v', 'error', '-i', str(source), str(test_file)],
+            check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("ffmpeg not available")
+
+    loaded_audio, sample_rate = await audio_processor.load_audio(test_file)
+
+    assert sample_rate == TEST_SAMPLE_RATE
+    assert loaded_audio.dtype == np.float32
+    assert loaded_audio.ndim == 1
+    assert abs(len(loaded_audio) / sample_rate - 3.0) < 0.1
+    assert list(test_audio_dir.glob("*.wav")) == [source]
 
-    # Normalize
-    normalized = audio_processor._normalize_audio(audio_data)
 
-    # Check normalization
-    assert np.abs(normalized).max() <= 1.0
-    assert np.abs(normalized).max() > 0.9  # Should be close to 1.0
+@pytest.mark.asyncio
+async def test_streaming_preprocess_matches_in_memory(test_audio_dir):
+    """Streaming preprocessing should match the in-memory path at bounded memory"""
+    source = test_audio_dir / "long_audio.wav"
+    sf.write(source, generate_test_audio(60.0, 44100), 44100)
+
+    in_memory = get_audio_processor(target_sample_rate=TEST_SAMPLE_RATE)
+    streaming = AudioProcessor(
+        target_sample_rate=TEST_SAMPLE_RATE, streaming=True, block_seconds=5.0
+    )
+
+    expected_meta = await in_memory.preprocess_audio(
+        source, test_audio_dir / "in_memory.wav", TEST_MEETING_ID
+    )
+    streamed_meta = await streaming.preprocess_audio(
+        source, test_audio_dir / "streamed.wav", TEST_MEETING_ID
+    )
+
+    expected, _ = sf.read(test_audio_dir / "in_memory.wav")
+    streamed, _ = sf.read(test_audio_dir / "streamed.wav")
+
+    assert streamed_meta.duration_seconds == pytest.approx(expected_meta.duration_seconds)
+    assert len(streamed) == len(expected)
+    assert streamed_meta.loudness_lufs == pytest.approx(expected_meta.loudness_lufs, abs=0.05)
+    assert np.abs(streamed).max() <= 10 ** (-1.5 / 20) + 1e-3
+    assert np.corrcoef(streamed, expected)[0, 1] > 0.999
+
+
+@pytest.mark.asyncio
+async def test_audio_normalization(audio_processor, test_audio_dir):
+    """Test loudness normalization during preprocessing"""
+    # Quiet recording (e.g. phone voice memo)
+    source = test_audio_dir / "quiet.wav"
+    sf.write(source, generate_test_audio(5.0) * 0.02, TEST_SAMPLE_RATE)
+
+    metadata = await audio_processor.preprocess_audio(
+        source, test_audio_dir / "normalized.wav", TEST_MEETING_ID
+    )
+    normalized, _ = sf.read(test_audio_dir / "normalized.wav")
+
+    # Source loudness is recorded; output is louder but under the peak ceiling
+    assert metadata.loudness_lufs is not None
+    assert metadata.loudness_lufs < -30
+    assert np.abs(normalized).max() <= 10 ** (-1.5 / 20) + 1e-3
+    assert np.abs(normalized).max() > 0.1
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,150 @@
+"""
+Tests for STT Engine Registry
+Per-job engine selection and lazy engine loading
+"""
+
+import sys
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stt_engines import (
+    EngineSelectionPolicy,
+    EngineSpec,
+    STTEngine,
+    STTEngineRegistry,
+    StreamingSTTEngine,
+    register_stt_engine,
+    select_stt_engine,
+    use_word_alignment,
+)
+from exceptions import TranscriptionError
+from models import AudioMetadata, TranscriptSegment
+
+
+class FakeEngine:
+    """Minimal STTEngine implementation that records calls"""
+
+    instances: List["FakeEngine"] = []
+
+    def __init__(self, model: Optional[str], device: Optional[str]):
+        self.model = model
+        self.device = device
+        self.initialized = 0
+        self.cleaned_up = False
+        FakeEngine.instances.append(self)
+
+    async def initialize(self) -> None:
+        self.initialized += 1
+
+    async def transcribe(
+        self,
+        audio_path: Path,
+        meeting_id: str,
+        language: Optional[str] = None,
+        audio_metadata: Optional[AudioMetadata] = None
+    ) -> List[TranscriptSegment]:
+        return []
+
+    def get_model_info(self) -> Dict:
+        return {"model": self.model}
+
+    async def cleanup(self) -> None:
+        self.cleaned_up = True
+
+
+class FakeStreamingEngine(FakeEngine):
+    """FakeEngine that also yields segments while decoding"""
+
+    async def transcribe_stream(
+        self,
+        audio_path: Path,
+        meeting_id: str,
+        language: Optional[str] = None,
+        audio_metadata: Optional[AudioMetadata] = None
+    ) -> AsyncIterator[TranscriptSegment]:
+        for i in range(3):
+            yield TranscriptSegment(meeting_id=meeting_id, start_time=i, end_time=i + 1, text=str(i))
+
+
+@pytest.fixture
+def fake_engine():
+    FakeEngine.instances = []
+    register_stt_engine("fake", FakeEngine)
+    return FakeEngine
+
+
+def test_engine_spec_parsing():
+    """Specs are "name" or "name:model"; names are case-insensitive"""
+    assert EngineSpec.parse("whisperx") == EngineSpec("whisperx")
+    assert EngineSpec.parse(" Faster-Whisper:large-v3-turbo ") == EngineSpec("faster-whisper", "large-v3-turbo")
+    assert str(EngineSpec("whisperx", "large-v2")) == "whisperx:large-v2"
+
+
+def test_selection_order():
+    """Preference > CPU-only > short audio > default"""
+    policy = EngineSelectionPolicy(short_audio_seconds=300.0)
+
+    assert select_stt_engine(3600, has_cuda=True, policy=policy) == policy.default
+    assert select_stt_engine(120, has_cuda=True, policy=policy) == policy.short_audio
+    assert select_stt_engine(None, has_cuda=True, policy=policy) == policy.default
+    assert select_stt_engine(120, has_cuda=False, policy=policy) == policy.cpu
+    assert select_stt_engine(120, "korean-whisper", has_cuda=False, policy=policy) == EngineSpec("korean-whisper")
+
+    # Unknown preferences fall back to the automatic choice
+    assert select_stt_engine(3600, "nonexistent", has_cuda=True, policy=policy) == policy.default
+
+    # 0 disables the short-audio rule
+    policy.short_audio_seconds = 0
+    assert select_stt_engine(10, has_cuda=True, policy=policy) == policy.default
+
+
+def test_word_alignment_fast_mode():
+    """Per-job setting > duration threshold > always align"""
+    assert use_word_alignment(3600) is True
+    assert use_word_alignment(3600, fast_mode_seconds=1800) is False
+    assert use_word_alignment(600, fast_mode_seconds=1800) is True
+    assert use_word_alignment(None, fast_mode_seconds=1800) is True
+    assert use_word_alignment(600, requested=False, fast_mode_seconds=1800) is False
+    assert use_word_alignment(3600, requested=True, fast_mode_seconds=1800) is True
+
+
+async def test_registry_loads_each_engine_once(fake_engine):
+    """Engines are created and initialized on first use, then reused"""
+    registry = STTEngineRegistry(device="cpu")
+
+    first = await registry.get(EngineSpec("fake", "small"))
+    again = await registry.get(EngineSpec("fake", "small"))
+    other = await registry.get(EngineSpec("fake", "large"))
+
+    assert first is again
+    assert first is not other
+    assert isinstance(first, STTEngine)
+    assert first.initialized == 1
+    assert (first.model, first.device) == ("small", "cpu")
+    assert registry.get_info() == {"fake:small": {"model": "small"}, "fake:large": {"model": "large"}}
+
+    await registry.cleanup()
+    assert all(engine.cleaned_up for engine in fake_engine.instances)
+    assert registry.get_info() == {}
+
+
+async def test_registry_rejects_unknown_engine():
+    """An unregistered engine name is a transcription error"""
+    with pytest.raises(TranscriptionError, match="Unknown STT engine"):
+        await STTEngineRegistry().get(EngineSpec("nonexistent"))
+
+
+async def test_streaming_engine_protocol():
+    """Only engines with transcribe_stream are streaming engines"""
+    engine = FakeStreamingEngine(None, None)
+
+    assert isinstance(engine, StreamingSTTEngine)
+    assert not isinstance(FakeEngine(None, None), StreamingSTTEngine)
+
+    segments = [s async for s in engine.transcribe_stream(Path("a.wav"), "m1")]
+    assert [s.start_time for s in segments] == [0, 1, 2]
@@ -0,0 +1,245 @@
+"""
+Tests for pooled STT decoding
+Short recordings share model batches; decoded text is routed back per recording
+
+whisperx, torch and faster-whisper are replaced by fakes: the pipeline
+"decodes" a clip to the first sample value, which encodes the recording
+and the second the clip starts at.
+"""
+
+import importlib
+import os
+import sys
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+
+import gpu_memory
+from gpu_memory import BatchSizeStore
+from models import AudioMetadata
+from stt_checkpoint import StageCheckpointStore
+
+
+SAMPLE_RATE = 16000
+
+
+class FakeVad:
+    """Speech from t to t+4s every 10s"""
+
+    def preprocess_audio(self, audio):
+        return audio
+
+    def merge_chunks(self, speech, chunk_size, onset, offset):
+        return speech
+
+    def __call__(self, inputs):
+        duration = len(inputs["waveform"]) / SAMPLE_RATE
+        return [{"start": float(t), "end": float(t + 4)} for t in range(0, int(duration) - 3, 10)]
+
+
+class FakePipeline:
+    """FasterWhisperPipeline stand-in recording the clips of each batch"""
+
+    def __init__(self):
+        self.vad_model = FakeVad()
+        self._vad_params = {"vad_onset": 0.5, "vad_offset": 0.363}
+        self.tokenizer = None
+        self.preset_language = None
+        self.model = SimpleNamespace(hf_tokenizer=None, model=SimpleNamespace(is_multilingual=True))
+        self.batches = []
+
+    def __call__(self, inputs, batch_size, num_workers):
+        clips = [item["inputs"] for item in inputs]
+        for start in range(0, len(clips), batch_size):
+            batch = clips[start:start + batch_size]
+            self.batches.append([int(clip[0]) for clip in batch])
+            for clip in batch:
+                yield {"text": f"clip {int(clip[0])}"}
+
+
+class FakeTokenizer:
+    def __init__(self, hf_tokenizer, multilingual, task, language):
+        self.task = task
+        self.language_code = language
+
+
+def fake_module(monkeypatch, name, **attributes):
+    module = ModuleType(name)
+    module.__dict__.update(attributes)
+    monkeypatch.setitem(sys.modules, name, module)
+    return module
+
+
+# Modules imported against the fakes; dropped again after each test
+FAKE_BACKED = ("whisperx_engine", "speaker_diarization", "stt_pipeline")
+
+
+@pytest.fixture
+def fake_ml_modules(monkeypatch):
+    """Fake torch/whisperx/faster-whisper/pyannote in sys.modules"""
+    fake_module(
+        monkeypatch, "torch",
+        Tensor=type("Tensor", (), {}),
+        load=lambda *args, **kwargs: None,
+        cuda=SimpleNamespace(is_available=lambda: False)
+    )
+    fake_module(monkeypatch, "whisperx", load_model=lambda *args, **kwargs: FakePipeline())
+    fake_module(monkeypatch, "whisperx.diarize", DiarizationPipeline=None)
+    fake_module(monkeypatch, "faster_whisper")
+    fake_module(monkeypatch, "faster_whisper.tokenizer", Tokenizer=FakeTokenizer)
+    for name in ("pyannote", "pyannote.audio.pipelines", "pyannote.audio.pipelines.utils"):
+        fake_module(monkeypatch, name)
+    fake_module(monkeypatch, "pyannote.audio", Pipeline=None)
+    fake_module(monkeypatch, "pyannote.audio.pipelines.utils.hook", ProgressHook=None)
+    fake_module(monkeypatch, "pyannote.core", Annotation=None, Segment=None)
+    monkeypatch.setattr(gpu_memory, "_batch_size_store", BatchSizeStore())
+
+    for name in FAKE_BACKED:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    yield
+    for name in FAKE_BACKED:
+        sys.modules.pop(name, None)
+
+
+@pytest.fixture
+def whisperx_engine(fake_ml_modules):
+    """whisperx_engine imported against the fakes"""
+    return importlib.import_module("whisperx_engine")
+
+
+@pytest.fixture
+def stt_pipeline(fake_ml_modules):
+    """stt_pipeline imported against the fakes"""
+    return importlib.import_module("stt_pipeline")
+
+
+def recording(index: int, seconds: int) -> np.ndarray:
+    """Audio whose samples in second t are index * 1000 + t"""
+    values = index * 1000 + np.arange(seconds, dtype=np.float32)
+    return np.repeat(values, SAMPLE_RATE)
+
+
+async def test_pooled_chunks_are_routed_back_to_their_recording(whisperx_engine):
+    """Each recording gets its own chunk texts and timestamps, in order"""
+    engine = whisperx_engine.WhisperXEngine(
+        whisperx_engine.WhisperXConfig(enable_diarization=False, batch_size=4)
+    )
+    engine.model = FakePipeline()
+    recordings = [
+        ("meeting-a", recording(1, 35), None),   # chunks at 0, 10, 20, 30s
+        ("meeting-b", recording(2, 14), None),   # chunks at 0, 10s
+        ("meeting-c", recording(3, 25), None),   # chunks at 0, 10, 20s
+    ]
+
+    results = await engine._transcribe_pooled(recordings, "ko", word_alignment=False)
+
+    expected = {
+        "meeting-a": [(0.0, 4.0, "clip 1000"), (10.0, 14.0, "clip 1010"),
+                      (20.0, 24.0, "clip 1020"), (30.0, 34.0, "clip 1030")],
+        "meeting-b": [(0.0, 4.0, "clip 2000"), (10.0, 14.0, "clip 2010")],
+        "meeting-c": [(0.0, 4.0, "clip 3000"), (10.0, 14.0, "clip 3010"), (20.0, 24.0, "clip 3020")],
+    }
+    assert {
+        meeting_id: [(s.start_time, s.end_time, s.text) for s in segments]
+        for meeting_id, segments in results.items()
+    } == expected
+
+    # Chunks of different recordings shared model batches
+    assert engine.model.batches == [
+        [1000, 1010, 1020, 1030], [2000, 2010, 3000, 3010], [3020]
+    ]
+    assert engine.model.tokenizer is None  # auto-detecting model: tokenizer reset after use
+
+
+def test_unsupported_pipeline_is_not_pooled(whisperx_engine):
+    """A whisperx without the pipeline internals pooling relies on transcribes files one at a time"""
+    engine = whisperx_engine.WhisperXEngine(whisperx_engine.WhisperXConfig(enable_diarization=False))
+    engine.model = FakePipeline()
+    assert engine._can_pool(None, recording(1, 20))
+
+    del engine.model._vad_params
+    assert not engine._can_pool(None, recording(1, 20))
+
+
+async def test_failed_recording_is_left_out_of_the_pooled_result(whisperx_engine, monkeypatch):
+    """A recording whose finish step fails is missing from the result, not an empty transcript"""
+    engine = whisperx_engine.WhisperXEngine(whisperx_engine.WhisperXConfig(enable_diarization=False))
+    engine.model = FakePipeline()
+    finish = engine._finish_transcription
+
+    async def finish_transcription(result, audio, meeting_id, *args):
+        if meeting_id == "meeting-b":
+            raise RuntimeError("alignment failed")
+        return await finish(result, audio, meeting_id, *args)
+
+    monkeypatch.setattr(engine, "_finish_transcription", finish_transcription)
+    recordings = [(f"meeting-{name}", recording(i, 14), None) for i, name in enumerate("abc", 1)]
+
+    results = await engine._transcribe_pooled(recordings, "ko", word_alignment=False)
+
+    assert sorted(results) == ["meeting-a", "meeting-c"]
+
+
+def audio_metadata(path: Path, seconds: float) -> AudioMetadata:
+    return AudioMetadata(
+        file_path=str(path), duration_seconds=seconds, sample_rate=SAMPLE_RATE,
+        channels=1, format="wav", size_bytes=int(seconds * SAMPLE_RATE * 2)
+    )
+
+
+async def test_process_batch_fails_a_file_that_failed_in_the_batch(
+    whisperx_engine, stt_pipeline, tmp_path, monkeypatch
+):
+    """A file the batch could not transcribe is retried on its own, then left out without checkpoints"""
+    engine = whisperx_engine.WhisperXEngine(whisperx_engine.WhisperXConfig(enable_diarization=False))
+    engine.model = FakePipeline()
+    engine._is_initialized = True
+    audio = {f"{name}.wav": recording(i, 14) for i, name in enumerate("abc", 1)}
+
+    async def load_for_stt(audio_path, audio_metadata=None):
+        if audio_path.name == "b.wav":
+            raise OSError("unreadable audio")
+        return audio[audio_path.name], None
+
+    retried = []
+
+    async def transcribe(audio_path, meeting_id, *args, **kwargs):
+        retried.append(meeting_id)
+        raise whisperx_engine.TranscriptionError("unreadable audio")
+
+    monkeypatch.setattr(engine, "_load_for_stt", load_for_stt)
+    monkeypatch.setattr(engine, "transcribe", transcribe)
+
+    pipeline = object.__new__(stt_pipeline.STTPipeline)
+    pipeline._is_initialized = True
+    pipeline.enable_preprocessing = False
+    pipeline.whisperx_engine = engine
+
+    async def diarize_and_assemble(path, meeting_id, language, on_segments, metadata, segments, *args, **kwargs):
+        return SimpleNamespace(meeting_id=meeting_id, segments=segments, to_dict=lambda: {})
+
+    pipeline._diarize_and_assemble = diarize_and_assemble
+
+    meeting_ids = ["meeting-a", "meeting-b", "meeting-c"]
+    paths = [tmp_path / f"{name}.wav" for name in "abc"]
+    checkpoints = {m: StageCheckpointStore(tmp_path / "checkpoints", m, "fp") for m in meeting_ids}
+
+    results = await pipeline.process_batch(
+        paths, meeting_ids, enhance_audio=False,
+        audio_metadata=[audio_metadata(path, 14.0) for path in paths],
+        word_alignment=False, checkpoints=checkpoints
+    )
+
+    assert [r.meeting_id for r in results] == ["meeting-a", "meeting-c"]
+    assert all(r.segments for r in results)
+    assert retried == ["meeting-b"]
+    assert checkpoints["meeting-a"].last_stage() == "diarization"
+    assert checkpoints["meeting-b"].last_stage() is None
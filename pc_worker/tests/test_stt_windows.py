@@ -0,0 +1,126 @@
+"""
+Tests for Long-Audio STT Windowing
+Silence-aligned window planning, overlap stitching and per-window checkpoints
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stt_windows import (
+    balance_chunks,
+    pack_speech_chunks,
+    plan_replica_cores,
+    plan_windows,
+    stitch_windows,
+)
+from stt_checkpoint import WindowCheckpointStore, audio_fingerprint
+
+
+def test_plan_windows_cuts_in_silence_near_target():
+    """Cuts land in the widest nearby gap; windows cover the whole recording"""
+    # Speech every 10s with a 0.5s gap, plus one wide gap at 589.5-597s
+    speech = [(t, t + 9.5) for t in np.arange(0, 1800, 10.0) if not 590 <= t < 597]
+    speech.append((597.0, 599.5))
+    speech.sort()
+
+    windows = plan_windows(speech, 1800.0, target_seconds=600, search_seconds=60, overlap_seconds=1.0)
+
+    assert windows[0].keep_start == 0.0
+    assert windows[-1].keep_end == 1800.0
+    assert windows[0].keep_end == 593.25  # middle of the wide gap
+    for prev, nxt in zip(windows, windows[1:]):
+        assert prev.keep_end == nxt.keep_start
+        assert nxt.start == nxt.keep_start - 1.0
+
+    # Cuts never fall inside speech
+    for window in windows[:-1]:
+        assert not any(start < window.keep_end < end for start, end in speech)
+
+
+def test_plan_windows_short_audio_is_one_window():
+    """Audio within target + search is not split"""
+    windows = plan_windows([(0.0, 600.0)], 650.0, target_seconds=600, search_seconds=60)
+    assert len(windows) == 1
+    assert (windows[0].start, windows[0].end) == (0.0, 650.0)
+
+
+def test_stitch_windows_offsets_and_deduplicates():
+    """Window-relative times are shifted; overlap duplicates are dropped"""
+    windows = plan_windows([(0, 100), (102, 300)], 300.0, target_seconds=100, search_seconds=10)
+    assert len(windows) == 3
+    first, second, third = windows
+
+    results = [
+        (first, [
+            {"start": 0.0, "end": 50.0, "text": "첫 번째 문장"},
+            {"start": 95.0, "end": 100.5, "text": "경계 문장."},
+        ]),
+        (second, [
+            # Same sentence decoded again in the leading overlap
+            {"start": 0.0, "end": 0.4, "text": "경계 문장"},
+            {"start": 5.0, "end": 20.0, "text": "두 번째 창",
+             "words": [{"word": "두", "start": 5.0, "end": 5.5}]},
+        ]),
+        (third, [{"start": 10.0, "end": 20.0, "text": "세 번째 창"}]),
+    ]
+
+    stitched = stitch_windows(results, overlap_seconds=1.0)
+    texts = [seg["text"] for seg in stitched]
+
+    assert texts == ["첫 번째 문장", "경계 문장.", "두 번째 창", "세 번째 창"]
+    assert stitched[2]["start"] == second.start + 5.0
+    assert stitched[2]["words"][0]["start"] == second.start + 5.0
+    assert stitched[3]["start"] == third.start + 10.0
+
+
+def test_window_checkpoint_resume_and_invalidation(tmp_path):
+    """Finished windows survive a restart; torn lines and stale logs are dropped"""
+    audio = np.random.default_rng(0).standard_normal(16000 * 30).astype(np.float32)
+    fingerprint = audio_fingerprint(audio, 16000, "large-v2", "ko")
+
+    store = WindowCheckpointStore(tmp_path, "meeting/1", fingerprint)
+    store.save(0, [{"start": 0.0, "end": 1.0, "text": "안녕하세요"}])
+    store.save(1, [{"start": np.float32(0.5), "end": 2.0, "text": "네"}])
+    with open(store.path, "a", encoding="utf-8") as f:
+        f.write('{"fingerprint": "')  # crash mid-append
+
+    restored = WindowCheckpointStore(tmp_path, "meeting/1", fingerprint).load()
+    assert sorted(restored) == [0, 1]
+    assert restored[0][0]["text"] == "안녕하세요"
+    assert restored[1][0]["start"] == 0.5
+
+    # Different settings -> checkpoint discarded
+    other = audio_fingerprint(audio, 16000, "large-v3", "ko")
+    assert WindowCheckpointStore(tmp_path, "meeting/1", other).load() == {}
+    assert not store.path.exists()
+
+
+def test_pack_speech_chunks_fits_decoder_window():
+    """Nearby speech is merged up to 30s; long regions are split evenly"""
+    speech = [(0.0, 5.0), (6.0, 20.0), (21.0, 29.0), (35.0, 40.0), (50.0, 125.0)]
+    chunks = pack_speech_chunks(speech, max_chunk_seconds=30.0)
+
+    assert chunks[:2] == [(0.0, 29.0), (35.0, 40.0)]
+    assert chunks[2:] == [(50.0, 75.0), (75.0, 100.0), (100.0, 125.0)]
+    assert all(end - start <= 30.0 for start, end in chunks)
+
+
+def test_balance_chunks_and_replica_cores():
+    """Replicas get similar amounts of speech and disjoint core sets"""
+    chunks = [(i * 40.0, i * 40.0 + length) for i, length in enumerate([30, 5, 25, 10, 20, 30])]
+    groups = balance_chunks(chunks, 2)
+
+    loads = [sum(end - start for start, end in group) for group in groups]
+    assert sorted(c for group in groups for c in group) == chunks
+    assert abs(loads[0] - loads[1]) <= 10
+    assert all(group == sorted(group) for group in groups)
+    assert balance_chunks(chunks[:1], 4) == [chunks[:1]]
+
+    assert plan_replica_cores(2, cores=range(4)) == [[0, 1], [2, 3]]
+    assert plan_replica_cores(3, cores=range(8)) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+    assert plan_replica_cores(8, cores=[0, 1]) == [[0], [1]]
@@ -5,11 +5,14 @@ Provides helper functions for common operations
 
 import os
 import sys
+import fnmatch
+import hashlib
 import psutil
-import torch
+import shutil
+import subprocess
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple
 import asyncio
 from functools import wraps
 
@@ -17,6 +20,40 @@ from models import SystemInfo
 from exceptions import ConfigurationError
 
 
+def detect_gpu() -> Tuple[bool, Optional[str]]:
+    """
+    Detect a CUDA GPU without paying for a torch import at startup
+
+    Uses torch if it is already imported, otherwise nvidia-smi; torch is only
+    imported when nvidia-smi is not installed.
+
+    Returns:
+        Tuple of (gpu_available, gpu_name)
+    """
+    if "torch" not in sys.modules and shutil.which("nvidia-smi"):
+        try:
+            result = subprocess.run(
+                ["nvidia-smi", "--query-gpu=name", "--format=csv,noheader"],
+                capture_output=True, text=True, timeout=10
+            )
+            names = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+            if result.returncode == 0:
+                return bool(names), names[0] if names else None
+        except (OSError, subprocess.SubprocessError):
+            pass
+
+    try:
+        import torch
+    except ImportError:
+        return False, None
+    if not torch.cuda.is_available():
+        return False, None
+    try:
+        return True, torch.cuda.get_device_name(0)
+    except Exception:
+        return True, "Unknown GPU"
+
+
 def get_system_info(worker_id: str, worker_name: str) -> SystemInfo:
     """
     Get current system information including CPU/GPU availability
@@ -29,13 +66,7 @@ def get_system_info(worker_id: str, worker_name: str) -> SystemInfo:
         SystemInfo object with current system state
     """
     # Check GPU availability
-    gpu_available = torch.cuda.is_available()
-    gpu_name = None
-    if gpu_available:
-        try:
-            gpu_name = torch.cuda.get_device_name(0)
-        except Exception:
-            gpu_name = "Unknown GPU"
+    gpu_available, gpu_name = detect_gpu()
 
     # Get memory info
     memory = psutil.virtual_memory()
@@ -95,7 +126,8 @@ def format_duration(seconds: float) -> str:
 def cleanup_temp_files(
     temp_dir: Path,
     max_age_hours: int = 24,
-    pattern: str = "*"
+    pattern: str = "*",
+    exclude: Sequence[str] = ()
 ) -> int:
     """
     Remove old temporary files from specified directory
@@ -104,6 +136,7 @@ def cleanup_temp_files(
         temp_dir: Directory containing temporary files
         max_age_hours: Maximum age of files to keep (in hours)
         pattern: Glob pattern for files to clean (default: all files)
+        exclude: Glob patterns of file names to keep regardless of age
 
     Returns:
         Number of files deleted
@@ -116,7 +149,9 @@ def cleanup_temp_files(
 
     try:
         for file_path in temp_dir.glob(pattern):
-            if file_path.is_file():
+            if file_path.is_file() and not any(
+                fnmatch.fnmatch(file_path.name, excluded) for excluded in exclude
+            ):
                 # Get file modification time
                 file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
 
@@ -188,6 +223,26 @@ def get_file_size_mb(file_path: Path) -> float:
     return file_path.stat().st_size / (1024 * 1024)
 
 
+def compute_content_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute SHA-256 of a file's contents, reading it in fixed-size chunks
+
+    Blocking; call via asyncio.to_thread for large files.
+
+    Args:
+        file_path: Path to file
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def validate_audio_file(file_path: Path) -> bool:
     """
     Basic validation that audio file exists and has reasonable size
@@ -0,0 +1,671 @@
+"""
+Local Vector Index Module
+Per-user approximate nearest neighbour (ANN) index over transcript chunk embeddings
+
+Features:
+- Append-only float32 vector store, memory-mapped from disk
+- IVF (inverted file) coarse quantizer trained with spherical k-means
+- Incremental updates when transcripts are indexed
+- Exact search and recall@k measurement against the ANN path
+
+On-disk layout (one directory per user):
+    vectors.f32   raw float32 matrix (count x dim), opened with np.memmap
+    lists.i32     IVF list assignment per row (-1 until the quantizer is trained)
+    meta.jsonl    chunk metadata, one JSON object per row
+    centroids.npy IVF centroids (absent until trained)
+    state.json    row count, dimension, tombstones, backfill flag (written last, atomically)
+"""
+
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from logger import get_logger
+
+logger = get_logger("vector_index")
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+class VectorIndexConfig(BaseModel):
+    """Configuration for the local vector index"""
+    base_dir: str = Field(..., description="Directory holding one sub-directory per user")
+    embedding_dim: int = Field(default=1024, description="Embedding vector dimension")
+    nprobe: int = Field(default=8, ge=1, description="IVF lists scanned per query")
+    min_train_size: int = Field(
+        default=1024,
+        description="Below this many vectors the index is searched exhaustively"
+    )
+    retrain_growth_factor: float = Field(
+        default=4.0,
+        description="Retrain the quantizer once the index grows by this factor"
+    )
+    kmeans_iterations: int = Field(default=20, ge=1)
+    kmeans_sample_per_list: int = Field(
+        default=64,
+        description="Training sample size per IVF list"
+    )
+
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+@dataclass
+class IndexedChunk:
+    """Chunk metadata stored alongside each vector"""
+    chunk_id: str
+    meeting_id: str
+    chunk_index: int
+    start_time: float
+    end_time: float
+    speaker_id: Optional[str]
+    text: str
+
+
+# =============================================================================
+# Per-user Index
+# =============================================================================
+
+class UserVectorIndex:
+    """
+    IVF index for a single user's transcript chunks.
+
+    Vectors are assumed to be L2-normalized (BGE-M3 output), so inner
+    product equals cosine similarity.
+    """
+
+    def __init__(self, directory: Path, config: VectorIndexConfig):
+        self.directory = directory
+        self.config = config
+        self.dim = config.embedding_dim
+
+        self._lock = threading.RLock()
+        self._count = 0
+        self._trained_count = 0
+        self._deleted: set = set()
+        self._complete = False
+        self._meta: List[IndexedChunk] = []
+        self._vectors: Optional[np.memmap] = None
+        self._lists = np.empty(0, dtype=np.int32)
+        self._centroids: Optional[np.ndarray] = None
+        self._inverted: Dict[int, np.ndarray] = {}
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    # -------------------------------------------------------------------------
+    # Paths
+    # -------------------------------------------------------------------------
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / "vectors.f32"
+
+    @property
+    def _lists_path(self) -> Path:
+        return self.directory / "lists.i32"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / "meta.jsonl"
+
+    @property
+    def _centroids_path(self) -> Path:
+        return self.directory / "centroids.npy"
+
+    @property
+    def _state_path(self) -> Path:
+        return self.directory / "state.json"
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def _load(self) -> None:
+        """Load index state from disk, discarding rows not committed to state.json"""
+        if not self._state_path.exists():
+            return
+
+        state = json.loads(self._state_path.read_text(encoding="utf-8"))
+        if state.get("dim") != self.dim:
+            raise ValueError(
+                f"Index at {self.directory} has dim={state.get('dim')}, expected {self.dim}"
+            )
+
+        self._count = int(state["count"])
+        self._trained_count = int(state.get("trained_count", 0))
+        self._deleted = set(state.get("deleted", []))
+        self._complete = bool(state.get("complete", False))
+
+        # Drop any partially appended rows from an interrupted write
+        self._truncate_files(self._count)
+
+        # An empty index (backfilled user without chunks) has no data files
+        if self._meta_path.exists():
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._meta = [
+                    IndexedChunk(**json.loads(line))
+                    for line, _ in zip(f, range(self._count))
+                ]
+        if self._lists_path.exists():
+            self._lists = np.fromfile(self._lists_path, dtype=np.int32, count=self._count)
+        vector_bytes = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+
+        if (
+            len(self._meta) < self._count
+            or len(self._lists) < self._count
+            or vector_bytes < self._count * self.dim * 4
+        ):
+            # Interrupted compaction: the data files no longer match state.json
+            logger.warning(f"Vector index {self.directory.name} is inconsistent, clearing it for a rebuild")
+            self.clear()
+            return
+
+        if self._centroids_path.exists():
+            self._centroids = np.load(self._centroids_path)
+
+        self._open_vectors()
+        self._rebuild_inverted_lists()
+
+        logger.debug(
+            f"Loaded vector index: {self.directory.name}",
+            count=self._count,
+            trained=self._centroids is not None
+        )
+
+    def _truncate_files(self, count: int) -> None:
+        """Truncate data files to exactly `count` rows"""
+        row_bytes = self.dim * 4
+        for path, size in (
+            (self._vectors_path, count * row_bytes),
+            (self._lists_path, count * 4),
+        ):
+            if path.exists() and path.stat().st_size > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+        if self._meta_path.exists():
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+            if len(lines) > count:
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    f.writelines(lines[:count])
+
+    def _write_state(self) -> None:
+        """Atomically persist the index state (commit point for appends)"""
+        state = {
+            "dim": self.dim,
+            "count": self._count,
+            "trained_count": self._trained_count,
+            "deleted": sorted(self._deleted),
+            "complete": self._complete,
+        }
+        tmp_path = self._state_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, self._state_path)
+
+    def _open_vectors(self) -> None:
+        """(Re)open the memory-mapped vector matrix"""
+        if self._count == 0:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(
+            self._vectors_path,
+            dtype=np.float32,
+            mode="r",
+            shape=(self._count, self.dim)
+        )
+
+    def _rebuild_inverted_lists(self) -> None:
+        """Group row ids by IVF list"""
+        self._inverted = {}
+        if self._centroids is None or self._count == 0:
+            return
+        order = np.argsort(self._lists, kind="stable")
+        sorted_lists = self._lists[order]
+        boundaries = np.flatnonzero(np.diff(sorted_lists)) + 1
+        for rows in np.split(order, boundaries):
+            if len(rows):
+                self._inverted[int(self._lists[rows[0]])] = rows.astype(np.int64)
+
+    # -------------------------------------------------------------------------
+    # Updates
+    # -------------------------------------------------------------------------
+
+    def add(self, chunks: Sequence[IndexedChunk], embeddings: np.ndarray) -> int:
+        """
+        Append chunks and their embeddings to the index.
+
+        Args:
+            chunks: Chunk metadata, one per embedding row
+            embeddings: Array of shape (len(chunks), dim)
+
+        Returns:
+            Number of rows added
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dim:
+            raise ValueError(f"Expected embeddings of shape (n, {self.dim}), got {embeddings.shape}")
+        if len(chunks) != len(embeddings):
+            raise ValueError("Chunks and embeddings count mismatch")
+        if not len(chunks):
+            return 0
+
+        with self._lock:
+            if self._centroids is not None:
+                lists = self._assign(embeddings)
+            else:
+                lists = np.full(len(embeddings), -1, dtype=np.int32)
+
+            with open(self._vectors_path, "ab") as f:
+                f.write(embeddings.tobytes())
+            with open(self._lists_path, "ab") as f:
+                f.write(lists.tobytes())
+            with open(self._meta_path, "a", encoding="utf-8") as f:
+                for chunk in chunks:
+                    f.write(json.dumps(asdict(chunk), ensure_ascii=False) + "\n")
+
+            self._count += len(chunks)
+            self._meta.extend(chunks)
+            self._lists = np.concatenate([self._lists, lists])
+            self._write_state()
+            self._open_vectors()
+
+            if self._should_train():
+                self._train()
+            else:
+                self._rebuild_inverted_lists()
+
+        return len(chunks)
+
+    def remove_meeting(self, meeting_id: str) -> int:
+        """
+        Tombstone all rows belonging to a meeting.
+
+        Rows are physically removed by compact() once more than half
+        of the index is tombstoned.
+
+        Returns:
+            Number of rows removed
+        """
+        with self._lock:
+            rows = [
+                i for i, chunk in enumerate(self._meta)
+                if chunk.meeting_id == meeting_id and i not in self._deleted
+            ]
+            if not rows:
+                return 0
+            self._deleted.update(rows)
+            self._write_state()
+
+            if len(self._deleted) * 2 > self._count:
+                self.compact()
+
+            return len(rows)
+
+    def clear(self) -> None:
+        """Remove every row, the IVF centroids and the backfill flag"""
+        with self._lock:
+            self._vectors = None
+            for path in (self._vectors_path, self._lists_path, self._meta_path, self._centroids_path):
+                path.unlink(missing_ok=True)
+
+            self._count = 0
+            self._trained_count = 0
+            self._deleted = set()
+            self._complete = False
+            self._meta = []
+            self._lists = np.empty(0, dtype=np.int32)
+            self._centroids = None
+            self._inverted = {}
+            self._write_state()
+
+    def mark_complete(self) -> None:
+        """Record that the index holds all of the user's stored chunks"""
+        with self._lock:
+            self._complete = True
+            self._write_state()
+
+    def compact(self) -> None:
+        """Rewrite the index files without tombstoned rows"""
+        with self._lock:
+            keep = np.array(
+                [i for i in range(self._count) if i not in self._deleted],
+                dtype=np.int64
+            )
+            vectors = np.array(self._vectors[keep]) if len(keep) else np.empty((0, self.dim), np.float32)
+            meta = [self._meta[i] for i in keep]
+            lists = self._lists[keep] if len(keep) else np.empty(0, dtype=np.int32)
+
+            # Write the compacted files aside, then swap them in just before the state commit
+            staged = {
+                self._vectors_path: vectors.astype(np.float32).tobytes(),
+                self._lists_path: lists.astype(np.int32).tobytes(),
+                self._meta_path: "".join(
+                    json.dumps(asdict(chunk), ensure_ascii=False) + "\n" for chunk in meta
+                ).encode("utf-8"),
+            }
+            for path, data in staged.items():
+                path.with_name(path.name + ".tmp").write_bytes(data)
+
+            self._vectors = None
+            for path in staged:
+                os.replace(path.with_name(path.name + ".tmp"), path)
+
+            self._count = len(keep)
+            self._meta = meta
+            self._lists = lists.astype(np.int32)
+            self._deleted = set()
+            self._write_state()
+            self._open_vectors()
+            self._rebuild_inverted_lists()
+
+            logger.info(f"Compacted vector index {self.directory.name}", count=self._count)
+
+    # -------------------------------------------------------------------------
+    # IVF Training
+    # -------------------------------------------------------------------------
+
+    def _should_train(self) -> bool:
+        live = self._count - len(self._deleted)
+        if live < self.config.min_train_size:
+            return False
+        if self._centroids is None:
+            return True
+        return live >= self._trained_count * self.config.retrain_growth_factor
+
+    def _nlist_for(self, n: int) -> int:
+        """Number of IVF lists: ~sqrt(n), same heuristic as the pgvector migration"""
+        return int(np.clip(np.sqrt(n), 8, 4096))
+
+    def _train(self) -> None:
+        """Train the coarse quantizer and reassign every row"""
+        live_rows = np.array(
+            [i for i in range(self._count) if i not in self._deleted],
+            dtype=np.int64
+        )
+        nlist = self._nlist_for(len(live_rows))
+
+        rng = np.random.default_rng(0)
+        sample_size = min(len(live_rows), nlist * self.config.kmeans_sample_per_list)
+        sample_rows = np.sort(rng.choice(live_rows, size=sample_size, replace=False))
+        sample = np.array(self._vectors[sample_rows])
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(self.config.kmeans_iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = counts == 0
+            # Re-seed empty lists from random sample points
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-10)
+
+        self._centroids = centroids.astype(np.float32)
+        self._lists = self._assign(self._vectors)
+        self._trained_count = len(live_rows)
+
+        np.save(self._centroids_path, self._centroids)
+        self._lists_path.write_bytes(self._lists.tobytes())
+        self._write_state()
+        self._rebuild_inverted_lists()
+
+        logger.info(
+            f"Trained IVF quantizer for {self.directory.name}",
+            nlist=nlist,
+            vectors=len(live_rows)
+        )
+
+    def _assign(self, vectors: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+        """Assign vectors to their nearest centroid"""
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), batch_size):
+            block = np.asarray(vectors[start:start + batch_size], dtype=np.float32)
+            out[start:start + batch_size] = np.argmax(block @ self._centroids.T, axis=1)
+        return out
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def _top_k(
+        self,
+        rows: np.ndarray,
+        query: np.ndarray,
+        k: int
+    ) -> List[Tuple[IndexedChunk, float]]:
+        """Score candidate rows and return the best k"""
+        if self._deleted and len(rows):
+            rows = rows[~np.isin(rows, np.fromiter(self._deleted, dtype=np.int64))]
+        if not len(rows):
+            return []
+
+        rows = np.sort(rows)  # sequential memmap access
+        scores = self._vectors[rows] @ query
+        if len(rows) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self._meta[int(rows[i])], float(scores[i])) for i in best]
+
+    def _meeting_rows(self, meeting_id: str) -> np.ndarray:
+        return np.array(
+            [i for i, chunk in enumerate(self._meta) if chunk.meeting_id == meeting_id],
+            dtype=np.int64
+        )
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        meeting_id: Optional[str] = None,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[IndexedChunk, float]]:
+        """
+        Approximate top-k search by cosine similarity.
+
+        Meeting-scoped queries and untrained indexes are searched exactly,
+        since the candidate set is already small.
+
+        Returns:
+            List of (chunk, similarity) sorted by similarity
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        with self._lock:
+            if self._count == 0:
+                return []
+            if meeting_id is not None:
+                return self._top_k(self._meeting_rows(meeting_id), query, k)
+            if self._centroids is None:
+                return self._top_k(np.arange(self._count, dtype=np.int64), query, k)
+
+            nprobe = min(nprobe or self.config.nprobe, len(self._centroids))
+            probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+            lists = [self._inverted[int(p)] for p in probe if int(p) in self._inverted]
+            rows = np.concatenate(lists) if lists else np.empty(0, dtype=np.int64)
+            return self._top_k(rows, query, k)
+
+    def exact_search(
+        self,
+        query: np.ndarray,
+        k: int,
+        meeting_id: Optional[str] = None
+    ) -> List[Tuple[IndexedChunk, float]]:
+        """Exhaustive top-k search (ground truth for recall measurement)"""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        with self._lock:
+            if self._count == 0:
+                return []
+            if meeting_id is not None:
+                return self._top_k(self._meeting_rows(meeting_id), query, k)
+            return self._top_k(np.arange(self._count, dtype=np.int64), query, k)
+
+    @property
+    def size(self) -> int:
+        """Number of live (non-deleted) vectors"""
+        return self._count - len(self._deleted)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether the index was backfilled with all stored chunks"""
+        return self._complete
+
+
+# =============================================================================
+# Index Manager
+# =============================================================================
+
+class LocalVectorIndex:
+    """
+    Manages per-user vector indexes under a common base directory.
+
+    User indexes are loaded lazily on first access and kept open.
+    All methods are blocking; call them via asyncio.to_thread.
+    """
+
+    def __init__(self, config: VectorIndexConfig):
+        self.config = config
+        self.base_dir = Path(config.base_dir)
+        self._indexes: Dict[str, UserVectorIndex] = {}
+        self._lock = threading.Lock()
+
+        logger.info(f"LocalVectorIndex initialized at {self.base_dir}")
+
+    def _user_dir(self, user_id: str) -> Path:
+        return self.base_dir / re.sub(r"[^A-Za-z0-9_-]", "_", user_id)
+
+    def get_user_index(self, user_id: str) -> UserVectorIndex:
+        """Get (loading if needed) the index for a user"""
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = UserVectorIndex(self._user_dir(user_id), self.config)
+                self._indexes[user_id] = index
+            return index
+
+    def has_user(self, user_id: str) -> bool:
+        """Check whether a user has any indexed vectors"""
+        if user_id in self._indexes:
+            return self._indexes[user_id].size > 0
+        return (self._user_dir(user_id) / "state.json").exists()
+
+    def is_complete(self, user_id: str) -> bool:
+        """
+        Check whether a user's index holds all of their stored chunks
+
+        Indexes only filled incrementally miss chunks saved before the local
+        index was enabled, so searches should not be served from them. A
+        backfilled index stays complete when it holds no chunks (a new user,
+        or one who deleted every meeting).
+        """
+        if user_id not in self._indexes and not (self._user_dir(user_id) / "state.json").exists():
+            return False
+        return self.get_user_index(user_id).is_complete
+
+    def replace_user(
+        self,
+        user_id: str,
+        chunks: Sequence[IndexedChunk],
+        embeddings: Sequence[Sequence[float]]
+    ) -> int:
+        """Replace a user's index with a full backfill and mark it complete"""
+        index = self.get_user_index(user_id)
+        index.clear()
+        if chunks:
+            index.add(chunks, np.asarray(embeddings, dtype=np.float32))
+        index.mark_complete()
+        return index.size
+
+    def add(
+        self,
+        user_id: str,
+        chunks: Sequence[IndexedChunk],
+        embeddings: Sequence[Sequence[float]]
+    ) -> int:
+        """Add chunks with embeddings to a user's index"""
+        return self.get_user_index(user_id).add(chunks, np.asarray(embeddings, dtype=np.float32))
+
+    def remove_meeting(self, user_id: str, meeting_id: str) -> int:
+        """Remove all vectors for a meeting from a user's index"""
+        if not self.has_user(user_id):
+            return 0
+        return self.get_user_index(user_id).remove_meeting(meeting_id)
+
+    def search(
+        self,
+        user_id: str,
+        query_embedding: Sequence[float],
+        k: int,
+        meeting_id: Optional[str] = None,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[IndexedChunk, float]]:
+        """Approximate top-k search within a user's index"""
+        return self.get_user_index(user_id).search(
+            np.asarray(query_embedding, dtype=np.float32), k, meeting_id, nprobe
+        )
+
+    def recall_at_k(
+        self,
+        user_id: str,
+        query_embeddings: Sequence[Sequence[float]],
+        k: int = 10,
+        nprobe: Optional[int] = None
+    ) -> float:
+        """
+        Measure ANN recall@k against exact search.
+
+        Args:
+            user_id: User whose index to evaluate
+            query_embeddings: Query vectors
+            k: Number of neighbours compared
+            nprobe: IVF lists to probe (default: config.nprobe)
+
+        Returns:
+            Mean fraction of exact top-k results found by the ANN search
+        """
+        index = self.get_user_index(user_id)
+        recalls = []
+        for query in np.asarray(query_embeddings, dtype=np.float32):
+            exact = {c.chunk_id for c, _ in index.exact_search(query, k)}
+            if not exact:
+                continue
+            approx = {c.chunk_id for c, _ in index.search(query, k, nprobe=nprobe)}
+            recalls.append(len(exact & approx) / len(exact))
+        return float(np.mean(recalls)) if recalls else 1.0
+
+
+# =============================================================================
+# Singleton Instance
+# =============================================================================
+
+_vector_index: Optional[LocalVectorIndex] = None
+
+
+def get_local_vector_index(config: Optional[VectorIndexConfig] = None) -> LocalVectorIndex:
+    """Get or create singleton local vector index"""
+    global _vector_index
+
+    if _vector_index is None:
+        if config is None:
+            from config import RAG_INDEX_DIR
+            config = VectorIndexConfig(base_dir=str(RAG_INDEX_DIR))
+        _vector_index = LocalVectorIndex(config)
+
+    return _vector_index
@@ -7,13 +7,14 @@ import asyncio
 from pathlib import Path
 from typing import List, Optional, Dict
 from dataclasses import dataclass
-import numpy as np
 import torch
 import soundfile as sf
 
-from models import TranscriptSegment
+from models import AudioMetadata, TranscriptSegment
 from exceptions import TranscriptionError
+from stt_engines import AUTO_LANGUAGE
 from logger import get_logger
+from resampling import resample_audio
 
 logger = get_logger("whisper_korean_engine")
 
@@ -96,7 +97,8 @@ class KoreanWhisperEngine:
         self,
         audio_path: Path,
         meeting_id: str,
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        audio_metadata: Optional[AudioMetadata] = None
     ) -> List[TranscriptSegment]:
         """
         한국어 음성 인식 수행
@@ -105,6 +107,7 @@ class KoreanWhisperEngine:
             audio_path: 오디오 파일 경로
             meeting_id: 회의 ID
             language: 언어 (기본: korean)
+            audio_metadata: 전처리 메타데이터 (STTEngine 인터페이스 호환용, 사용하지 않음)
 
         Returns:
             TranscriptSegment 리스트
@@ -119,7 +122,9 @@ class KoreanWhisperEngine:
             audio = await self._load_audio(audio_path)
 
             # 음성 인식 실행
-            generate_kwargs = {"language": language or self.config.language}
+            # 한국어 전용 모델: 자동 감지("auto") 대신 기본 언어 사용
+            lang = language if language and language != AUTO_LANGUAGE else self.config.language
+            generate_kwargs = {"language": lang}
 
             result = await asyncio.to_thread(
                 self.pipe,
@@ -143,17 +148,10 @@ class KoreanWhisperEngine:
         SAMPLE_RATE = 16000
 
         def _load():
-            audio_data, sr = sf.read(str(audio_path))
-            audio_data = audio_data.astype(np.float32)
+            audio_data, sr = sf.read(str(audio_path), dtype='float32')
 
-            # 스테레오 → 모노
-            if len(audio_data.shape) > 1:
-                audio_data = audio_data.mean(axis=1)
-
-            # 리샘플링
-            if sr != SAMPLE_RATE:
-                import librosa
-                audio_data = librosa.resample(audio_data, orig_sr=sr, target_sr=SAMPLE_RATE)
+            # 스테레오 → 모노 + 리샘플링 (float32 polyphase/soxr)
+            audio_data = resample_audio(audio_data, sr, SAMPLE_RATE)
 
             return {"array": audio_data, "sampling_rate": SAMPLE_RATE}
 
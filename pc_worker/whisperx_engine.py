@@ -1,10 +1,24 @@
 """
 WhisperX STT Engine Module
 Handles audio transcription using WhisperX with Korean language support
+
+Batch mode (transcribe_batch): the VAD chunks of many short recordings are
+pooled into shared model batches and the decoded text is routed back to
+each recording, so a queue of short voice memos fills the GPU batch
+instead of running one underfilled batch per file.
+
+On CUDA out-of-memory, decoding is retried with half the batch size and the
+size that fit is remembered for this model and GPU (see gpu_memory).
 """
 
-# Import config first to apply PyTorch 2.6+ compatibility patch
-from config import WHISPERX_MODEL, ENABLE_GPU, CUDA_DEVICE, MODEL_CACHE_DIR, HUGGINGFACE_TOKEN
+# Apply the PyTorch 2.6+ compatibility patch before whisperx loads any models
+from config import (
+    WHISPERX_MODEL, ENABLE_GPU, CUDA_DEVICE, MODEL_CACHE_DIR, HUGGINGFACE_TOKEN,
+    WHISPERX_SKIP_SILENCE, WHISPERX_LONG_AUDIO_SECONDS, WHISPERX_WINDOW_SECONDS,
+    WHISPERX_PARALLEL_WINDOWS, WHISPERX_BATCH_POOL_MAX_SECONDS, WHISPERX_ALIGN_CACHE_SIZE,
+    patch_torch_load
+)
+patch_torch_load()
 
 import asyncio
 from pathlib import Path
@@ -13,11 +27,21 @@ import numpy as np
 import torch
 import whisperx
 from whisperx.diarize import DiarizationPipeline
+from faster_whisper.tokenizer import Tokenizer
 import soundfile as sf
 from dataclasses import dataclass
 
-from models import TranscriptSegment
+from models import AudioMetadata, TranscriptSegment
 from exceptions import TranscriptionError
+from audio_decoder import decode_with_ffmpeg
+from resampling import resample_audio
+from loudness import normalize_loudness
+from vad import VADConfig, TimestampMap, detect_speech_segments, compact_silences
+from stt_windows import AudioWindow, plan_windows, stitch_windows
+from stt_checkpoint import WindowCheckpointStore, audio_fingerprint, get_window_checkpoint_store
+from align_models import AlignModel, AlignModelCache, group_by_language, match_source_segments
+from gpu_memory import batch_size_key, get_batch_size_store, run_with_oom_backoff
+from stt_engines import AUTO_LANGUAGE
 from logger import get_logger
 
 logger = get_logger("whisperx_engine")
@@ -29,8 +53,8 @@ class WhisperXConfig:
     model_size: str = "large-v2"
     device: str = "cuda" if torch.cuda.is_available() else "cpu"
     compute_type: str = "float16" if torch.cuda.is_available() else "int8"
-    language: str = "ko"  # Korean
-    batch_size: int = 16
+    language: str = "ko"  # Korean ("auto" = detect from the first 30s of audio)
+    batch_size: int = 16  # upper bound; lowered per GPU after out-of-memory
     confidence_threshold: float = 0.4  # 한국어는 0.4 권장 (영어 대비 신뢰도 낮게 나옴)
     chunk_length_seconds: int = 30
     # VAD (Voice Activity Detection) options
@@ -44,6 +68,23 @@ class WhisperXConfig:
     min_speakers: int = 1  # 최소 화자 수
     max_speakers: int = 10  # 최대 화자 수
     hf_token: Optional[str] = None  # HuggingFace 토큰 (None이면 환경변수에서 가져옴)
+    # Silence skipping: drop long silences before STT, then remap timestamps
+    skip_silence: bool = WHISPERX_SKIP_SILENCE
+    skip_silence_min_gap_seconds: float = 2.0  # only silences at least this long are removed
+    skip_silence_padding_seconds: float = 0.25  # context kept around speech
+    # Long-audio mode: transcribe in silence-aligned windows with per-window checkpoints
+    long_audio_threshold_seconds: float = WHISPERX_LONG_AUDIO_SECONDS  # 0 disables
+    window_seconds: float = WHISPERX_WINDOW_SECONDS  # target window length
+    window_search_seconds: float = 60.0  # how far a cut may move to find silence
+    window_overlap_seconds: float = 1.0  # context decoded on each side of a cut
+    max_parallel_windows: int = WHISPERX_PARALLEL_WINDOWS
+    # transcribe_batch: recordings up to this length share model batches (0 disables)
+    batch_pool_max_seconds: float = WHISPERX_BATCH_POOL_MAX_SECONDS
+    # Alignment models kept loaded (one per language, least recently used evicted)
+    align_cache_size: int = WHISPERX_ALIGN_CACHE_SIZE
+    # Word alignment during transcribe(); False = fast mode (segment-level
+    # timestamps, align_segments() later); overridden per call
+    word_alignment: bool = True
 
     def __post_init__(self):
         """Validate configuration"""
@@ -72,10 +113,15 @@ class WhisperXEngine:
         """
         self.config = config or WhisperXConfig()
         self.model = None
-        self.align_model = None
-        self.align_metadata = None
+        # Loaded per language on first use (mixed-language audio uses several)
+        self.align_models = AlignModelCache(
+            self._load_align_model,
+            max_models=self.config.align_cache_size,
+            release=self._empty_cuda_cache
+        )
         self.diarize_model = None  # 화자분리 파이프라인
         self._is_initialized = False
+        self._pooling_unsupported_logged = False
 
         logger.info(
             f"WhisperX Engine initialized with: "
@@ -120,13 +166,9 @@ class WhisperXEngine:
                 vad_options=vad_options
             )
 
-            # Load alignment model for word-level timestamps (Korean)
-            logger.info(f"Loading alignment model for language: {self.config.language}")
-            self.align_model, self.align_metadata = await asyncio.to_thread(
-                whisperx.load_align_model,
-                language_code=self.config.language,
-                device=self.config.device
-            )
+            # Alignment model for the configured language (others load on first use)
+            if self.config.language != AUTO_LANGUAGE:
+                await self.align_models.get(self.config.language)
 
             # Load speaker diarization pipeline (if enabled)
             if self.config.enable_diarization:
@@ -165,7 +207,9 @@ class WhisperXEngine:
         self,
         audio_path: Path,
         meeting_id: str,
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        audio_metadata: Optional[AudioMetadata] = None,
+        word_alignment: Optional[bool] = None
     ) -> List[TranscriptSegment]:
         """
         Transcribe audio file to text with timestamps
@@ -174,6 +218,10 @@ class WhisperXEngine:
             audio_path: Path to audio file (WAV format, 16kHz recommended)
             meeting_id: Meeting ID for logging and result tracking
             language: Language code (defaults to config language)
+            audio_metadata: Preprocessing metadata; audio with a measured
+                loudness_lufs is already normalized and is not normalized again
+            word_alignment: Run word alignment (defaults to config); False keeps
+                the decoder's segment-level timestamps (fast mode)
 
         Returns:
             List of transcript segments with timestamps and text
@@ -191,191 +239,486 @@ class WhisperXEngine:
         )
 
         try:
-            # Load audio using our own loader to avoid ffmpeg PATH issues
-            logger.debug(f"Loading audio from {audio_path}")
-            audio = await self._load_audio(audio_path)
+            audio, timestamp_map = await self._load_for_stt(audio_path, audio_metadata)
 
             # Run transcription
             lang = language or self.config.language
             logger.info(f"Starting transcription (language={lang})")
 
-            result = await asyncio.to_thread(
-                self._transcribe_with_model,
-                audio,
-                lang
+            checkpoint = None
+            if self._use_windows(audio):
+                checkpoint = get_window_checkpoint_store(
+                    meeting_id,
+                    audio_fingerprint(
+                        audio, 16000, self.config.model_size, lang,
+                        self.config.window_seconds, self.config.window_search_seconds,
+                        self.config.window_overlap_seconds, self.config.skip_silence
+                    )
+                )
+                result = await self._transcribe_windowed(audio, lang, checkpoint)
+            else:
+                result = await asyncio.to_thread(
+                    self._transcribe_with_model,
+                    audio,
+                    lang
+                )
+
+            segments = await self._finish_transcription(
+                result, audio, meeting_id, timestamp_map, self._word_alignment(word_alignment)
+            )
+
+            # Transcript is complete; window results are no longer needed
+            if checkpoint is not None:
+                await asyncio.to_thread(checkpoint.clear)
+
+            logger.log_operation_success(
+                "transcribe_audio",
+                meeting_id=meeting_id,
+                segment_count=len(segments),
+                language=lang
+            )
+
+            return segments
+
+        except Exception as e:
+            logger.log_operation_failure(
+                "transcribe_audio",
+                e,
+                meeting_id=meeting_id
             )
+            raise TranscriptionError(f"Failed to transcribe audio: {e}")
+
+    async def _load_for_stt(
+        self,
+        audio_path: Path,
+        audio_metadata: Optional[AudioMetadata] = None
+    ) -> Tuple[np.ndarray, Optional[TimestampMap]]:
+        """
+        Load audio for the model, dropping long silences if enabled
+
+        Returns:
+            Tuple of (audio, timestamp map or None if no silence was removed)
+        """
+        # Load audio using our own loader to avoid ffmpeg PATH issues
+        logger.debug(f"Loading audio from {audio_path}")
+        already_normalized = (
+            audio_metadata is not None and audio_metadata.loudness_lufs is not None
+        )
+        audio = await self._load_audio(audio_path, normalize=not already_normalized)
+
+        # Optionally drop long silences so WhisperX never sees them
+        timestamp_map = None
+        if self.config.skip_silence:
+            audio, timestamp_map = await self._compact_silences(audio)
+
+        return audio, timestamp_map
+
+    async def _finish_transcription(
+        self,
+        result: Dict,
+        audio: np.ndarray,
+        meeting_id: str,
+        timestamp_map: Optional[TimestampMap],
+        word_alignment: bool = True
+    ) -> List[TranscriptSegment]:
+        """
+        Align, diarize and convert a raw WhisperX result
 
+        Args:
+            result: Raw transcription result (segments on the audio's timeline)
+            audio: Audio the result was decoded from
+            meeting_id: Meeting ID
+            timestamp_map: Map back to the original timeline (skip_silence)
+            word_alignment: False skips alignment (segments keep the decoder's
+                timestamps and have no confidence)
+
+        Returns:
+            Transcript segments above the confidence threshold
+        """
+        if word_alignment:
             # Align transcript for word-level timestamps
             logger.debug("Aligning transcript for word-level timestamps")
-            aligned_result = await asyncio.to_thread(
+            aligned_result = await self._align(result, audio)
+        else:
+            logger.info("Fast mode: skipping word alignment (segment-level timestamps)")
+            aligned_result = {"segments": [dict(seg) for seg in result["segments"]]}
+
+        # Speaker diarization (if enabled and model loaded)
+        if self.diarize_model is not None:
+            logger.info("Running speaker diarization...")
+            try:
+                diarize_segments = await asyncio.to_thread(
+                    self.diarize_model,
+                    audio,
+                    min_speakers=self.config.min_speakers,
+                    max_speakers=self.config.max_speakers
+                )
+
+                # Assign speakers to words/segments
+                aligned_result = await asyncio.to_thread(
+                    whisperx.assign_word_speakers,
+                    diarize_segments,
+                    aligned_result
+                )
+
+                # 화자 수 로깅
+                speakers = set()
+                for seg in aligned_result.get("segments", []):
+                    if seg.get("speaker"):
+                        speakers.add(seg["speaker"])
+                logger.info(f"Speaker diarization complete: {len(speakers)} speakers detected")
+
+            except Exception as diarize_err:
+                logger.warning(f"화자분리 실행 실패 (전사 결과는 유지): {diarize_err}")
+
+        if timestamp_map is not None:
+            self._remap_timestamps(aligned_result["segments"], timestamp_map)
+
+        # Convert to TranscriptSegment objects
+        segments = self._convert_to_segments(
+            aligned_result["segments"],
+            meeting_id
+        )
+
+        # Filter by confidence threshold
+        segments = [
+            seg for seg in segments
+            if seg.confidence is None or seg.confidence >= self.config.confidence_threshold
+        ]
+
+        return segments
+
+    async def _align(self, result: Dict, audio: np.ndarray) -> Dict:
+        """
+        Align a transcript with the alignment model of each segment's language
+
+        Segments tagged with a detected "language" are aligned run by run;
+        runs in a language without an alignment model keep their segment
+        timestamps.
+
+        Args:
+            result: Raw transcription result
+            audio: Audio the result was decoded from
+
+        Returns:
+            WhisperX-style result with word-level timestamps
+        """
+        default = result.get("language") or self.config.language
+        segments: List[Dict] = []
+        for language, run in group_by_language(result["segments"], default):
+            align_model = await self.align_models.get(language)
+            if align_model is None:
+                segments.extend(run)
+                continue
+            model, metadata = align_model
+            aligned = await asyncio.to_thread(
                 whisperx.align,
-                result["segments"],
-                self.align_model,
-                self.align_metadata,
+                run,
+                model,
+                metadata,
                 audio,
                 self.config.device,
                 return_char_alignments=False
             )
+            segments.extend(aligned["segments"])
+        return {"segments": segments, "language": default}
 
-            # Speaker diarization (if enabled and model loaded)
-            if self.diarize_model is not None:
-                logger.info("Running speaker diarization...")
-                try:
-                    diarize_segments = await asyncio.to_thread(
-                        self.diarize_model,
-                        audio,
-                        min_speakers=self.config.min_speakers,
-                        max_speakers=self.config.max_speakers
-                    )
+    def _word_alignment(self, requested: Optional[bool]) -> bool:
+        return self.config.word_alignment if requested is None else requested
 
-                    # Assign speakers to words/segments
-                    aligned_result = await asyncio.to_thread(
-                        whisperx.assign_word_speakers,
-                        diarize_segments,
-                        aligned_result
-                    )
+    async def align_segments(
+        self,
+        audio_path: Path,
+        segments: List[TranscriptSegment],
+        language: Optional[str] = None,
+        audio_metadata: Optional[AudioMetadata] = None
+    ) -> List[TranscriptSegment]:
+        """
+        Word-align a transcript that was transcribed in fast mode
 
-                    # 화자 수 로깅
-                    speakers = set()
-                    for seg in aligned_result.get("segments", []):
-                        if seg.get("speaker"):
-                            speakers.add(seg["speaker"])
-                    logger.info(f"Speaker diarization complete: {len(speakers)} speakers detected")
+        Segments may be split into sentences by the aligner; each result
+        keeps the speaker of the segment it came from. Nothing is filtered
+        by confidence, so no saved text is lost.
 
-                except Exception as diarize_err:
-                    logger.warning(f"화자분리 실행 실패 (전사 결과는 유지): {diarize_err}")
+        Args:
+            audio_path: Audio the transcript was decoded from (original timeline)
+            segments: Saved transcript segments
+            language: Language code (defaults to config language)
+            audio_metadata: Preprocessing metadata (see transcribe)
+
+        Returns:
+            Segments with word-aligned timestamps and confidence
+
+        Raises:
+            TranscriptionError: If alignment fails
+        """
+        if not segments:
+            return []
 
-            # Convert to TranscriptSegment objects
-            segments = self._convert_to_segments(
-                aligned_result["segments"],
-                meeting_id
+        meeting_id = segments[0].meeting_id
+        logger.log_operation_start("align_segments", meeting_id=meeting_id, segments=len(segments))
+
+        try:
+            already_normalized = (
+                audio_metadata is not None and audio_metadata.loudness_lufs is not None
             )
+            audio = await self._load_audio(audio_path, normalize=not already_normalized)
 
-            # Filter by confidence threshold
-            segments = [
-                seg for seg in segments
-                if seg.confidence is None or seg.confidence >= self.config.confidence_threshold
-            ]
+            lang = language or self.config.language
+            if lang == AUTO_LANGUAGE:
+                if not self._is_initialized:
+                    await self.initialize()
+                lang = await asyncio.to_thread(self.model.detect_language, audio)
+
+            sources = sorted(segments, key=lambda seg: seg.start_time)
+            aligned = await self._align(
+                {
+                    "segments": [
+                        {"start": seg.start_time, "end": seg.end_time, "text": seg.text}
+                        for seg in sources
+                    ],
+                    "language": lang
+                },
+                audio
+            )
+            aligned_segments = self._convert_to_segments(aligned["segments"], meeting_id)
+
+            matches = match_source_segments(
+                [(seg.start_time, seg.end_time) for seg in aligned_segments],
+                [(seg.start_time, seg.end_time) for seg in sources]
+            )
+            for seg, match in zip(aligned_segments, matches):
+                if match is not None:
+                    seg.speaker_id = sources[match].speaker_id
+                    seg.speaker_label = sources[match].speaker_label
 
             logger.log_operation_success(
-                "transcribe_audio",
+                "align_segments",
                 meeting_id=meeting_id,
-                segment_count=len(segments),
+                segments=len(aligned_segments),
                 language=lang
             )
-
-            return segments
+            return aligned_segments
 
         except Exception as e:
-            logger.log_operation_failure(
-                "transcribe_audio",
-                e,
-                meeting_id=meeting_id
-            )
-            raise TranscriptionError(f"Failed to transcribe audio: {e}")
+            logger.log_operation_failure("align_segments", e, meeting_id=meeting_id)
+            raise TranscriptionError(f"Failed to align transcript: {e}")
 
-    async def _load_audio(self, audio_path: Path) -> np.ndarray:
+    def _batch_size_key(self) -> str:
+        """Safe batch size key of the loaded model on this GPU"""
+        return batch_size_key(f"whisperx:{self.config.model_size}", self.config.device)
+
+    def _load_align_model(self, language: str) -> AlignModel:
+        """Load the alignment model for a language (blocking)"""
+        return whisperx.load_align_model(language_code=language, device=self.config.device)
+
+    @staticmethod
+    def _empty_cuda_cache() -> None:
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    async def _load_audio(self, audio_path: Path, normalize: bool = True) -> np.ndarray:
         """
         Load audio file in WhisperX-compatible format (float32, 16kHz, mono)
 
-        Uses soundfile for WAV files and ffmpeg via imageio_ffmpeg for other formats.
+        Uses soundfile for WAV files and an ffmpeg pipe (audio_decoder) for other formats.
         This avoids the PATH issues with WhisperX's internal load_audio function.
+        Both loaders share the same loudness stage, so results do not depend
+        on which one ran.
 
         Args:
             audio_path: Path to audio file
+            normalize: Apply EBU R128 loudness normalization (skip for audio
+                the preprocessor already normalized)
 
         Returns:
             Audio data as numpy array (float32, 16kHz)
         """
-        import subprocess
-        import tempfile
-
         audio_path = Path(audio_path)
         SAMPLE_RATE = 16000  # WhisperX requires 16kHz
 
+        audio_data = None
+
         # For WAV files, try soundfile first
         if audio_path.suffix.lower() == '.wav':
             try:
-                audio_data, sr = await asyncio.to_thread(sf.read, str(audio_path))
-                audio_data = audio_data.astype(np.float32)
-
-                # Convert to mono if stereo
-                if len(audio_data.shape) > 1:
-                    audio_data = audio_data.mean(axis=1)
-
-                # Resample if needed
-                if sr != SAMPLE_RATE:
-                    import librosa
-                    audio_data = await asyncio.to_thread(
-                        librosa.resample,
-                        audio_data,
-                        orig_sr=sr,
-                        target_sr=SAMPLE_RATE
-                    )
+                audio_data, sr = await asyncio.to_thread(
+                    sf.read, str(audio_path), dtype='float32'
+                )
 
-                return audio_data
+                # Downmix to mono and resample if needed (polyphase/soxr, float32)
+                audio_data = await asyncio.to_thread(resample_audio, audio_data, sr, SAMPLE_RATE)
             except Exception as e:
                 logger.warning(f"soundfile failed to load WAV: {e}, trying ffmpeg")
+                audio_data = None
+
+        # For other formats or if soundfile failed, decode through an ffmpeg pipe
+        if audio_data is None:
+            audio_data = await asyncio.to_thread(
+                decode_with_ffmpeg,
+                audio_path,
+                sample_rate=SAMPLE_RATE,
+                channels=1
+            )
 
-        # For other formats or if soundfile failed, use ffmpeg
-        try:
-            import imageio_ffmpeg
-            ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
-        except ImportError:
-            ffmpeg_path = "ffmpeg"
-
-        def _load_with_ffmpeg():
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
-                temp_wav = tmp.name
+        # 라우드니스 정규화 (iPhone Voice Memos 등 낮은 볼륨 파일 대응)
+        # 통합 라우드니스 -16 LUFS, 피크 -1.5 dBFS (기존 ffmpeg loudnorm과 동일 목표)
+        if normalize:
+            audio_data, loudness_lufs = await asyncio.to_thread(
+                normalize_loudness, audio_data, SAMPLE_RATE
+            )
+            if loudness_lufs is not None:
+                logger.debug(f"Normalized loudness from {loudness_lufs:.1f} LUFS")
 
-            try:
-                # loudnorm 필터로 오디오 정규화 (iPhone Voice Memos 등 낮은 볼륨 파일 대응)
-                # -I=-16: 통합 라우드니스 목표 (EBU R128 표준)
-                # -TP=-1.5: True Peak 최대값
-                # -LRA=11: 라우드니스 범위
-                cmd = [
-                    ffmpeg_path,
-                    '-i', str(audio_path),
-                    '-af', 'loudnorm=I=-16:TP=-1.5:LRA=11',  # 오디오 정규화
-                    '-ar', str(SAMPLE_RATE),
-                    '-ac', '1',
-                    '-f', 'wav',
-                    '-y',
-                    temp_wav
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-
-                if result.returncode != 0:
-                    raise Exception(f"ffmpeg error: {result.stderr}")
-
-                audio_data, _ = sf.read(temp_wav)
-                return audio_data.astype(np.float32)
-            finally:
-                import os
-                if os.path.exists(temp_wav):
-                    os.remove(temp_wav)
-
-        audio_data = await asyncio.to_thread(_load_with_ffmpeg)
         logger.debug(f"Loaded audio: {len(audio_data)/SAMPLE_RATE:.2f}s @ {SAMPLE_RATE}Hz")
         return audio_data
 
+    async def _compact_silences(
+        self,
+        audio: np.ndarray
+    ) -> Tuple[np.ndarray, Optional[TimestampMap]]:
+        """
+        Remove long silences from audio before transcription
+
+        Args:
+            audio: Audio data (float32, 16kHz)
+
+        Returns:
+            Tuple of (compacted audio, timestamp map), or (audio, None) if
+            no speech was detected
+        """
+        sample_rate = 16000
+        vad_config = VADConfig(
+            min_silence_ms=int(self.config.skip_silence_min_gap_seconds * 1000)
+        )
+        speech = await asyncio.to_thread(detect_speech_segments, audio, sample_rate, vad_config)
+        if not speech:
+            logger.warning("No speech detected by VAD, transcribing full audio")
+            return audio, None
+
+        compacted, timestamp_map = await asyncio.to_thread(
+            compact_silences,
+            audio,
+            sample_rate,
+            speech,
+            self.config.skip_silence_padding_seconds
+        )
+        logger.info(
+            f"Skipped silence: {len(audio) / sample_rate:.1f}s -> "
+            f"{len(compacted) / sample_rate:.1f}s ({len(speech)} speech regions)"
+        )
+        return compacted, timestamp_map
+
+    @staticmethod
+    def _remap_timestamps(whisperx_segments: List[Dict], timestamp_map: TimestampMap) -> None:
+        """Map segment and word timestamps from compacted audio back to the original"""
+        for seg in whisperx_segments:
+            if "start" in seg:
+                seg["start"] = timestamp_map.to_original(seg["start"])
+            if "end" in seg:
+                seg["end"] = timestamp_map.to_original(seg["end"], is_end=True)
+            for word in seg.get("words") or []:
+                if "start" in word:
+                    word["start"] = timestamp_map.to_original(word["start"])
+                if "end" in word:
+                    word["end"] = timestamp_map.to_original(word["end"], is_end=True)
+
+    def _use_windows(self, audio: np.ndarray) -> bool:
+        """Check whether audio is long enough for windowed transcription"""
+        threshold = self.config.long_audio_threshold_seconds
+        return threshold > 0 and len(audio) / 16000 > threshold
+
+    async def _transcribe_windowed(
+        self,
+        audio: np.ndarray,
+        language: str,
+        checkpoint: WindowCheckpointStore
+    ) -> Dict:
+        """
+        Transcribe long audio in silence-aligned windows
+
+        Windows already in the checkpoint are not transcribed again; each
+        newly finished window is checkpointed before the next result is
+        used. Up to max_parallel_windows windows run at once (WhisperX
+        batches the VAD chunks inside each window).
+
+        Args:
+            audio: Audio data (float32, 16kHz)
+            language: Language code
+            checkpoint: Per-window checkpoint store for this meeting
+
+        Returns:
+            WhisperX-style result with segments on the full-audio timeline
+        """
+        sample_rate = 16000
+        speech = await asyncio.to_thread(detect_speech_segments, audio, sample_rate)
+        windows = plan_windows(
+            speech,
+            len(audio) / sample_rate,
+            target_seconds=self.config.window_seconds,
+            search_seconds=self.config.window_search_seconds,
+            overlap_seconds=self.config.window_overlap_seconds
+        )
+        finished = await asyncio.to_thread(checkpoint.load)
+        logger.info(
+            f"Long-audio mode: {len(windows)} windows "
+            f"({len(finished)} restored from checkpoint)"
+        )
+
+        semaphore = asyncio.Semaphore(max(1, self.config.max_parallel_windows))
+
+        async def run_window(window: AudioWindow) -> Tuple[AudioWindow, List[Dict]]:
+            if window.index in finished:
+                return window, finished[window.index]
+
+            async with semaphore:
+                window_audio = audio[int(window.start * sample_rate):int(window.end * sample_rate)]
+                result = await asyncio.to_thread(self._transcribe_with_model, window_audio, language)
+                segments = result.get("segments", [])
+                await asyncio.to_thread(checkpoint.save, window.index, segments)
+
+            logger.info(
+                f"Window {window.index + 1}/{len(windows)} transcribed "
+                f"({window.start:.0f}s-{window.end:.0f}s, {len(segments)} segments)"
+            )
+            return window, segments
+
+        window_results = await asyncio.gather(*(run_window(w) for w in windows))
+
+        return {
+            "segments": stitch_windows(window_results, self.config.window_overlap_seconds),
+            "language": language
+        }
+
     def _transcribe_with_model(self, audio: np.ndarray, language: str) -> Dict:
         """
         Run transcription with WhisperX model (blocking operation)
 
         Args:
             audio: Audio data as numpy array
-            language: Language code
+            language: Language code ("auto" = detect from the first 30s)
 
         Returns:
-            Raw transcription result from WhisperX
+            Raw transcription result from WhisperX; with "auto", segments
+            are tagged with the detected language
         """
-        return self.model.transcribe(
-            audio,
-            batch_size=self.config.batch_size,
-            language=language,
-            chunk_size=self.config.chunk_length_seconds
+        detect = language == AUTO_LANGUAGE
+        result = run_with_oom_backoff(
+            lambda batch_size: self.model.transcribe(
+                audio,
+                batch_size=batch_size,
+                language=None if detect else language,
+                chunk_size=self.config.chunk_length_seconds
+            ),
+            self._batch_size_key(),
+            self.config.batch_size,
+            get_batch_size_store()
         )
+        if detect:
+            logger.info(f"Detected language: {result['language']}")
+            for segment in result["segments"]:
+                segment["language"] = result["language"]
+        return result
 
     def _convert_to_segments(
         self,
@@ -432,18 +775,28 @@ class WhisperXEngine:
         self,
         audio_paths: List[Path],
         meeting_ids: List[str],
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        audio_metadata: Optional[List[Optional[AudioMetadata]]] = None,
+        word_alignment: Optional[bool] = None
     ) -> Dict[str, List[TranscriptSegment]]:
         """
         Transcribe multiple audio files in batch
 
+        Recordings up to batch_pool_max_seconds share model batches: their
+        VAD chunks are decoded together and the text is routed back to each
+        recording before per-recording alignment and diarization. Longer
+        recordings are transcribed one at a time.
+
         Args:
             audio_paths: List of audio file paths
             meeting_ids: List of meeting IDs (must match audio_paths length)
             language: Language code (defaults to config language)
+            audio_metadata: Preprocessing metadata per file (None entries allowed)
+            word_alignment: Run word alignment (defaults to config)
 
         Returns:
-            Dictionary mapping meeting_id to transcript segments
+            Dictionary mapping meeting_id to transcript segments (files that
+            failed are left out, so callers can retry or fail them)
 
         Raises:
             TranscriptionError: If batch transcription fails
@@ -457,21 +810,233 @@ class WhisperXEngine:
 
         logger.info(f"Starting batch transcription for {len(audio_paths)} files")
 
-        results = {}
+        lang = language or self.config.language
+        align = self._word_alignment(word_alignment)
+        sources = dict(zip(meeting_ids, zip(audio_paths, audio_metadata or [None] * len(audio_paths))))
+        results: Dict[str, List[TranscriptSegment]] = {}
+
+        # Load short files for pooling; the rest go through transcribe()
+        pooled: List[Tuple[str, np.ndarray, Optional[TimestampMap]]] = []
+        individual: List[str] = []
+        for meeting_id, (audio_path, meta) in sources.items():
+            if not self._can_pool(meta):
+                individual.append(meeting_id)
+                continue
+            try:
+                audio, timestamp_map = await self._load_for_stt(audio_path, meta)
+            except Exception as e:
+                logger.error(f"Failed to load {meeting_id}: {e}")
+                continue
+            if self._can_pool(None, audio):
+                pooled.append((meeting_id, audio, timestamp_map))
+            else:
+                individual.append(meeting_id)
+
+        if len(pooled) > 1:
+            try:
+                results.update(await self._transcribe_pooled(pooled, lang, align))
+            except Exception as e:
+                logger.warning(f"Pooled decoding failed, transcribing files one at a time: {e}")
+                individual.extend(meeting_id for meeting_id, _, _ in pooled)
+        else:
+            individual.extend(meeting_id for meeting_id, _, _ in pooled)
 
-        # Process each file (can be parallelized further if needed)
-        for audio_path, meeting_id in zip(audio_paths, meeting_ids):
+        for meeting_id in individual:
+            audio_path, meta = sources[meeting_id]
             try:
-                segments = await self.transcribe(audio_path, meeting_id, language)
-                results[meeting_id] = segments
+                results[meeting_id] = await self.transcribe(audio_path, meeting_id, lang, meta, align)
             except Exception as e:
                 logger.error(f"Failed to transcribe {meeting_id}: {e}")
-                results[meeting_id] = []
 
-        logger.info(f"Batch transcription complete: {len(results)} results")
+        logger.info(
+            f"Batch transcription complete: {len(results)}/{len(sources)} files "
+            f"({len(individual)} transcribed individually)"
+        )
 
         return results
 
+    def _can_pool(self, audio_metadata: Optional[AudioMetadata], audio: Optional[np.ndarray] = None) -> bool:
+        """Check whether a recording is short enough to share model batches"""
+        limit = self.config.batch_pool_max_seconds
+        if limit <= 0 or not self._pipeline_supports_pooling():
+            return False
+        if audio is not None:
+            return len(audio) / 16000 <= limit and not self._use_windows(audio)
+        return audio_metadata is None or audio_metadata.duration_seconds <= limit
+
+    def _pipeline_supports_pooling(self) -> bool:
+        """
+        Check the FasterWhisperPipeline internals pooled decoding relies on
+
+        _vad_chunks reads the private _vad_params and _decode_pooled swaps the
+        pipeline tokenizer; both match whisperx 3.3.4 - 3.8 (see requirements.txt).
+        """
+        pipeline = self.model
+        supported = all(
+            hasattr(pipeline, name) for name in ("vad_model", "_vad_params", "tokenizer")
+        ) and hasattr(getattr(pipeline, "model", None), "hf_tokenizer")
+        if not supported and not self._pooling_unsupported_logged:
+            logger.warning(
+                "Installed whisperx pipeline does not support pooled decoding; "
+                "transcribing files one at a time"
+            )
+            self._pooling_unsupported_logged = True
+        return supported
+
+    async def _transcribe_pooled(
+        self,
+        recordings: List[Tuple[str, np.ndarray, Optional[TimestampMap]]],
+        language: str,
+        word_alignment: bool = True
+    ) -> Dict[str, List[TranscriptSegment]]:
+        """
+        Decode the VAD chunks of several recordings in shared batches
+
+        Args:
+            recordings: (meeting_id, audio, timestamp map) per recording
+            language: Language code ("auto" = detect per recording; recordings
+                in the same language share batches)
+            word_alignment: Run word alignment per recording
+
+        Returns:
+            Dictionary mapping meeting_id to transcript segments (recordings
+            whose alignment or diarization failed are left out)
+        """
+        sample_rate = 16000
+
+        languages = [language] * len(recordings)
+        if language == AUTO_LANGUAGE:
+            languages = [
+                await asyncio.to_thread(self.model.detect_language, audio)
+                for _, audio, _ in recordings
+            ]
+
+        # VAD per recording (same chunking as the model's own transcribe)
+        chunks_per_recording = []
+        for _, audio, _ in recordings:
+            chunks_per_recording.append(await asyncio.to_thread(self._vad_chunks, audio))
+
+        clips = [
+            audio[int(chunk["start"] * sample_rate):int(chunk["end"] * sample_rate)]
+            for (_, audio, _), chunks in zip(recordings, chunks_per_recording)
+            for chunk in chunks
+        ]
+        clip_languages = [
+            lang
+            for lang, chunks in zip(languages, chunks_per_recording)
+            for _ in chunks
+        ]
+        batch_size = max(1, get_batch_size_store().get(self._batch_size_key(), self.config.batch_size))
+        logger.info(
+            f"Pooled decoding: {len(clips)} chunks from {len(recordings)} recordings "
+            f"in {-(-len(clips) // batch_size)} batches of up to {batch_size}"
+        )
+        texts: List[str] = [""] * len(clips)
+        for lang in dict.fromkeys(clip_languages):
+            indices = [i for i, clip_lang in enumerate(clip_languages) if clip_lang == lang]
+            decoded = await asyncio.to_thread(self._decode_pooled, [clips[i] for i in indices], lang)
+            for i, text in zip(indices, decoded):
+                texts[i] = text
+
+        # Route the decoded text back to each recording
+        results = {}
+        position = 0
+        for (meeting_id, audio, timestamp_map), chunks, lang in zip(
+            recordings, chunks_per_recording, languages
+        ):
+            segments = [
+                {
+                    "text": text,
+                    "start": round(chunk["start"], 3),
+                    "end": round(chunk["end"], 3)
+                }
+                for chunk, text in zip(chunks, texts[position:position + len(chunks)])
+            ]
+            position += len(chunks)
+
+            try:
+                results[meeting_id] = await self._finish_transcription(
+                    {"segments": segments, "language": lang},
+                    audio,
+                    meeting_id,
+                    timestamp_map,
+                    word_alignment
+                )
+            except Exception as e:
+                logger.error(f"Failed to transcribe {meeting_id}: {e}")
+
+        return results
+
+    def _vad_chunks(self, audio: np.ndarray) -> List[Dict]:
+        """
+        Speech chunks of up to chunk_length_seconds (blocking)
+
+        Mirrors the VAD step of WhisperX's FasterWhisperPipeline.transcribe so
+        pooled chunks match what a single-file run would decode.
+        """
+        pipeline = self.model
+        vad_model = pipeline.vad_model
+        if hasattr(vad_model, "merge_chunks"):
+            waveform = vad_model.preprocess_audio(audio)
+            merge_chunks = vad_model.merge_chunks
+        else:
+            # Manually assigned pyannote model
+            from whisperx.vads import Pyannote
+            waveform = Pyannote.preprocess_audio(audio)
+            merge_chunks = Pyannote.merge_chunks
+
+        speech = vad_model({"waveform": waveform, "sample_rate": 16000})
+        return merge_chunks(
+            speech,
+            self.config.chunk_length_seconds,
+            onset=pipeline._vad_params["vad_onset"],
+            offset=pipeline._vad_params["vad_offset"],
+        )
+
+    def _decode_pooled(self, clips: List[np.ndarray], language: str) -> List[str]:
+        """
+        Decode audio clips in model batches (blocking)
+
+        Args:
+            clips: Speech chunks of at most 30s, from any number of recordings
+            language: Language code shared by all clips
+
+        Returns:
+            Decoded text per clip, in input order
+        """
+        pipeline = self.model
+        tokenizer = pipeline.tokenizer
+        if tokenizer is None or tokenizer.language_code != language or tokenizer.task != "transcribe":
+            pipeline.tokenizer = Tokenizer(
+                pipeline.model.hf_tokenizer,
+                pipeline.model.model.is_multilingual,
+                task="transcribe",
+                language=language,
+            )
+
+        def decode(batch_size: int) -> List[str]:
+            texts = []
+            outputs = pipeline(
+                ({"inputs": clip} for clip in clips),
+                batch_size=batch_size,
+                num_workers=0
+            )
+            for out in outputs:
+                text = out["text"]
+                if batch_size in (0, 1, None):
+                    text = text[0]
+                texts.append(text)
+            return texts
+
+        try:
+            return run_with_oom_backoff(
+                decode, self._batch_size_key(), self.config.batch_size, get_batch_size_store()
+            )
+        finally:
+            # Same as WhisperX: a model loaded without a language detects it per call
+            if pipeline.preset_language is None:
+                pipeline.tokenizer = None
+
     async def get_supported_languages(self) -> List[str]:
         """
         Get list of supported languages
@@ -527,7 +1092,10 @@ class WhisperXEngine:
             "device": self.config.device,
             "compute_type": self.config.compute_type,
             "language": self.config.language,
+            "align_languages": self.align_models.languages,
+            "word_alignment": self.config.word_alignment,
             "batch_size": self.config.batch_size,
+            "safe_batch_size": get_batch_size_store().get(self._batch_size_key(), self.config.batch_size),
             "confidence_threshold": self.config.confidence_threshold,
             "initialized": self._is_initialized,
             "gpu_available": torch.cuda.is_available(),
@@ -544,11 +1112,7 @@ class WhisperXEngine:
             del self.model
             self.model = None
 
-        if self.align_model is not None:
-            del self.align_model
-            self.align_model = None
-
-        self.align_metadata = None
+        self.align_models.clear()
         self._is_initialized = False
 
         # Force garbage collection